@@ -0,0 +1,436 @@
+"""
+admission.py
+
+Admission control for LLM-backed endpoints.
+
+Bounds the number of concurrent LLM requests, with a bounded wait queue and
+load shedding (503 + Retry-After) when it is full, and applies per-user
+token-bucket quotas keyed on the JWT email (429 + Retry-After). State lives in
+process memory, or with ADMISSION_BACKEND=mongo in MongoDB so the limits hold
+across multiple workers.
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from . import metrics, user_model
+
+# Concurrent LLM requests (per process, or across workers with the mongo backend)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+# Requests allowed to wait for a slot (per process); more are shed immediately
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "16"))
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "10"))
+
+# Per-user token bucket: sustained rate and burst size (rate 0 disables quotas)
+LLM_USER_REQUESTS_PER_MINUTE = float(os.getenv("LLM_USER_REQUESTS_PER_MINUTE", "6"))
+LLM_USER_BURST = int(os.getenv("LLM_USER_BURST", "3"))
+
+# "memory" (single process) or "mongo" (shared across workers)
+ADMISSION_BACKEND = os.getenv("ADMISSION_BACKEND", "memory").lower()
+
+# A mongo slot whose holder died is reclaimed after this long; a live holder
+# renews the lease every third of it, however long its request runs
+SLOT_LEASE_SECONDS = 120
+
+# Assumed LLM request duration before any has been measured (for Retry-After)
+DEFAULT_HOLD_SECONDS = 5.0
+METRICS_WINDOW = 200
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed or over its quota."""
+
+    def __init__(self, status: int, message: str, retry_after: int):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class MemoryBackend:
+    """Concurrency slots and token buckets in process memory."""
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self._active = 0
+        self._condition = threading.Condition()
+        self._buckets: Dict[str, tuple] = {}
+        self._bucket_lock = threading.Lock()
+
+    def acquire_slot(self, timeout: float) -> Optional[str]:
+        """Wait up to timeout seconds for a slot; return a token or None."""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._active >= self.max_concurrency:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+            self._active += 1
+            return "local"
+
+    def release_slot(self, token: str) -> None:  # pylint: disable=unused-argument
+        """Free a slot and wake one waiter."""
+        with self._condition:
+            self._active -= 1
+            self._condition.notify()
+
+    def active_slots(self) -> int:
+        """Number of slots in use."""
+        with self._condition:
+            return self._active
+
+    def take_token(self, key: str, rate: float, burst: int) -> float:
+        """
+        Take one token from the key's bucket.
+
+        Returns:
+            0.0 if allowed, otherwise seconds until a token is available
+        """
+        now = time.monotonic()
+        with self._bucket_lock:
+            tokens, updated_at = self._buckets.get(key, (float(burst), now))
+            tokens = min(float(burst), tokens + (now - updated_at) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / rate
+
+
+class MongoBackend:
+    """
+    Concurrency slots and token buckets in MongoDB, shared by all workers.
+
+    Each slot is a document claimed atomically with find_one_and_update and
+    leased for SLOT_LEASE_SECONDS. While a slot is held, a background thread
+    renews its lease, so a long request (a whole plan, or hedged and
+    escalated calls) keeps its slot until it releases it. Buckets are updated
+    with compare-and-set on their last update time.
+    """
+
+    SLOTS_COLLECTION = "llm_admission_slots"
+    QUOTAS_COLLECTION = "llm_quotas"
+
+    def __init__(self, max_concurrency: int, lease_seconds: float = SLOT_LEASE_SECONDS):
+        self.max_concurrency = max_concurrency
+        self.lease_seconds = lease_seconds
+        self.slot_ids = [f"slot-{i}" for i in range(max_concurrency)]
+        self._slots_ready = False
+        # Held slot token -> database, renewed by the _renewer thread
+        self._held: Dict[str, object] = {}
+        self._held_lock = threading.Lock()
+        self._renewer: Optional[threading.Thread] = None
+
+    def _ensure_slots(self, db) -> None:
+        if self._slots_ready:
+            return
+        for slot_id in self.slot_ids:
+            db[self.SLOTS_COLLECTION].update_one(
+                {"_id": slot_id},
+                {"$setOnInsert": {"holder": None, "expires_at": 0}},
+                upsert=True,
+            )
+        self._slots_ready = True
+
+    def acquire_slot(self, timeout: float) -> Optional[str]:
+        """Poll (with backoff) up to timeout seconds for a slot; return a token or None."""
+        db = user_model.db
+        self._ensure_slots(db)
+        holder = uuid.uuid4().hex
+        deadline = time.time() + timeout
+        delay = 0.02
+
+        while True:
+            now = time.time()
+            slot = db[self.SLOTS_COLLECTION].find_one_and_update(
+                {
+                    "_id": {"$in": self.slot_ids},
+                    "$or": [{"holder": None}, {"expires_at": {"$lt": now}}],
+                },
+                {"$set": {"holder": holder, "expires_at": now + self.lease_seconds}},
+            )
+            if slot is not None:
+                token = f"{slot['_id']}:{holder}"
+                self._hold(token, db)
+                return token
+            if now >= deadline:
+                return None
+            time.sleep(min(delay, max(0.0, deadline - now)))
+            delay = min(delay * 2, 0.25)
+
+    def _hold(self, token: str, db) -> None:
+        """Renew the slot's lease until it is released."""
+        with self._held_lock:
+            self._held[token] = db
+            if self._renewer is None or not self._renewer.is_alive():
+                self._renewer = threading.Thread(
+                    target=self._renew_leases, name="admission-lease", daemon=True
+                )
+                self._renewer.start()
+
+    def _renew_leases(self) -> None:
+        """Extend the leases of the held slots; exits once none is held."""
+        while True:
+            time.sleep(self.lease_seconds / 3)
+            with self._held_lock:
+                if not self._held:
+                    self._renewer = None
+                    return
+                held = list(self._held.items())
+            for token, db in held:
+                slot_id, holder = token.split(":", 1)
+                try:
+                    db[self.SLOTS_COLLECTION].update_one(
+                        {"_id": slot_id, "holder": holder},
+                        {"$set": {"expires_at": time.time() + self.lease_seconds}},
+                    )
+                except Exception as e:
+                    print(f"WARNING: Failed to renew admission slot {slot_id}: {e}")
+
+    def release_slot(self, token: str) -> None:
+        """Free a slot if this request still holds it."""
+        with self._held_lock:
+            self._held.pop(token, None)
+        slot_id, holder = token.split(":", 1)
+        user_model.db[self.SLOTS_COLLECTION].update_one(
+            {"_id": slot_id, "holder": holder},
+            {"$set": {"holder": None, "expires_at": 0}},
+        )
+
+    def active_slots(self) -> int:
+        """Number of unexpired slots in use across all workers."""
+        return user_model.db[self.SLOTS_COLLECTION].count_documents(
+            {
+                "_id": {"$in": self.slot_ids},
+                "holder": {"$ne": None},
+                "expires_at": {"$gte": time.time()},
+            }
+        )
+
+    def take_token(self, key: str, rate: float, burst: int) -> float:
+        """
+        Take one token from the key's bucket.
+
+        Returns:
+            0.0 if allowed, otherwise seconds until a token is available
+        """
+        quotas = user_model.db[self.QUOTAS_COLLECTION]
+        for _ in range(5):
+            now = time.time()
+            bucket = quotas.find_one({"_id": key})
+            if bucket is None:
+                try:
+                    quotas.insert_one(
+                        {"_id": key, "tokens": burst - 1, "updated_at": now}
+                    )
+                    return 0.0
+                except DuplicateKeyError:
+                    continue  # another worker created it first
+
+            tokens = min(
+                float(burst), bucket["tokens"] + (now - bucket["updated_at"]) * rate
+            )
+            if tokens < 1:
+                return (1 - tokens) / rate
+            result = quotas.update_one(
+                {"_id": key, "updated_at": bucket["updated_at"]},
+                {"$set": {"tokens": tokens - 1, "updated_at": now}},
+            )
+            if result.modified_count:
+                return 0.0
+        # Lost every compare-and-set race: treat as over quota for now
+        return 1 / rate
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats = {
+    "admitted": 0,
+    "shed": 0,
+    "queue_timeouts": 0,
+    "rate_limited": 0,
+    "queue_depth": 0,
+    "max_queue_depth": 0,
+}
+_wait_times: deque = deque(maxlen=METRICS_WINDOW)
+_hold_times: deque = deque(maxlen=METRICS_WINDOW)
+
+
+def _get_backend():
+    """Get the configured admission backend (created on first use)."""
+    global _backend  # pylint: disable=global-statement
+
+    with _backend_lock:
+        if _backend is None:
+            if ADMISSION_BACKEND == "mongo":
+                _backend = MongoBackend(LLM_MAX_CONCURRENCY)
+            else:
+                _backend = MemoryBackend(LLM_MAX_CONCURRENCY)
+        return _backend
+
+
+def _retry_after_seconds(queue_depth: int) -> int:
+    """Estimate when a slot frees up: typical hold time x queue length / slots."""
+    with _stats_lock:
+        hold = metrics.percentile(list(_hold_times), 50) or DEFAULT_HOLD_SECONDS
+    backend = _get_backend()
+    return max(1, math.ceil(hold * (queue_depth + 1) / max(1, backend.max_concurrency)))
+
+
+def check_quota(email: str) -> None:
+    """
+    Take one request from the user's token bucket.
+
+    Args:
+        email: Authenticated user's email (from the JWT)
+
+    Raises:
+        AdmissionRejected: 429 if the user is over quota
+    """
+    if LLM_USER_REQUESTS_PER_MINUTE <= 0:
+        return
+    wait = _get_backend().take_token(
+        email or "anonymous", LLM_USER_REQUESTS_PER_MINUTE / 60, max(1, LLM_USER_BURST)
+    )
+    if wait > 0:
+        with _stats_lock:
+            _stats["rate_limited"] += 1
+        raise AdmissionRejected(
+            429,
+            "Too many recommendation requests. Please try again shortly.",
+            max(1, math.ceil(wait)),
+        )
+
+
+@contextmanager
+def admit(email: str):
+    """
+    Admit one LLM request: check the user's quota, then hold a concurrency slot.
+
+    Waits up to LLM_QUEUE_TIMEOUT_SECONDS for a slot. Requests arriving while
+    LLM_MAX_QUEUE requests are already waiting are shed immediately.
+
+    Args:
+        email: Authenticated user's email (from the JWT)
+
+    Raises:
+        AdmissionRejected: 429 if over quota, 503 if shed or the wait timed out
+    """
+    check_quota(email)
+    backend = _get_backend()
+
+    with _stats_lock:
+        queue_depth = _stats["queue_depth"]
+        shed = queue_depth >= LLM_MAX_QUEUE
+        if shed:
+            _stats["shed"] += 1
+        else:
+            _stats["queue_depth"] += 1
+            _stats["max_queue_depth"] = max(_stats["max_queue_depth"], queue_depth + 1)
+    if shed:
+        raise AdmissionRejected(
+            503,
+            "Service busy: too many recommendation requests in progress. Please retry.",
+            _retry_after_seconds(queue_depth),
+        )
+
+    start = time.perf_counter()
+    try:
+        token = backend.acquire_slot(LLM_QUEUE_TIMEOUT_SECONDS)
+    finally:
+        with _stats_lock:
+            _stats["queue_depth"] -= 1
+            _wait_times.append(time.perf_counter() - start)
+
+    if token is None:
+        with _stats_lock:
+            _stats["queue_timeouts"] += 1
+        raise AdmissionRejected(
+            503,
+            "Service busy: timed out waiting for a recommendation slot. Please retry.",
+            _retry_after_seconds(queue_depth),
+        )
+
+    with _stats_lock:
+        _stats["admitted"] += 1
+    held_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        backend.release_slot(token)
+        with _stats_lock:
+            _hold_times.append(time.perf_counter() - held_at)
+
+
+def _exit_abandoned(admission, future) -> None:
+    """Release the slot of a request that was cancelled while waiting for it."""
+    if not future.cancelled() and future.exception() is None:
+        admission.__exit__(None, None, None)
+
+
+@asynccontextmanager
+async def admit_async(email: str):
+    """
+    Async version of admit (ASGI serving mode).
+
+    Entering and leaving admit() (quota, waiting for and releasing a slot)
+    run in worker threads so the event loop is never blocked.
+
+    Args:
+        email: Authenticated user's email (from the JWT)
+
+    Raises:
+        AdmissionRejected: 429 if over quota, 503 if shed or the wait timed out
+    """
+    admission = admit(email)
+    entering = asyncio.ensure_future(asyncio.to_thread(admission.__enter__))
+    try:
+        await asyncio.shield(entering)
+    except asyncio.CancelledError:
+        # The client went away: release the slot once the wait finishes
+        entering.add_done_callback(lambda future: _exit_abandoned(admission, future))
+        raise
+
+    try:
+        yield
+    finally:
+        await asyncio.to_thread(admission.__exit__, None, None, None)
+
+
+def get_admission_stats() -> Dict:
+    """
+    Get admission metrics for this process.
+
+    Returns:
+        Dictionary with limits, admitted/shed/timed-out/rate-limited counts,
+        current and max queue depth, active slots and wait time percentiles
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+        wait_times = list(_wait_times)
+    backend = _get_backend()
+    stats.update(
+        {
+            "backend": ADMISSION_BACKEND,
+            "max_concurrency": backend.max_concurrency,
+            "max_queue": LLM_MAX_QUEUE,
+            "active": backend.active_slots(),
+            "wait_seconds": {
+                "p50": metrics.percentile(wait_times, 50),
+                "p95": metrics.percentile(wait_times, 95),
+                "p99": metrics.percentile(wait_times, 99),
+            },
+        }
+    )
+    return stats
@@ -1,8 +1,9 @@
 import os
 
 from dotenv import load_dotenv
-from flask import Flask, redirect, render_template, request, session, url_for
+from flask import Flask, jsonify, redirect, render_template, request, session, url_for
 
+from . import warmup
 from .auth_routes import auth
 from .course_routes import courses
 from .plan_routes import plans
@@ -77,3 +78,12 @@ def editsemester():
     if "user_email" not in session:
         return redirect(url_for("login_page"))
     return render_template("editsemester.html")
+
+
+@app.route("/readyz")
+def readyz():
+    """Readiness probe: 200 once this process has warmed up, 503 before that."""
+    status = warmup.get_warmup_status()
+    if not status["ready"]:
+        warmup.retry_in_background()
+    return jsonify(status), 200 if status["ready"] else 503
@@ -0,0 +1,228 @@
+"""
+asgi.py
+
+ASGI serving mode (SERVER_MODE=asgi, see start.sh):
+    uvicorn api.asgi:app --host 0.0.0.0 --port 5000
+
+The LLM endpoints are served by coroutines that use the async OpenAI client,
+so a request waiting on the LLM holds no thread:
+
+    POST /api/recommendations/generate
+    POST /api/recommendations/generate-plan
+
+Every other request (pages, static files, auth, profile, plans, stats) is
+passed to the Flask app through asgiref's WSGI adapter, at most
+ASGI_WSGI_THREADS at a time. The default serving mode (gunicorn, WSGI) is
+unchanged.
+
+Request validation, course filtering, fallbacks and response bodies are
+shared with the Flask views, and the LLM calls with the sync path (see
+llm_service._run_calls). Short blocking steps (authentication, MongoDB,
+filtering, the local recommender) run in worker threads so they don't block
+the event loop.
+"""
+
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+from starlette.responses import Response
+from starlette.routing import Route, Router
+
+from . import (
+    admission,
+    llm_service,
+    plan_recommender,
+    recommendation_routes,
+    recommendation_store,
+    warmup,
+)
+from .app import app as flask_app
+
+ASGI_WSGI_THREADS = int(os.getenv("ASGI_WSGI_THREADS", "32"))
+
+_wsgi_app = WsgiToAsgi(flask_app)
+_wsgi_slots = asyncio.Semaphore(max(1, ASGI_WSGI_THREADS))
+
+
+async def wsgi_fallback(scope, receive, send):
+    """Serve a request with the Flask app, in a worker thread of its own."""
+    # Without a ThreadSensitiveContext, asgiref runs every WSGI request in
+    # one shared thread
+    async with _wsgi_slots, ThreadSensitiveContext():
+        await _wsgi_app(scope, receive, send)
+
+
+def _json_response(result) -> Response:
+    """Build a JSON response from a (body, status[, headers]) result."""
+    body, status = result[0], result[1]
+    headers = result[2] if len(result) > 2 else None
+    return Response(
+        json.dumps(body, default=str),
+        status_code=status,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+def async_view(handler):
+    """
+    Wrap an async handler(request, user) as an authenticated JSON endpoint.
+
+    Same behaviour as require_auth and the Flask views' error handling: 401
+    if authentication fails, JSON instead of an HTML error page on errors.
+    """
+
+    async def endpoint(request):
+        try:
+            user, error = await asyncio.to_thread(
+                recommendation_routes.authenticate,
+                request.headers.get("authorization"),
+            )
+            result = error if error else await handler(request, user)
+        except Exception as e:
+            print(f"ERROR in {handler.__name__}: {e}")
+            import traceback
+
+            traceback.print_exc()
+            result = {"error": f"Internal server error: {str(e)}"}, 500
+        return _json_response(result)
+
+    endpoint.__name__ = handler.__name__
+    return endpoint
+
+
+async def _request_json(request):
+    """Request body as JSON (None if missing or invalid, like Flask's request.json)."""
+    body = await request.body()
+    if not body:
+        return None
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+@async_view
+async def generate_recommendations(request, user):
+    """POST /api/recommendations/generate (see recommendation_routes.generate_recommendations)."""
+    context, error = await asyncio.to_thread(
+        recommendation_routes.prepare_semester_request,
+        user,
+        await _request_json(request),
+    )
+    if error:
+        return error
+    mode = context["mode"]
+
+    recommended_courses = None
+    source = "local"
+
+    if mode != "local":
+        try:
+            async with admission.admit_async(user.get("email")):
+                recommended_courses = (
+                    await llm_service.generate_course_recommendations_async(
+                        **recommendation_routes.llm_recommendation_args(context)
+                    )
+                )
+        except admission.AdmissionRejected as e:
+            if mode == "llm":
+                return recommendation_routes.admission_rejected_error(e)
+            print(f"WARNING: {e}")
+        source = "llm"
+
+        if not recommended_courses:
+            if mode == "llm":
+                return recommendation_routes.llm_unavailable_error()
+            print("WARNING: LLM recommendations unavailable, using local recommender")
+
+    if not recommended_courses:
+        recommended_courses = await asyncio.to_thread(
+            recommendation_routes.local_recommendations, context
+        )
+        source = "local"
+
+    try:
+        await asyncio.to_thread(
+            lambda: recommendation_store.save_recommendations(
+                **recommendation_routes.saved_recommendation_args(
+                    user, context, recommended_courses, source
+                ),
+                db=recommendation_routes.db,
+            )
+        )
+    except Exception as e:
+        print(f"ERROR: Failed to save recommendations: {e}")
+    return {"courses": recommended_courses, "source": source}, 200
+
+
+@async_view
+async def generate_plan_recommendations(request, user):
+    """POST /api/recommendations/generate-plan (see recommendation_routes.generate_plan_recommendations)."""
+    context, error = await asyncio.to_thread(
+        recommendation_routes.prepare_plan_request, user, await _request_json(request)
+    )
+    if error:
+        return error
+    mode = context["mode"]
+
+    plan = None
+    source = "local"
+
+    if mode != "local":
+        # One admission slot covers all of the plan's LLM calls
+        try:
+            async with admission.admit_async(user.get("email")):
+                plan = await plan_recommender.generate_plan_async(
+                    **recommendation_routes.plan_args(context),
+                    strategy=context["strategy"],
+                )
+        except admission.AdmissionRejected as e:
+            if mode == "llm":
+                return recommendation_routes.admission_rejected_error(e)
+            print(f"WARNING: {e}")
+        source = "llm"
+
+        if plan is None:
+            if mode == "llm":
+                return recommendation_routes.llm_unavailable_error()
+            print("WARNING: LLM plan unavailable, using local recommender")
+
+    if plan is None:
+        plan = await asyncio.to_thread(
+            lambda: plan_recommender.generate_local_plan(
+                **recommendation_routes.plan_args(context)
+            )
+        )
+        source = "local"
+
+    return recommendation_routes.plan_body(source, plan, context["semesters"]), 200
+
+
+@asynccontextmanager
+async def lifespan(_app):
+    """Warm up before serving (GET /readyz reports ready once this completes)."""
+    await asyncio.to_thread(warmup.warm_up)
+    yield
+
+
+app = Router(
+    routes=[
+        Route(
+            "/api/recommendations/generate",
+            generate_recommendations,
+            methods=["POST"],
+        ),
+        Route(
+            "/api/recommendations/generate-plan",
+            generate_plan_recommendations,
+            methods=["POST"],
+        ),
+    ],
+    default=wsgi_fallback,
+    lifespan=lifespan,
+)
@@ -0,0 +1,775 @@
+"""
+catalog.py
+
+Binary course catalog snapshot, memory-mapped read-only by every server
+process so the catalog is held once in the page cache instead of once per
+worker as Python dictionaries.
+
+The snapshot is built by the first process that finds it missing or stale:
+under gunicorn, the master during warmup (api/warmup.py), before workers are
+forked. It is stale if its catalog_meta version, database name or published
+content hash differ from the database's. The default path is per database,
+so apps on different databases never share a file.
+
+File layout (little-endian, sections aligned to 8 bytes):
+- header: magic, course count, catalog_meta version, catalog version,
+  database name and content hash string references, section offsets
+- records: one fixed-width RECORD struct per course, in catalog order
+- code index: record numbers sorted by course code (binary search)
+- prerequisite edges: (offset, length) string references, per course a
+  contiguous run
+- search text: lowercased "code\\0title\\n" per course, with a table of
+  line offsets
+- string table: UTF-8 strings referenced by (offset, length)
+
+CatalogSnapshot is a read-only Sequence of courses (course.Course), so it can
+be passed wherever a list of courses is expected; accessors such as code(),
+prerequisites(), offered_in() and search() read single fields without
+building the courses.
+"""
+
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .course import FIELDS, Course, PrerequisiteLogic, to_plain
+
+# Serve the catalog from the snapshot (disable to read courses from MongoDB
+# on every request)
+CATALOG_SNAPSHOT = os.getenv("CATALOG_SNAPSHOT", "true").lower() in ("1", "true", "yes")
+# Default: <tmp>/course_catalog-<database name>.snap (see snapshot_path)
+CATALOG_SNAPSHOT_PATH = os.getenv("CATALOG_SNAPSHOT_PATH")
+# Seconds between checks of the published catalog_meta version
+CATALOG_SNAPSHOT_CHECK_SECONDS = float(os.getenv("CATALOG_SNAPSHOT_CHECK_SECONDS", "5"))
+
+CATALOG_META_COLLECTION = "catalog_meta"
+CATALOG_COLLECTION = "courses"
+
+# Course fields that define the catalog content (used for versioning)
+CATALOG_VERSION_FIELDS = (
+    "course_code",
+    "title",
+    "credits",
+    "difficulty",
+    "prerequisites",
+    "semester_offered",
+    "description",
+)
+
+MAGIC = b"CATSNAP2"
+# magic, course count, catalog_meta version, string refs (catalog_version,
+# database name, catalog_meta content hash), section offsets (records, code
+# index, edges, search offsets, search text, strings), search text length
+HEADER = struct.Struct("<8sIq6I6QQ")
+# String refs (offset, length) for course_code, title, type, subject,
+# description, credits (string form), extras (JSON), prerequisite logic;
+# first edge and edge count; credits (int form), difficulty; present-field
+# bits, offerings bits, prerequisite kind
+RECORD = struct.Struct("<16I2I2iHBB")
+STRING_REF = struct.Struct("<2I")
+U32 = struct.Struct("<I")
+
+TEXT_FIELDS = ("course_code", "title", "type", "subject", "description")
+# Present-field bits
+HAS = {field: 1 << bit for bit, field in enumerate(TEXT_FIELDS)}
+HAS_CREDITS_INT = 1 << 5
+HAS_CREDITS_STR = 1 << 6
+HAS_DIFFICULTY = 1 << 7
+HAS_PREREQUISITES = 1 << 8
+HAS_OFFERINGS = 1 << 9
+# Offerings bits, in the order they are listed in materialized courses
+OFFERINGS = ("Fall", "Spring", "Summer", "Winter", "Occasionally")
+OFFERING_BITS = {offering: 1 << bit for bit, offering in enumerate(OFFERINGS)}
+# Offerings bits -> tuple of offerings (shared by materialized courses)
+_OFFERING_TUPLES = [
+    tuple(o for o in OFFERINGS if bits & OFFERING_BITS[o])
+    for bits in range(1 << len(OFFERINGS))
+]
+# Prerequisite kinds: plain list of codes (AND), {"logic", "courses"} object
+PREREQ_LIST = 0
+PREREQ_LOGIC = 1
+
+INT32_MIN = -(2**31)
+INT32_MAX = 2**31 - 1
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _is_int32(value) -> bool:
+    return (
+        isinstance(value, int)
+        and not isinstance(value, bool)
+        and INT32_MIN <= value <= INT32_MAX
+    )
+
+
+class _StringTable:
+    """Deduplicated UTF-8 string table built while writing a snapshot."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+
+    def ref(self, text: str) -> Tuple[int, int]:
+        ref = self._offsets.get(text)
+        if ref is None:
+            encoded = text.encode("utf-8")
+            ref = (len(self.data), len(encoded))
+            self.data += encoded
+            self._offsets[text] = ref
+        return ref
+
+
+def _encode_course(
+    course: Dict, strings: _StringTable, edges: List[Tuple[int, int]]
+) -> bytes:
+    """Encode one course as a RECORD; values of unexpected types go to extras."""
+    if isinstance(course, Course):
+        course = course.to_dict()
+    extras = {}
+    present = 0
+    refs = {}
+    for field in TEXT_FIELDS:
+        value = course.get(field)
+        if isinstance(value, str):
+            refs[field] = strings.ref(value)
+            present |= HAS[field]
+        elif field in course:
+            extras[field] = value
+
+    course_credits = course.get("credits")
+    credits_int = 0
+    credits_str = (0, 0)
+    if _is_int32(course_credits):
+        credits_int = course_credits
+        present |= HAS_CREDITS_INT
+    elif isinstance(course_credits, str):
+        credits_str = strings.ref(course_credits)
+        present |= HAS_CREDITS_STR
+    elif "credits" in course:
+        extras["credits"] = course_credits
+
+    difficulty = course.get("difficulty")
+    if _is_int32(difficulty):
+        present |= HAS_DIFFICULTY
+    elif "difficulty" in course:
+        extras["difficulty"] = difficulty
+        difficulty = 0
+    else:
+        difficulty = 0
+
+    prerequisites = course.get("prerequisites")
+    prereq_kind = PREREQ_LIST
+    prereq_codes = None
+    logic = (0, 0)
+    if isinstance(prerequisites, list) and all(
+        isinstance(c, str) for c in prerequisites
+    ):
+        prereq_codes = prerequisites
+    elif (
+        isinstance(prerequisites, dict)
+        and set(prerequisites) == {"logic", "courses"}
+        and isinstance(prerequisites["logic"], str)
+        and isinstance(prerequisites["courses"], list)
+        and all(isinstance(c, str) for c in prerequisites["courses"])
+    ):
+        prereq_kind = PREREQ_LOGIC
+        prereq_codes = prerequisites["courses"]
+        logic = strings.ref(prerequisites["logic"])
+    elif "prerequisites" in course:
+        extras["prerequisites"] = prerequisites
+    first_edge = len(edges)
+    if prereq_codes is not None:
+        present |= HAS_PREREQUISITES
+        edges.extend(strings.ref(code) for code in prereq_codes)
+
+    offerings = course.get("semester_offered")
+    offered = 0
+    if (
+        isinstance(offerings, list)
+        and all(offering in OFFERING_BITS for offering in offerings)
+        and offerings == [o for o in OFFERINGS if o in offerings]
+    ):
+        for offering in offerings:
+            offered |= OFFERING_BITS[offering]
+        present |= HAS_OFFERINGS
+    elif "semester_offered" in course:
+        extras["semester_offered"] = offerings
+
+    for field, value in course.items():
+        if field != "_id" and field not in FIELDS:
+            extras[field] = value
+    extras_ref = strings.ref(json.dumps(extras, default=str)) if extras else (0, 0)
+
+    text_refs = []
+    for field in TEXT_FIELDS:
+        text_refs.extend(refs.get(field, (0, 0)))
+    return RECORD.pack(
+        *text_refs,
+        *credits_str,
+        *extras_ref,
+        *logic,
+        first_edge,
+        len(edges) - first_edge,
+        credits_int,
+        difficulty,
+        present,
+        offered,
+        prereq_kind,
+    )
+
+
+def compute_catalog_version(courses) -> str:
+    """
+    Content hash of a catalog (see course_filtering.get_catalog_version).
+
+    Args:
+        courses: Course dictionaries or Course records
+
+    Returns:
+        Short hex digest identifying the catalog content
+    """
+    # to_plain: Course tuples hash like the catalog's lists
+    canonical = sorted(
+        (
+            {field: to_plain(course.get(field)) for field in CATALOG_VERSION_FIELDS}
+            for course in courses
+        ),
+        key=lambda course: str(course.get("course_code")),
+    )
+    payload = json.dumps(canonical, sort_keys=True, default=str).encode()
+    return hashlib.sha1(payload).hexdigest()[:16]
+
+
+def write_snapshot(
+    courses: List[Dict],
+    catalog_version: str,
+    meta_version: int,
+    path: str,
+    db_name: str = "",
+    content_hash: Optional[str] = None,
+) -> str:
+    """
+    Write a catalog snapshot file (atomically replacing any previous one).
+
+    Args:
+        courses: Course dictionaries (MongoDB "_id" fields are not stored)
+        catalog_version: Catalog content version (course_filtering.get_catalog_version)
+        meta_version: Published catalog_meta version the courses belong to
+        path: Snapshot file path
+        db_name: Database the catalog was read from
+        content_hash: catalog_meta content hash of the published catalog
+
+    Returns:
+        Path written
+    """
+    strings = _StringTable()
+    edges: List[Tuple[int, int]] = []
+    records = bytearray()
+    search_text = bytearray()
+    search_offsets = bytearray()
+    codes = []
+    for course in courses:
+        records += _encode_course(course, strings, edges)
+        code = course.get("course_code")
+        code = code if isinstance(code, str) else ""
+        codes.append(code.encode("utf-8"))
+        title = course.get("title")
+        title = title if isinstance(title, str) else ""
+        search_offsets += U32.pack(len(search_text))
+        search_text += f"{code.lower()}\0{title.lower()}\n".encode("utf-8")
+
+    # Stable sort, so the first of duplicate codes is found first
+    code_index = sorted(range(len(codes)), key=codes.__getitem__)
+    version_ref = strings.ref(catalog_version)
+    db_name_ref = strings.ref(db_name)
+    content_hash_ref = strings.ref(content_hash or "")
+
+    sections = [
+        bytes(records),
+        b"".join(U32.pack(i) for i in code_index),
+        b"".join(STRING_REF.pack(*edge) for edge in edges),
+        bytes(search_offsets),
+        bytes(search_text),
+        bytes(strings.data),
+    ]
+    offsets = []
+    position = _align(HEADER.size)
+    for section in sections:
+        offsets.append(position)
+        position = _align(position + len(section))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".catalog-", suffix=".snap", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(
+                HEADER.pack(
+                    MAGIC,
+                    len(courses),
+                    meta_version,
+                    *version_ref,
+                    *db_name_ref,
+                    *content_hash_ref,
+                    *offsets,
+                    len(search_text),
+                )
+            )
+            for offset, section in zip(offsets, sections):
+                f.write(b"\0" * (offset - f.tell()))
+                f.write(section)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+class _CodeIndex(Mapping):
+    """Read-only course code -> course mapping over a snapshot (first wins)."""
+
+    def __init__(self, snapshot: "CatalogSnapshot"):
+        self._snapshot = snapshot
+
+    def __getitem__(self, code):
+        position = self._snapshot.position(code)
+        if position < 0:
+            raise KeyError(code)
+        return self._snapshot[position]
+
+    def __contains__(self, code):
+        return self._snapshot.position(code) >= 0
+
+    def __iter__(self):
+        seen = set()
+        for code in self._snapshot.codes():
+            if code not in seen:
+                seen.add(code)
+                yield code
+
+    def __len__(self):
+        return len(set(self._snapshot.codes()))
+
+
+class _Header(NamedTuple):
+    """Catalog identity stored in a snapshot's header."""
+
+    meta_version: int
+    catalog_version: str
+    db_name: str
+    content_hash: str
+
+
+class _Sections(NamedTuple):
+    """File offsets of a snapshot's sections (see HEADER)."""
+
+    records: int
+    code_index: int
+    edges: int
+    search_offsets: int
+    search_text: int
+    strings: int
+    search_end: int
+
+
+class CatalogSnapshot(Sequence):
+    """
+    Read-only, memory-mapped course catalog.
+
+    Indexing and iteration build a new Course per access; the accessor
+    methods decode only the fields they return.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm.size() < HEADER.size or self._mm[:8] != MAGIC:
+            self._mm.close()
+            raise ValueError(f"Not a catalog snapshot: {path}")
+        (
+            _,
+            self._count,
+            meta_version,
+            version_offset,
+            version_length,
+            db_name_offset,
+            db_name_length,
+            content_hash_offset,
+            content_hash_length,
+            *offsets,
+            search_length,
+        ) = HEADER.unpack_from(self._mm, 0)
+        self._sections = _Sections(*offsets, offsets[4] + search_length)
+        self._header = _Header(
+            meta_version,
+            self._string(version_offset, version_length),
+            self._string(db_name_offset, db_name_length),
+            self._string(content_hash_offset, content_hash_length),
+        )
+        self.path = path
+        self.index = _CodeIndex(self)
+
+    @property
+    def meta_version(self) -> int:
+        """catalog_meta version the snapshot was written for."""
+        return self._header.meta_version
+
+    @property
+    def catalog_version(self) -> str:
+        """Catalog content version (course_filtering.get_catalog_version)."""
+        return self._header.catalog_version
+
+    @property
+    def db_name(self) -> str:
+        """Database the catalog was read from."""
+        return self._header.db_name
+
+    @property
+    def content_hash(self) -> str:
+        """catalog_meta content hash of the published catalog ("" if none)."""
+        return self._header.content_hash
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._sections.strings + offset
+        return self._mm[start : start + length].decode("utf-8")
+
+    def _record(self, position: int) -> tuple:
+        if not 0 <= position < self._count:
+            raise IndexError("catalog position out of range")
+        return RECORD.unpack_from(
+            self._mm, self._sections.records + position * RECORD.size
+        )
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(self._count))]
+        if position < 0:
+            position += self._count
+        record = self._record(position)
+        present = record[20]
+        if record[13]:
+            # Rare: values outside the fixed-width layout
+            course = self._course_dict(record)
+            course.update(json.loads(self._string(record[12], record[13])))
+            return Course.from_dict(course)
+        # Slots set directly: Course.__setattr__ is disabled (immutable)
+        string = self._string
+        set_field = object.__setattr__
+        course = Course.__new__(Course)
+        if present & HAS["course_code"]:
+            set_field(course, "course_code", sys.intern(string(record[0], record[1])))
+        if present & HAS["title"]:
+            set_field(course, "title", string(record[2], record[3]))
+        if present & HAS["type"]:
+            set_field(course, "type", string(record[4], record[5]))
+        if present & HAS["subject"]:
+            set_field(course, "subject", string(record[6], record[7]))
+        if present & HAS_DIFFICULTY:
+            set_field(course, "difficulty", record[19])
+        if present & HAS_CREDITS_INT:
+            set_field(course, "credits", record[18])
+        elif present & HAS_CREDITS_STR:
+            set_field(course, "credits", string(record[10], record[11]))
+        if present & HAS_PREREQUISITES:
+            set_field(course, "prerequisites", self._prerequisites(record))
+        if present & HAS["description"]:
+            set_field(course, "description", string(record[8], record[9]))
+        if present & HAS_OFFERINGS:
+            set_field(course, "semester_offered", _OFFERING_TUPLES[record[21]])
+        set_field(course, "_extras", None)
+        return course
+
+    def _course_dict(self, record: tuple) -> Dict:
+        present = record[20]
+        string = self._string
+        course = {}
+        for field in TEXT_FIELDS:
+            if present & HAS[field]:
+                offset = 2 * TEXT_FIELDS.index(field)
+                course[field] = string(record[offset], record[offset + 1])
+        if present & HAS_DIFFICULTY:
+            course["difficulty"] = record[19]
+        if present & HAS_CREDITS_INT:
+            course["credits"] = record[18]
+        elif present & HAS_CREDITS_STR:
+            course["credits"] = string(record[10], record[11])
+        if present & HAS_PREREQUISITES:
+            course["prerequisites"] = self._prerequisites(record)
+        if present & HAS_OFFERINGS:
+            course["semester_offered"] = _OFFERING_TUPLES[record[21]]
+        return course
+
+    def _prerequisites(self, record: tuple):
+        if not record[17] and record[22] == PREREQ_LIST:
+            return ()
+        codes = []
+        for edge in range(record[16], record[16] + record[17]):
+            offset, length = STRING_REF.unpack_from(
+                self._mm, self._sections.edges + edge * STRING_REF.size
+            )
+            codes.append(sys.intern(self._string(offset, length)))
+        if record[22] == PREREQ_LOGIC:
+            return PrerequisiteLogic(self._string(record[14], record[15]), codes)
+        return tuple(codes)
+
+    def _extra(self, record: tuple, field: str, default=None):
+        if not record[13]:
+            return default
+        return json.loads(self._string(record[12], record[13])).get(field, default)
+
+    def code(self, position: int) -> str:
+        """Course code at a catalog position ("" if the course has none)."""
+        record = self._record(position)
+        return self._string(record[0], record[1])
+
+    def codes(self) -> Iterator[str]:
+        """Course codes in catalog order."""
+        records = memoryview(self._mm)[
+            self._sections.records : self._sections.records + self._count * RECORD.size
+        ]
+        try:
+            for record in RECORD.iter_unpack(records):
+                yield self._string(record[0], record[1])
+        finally:
+            records.release()
+
+    def title(self, position: int) -> str:
+        """Title at a catalog position ("" if the course has none)."""
+        record = self._record(position)
+        return self._string(record[2], record[3])
+
+    def credits(self, position: int, default=4):
+        """Credits at a catalog position as stored (int or range string)."""
+        record = self._record(position)
+        if record[20] & HAS_CREDITS_INT:
+            return record[18]
+        if record[20] & HAS_CREDITS_STR:
+            return self._string(record[10], record[11])
+        return self._extra(record, "credits", default)
+
+    def prerequisites(self, position: int):
+        """Prerequisites at a catalog position (tuple, PrerequisiteLogic or None)."""
+        record = self._record(position)
+        if record[20] & HAS_PREREQUISITES:
+            return self._prerequisites(record)
+        return self._extra(record, "prerequisites")
+
+    def offered_in(self, position: int, semester_type: str) -> bool:
+        """True if the course at a catalog position is offered in a Fall/Spring/Summer term."""
+        record = self._record(position)
+        if record[20] & HAS_OFFERINGS:
+            return bool(record[21] & OFFERING_BITS.get(semester_type, 0))
+        return semester_type in (self._extra(record, "semester_offered") or [])
+
+    def position(self, code: str) -> int:
+        """
+        Find a course by code (binary search on the code index).
+
+        Returns:
+            Catalog position of the first course with this code, or -1
+        """
+        target = code.encode("utf-8") if isinstance(code, str) else None
+        if target is None:
+            return -1
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            (position,) = U32.unpack_from(
+                self._mm, self._sections.code_index + middle * U32.size
+            )
+            record = RECORD.unpack_from(
+                self._mm, self._sections.records + position * RECORD.size
+            )
+            start = self._sections.strings + record[0]
+            if self._mm[start : start + record[1]] < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count:
+            (position,) = U32.unpack_from(
+                self._mm, self._sections.code_index + low * U32.size
+            )
+            if self.code(position) == code:
+                return position
+        return -1
+
+    def get(self, code: str) -> Optional[Course]:
+        """Course for a code, or None."""
+        position = self.position(code)
+        return self[position] if position >= 0 else None
+
+    def search(self, query: str) -> List[int]:
+        """
+        Find courses whose code or title contains a query (case-insensitive).
+
+        Args:
+            query: Search text
+
+        Returns:
+            Catalog positions of matching courses, in catalog order
+        """
+        needle = query.lower().encode("utf-8")
+        if not needle or b"\0" in needle or b"\n" in needle:
+            return []
+        line_starts = _U32View(self._mm, self._sections.search_offsets, self._count)
+        matches = []
+        start = self._sections.search_text
+        while True:
+            hit = self._mm.find(needle, start, self._sections.search_end)
+            if hit < 0:
+                return matches
+            position = (
+                bisect.bisect_right(line_starts, hit - self._sections.search_text) - 1
+            )
+            matches.append(position)
+            # Continue after this course's line
+            if position + 1 >= self._count:
+                return matches
+            start = self._sections.search_text + line_starts[position + 1]
+
+    def close(self) -> None:
+        """Unmap the snapshot file."""
+        self._mm.close()
+
+
+class _U32View(Sequence):
+    """Sequence view of a little-endian uint32 array inside a buffer."""
+
+    def __init__(self, buffer, offset: int, count: int):
+        self._buffer = buffer
+        self._offset = offset
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        return U32.unpack_from(self._buffer, self._offset + i * U32.size)[0]
+
+
+def iter_course_codes(all_courses) -> Iterator[Tuple[int, str]]:
+    """
+    Iterate over (position, course code) of a course list or snapshot.
+
+    For a snapshot only the codes are decoded; all_courses[position] gives
+    the full course when needed.
+    """
+    if isinstance(all_courses, CatalogSnapshot):
+        return enumerate(all_courses.codes())
+    return (
+        (position, course.get("course_code", ""))
+        for position, course in enumerate(all_courses)
+    )
+
+
+_snapshot: Optional[CatalogSnapshot] = None
+_snapshot_checked = 0.0
+_snapshot_lock = threading.Lock()
+
+
+def snapshot_path(db) -> str:
+    """Snapshot file of a database: CATALOG_SNAPSHOT_PATH, or one per database name."""
+    if CATALOG_SNAPSHOT_PATH:
+        return CATALOG_SNAPSHOT_PATH
+    name = "".join(c if c.isalnum() or c in "-_" else "_" for c in db.name)
+    return os.path.join(tempfile.gettempdir(), f"course_catalog-{name}.snap")
+
+
+def _is_current(snapshot: CatalogSnapshot, db, meta: Dict) -> bool:
+    """Check that a snapshot holds the catalog published in this database."""
+    return (
+        snapshot.meta_version == meta.get("version")
+        and snapshot.db_name == db.name
+        and snapshot.content_hash == (meta.get("content_hash") or "")
+    )
+
+
+def _build_snapshot(db, meta: Dict, path: str) -> None:
+    courses = list(db[CATALOG_COLLECTION].find({}, {"_id": 0}))
+    write_snapshot(
+        courses,
+        compute_catalog_version(courses),
+        meta.get("version"),
+        path,
+        db.name,
+        meta.get("content_hash"),
+    )
+    print(
+        f"DEBUG: Wrote catalog snapshot v{meta.get('version')} ({len(courses)} courses)"
+    )
+
+
+def get_snapshot(db, path: Optional[str] = None) -> Optional[CatalogSnapshot]:
+    """
+    Get the memory-mapped snapshot of the published catalog.
+
+    The catalog_meta version is checked at most every
+    CATALOG_SNAPSHOT_CHECK_SECONDS; a missing snapshot file, or one written
+    for another catalog_meta version, database or content hash, is rebuilt
+    from the courses collection.
+
+    Args:
+        db: MongoDB database instance
+        path: Snapshot file path (default: snapshot_path(db))
+
+    Returns:
+        CatalogSnapshot, or None if the catalog was never published (no
+        catalog_meta) or the snapshot could not be loaded
+    """
+    global _snapshot, _snapshot_checked  # pylint: disable=global-statement
+
+    path = path or snapshot_path(db)
+    snapshot = _snapshot
+    if (
+        snapshot is not None
+        and snapshot.path == path
+        and time.monotonic() - _snapshot_checked < CATALOG_SNAPSHOT_CHECK_SECONDS
+    ):
+        return snapshot
+
+    with _snapshot_lock:
+        try:
+            meta = db[CATALOG_META_COLLECTION].find_one(
+                {"_id": CATALOG_COLLECTION}, {"version": 1, "content_hash": 1}
+            )
+            if meta is None:
+                return None
+            snapshot = _snapshot
+            if (
+                snapshot is None
+                or snapshot.path != path
+                or not _is_current(snapshot, db, meta)
+            ):
+                snapshot = None
+                if os.path.exists(path):
+                    try:
+                        snapshot = CatalogSnapshot(path)
+                    except ValueError:
+                        pass  # Written by an older version: rebuilt below
+                    if snapshot is not None and not _is_current(snapshot, db, meta):
+                        snapshot = None
+                if snapshot is None:
+                    _build_snapshot(db, meta, path)
+                    snapshot = CatalogSnapshot(path)
+                # The previous snapshot is unmapped when no request uses it any more
+                _snapshot = snapshot
+            _snapshot_checked = time.monotonic()
+            return snapshot
+        except Exception as e:
+            print(f"ERROR: Failed to load catalog snapshot: {type(e).__name__}: {e}")
+            return None
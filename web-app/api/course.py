@@ -0,0 +1,232 @@
+"""
+course.py
+
+Compact, immutable course records used throughout the filtering pipeline.
+
+Course is a read-only Mapping with __slots__ instead of a per-course
+dictionary: course codes are interned, prerequisites and offerings are
+tuples (offerings tuples are shared between courses), and MongoDB's _id is
+dropped. Existing code keeps working through course.get(...) and
+course["..."]; to_dict() gives the plain JSON/BSON form.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional
+
+# Fields stored in slots, in the order of the seeded catalog; any other key
+# is kept in the course's extras
+FIELDS = (
+    "course_code",
+    "title",
+    "type",
+    "subject",
+    "difficulty",
+    "credits",
+    "prerequisites",
+    "description",
+    "semester_offered",
+)
+_FIELD_SET = frozenset(FIELDS)
+# Short strings shared by many courses
+_INTERNED_FIELDS = ("course_code", "type", "subject")
+# Canonical offerings tuples, one object per distinct combination
+_offerings: Dict[tuple, tuple] = {}
+
+
+def _intern(value):
+    # Exact type: sys.intern raises TypeError for str subclasses
+    # pylint: disable-next=unidiomatic-typecheck
+    return sys.intern(value) if type(value) is str else value
+
+
+def _codes(values) -> tuple:
+    return tuple(_intern(value) for value in values)
+
+
+def _offerings_tuple(values) -> tuple:
+    offered = tuple(_intern(value) for value in values)
+    return _offerings.setdefault(offered, offered)
+
+
+class PrerequisiteLogic(Mapping):
+    """
+    Prerequisites with explicit logic, the immutable form of
+    {"logic": "and" | "or", "courses": [...]}.
+    """
+
+    __slots__ = ("logic", "courses")
+    logic: str
+    courses: tuple
+
+    def __init__(self, logic: str, courses):
+        object.__setattr__(self, "logic", _intern(logic))
+        object.__setattr__(self, "courses", _codes(courses))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PrerequisiteLogic is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("PrerequisiteLogic is immutable")
+
+    def __getitem__(self, key):
+        if key == "logic":
+            return self.logic
+        if key == "courses":
+            return self.courses
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(("logic", "courses"))
+
+    def __len__(self) -> int:
+        return 2
+
+    def __eq__(self, other):
+        if isinstance(other, Mapping):
+            return self.to_dict() == to_plain(dict(other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"PrerequisiteLogic({self.logic!r}, {self.courses!r})"
+
+    def __reduce__(self):
+        return (PrerequisiteLogic, (self.logic, self.courses))
+
+    def to_dict(self) -> Dict:
+        """Plain {"logic", "courses"} dictionary."""
+        return {"logic": self.logic, "courses": list(self.courses)}
+
+
+def _prerequisites(value):
+    """Immutable form of a prerequisites value (other types are kept as is)."""
+    if isinstance(value, list):
+        return _codes(value)
+    if isinstance(value, dict) and "logic" in value and "courses" in value:
+        return PrerequisiteLogic(value["logic"], value["courses"])
+    return value
+
+
+class Course(Mapping):
+    """
+    Immutable course record.
+
+    Fields missing from the source document are unset slots, so get(),
+    "in" and iteration behave as they did on the dictionary.
+    """
+
+    __slots__ = FIELDS + ("_extras",)
+    _extras: Optional[Dict]
+
+    def __init__(self, fields: Dict, extras: Optional[Dict] = None):
+        """
+        Build a course from already normalized field values (see from_dict).
+
+        Args:
+            fields: Slot name -> value (only names from FIELDS)
+            extras: Other course keys, or None
+        """
+        set_field = object.__setattr__
+        for name, value in fields.items():
+            set_field(self, name, value)
+        set_field(self, "_extras", extras)
+
+    @classmethod
+    def from_dict(cls, course: Mapping) -> "Course":
+        """
+        Build a Course from a course dictionary (e.g. a MongoDB document).
+
+        Args:
+            course: Course dictionary; _id is dropped
+
+        Returns:
+            Course with interned codes and tuple prerequisites/offerings
+        """
+        if isinstance(course, Course):
+            return course
+        fields = {}
+        extras = None
+        for key, value in course.items():
+            if key in _FIELD_SET:
+                if key == "prerequisites":
+                    value = _prerequisites(value)
+                elif key == "semester_offered" and isinstance(value, list):
+                    value = _offerings_tuple(value)
+                elif key in _INTERNED_FIELDS:
+                    value = _intern(value)
+                fields[key] = value
+            elif key != "_id":
+                if extras is None:
+                    extras = {}
+                extras[key] = value
+        return cls(fields, extras)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Course is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Course is immutable")
+
+    def get(self, key, default=None):
+        if key in _FIELD_SET:
+            return getattr(self, key, default)
+        extras = self._extras
+        return extras.get(key, default) if extras else default
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        extras = self._extras
+        if extras and key in extras:
+            return extras[key]
+        raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        if key in _FIELD_SET:
+            return hasattr(self, key)
+        extras = self._extras
+        return bool(extras) and key in extras
+
+    def __iter__(self) -> Iterator[str]:
+        for name in FIELDS:
+            if hasattr(self, name):
+                yield name
+        if self._extras:
+            yield from self._extras
+
+    def __len__(self) -> int:
+        count = sum(1 for name in FIELDS if hasattr(self, name))
+        return count + (len(self._extras) if self._extras else 0)
+
+    def __eq__(self, other):
+        if isinstance(other, Mapping):
+            return self.to_dict() == to_plain(dict(other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Course({self.to_dict()!r})"
+
+    def __reduce__(self):
+        return (Course.from_dict, (self.to_dict(),))
+
+    def to_dict(self) -> Dict:
+        """Plain course dictionary (lists and dicts instead of tuples), e.g. for JSON."""
+        return {key: to_plain(value) for key, value in self.items()}
+
+
+def to_plain(value):
+    """Convert Course/PrerequisiteLogic values and tuples back to plain JSON types."""
+    if isinstance(value, tuple):
+        return [to_plain(item) for item in value]
+    if isinstance(value, (Course, PrerequisiteLogic)):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    return value
@@ -6,10 +6,13 @@ semester availability, and student completion status.
 """
 
 import os
-from typing import Dict, List, Optional
-
-from pymongo import MongoClient
+import re
+import threading
+from collections.abc import Mapping
+from typing import Dict, List, Optional, Sequence
 
+from api import catalog, user_model
+from api.course import Course
 from api.major_requirements import (
     get_math_course_info,
     get_major_requirements,
@@ -28,36 +31,147 @@ if not MONGO_URI or not DB_NAME:
     client = None
     db = None
 else:
-    try:
-        client = MongoClient(MONGO_URI)
-        db = client[DB_NAME]
-    except Exception as e:
-        print(f"ERROR: Failed to connect to MongoDB: {e}")
-        client = None
-        db = None
+    # The process's one MongoClient (closed before forking, see gunicorn.conf.py)
+    client = user_model.client
+    db = client[DB_NAME]
+
 
+# Courses of the published catalog, built once per catalog_meta version
+_courses: Dict = {}
+_courses_lock = threading.Lock()
 
-def get_all_courses_from_db() -> List[Dict]:
+
+def _load_courses(database) -> Sequence[Course]:
+    """Courses from the courses collection, cached per published catalog_meta version."""
+    global _courses  # pylint: disable=global-statement
+
+    meta = database[catalog.CATALOG_META_COLLECTION].find_one(
+        {"_id": catalog.CATALOG_COLLECTION}, {"version": 1}
+    )
+    version = meta.get("version") if meta else None
+    with _courses_lock:
+        cached = _courses
+    if (
+        version is not None
+        and cached.get("db") is database
+        and cached.get("version") == version
+    ):
+        return cached["courses"]
+
+    courses = tuple(
+        Course.from_dict(course) for course in database.courses.find({}, {"_id": 0})
+    )
+    print(f"DEBUG: Retrieved {len(courses)} courses from database")
+    if version is not None:
+        with _courses_lock:
+            _courses = {"db": database, "version": version, "courses": courses}
+    return courses
+
+
+def get_all_courses_from_db() -> Sequence[Course]:
     """
     Fetch all courses from MongoDB courses collection.
 
+    With CATALOG_SNAPSHOT enabled, the published catalog is served from the
+    shared memory-mapped snapshot (see catalog.py) instead. Otherwise the
+    courses are built once per published catalog version and reused.
+
     Returns:
-        List of course dictionaries with all course metadata
+        Read-only sequence of Course records (course.Course; a tuple, or a
+        catalog.CatalogSnapshot when served from the snapshot)
     """
     if db is None:
         print("ERROR: Database connection not available")
         return []
 
+    if catalog.CATALOG_SNAPSHOT:
+        snapshot = catalog.get_snapshot(db)
+        if snapshot is not None:
+            return snapshot
+
     try:
-        courses_cursor = db.courses.find({})
-        courses = list(courses_cursor)
-        print(f"DEBUG: Retrieved {len(courses)} courses from database")
-        return courses
+        return _load_courses(db)
     except Exception as e:
         print(f"ERROR: Failed to fetch courses from database: {e}")
         return []
 
 
+# Version of the last Course tuple hashed (see get_catalog_version)
+_tuple_version: Dict = {}
+
+
+def get_catalog_version(all_courses: List[Dict]) -> str:
+    """
+    Compute a version identifier for the course catalog.
+
+    The version is a content hash, so it changes whenever any course is added,
+    removed or edited and stays stable across requests otherwise. Used to key
+    data precomputed once per catalog (e.g. prompt course rows).
+
+    Args:
+        all_courses: List of all course dictionaries from database
+
+    Returns:
+        Short hex digest identifying the catalog content
+    """
+    global _tuple_version  # pylint: disable=global-statement
+
+    if isinstance(all_courses, catalog.CatalogSnapshot):
+        # Computed when the snapshot was written
+        return all_courses.catalog_version
+    if isinstance(all_courses, tuple):
+        # Immutable, so the last Course tuple's version is kept
+        cached = _tuple_version
+        if cached.get("courses") is all_courses:
+            return cached["version"]
+
+    version = catalog.compute_catalog_version(all_courses)
+    if isinstance(all_courses, tuple):
+        _tuple_version = {"courses": all_courses, "version": version}
+    return version
+
+
+_catalog_index: Dict[str, Dict] = {}
+_catalog_index_version: Optional[str] = None
+_catalog_index_lock = threading.Lock()
+
+
+def get_catalog_index(
+    all_courses: List[Dict], catalog_version: Optional[str] = None
+) -> Dict[str, Dict]:
+    """
+    Get a course code -> course lookup for the catalog, built once per version.
+
+    Args:
+        all_courses: List of all course dictionaries from database
+        catalog_version: Catalog version (from get_catalog_version); the index
+                         is rebuilt on every call if None
+
+    Returns:
+        Dictionary mapping course codes to course dictionaries (first wins)
+    """
+    global _catalog_index, _catalog_index_version  # pylint: disable=global-statement
+
+    if isinstance(all_courses, catalog.CatalogSnapshot):
+        # Binary search on the snapshot's code index, nothing to build
+        return all_courses.index
+
+    if catalog_version is not None:
+        with _catalog_index_lock:
+            if catalog_version == _catalog_index_version:
+                return _catalog_index
+
+    index: Dict[str, Dict] = {}
+    for course in all_courses:
+        index.setdefault(course.get("course_code"), course)
+
+    if catalog_version is not None:
+        with _catalog_index_lock:
+            _catalog_index = index
+            _catalog_index_version = catalog_version
+    return index
+
+
 def filter_completed_courses(
     courses: List[Dict], completed_codes: List[str]
 ) -> List[Dict]:
@@ -90,26 +204,81 @@ def get_course_by_code(course_code: str, all_courses: List[Dict]) -> Optional[Di
         Normalized structure uses 'title' for name (DB courses have 'title', math courses have 'name')
     """
     # First check in database courses
-    for course in all_courses:
-        if course.get("course_code") == course_code:
+    if isinstance(all_courses, catalog.CatalogSnapshot):
+        course = all_courses.get(course_code)
+        if course is not None:
             return course
+    else:
+        for course in all_courses:
+            if course.get("course_code") == course_code:
+                return course
 
     # If not found, check math courses
-    math_course = get_math_course_info(course_code)
-    if math_course:
-        # Normalize math course structure to match DB courses
-        # Math courses have 'name', DB courses have 'title'
-        normalized_course = math_course.copy()
-        normalized_course["title"] = normalized_course.pop("name", "")
-        # Add default fields that math courses might not have
-        normalized_course.setdefault("prerequisites", [])
-        normalized_course.setdefault("semester_offered", [])
-        normalized_course.setdefault("credits", 4)
-        normalized_course.setdefault("difficulty", 0)
-        normalized_course.setdefault("description", "")
-        return normalized_course
+    return _get_math_course(course_code)
 
-    return None
+
+# Normalized math courses, built once: {course_code: Course} and
+# {(semester_type, major_name): tuple of Course}
+_math_courses: Dict[str, Optional[Course]] = {}
+_math_courses_by_semester: Dict[tuple, tuple] = {}
+
+
+def _normalize_math_course(
+    math_course: Dict, semester_offered: Optional[List[str]] = None, prerequisites=None
+) -> Course:
+    """
+    Normalize a math course (see major_requirements.MATH_COURSES) to the DB course structure.
+
+    Args:
+        math_course: Math course info; math courses have 'name', DB courses have 'title'
+        semester_offered: Offerings from the major requirements (kept if None)
+        prerequisites: Default prerequisites if the math course has none
+
+    Returns:
+        Course
+    """
+    normalized = dict(math_course)
+    normalized["title"] = normalized.pop("name", "")
+    if semester_offered is not None:
+        normalized["semester_offered"] = semester_offered
+    # Add default fields that math courses might not have
+    normalized.setdefault("prerequisites", prerequisites or [])
+    normalized.setdefault("semester_offered", [])
+    normalized.setdefault("credits", 4)
+    normalized.setdefault("difficulty", 0)
+    normalized.setdefault("description", "")
+    return Course.from_dict(normalized)
+
+
+def _get_math_course(course_code: str) -> Optional[Course]:
+    """Normalized math course for a code (None if it is not a math course)."""
+    if course_code not in _math_courses:
+        math_course = get_math_course_info(course_code)
+        _math_courses[course_code] = (
+            _normalize_math_course(math_course) if math_course else None
+        )
+    return _math_courses[course_code]
+
+
+def get_course_credits(course: Dict, default: int = 4) -> int:
+    """
+    Get a course's credits as an integer.
+
+    Catalog credits may be ints, numeric strings ("4") or ranges ("2-4",
+    "1 - 4"); ranges count as their maximum.
+
+    Args:
+        course: Course dictionary
+        default: Value used when credits are missing or unparseable
+
+    Returns:
+        Number of credits
+    """
+    course_credits = course.get("credits")
+    if isinstance(course_credits, (int, float)):
+        return int(course_credits)
+    numbers = re.findall(r"\d+", str(course_credits or ""))
+    return max(int(n) for n in numbers) if numbers else default
 
 
 def check_prerequisites_met(
@@ -151,7 +320,7 @@ def _evaluate_prerequisites(
 
     Args:
         prerequisites: Can be:
-            - List of strings: ["A", "B"] = AND logic (all required)
+            - List (or tuple) of strings: ["A", "B"] = AND logic (all required)
             - Dict with "logic" and "courses": {"logic": "and", "courses": ["A", "B"]}
               or {"logic": "or", "courses": ["A", "B"]}
         completed_set: Set of completed course codes
@@ -161,12 +330,12 @@ def _evaluate_prerequisites(
         True if prerequisites are met
     """
     # Simple list = AND logic (all prerequisites must be completed)
-    if isinstance(prerequisites, list):
+    if isinstance(prerequisites, (list, tuple)):
         # Check if ALL prerequisites are completed
         return all(prereq_code in completed_set for prereq_code in prerequisites)
 
-    # Dictionary structure with explicit logic
-    if isinstance(prerequisites, dict):
+    # Dictionary structure with explicit logic (or course.PrerequisiteLogic)
+    if isinstance(prerequisites, Mapping):
         if "logic" in prerequisites and "courses" in prerequisites:
             logic = prerequisites["logic"].lower()
             courses = prerequisites["courses"]
@@ -198,10 +367,13 @@ def filter_by_prerequisites(
     Returns:
         List of courses where prerequisites are met
     """
+    # Same rules as check_prerequisites_met, with the completed set built once
+    completed_set = set(completed_courses)
     return [
         course
         for course in courses
-        if check_prerequisites_met(course, completed_courses, all_courses)
+        if not course.get("prerequisites", [])
+        or _evaluate_prerequisites(course["prerequisites"], completed_set, all_courses)
     ]
 
 
@@ -257,24 +429,34 @@ def filter_by_semester_availability(
 
 def _get_math_courses_for_semester(
     target_semester: str, major_name: Optional[str] = None
-) -> List[Dict]:
+) -> List[Course]:
     """
     Get math courses that are available in the target semester.
 
     Checks major requirements for math courses with semester information,
-    or falls back to all math courses if no major is specified.
+    or falls back to all math courses if no major is specified. The
+    normalized courses are built once per semester type and major.
 
     Args:
         target_semester: Semester name like "Freshman Fall"
         major_name: Optional major name to get major-specific math courses
 
     Returns:
-        List of math course dictionaries normalized to match DB course structure
+        List of math courses normalized to match DB course structure
     """
     semester_type = _extract_semester_type(target_semester)
     if not semester_type:
         return []
 
+    key = (semester_type, major_name)
+    if key not in _math_courses_by_semester:
+        _math_courses_by_semester[key] = tuple(
+            _build_math_courses(semester_type, major_name)
+        )
+    return list(_math_courses_by_semester[key])
+
+
+def _build_math_courses(semester_type: str, major_name: Optional[str]) -> List[Course]:
     math_courses = []
 
     # If major is specified, check major requirements for math courses
@@ -289,16 +471,13 @@ def _get_math_courses_for_semester(
                     if semester_type in semesters_offered:
                         math_course = get_math_course_info(req["course_code"])
                         if math_course:
-                            normalized = math_course.copy()
-                            normalized["title"] = normalized.pop("name", "")
-                            normalized["semester_offered"] = semesters_offered
-                            normalized.setdefault(
-                                "prerequisites", req.get("prerequisites", [])
+                            math_courses.append(
+                                _normalize_math_course(
+                                    math_course,
+                                    semesters_offered,
+                                    req.get("prerequisites", []),
+                                )
                             )
-                            normalized.setdefault("credits", 4)
-                            normalized.setdefault("difficulty", 0)
-                            normalized.setdefault("description", "")
-                            math_courses.append(normalized)
 
             # Check elective substitutions for math courses
             elective_reqs = major_reqs.get("elective_requirements", {})
@@ -315,18 +494,54 @@ def _get_math_courses_for_semester(
                                 sub_course["course_code"]
                             )
                             if math_course:
-                                normalized = math_course.copy()
-                                normalized["title"] = normalized.pop("name", "")
-                                normalized["semester_offered"] = semesters_offered
-                                normalized.setdefault("prerequisites", [])
-                                normalized.setdefault("credits", 4)
-                                normalized.setdefault("difficulty", 0)
-                                normalized.setdefault("description", "")
-                                math_courses.append(normalized)
+                                math_courses.append(
+                                    _normalize_math_course(
+                                        math_course, semesters_offered
+                                    )
+                                )
 
     return math_courses
 
 
+def _filter_snapshot_courses(
+    snapshot: catalog.CatalogSnapshot,
+    completed_courses: List[str],
+    target_semester: str,
+) -> List[Course]:
+    """
+    Steps 1-3 of get_available_courses_for_semester on a catalog snapshot.
+
+    Same rules as filter_completed_courses, filter_by_prerequisites and
+    filter_by_semester_availability, read from the snapshot's fields.
+    """
+    completed_set = set(completed_courses)
+    positions = [
+        position
+        for position, code in enumerate(snapshot.codes())
+        if code not in completed_set
+    ]
+    print(f"DEBUG: After filtering completed courses: {len(positions)} courses")
+
+    met = []
+    for position in positions:
+        prerequisites = snapshot.prerequisites(position)
+        if not prerequisites or _evaluate_prerequisites(
+            prerequisites, completed_set, snapshot
+        ):
+            met.append(position)
+    positions = met
+    print(f"DEBUG: After filtering prerequisites: {len(positions)} courses")
+
+    semester_type = _extract_semester_type(target_semester)
+    if semester_type:
+        positions = [
+            position
+            for position in positions
+            if snapshot.offered_in(position, semester_type)
+        ]
+    return [snapshot[position] for position in positions]
+
+
 def get_available_courses_for_semester(
     completed_courses: List[str],
     target_semester: str,
@@ -364,20 +579,28 @@ def get_available_courses_for_semester(
         print("WARNING: No courses found in database. Make sure database is seeded.")
         return []
 
-    # Step 1: Filter out completed courses
-    available_courses = filter_completed_courses(all_courses, completed_courses)
-    print(f"DEBUG: After filtering completed courses: {len(available_courses)} courses")
-
-    # Step 2: Filter by prerequisites
-    available_courses = filter_by_prerequisites(
-        available_courses, completed_courses, all_courses
-    )
-    print(f"DEBUG: After filtering prerequisites: {len(available_courses)} courses")
-
-    # Step 3: Filter by semester availability
-    available_courses = filter_by_semester_availability(
-        available_courses, target_semester
-    )
+    if isinstance(all_courses, catalog.CatalogSnapshot):
+        # Steps 1-3 on the snapshot's fields; only the result is materialized
+        available_courses = _filter_snapshot_courses(
+            all_courses, completed_courses, target_semester
+        )
+    else:
+        # Step 1: Filter out completed courses
+        available_courses = filter_completed_courses(all_courses, completed_courses)
+        print(
+            f"DEBUG: After filtering completed courses: {len(available_courses)} courses"
+        )
+
+        # Step 2: Filter by prerequisites
+        available_courses = filter_by_prerequisites(
+            available_courses, completed_courses, all_courses
+        )
+        print(f"DEBUG: After filtering prerequisites: {len(available_courses)} courses")
+
+        # Step 3: Filter by semester availability
+        available_courses = filter_by_semester_availability(
+            available_courses, target_semester
+        )
     print(
         f"DEBUG: After filtering semester availability ({target_semester}): {len(available_courses)} courses"
     )
@@ -403,3 +626,56 @@ def get_available_courses_for_semester(
     print(f"DEBUG: Total available courses: {len(all_available_courses)}")
 
     return all_available_courses
+
+
+def split_available_course_codes(available_courses: List[Dict]) -> Dict[str, List[str]]:
+    """
+    Course codes of a get_available_courses_for_semester result, for storing.
+
+    Args:
+        available_courses: Available courses (catalog courses and math courses)
+
+    Returns:
+        {"catalog": codes of the catalog courses, "math": codes of the math
+        courses}, each in result order
+    """
+    codes = {"catalog": [], "math": []}
+    for course in available_courses:
+        kind = "math" if course.get("is_math_course") else "catalog"
+        codes[kind].append(course.get("course_code"))
+    return codes
+
+
+def get_available_courses_from_codes(
+    course_codes: Dict[str, List[str]],
+    target_semester: str,
+    all_courses: List[Dict],
+    major_name: Optional[str] = None,
+    catalog_version: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Rebuild a get_available_courses_for_semester result from its course codes
+    (see split_available_course_codes) without filtering the catalog again.
+
+    Args:
+        course_codes: {"catalog": [...], "math": [...]} course codes
+        target_semester: Semester name like "Freshman Fall"
+        all_courses: List of all course dictionaries the codes were selected from
+        major_name: Major name the math courses were selected for
+        catalog_version: Catalog version (from get_catalog_version)
+
+    Returns:
+        List of available courses, in the order of the codes
+    """
+    index = get_catalog_index(all_courses, catalog_version)
+    available_courses = [
+        index[code] for code in course_codes.get("catalog", []) if code in index
+    ]
+    math_codes = set(course_codes.get("math", []))
+    if math_codes:
+        available_courses += [
+            course
+            for course in _get_math_courses_for_semester(target_semester, major_name)
+            if course.get("course_code") in math_codes
+        ]
+    return available_courses
@@ -0,0 +1,273 @@
+"""
+course_ranking.py
+
+Fast local relevance ranking for available courses.
+
+Scores each eligible course against the student's career path and interests
+(keyword + TF-IDF overlap on title/description) and boosts courses that fulfill
+remaining major requirements, so the LLM prompt only carries the most relevant
+candidates under a token budget.
+"""
+
+import math
+import os
+import re
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Candidate selection limits (overridable via environment)
+DEFAULT_MAX_CANDIDATES = int(os.getenv("RECOMMENDATION_MAX_CANDIDATES", "30"))
+DEFAULT_TOKEN_BUDGET = int(os.getenv("RECOMMENDATION_PROMPT_TOKEN_BUDGET", "2500"))
+
+# Score boosts for requirement-fulfilling courses
+CORE_REQUIREMENT_BOOST = 3.0
+ELECTIVE_REQUIREMENT_BOOST = 1.0
+SUBSTITUTION_BOOST = 0.5
+TITLE_KEYWORD_BOOST = 0.75
+
+STOPWORDS = frozenset(
+    (
+        "a an and are as at be by course courses for from how in into intro "
+        "introduction is it its of on or students such that the their this to "
+        "topics will with"
+    ).split()
+)
+
+# Common abbreviations/phrases students type into career path and interests
+KEYWORD_EXPANSIONS = {
+    "ai": ["artificial", "intelligence", "machine", "learning"],
+    "ml": ["machine", "learning"],
+    "swe": ["software", "engineering"],
+    "se": ["software", "engineering"],
+    "web": ["web", "internet", "applications"],
+    "data": ["data", "database", "statistics"],
+    "security": ["security", "cryptography"],
+    "cybersecurity": ["security", "cryptography"],
+    "crypto": ["cryptography"],
+    "systems": ["systems", "operating", "distributed"],
+    "graphics": ["graphics", "visualization"],
+    "games": ["game", "graphics"],
+    "finance": ["finance", "economics", "probability"],
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase keyword tokens, dropping stopwords.
+
+    Args:
+        text: Free text (title, description, career path, ...)
+
+    Returns:
+        List of tokens
+    """
+    if not text:
+        return []
+    return [
+        token
+        for token in _TOKEN_RE.findall(str(text).lower())
+        if token not in STOPWORDS and len(token) > 1
+    ]
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (~4 characters per token for English text).
+
+    Args:
+        text: Prompt text
+
+    Returns:
+        Estimated number of LLM tokens
+    """
+    return math.ceil(len(text) / 4) if text else 0
+
+
+def _course_terms(course: Dict) -> Counter:
+    """Term frequencies for a course; title terms count double."""
+    title = course.get("title", course.get("name", ""))
+    terms = Counter(tokenize(title))
+    terms.update(tokenize(title))
+    terms.update(tokenize(course.get("description", "")))
+    return terms
+
+
+def _interest_terms(student_info: Dict) -> Counter:
+    """Query terms built from career path, side interests and interests."""
+    texts = [student_info.get("career_path", "") or ""]
+    texts.extend(student_info.get("side_interests", []) or [])
+    texts.extend(student_info.get("interests", []) or [])
+
+    terms = Counter()
+    for text in texts:
+        for token in tokenize(text):
+            terms[token] += 1
+            for expanded in KEYWORD_EXPANSIONS.get(token, []):
+                terms[expanded] += 1
+    return terms
+
+
+def matching_interest_terms(course: Dict, student_info: Dict) -> List[str]:
+    """
+    List the student's interest keywords that appear in a course's text.
+
+    Args:
+        course: Course dictionary
+        student_info: Student profile (career_path, side_interests, interests)
+
+    Returns:
+        Matching terms, most frequent in the course first
+    """
+    query = _interest_terms(student_info)
+    terms = _course_terms(course)
+    return sorted(
+        (term for term in terms if term in query), key=lambda term: (-terms[term], term)
+    )
+
+
+def _build_idf(documents: List[Counter]) -> Dict[str, float]:
+    """Smoothed inverse document frequency over the candidate courses."""
+    doc_freq = Counter()
+    for terms in documents:
+        doc_freq.update(terms.keys())
+    total = len(documents)
+    return {
+        term: math.log((1 + total) / (1 + count)) + 1.0
+        for term, count in doc_freq.items()
+    }
+
+
+def _requirement_boosts(remaining_requirements: Optional[Dict]) -> Dict[str, float]:
+    """Map course codes to boosts derived from remaining major requirements."""
+    boosts: Dict[str, float] = {}
+    if not remaining_requirements or "error" in remaining_requirements:
+        return boosts
+
+    for req in remaining_requirements.get("remaining_core", []):
+        code = req.get("course_code")
+        if code:
+            boosts[code] = boosts.get(code, 0.0) + CORE_REQUIREMENT_BOOST
+
+    electives = remaining_requirements.get("remaining_electives", {})
+    if electives.get("count_needed", 0) > 0:
+        for elective in electives.get("available_courses", []):
+            code = elective.get("course_code")
+            if code:
+                boosts[code] = boosts.get(code, 0.0) + ELECTIVE_REQUIREMENT_BOOST
+        for sub_course in electives.get("substitutions_available", []):
+            code = sub_course.get("course_code")
+            if code:
+                boosts[code] = boosts.get(code, 0.0) + SUBSTITUTION_BOOST
+
+    return boosts
+
+
+def rank_courses(
+    available_courses: List[Dict],
+    student_info: Dict,
+    remaining_requirements: Optional[Dict] = None,
+) -> List[Tuple[float, Dict]]:
+    """
+    Rank available courses by relevance to the student.
+
+    Score = TF-IDF cosine similarity between the course text and the student's
+    interests, plus a boost for interest keywords in the title, plus boosts for
+    courses that fulfill remaining core/elective requirements.
+
+    Args:
+        available_courses: Eligible course dictionaries (already filtered)
+        student_info: Student profile (career_path, side_interests, interests)
+        remaining_requirements: Output of get_remaining_requirements (optional)
+
+    Returns:
+        List of (score, course) tuples, highest score first. Ties keep the
+        original order so ranking is deterministic.
+    """
+    if not available_courses:
+        return []
+
+    documents = [_course_terms(course) for course in available_courses]
+    idf = _build_idf(documents)
+    query = _interest_terms(student_info)
+    query_weights = {term: count * idf.get(term, 0.0) for term, count in query.items()}
+    query_norm = math.sqrt(sum(w * w for w in query_weights.values()))
+    boosts = _requirement_boosts(remaining_requirements)
+
+    scored = []
+    for course, terms in zip(available_courses, documents):
+        score = 0.0
+        if query_norm and terms:
+            weights = {term: count * idf[term] for term, count in terms.items()}
+            dot = sum(weights.get(term, 0.0) * w for term, w in query_weights.items())
+            norm = math.sqrt(sum(w * w for w in weights.values()))
+            if norm:
+                score += dot / (norm * query_norm)
+
+            title_terms = set(tokenize(course.get("title", course.get("name", ""))))
+            score += (
+                TITLE_KEYWORD_BOOST
+                * len(title_terms & query.keys())
+                / max(len(title_terms), 1)
+            )
+
+        score += boosts.get(course.get("course_code", ""), 0.0)
+        scored.append((score, course))
+
+    scored.sort(key=lambda item: -item[0])
+    return scored
+
+
+def select_candidates(
+    available_courses: List[Dict],
+    student_info: Dict,
+    remaining_requirements: Optional[Dict] = None,
+    token_budget: Optional[int] = None,
+    max_candidates: Optional[int] = None,
+    format_course: Optional[Callable[[Dict], str]] = None,
+) -> List[Dict]:
+    """
+    Pick the top-ranked candidates that fit within a prompt token budget.
+
+    Args:
+        available_courses: Eligible course dictionaries (already filtered)
+        student_info: Student profile (career_path, side_interests, interests)
+        remaining_requirements: Output of get_remaining_requirements (optional)
+        token_budget: Max estimated tokens for the course section
+                      (default: RECOMMENDATION_PROMPT_TOKEN_BUDGET)
+        max_candidates: Max number of courses (default: RECOMMENDATION_MAX_CANDIDATES)
+        format_course: Function rendering a course for the prompt, used to
+                       estimate its token cost (default: title + description)
+
+    Returns:
+        List of course dictionaries, most relevant first (one per course code)
+    """
+    token_budget = DEFAULT_TOKEN_BUDGET if token_budget is None else token_budget
+    max_candidates = (
+        DEFAULT_MAX_CANDIDATES if max_candidates is None else max_candidates
+    )
+
+    selected = []
+    seen_codes = set()
+    used_tokens = 0
+    for _, course in rank_courses(
+        available_courses, student_info, remaining_requirements
+    ):
+        if len(selected) >= max_candidates:
+            break
+        code = course.get("course_code")
+        if code in seen_codes:
+            continue  # same course listed twice (e.g. DB and major math course)
+        if format_course:
+            text = format_course(course)
+        else:
+            text = f"{course.get('title', '')} {course.get('description', '')}"
+        cost = estimate_tokens(text)
+        if selected and used_tokens + cost > token_budget:
+            continue  # a shorter, lower-ranked course may still fit
+        selected.append(course)
+        seen_codes.add(code)
+        used_tokens += cost
+
+    return selected
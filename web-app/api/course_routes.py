@@ -6,6 +6,7 @@ Flask blueprint for course search and autocomplete API endpoints.
 
 from flask import Blueprint, jsonify, request
 
+from .catalog import CatalogSnapshot
 from .course_filtering import get_all_courses_from_db
 
 courses = Blueprint("courses", __name__)
@@ -46,19 +47,30 @@ def search_courses():
         query_lower = query.lower()
         matching_courses = []
 
-        for course in all_courses:
-            course_code = course.get("course_code", "").lower()
-            title = course.get("title", "").lower()
-
-            # Check if query matches course code or title
-            if query_lower in course_code or query_lower in title:
+        if isinstance(all_courses, CatalogSnapshot):
+            # Scan the snapshot's search text; only matches are decoded
+            for position in all_courses.search(query_lower):
                 matching_courses.append(
                     {
-                        "course_code": course.get("course_code", ""),
-                        "title": course.get("title", ""),
-                        "credits": course.get("credits", 4),
+                        "course_code": all_courses.code(position),
+                        "title": all_courses.title(position),
+                        "credits": all_courses.credits(position),
                     }
                 )
+        else:
+            for course in all_courses:
+                course_code = course.get("course_code", "").lower()
+                title = course.get("title", "").lower()
+
+                # Check if query matches course code or title
+                if query_lower in course_code or query_lower in title:
+                    matching_courses.append(
+                        {
+                            "course_code": course.get("course_code", ""),
+                            "title": course.get("title", ""),
+                            "credits": course.get("credits", 4),
+                        }
+                    )
 
         # Sort by relevance: code matches starting with query first, then other code matches, then title matches
         matching_courses.sort(
@@ -1,38 +1,175 @@
 """
 llm_service.py
 
-Module for generating course recommendations using OpenAI GPT-4.
+Module for generating course recommendations using OpenAI chat models
+(OPENAI_MODEL, and OPENAI_FAST_MODEL for simple requests with MODEL_ROUTING).
 """
 
+import asyncio
 import json
 import os
-from typing import Dict, List, Optional
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Set, Tuple
 
-from openai import OpenAI  # pyright: ignore[reportMissingImports]
+from . import (
+    catalog,
+    course_filtering,
+    course_ranking,
+    llm_telemetry,
+    metrics,
+    prompt_encoding,
+)
 
-
-# Initialize OpenAI client
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     print("WARNING: OPENAI_API_KEY not set in environment variables.")
     print(
         "LLM recommendations will not work. Please set OPENAI_API_KEY in your .env file."
     )
-    client = None
-else:
-    try:
-        client = OpenAI(api_key=OPENAI_API_KEY)
-    except Exception as e:
-        print(f"ERROR: Failed to initialize OpenAI client: {e}")
-        client = None
+
+# OpenAI clients, created on first use by get_client() / get_async_client():
+# importing the openai package takes most of this module's import time
+client = None
+# Used by the *_async functions (ASGI serving mode, see api/asgi.py)
+async_client = None
+_clients_lock = threading.Lock()
+_clients_failed = False
+
+# Put the full catalog table in the cacheable prompt prefix and reference
+# available courses by code (disable to send only candidate rows)
+PROMPT_CATALOG_PREFIX = os.getenv("PROMPT_CATALOG_PREFIX", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# Largest catalog table put in the prefix; a larger catalog falls back to the
+# ranked candidate rows (the seed catalog is about 3.5k tokens)
+PROMPT_CATALOG_MAX_TOKENS = int(os.getenv("PROMPT_CATALOG_MAX_TOKENS", "8000"))
+
+# Per-request timeout so a slow API call can fall back to the local recommender
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "30"))
+
+# Stream completions and record the time to first token per model
+OPENAI_STREAM = os.getenv("OPENAI_STREAM", "false").lower() in ("1", "true", "yes")
+
+# Hedged requests: if a call has not returned after the OPENAI_HEDGE_PERCENTILE
+# latency of recent calls, send an identical second call and use whichever
+# succeeds first. OPENAI_HEDGE_MAX_RATE caps the fraction of hedged requests.
+OPENAI_HEDGE = os.getenv("OPENAI_HEDGE", "false").lower() in ("1", "true", "yes")
+OPENAI_HEDGE_PERCENTILE = float(os.getenv("OPENAI_HEDGE_PERCENTILE", "95"))
+OPENAI_HEDGE_DELAY_SECONDS = float(os.getenv("OPENAI_HEDGE_DELAY_SECONDS", "10"))
+OPENAI_HEDGE_MAX_RATE = float(os.getenv("OPENAI_HEDGE_MAX_RATE", "0.1"))
+OPENAI_HEDGE_WORKERS = int(os.getenv("OPENAI_HEDGE_WORKERS", "16"))
+
+# Recent latencies needed before the percentile replaces the fixed delay
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+# Model routing (off by default): simple requests (see _request_complexity)
+# go to OPENAI_FAST_MODEL, the rest to OPENAI_MODEL; a fast-model response that
+# fails validation is escalated to OPENAI_MODEL
+MODEL_ROUTING = os.getenv("MODEL_ROUTING", "false").lower() in ("1", "true", "yes")
+MODEL_ROUTING_MAX_FAST_COMPLEXITY = int(
+    os.getenv("MODEL_ROUTING_MAX_FAST_COMPLEXITY", "1")
+)
+
+# Eligible-set sizes above which a request counts as more complex
+ROUTING_SMALL_ELIGIBLE = 15
+ROUTING_LARGE_ELIGIBLE = 40
+
+# Upper bound on courses kept per semester (the prompt asks for 4-6)
+MAX_RECOMMENDED_COURSES = 6
+
+# Catalog version -> catalog message (None if over PROMPT_CATALOG_MAX_TOKENS)
+_catalog_message_cache: Dict[str, Optional[str]] = {}
+_catalog_message_lock = threading.Lock()
+# Token counts of the prompt prefix messages (system and catalog), which only
+# change with the catalog version
+_prefix_token_counts: Dict[str, int] = {}
+
+_usage_totals = {
+    "calls": 0,
+    "prompt_tokens": 0,
+    "cached_tokens": 0,
+    "completion_tokens": 0,
+    "invalid_courses": 0,
+    "repair_calls": 0,
+}
+_usage_lock = threading.Lock()
+
+# Latency of each request as seen by the caller, over the last LATENCY_WINDOW
+# calls (per-model attempt latencies, which drive the hedge delay, are kept
+# in _model_stats)
+_request_latencies: deque = deque(maxlen=LATENCY_WINDOW)
+_model_stats: Dict[str, Dict] = {}
+_hedge_totals = {
+    "requests": 0,
+    "hedged_requests": 0,
+    "hedge_wins": 0,
+    "extra_prompt_tokens": 0,
+    "extra_completion_tokens": 0,
+    "latency_saved_seconds": 0.0,
+}
+_hedge_executor = None
+_hedge_executor_lock = threading.Lock()
+
+
+def _create_clients():
+    global client, async_client, _clients_failed  # pylint: disable=global-statement
+
+    with _clients_lock:
+        if _clients_failed or not OPENAI_API_KEY:
+            return
+        try:
+            # pylint: disable=import-outside-toplevel
+            from openai import (  # pyright: ignore[reportMissingImports]
+                AsyncOpenAI,
+                OpenAI,
+            )
+
+            if client is None:
+                client = OpenAI(api_key=OPENAI_API_KEY)
+            if async_client is None:
+                async_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+        except Exception as e:
+            print(f"ERROR: Failed to initialize OpenAI client: {e}")
+            _clients_failed = True
+
+
+def get_client():
+    """
+    Get the OpenAI client, creating it on first use.
+
+    Returns:
+        OpenAI client, or None if OPENAI_API_KEY is missing or the client
+        could not be created
+    """
+    if client is None:
+        _create_clients()
+    return client
+
+
+def get_async_client():
+    """Async counterpart of get_client() (AsyncOpenAI client or None)."""
+    if async_client is None:
+        _create_clients()
+    return async_client
 
 
 def _build_system_message() -> str:
     """
     Build the system message for the LLM.
 
+    Contains the role and all static instructions. It is byte-identical for
+    every student, so together with the catalog message it forms a stable
+    prompt prefix that the provider can cache.
+
     Returns:
-        System message string defining the role and context
+        System message string defining the role, priorities and response format
     """
     return """You are an expert academic advisor at NYU specializing in course planning and
 curriculum design. Your role is to help students create balanced, strategic course schedules
@@ -45,35 +182,178 @@ You understand:
 - Career path alignment with course selection
 - Prerequisite chains and course dependencies
 
-Provide thoughtful, personalized recommendations that consider the student's unique situation."""
+Provide thoughtful, personalized recommendations that consider the student's unique situation.
 
+PRIORITIES (highest first):
+1. Major requirements: remaining core courses first, then major electives (CS majors: CSCI-UA; Math majors: MATH-UA). Major alignment outranks general interests; courses from other departments are fine when they directly support the career path or interests.
+2. Career path: prefer courses that directly support it, e.g. Software Engineering -> software engineering, web, databases, agile/devops; AI/ML or Data Science -> machine learning, data management, big data, probability/statistics, linear algebra; Systems -> operating systems, computer systems, theory; Cybersecurity -> cryptography. Avoid generic courses when career-specific ones are available.
+3. Side interests: if any are given, include 1-2 courses connected to them (cross-department courses welcome).
+4. Balance difficulty (mix 1-2, 3 and 4-5) and keep a logical prerequisite sequence.
 
-def _format_course_for_prompt(course: Dict) -> str:
+RULES:
+- Only recommend course codes listed under AVAILABLE COURSES in the student request; they are already filtered (not completed or planned, prerequisites met, offered that semester).
+- Recommend 4-6 courses within the target credit range given in the request.
+- Course details (credits, difficulty, prerequisites, semesters offered) are in the COURSE CATALOG table or next to each available course. Difficulty is 1-5; prerequisites "A+B" means all required, "A/B" means any one.
+
+Respond with JSON only:
+{"courses": [{"course_code": "CSCI-UA.0101", "title": "Introduction to Computer Science", "credits": 4, "reasoning": "1-2 sentences on how it fits the career path, interests or requirements"}]}
+For a multi-semester plan request, respond with one course list per semester instead:
+{"semesters": {"Freshman Fall": [<course objects as above>], "Freshman Spring": [...]}}"""
+
+
+def _build_catalog_message(
+    all_courses: List[Dict], catalog_version: str
+) -> Optional[str]:
     """
-    Format a course dictionary into a readable string for the prompt.
+    Build the catalog message: every course as a compact row, stamped with the
+    catalog version.
+
+    The message only changes when the catalog is republished, so it is part of
+    the cacheable prompt prefix. It is built once per catalog version.
 
     Args:
-        course: Course dictionary
+        all_courses: List of all course dictionaries from database
+        catalog_version: Catalog version (from course_filtering.get_catalog_version)
 
     Returns:
-        Formatted string with course information
+        Catalog message string, or None if it is over PROMPT_CATALOG_MAX_TOKENS
+    """
+    with _catalog_message_lock:
+        if catalog_version in _catalog_message_cache:
+            return _catalog_message_cache[catalog_version]
+
+        ordered = sorted(all_courses, key=lambda c: str(c.get("course_code", "")))
+        rows = prompt_encoding.get_course_rows(ordered, catalog_version)
+        message = (
+            f"COURSE CATALOG (version {catalog_version}):\n"
+            f"{prompt_encoding.COURSE_TABLE_HEADER}\n" + "\n".join(rows)
+        )
+        tokens = prompt_encoding.count_tokens(message)
+        if tokens > PROMPT_CATALOG_MAX_TOKENS:
+            print(
+                f"WARNING: Catalog table is {tokens} tokens "
+                f"(PROMPT_CATALOG_MAX_TOKENS={PROMPT_CATALOG_MAX_TOKENS}); "
+                "sending candidate rows only"
+            )
+            message = None
+        _catalog_message_cache.clear()
+        _catalog_message_cache[catalog_version] = message
+        _prefix_token_counts.clear()
+        if message is not None:
+            _prefix_token_counts[message] = tokens
+    return message
+
+
+def prime_prompt_prefix(all_courses: List[Dict], catalog_version: str) -> None:
     """
-    course_code = course.get("course_code", "Unknown")
-    title = course.get("title", course.get("name", "Unknown Title"))
-    credit_hours = course.get("credits", 0)
-    difficulty = course.get("difficulty", 0)
-    prerequisites = course.get("prerequisites", [])
-    description = course.get("description", "")
-    semester_offered = course.get("semester_offered", [])
+    Build the cached catalog message (and its prompt rows) ahead of the first
+    request, e.g. in a preloading server process before workers are forked.
+
+    Args:
+        all_courses: List of all course dictionaries from database
+        catalog_version: Catalog version (from course_filtering.get_catalog_version)
+    """
+    if PROMPT_CATALOG_PREFIX:
+        _build_catalog_message(all_courses, catalog_version)
+    else:
+        prompt_encoding.get_course_rows(all_courses, catalog_version)
+
+
+def _format_list(values: List[str], empty: str = "None") -> str:
+    """Join a list of strings for the prompt, with a placeholder when empty."""
+    return ", ".join(values) if values else empty
+
+
+def _format_profile_section(student_info: Dict) -> str:
+    """Format the STUDENT PROFILE section of the user message."""
+    major = student_info.get("major", "Undeclared")
+    year = student_info.get("year", "Unknown")
+    completed_courses = student_info.get("completed_courses", [])
+    interests = student_info.get("interests", [])
+    career_path = student_info.get("career_path", "")
+    side_interests = student_info.get("side_interests", [])
+
+    return f"""STUDENT PROFILE:
+- MAJOR: {major or "Undeclared"}
+- Year: {year or "Unknown"}
+- Career Path: {career_path or "Not specified"}
+- Interests: {_format_list(interests, "Not specified")}
+- Side Interests: {_format_list(side_interests)}
+- Completed or already planned (never recommend): {_format_list(completed_courses)}
+
+"""
+
+
+def _format_progress_section(major_progress: Optional[Dict]) -> str:
+    """Format the MAJOR PROGRESS line of the user message."""
+    if not major_progress or "error" in major_progress:
+        return ""
+
+    progress_pct = major_progress.get("overall_progress", {}).get("percentage", 0)
+    core_completed = major_progress.get("core_requirements", {}).get("count", 0)
+    core_total = major_progress.get("core_requirements", {}).get("total", 0)
+    elective_completed = len(
+        major_progress.get("elective_requirements", {}).get("completed", [])
+    )
+    elective_needed = major_progress.get("elective_requirements", {}).get(
+        "remaining_count", 0
+    )
+    return (
+        f"MAJOR PROGRESS: {progress_pct}% | core {core_completed}/{core_total} | "
+        f"electives {elective_completed} done, {elective_needed} needed\n"
+    )
+
+
+def _format_remaining_core_section(remaining_requirements: Optional[Dict]) -> str:
+    """Format the REMAINING CORE line of the user message."""
+    if not remaining_requirements or "error" in remaining_requirements:
+        return ""
+
+    remaining_core = remaining_requirements.get("remaining_core", [])
+    if not remaining_core:
+        return ""
+    return (
+        "REMAINING CORE: "
+        + "; ".join(
+            f"{req.get('course_code', '')} {req.get('name', '')}"
+            for req in remaining_core[:5]  # Limit to first 5 for brevity
+        )
+        + "\n"
+    )
+
 
-    prereq_str = ", ".join(prerequisites) if prerequisites else "None"
-    semester_str = ", ".join(semester_offered) if semester_offered else "Unknown"
+def _format_available_section(
+    candidates: List[Dict],
+    eligible_count: int,
+    catalog_codes: Set[str],
+    catalog_version: Optional[str],
+) -> str:
+    """
+    Format the AVAILABLE COURSES section: candidates found in the catalog
+    message are referenced by code, others are inlined as compact rows.
+    """
+    in_catalog = [c for c in candidates if c.get("course_code") in catalog_codes]
+    not_in_catalog = [
+        c for c in candidates if c.get("course_code") not in catalog_codes
+    ]
 
-    return f"""  - {course_code}: {title}
-    Credits: {credit_hours} | Difficulty: {difficulty}/5
-    Prerequisites: {prereq_str}
-    Offered: {semester_str}
-    Description: {description[:200]}{"..." if len(description) > 200 else ""}"""
+    section = (
+        f"AVAILABLE COURSES ({len(candidates)} most relevant of "
+        f"{eligible_count} eligible, ranked):\n"
+    )
+    if in_catalog:
+        section += (
+            "See COURSE CATALOG: "
+            + ", ".join(c.get("course_code", "") for c in in_catalog)
+            + "\n"
+        )
+    if not_in_catalog:
+        section += f"{prompt_encoding.COURSE_TABLE_HEADER}\n"
+        section += "\n".join(
+            prompt_encoding.get_course_rows(not_in_catalog, catalog_version)
+        )
+        section += "\n"
+    return section
 
 
 def _build_user_message(
@@ -83,9 +363,15 @@ def _build_user_message(
     major_progress: Optional[Dict],
     remaining_requirements: Optional[Dict],
     semester_info: Dict,
+    catalog_version: Optional[str] = None,
+    catalog_codes: Optional[Set[str]] = None,
 ) -> str:
     """
-    Build the user message with all context for course recommendations.
+    Build the user message with all per-student context for course recommendations.
+
+    This is the only part of the prompt that varies between students, so it
+    comes last. Courses are encoded as compact table rows (see prompt_encoding),
+    or referenced by code when they appear in the catalog message.
 
     Args:
         student_info: Dictionary with student profile (name, major, year, completed_courses,
@@ -95,312 +381,1478 @@ def _build_user_message(
         major_progress: Major progress dictionary (from get_major_progress)
         remaining_requirements: Remaining requirements dictionary (from get_remaining_requirements)
         semester_info: Dictionary with semester name and target credits
+        catalog_version: Catalog version used to reuse precomputed course rows
+        catalog_codes: Course codes already described in the catalog message
 
     Returns:
         Formatted user message string
     """
-    # Student profile section
     student_name = student_info.get("name", "Student")
-    major = student_info.get("major", "Undeclared")
-    year = student_info.get("year", "Unknown")
-    completed_courses = student_info.get("completed_courses", [])
-    interests = student_info.get("interests", [])
-    career_path = student_info.get("career_path", "")
-    side_interests = student_info.get("side_interests", [])
 
     # Semester info
     semester_name = semester_info.get("semester", "Unknown Semester")
     target_credits_min = semester_info.get("target_credits_min", 16)
     target_credits_max = semester_info.get("target_credits_max", 24)
 
-    message = f"""Please recommend 4-6 courses for {student_name} for {semester_name}.
+    message = (
+        f"Recommend 4-6 courses ({target_credits_min}-{target_credits_max} credits total) "
+        f"for {student_name} for {semester_name}.\n\n"
+    )
+    message += _format_profile_section(student_info)
+    message += _format_progress_section(major_progress)
+    message += _format_remaining_core_section(remaining_requirements)
+
+    # Available courses section - preselect the most relevant candidates
+    # (interest overlap + remaining requirements) under the prompt token budget
+    candidates = course_ranking.select_candidates(
+        available_courses,
+        student_info,
+        remaining_requirements,
+        format_course=prompt_encoding.encode_course_row,
+    )
+    message += "\n" + _format_available_section(
+        candidates, len(available_courses), catalog_codes or set(), catalog_version
+    )
+
+    return message
 
-STUDENT PROFILE:
-- **MAJOR: {major}** (CRITICAL: All recommendations must align with this major)
-- Year: {year}
-- Career Path: {career_path if career_path else "Not specified"}
-- Interests: {", ".join(interests) if interests else "Not specified"}
-- Side Interests: {", ".join(side_interests) if side_interests else "None"}
-- Completed Courses: {", ".join(completed_courses) if completed_courses else "None"}
 
-"""
+def _build_plan_user_message(
+    student_info: Dict,
+    semester_candidates: List[Dict],
+    major_progress: Optional[Dict],
+    catalog_version: Optional[str] = None,
+    catalog_codes: Optional[Set[str]] = None,
+) -> str:
+    """
+    Build the user message for a multi-semester plan request.
 
-    # Major requirements section
-    if major_progress and "error" not in major_progress:
-        progress_pct = major_progress.get("overall_progress", {}).get("percentage", 0)
-        core_completed = major_progress.get("core_requirements", {}).get("count", 0)
-        core_total = major_progress.get("core_requirements", {}).get("total", 0)
-        elective_completed = len(
-            major_progress.get("elective_requirements", {}).get("completed", [])
+    Each semester lists its own candidates, computed assuming the courses
+    planned for earlier semesters are completed by then.
+
+    Args:
+        student_info: Dictionary with student profile
+        semester_candidates: Per-semester candidates (see generate_plan_recommendations)
+        major_progress: Major progress dictionary (from get_major_progress)
+        catalog_version: Catalog version used to reuse precomputed course rows
+        catalog_codes: Course codes already described in the catalog message
+
+    Returns:
+        Formatted user message string
+    """
+    student_name = student_info.get("name", "Student")
+    semester_names = [entry["semester"] for entry in semester_candidates]
+
+    message = (
+        f"Plan {len(semester_names)} semesters for {student_name}, in order: "
+        f"{', '.join(semester_names)}. Recommend 4-6 courses for EACH semester. "
+        "Courses recommended for an earlier semester count as completed for later "
+        "ones; never recommend the same course twice. Keep each reasoning under 20 words.\n\n"
+    )
+    message += _format_profile_section(student_info)
+    message += _format_progress_section(major_progress)
+    if semester_candidates:
+        message += _format_remaining_core_section(
+            semester_candidates[0].get("remaining_requirements")
+        )
+
+    for entry in semester_candidates:
+        message += (
+            f"\nSEMESTER: {entry['semester']} "
+            f"({entry.get('target_credits_min', 16)}-"
+            f"{entry.get('target_credits_max', 24)} credits)\n"
         )
-        elective_needed = major_progress.get("elective_requirements", {}).get(
-            "remaining_count", 0
+        message += _format_available_section(
+            entry["candidates"],
+            entry.get("eligible_count", len(entry["candidates"])),
+            catalog_codes or set(),
+            catalog_version,
         )
 
-        message += f"""MAJOR PROGRESS:
-- Overall Progress: {progress_pct}% complete
-- Core Requirements: {core_completed}/{core_total} completed
-- Electives: {elective_completed} completed, {elective_needed} still needed
+    return message
 
-"""
 
-    # Remaining requirements section
-    if remaining_requirements and "error" not in remaining_requirements:
-        remaining_core = remaining_requirements.get("remaining_core", [])
-        if remaining_core:
-            message += "REMAINING CORE REQUIREMENTS:\n"
-            for req in remaining_core[:5]:  # Limit to first 5 for brevity
-                message += f"  - {req.get('course_code', '')}: {req.get('name', '')}\n"
-            message += "\n"
-
-        elective_info = remaining_requirements.get("remaining_electives", {})
-        elective_count = elective_info.get("count_needed", 0)
-        if elective_count > 0:
-            message += f"ELECTIVES NEEDED: {elective_count} more required\n\n"
-
-    # Available courses section
-    message += f"AVAILABLE COURSES ({len(available_courses)} total):\n"
-    for course in available_courses[
-        :50
-    ]:  # Limit to first 50 courses for token efficiency
-        message += _format_course_for_prompt(course) + "\n"
-
-    if len(available_courses) > 50:
-        message += f"\n... and {len(available_courses) - 50} more courses available.\n"
-
-    # Instructions section - REORDERED AND EMPHASIZED
-    message += f"""
-CRITICAL RECOMMENDATION PRIORITIES (in order of importance):
-1. MAJOR ALIGNMENT (HIGHEST PRIORITY):
-   The student's major is: "{major}"
-   CRITICAL: Strongly prioritize courses that align with the student's declared major.
-   - If major is "Computer Science": Prioritize CS courses (CSCI-UA courses) that fulfill major requirements.
-     Focus on core CS requirements first, then CS electives that support the career path.
-   - If major is "Mathematics": Prioritize Math courses (MATH-UA courses) that fulfill major requirements.
-     Focus on core Math requirements first, then Math electives that support the career path.
-   - If major is not specified or "Undeclared": Still consider major requirements if available, but balance with other factors.
-   The student MUST complete their major requirements to graduate. Major alignment is more important than general interests.
-   NOTE: It is acceptable to include courses from other majors/departments (e.g., Math courses for CS majors, CS courses for Math majors)
-   when they directly support the student's interests or career path, AS LONG AS major requirements are still being prioritized and completed.
-
-2. CAREER PATH ALIGNMENT (HIGH PRIORITY): 
-   The student's intended career path is: "{career_path if career_path else "Not specified"}"
-   Within the context of the student's major, prioritize courses that directly support this career path.
-   For example:
-   - If career path is "Software Engineering" and major is CS: prioritize Software Engineering, Web Development, 
-     Database Design, Agile/DevOps, Applied Internet Technology, etc.
-   - If career path is "AI/ML" or "Machine Learning" and major is CS: prioritize Predictive Analytics, 
-     Data Management, Big Data Processing, Machine Learning, Deep Learning, etc.
-   - If career path is "Data Science" and major is CS: prioritize Database Design, Predictive Analytics, 
-     Data Management, Probability and Statistics, etc.
-   - If career path is "Systems" and major is CS: prioritize Operating Systems, Computer Systems Organization, 
-     Theory of Computation, etc.
-   - If career path is "Cybersecurity" and major is CS: prioritize Introduction to Cryptography, etc.
-   DO NOT recommend generic courses when career-specific courses within the major are available.
-
-3. SIDE INTERESTS (MEDIUM PRIORITY):
-   The student has expressed interest in: {", ".join(side_interests) if side_interests else "none specified"}
-   Include 1-2 courses that align with these side interests to create a well-rounded schedule.
-   IMPORTANT: If an interest requires courses from another major/department, DO NOT hesitate to recommend them.
-   For example:
-   - If interest is "Machine Learning" or "AI": Recommend relevant Math courses like Probability and Statistics (MATH-UA.0185),
-     Linear Algebra (MATH-UA.0140), or Theory of Probability (MATH-UA.0333) even if the student is a CS major.
-   - If interest is "Data Science": Recommend Math courses like Probability and Statistics, Linear Algebra, etc.
-   - If interest is "Cryptography": Recommend relevant Math courses that support cryptography.
-   - Cross-major courses that support interests are valuable and should be included when they directly support the interest.
-   However, ensure that major requirements are still being prioritized and completed. Balance is key:
-   prioritize major requirements first, but include cross-major courses when they directly support stated interests.
-   If side interests are specified, make sure at least one recommended course connects to them.
-
-4. Major Requirements: Prioritize remaining core requirements if applicable (already covered in priority #1)
-5. Difficulty Balance: Mix easy (1-2), medium (3), and challenging (4-5) courses
-6. Course Sequencing: Ensure logical progression and prerequisite satisfaction
-
-IMPORTANT CONSTRAINTS:
-- DO NOT recommend courses the student has already completed: {", ".join(completed_courses) if completed_courses else "None"}
-- DO NOT recommend courses already planned for ANY semester (including previous semesters)
-- The available courses list has already been filtered to exclude completed and planned courses
-- Recommend 4-6 courses (aim for {target_credits_min}-{target_credits_max} total credits)
-- All prerequisites are already satisfied (already filtered, but double-check)
-
-RESPONSE FORMAT:
-Return a JSON object with this structure:
-{{
-  "courses": [
-    {{
-      "course_code": "CSCI-UA.0101",
-      "title": "Introduction to Computer Science",
-      "credits": 4,
-      "reasoning": "Brief explanation that specifically mentions how this course aligns with the career path '{career_path if career_path else "academic goals"}' and/or side interests {side_interests if side_interests else "general academic growth"}"
-    }},
-    ...
-  ]
-}}
-
-Provide thoughtful reasoning for each recommendation that explicitly connects the course to the student's career path and interests. 
-Each reasoning should clearly state WHY this course is relevant to their career goals and how it fits into their academic journey."""
+def _prefix_messages(
+    catalog_version: Optional[str], all_courses: Optional[List[Dict]]
+) -> Tuple[List[Dict], Set[str]]:
+    """
+    Build the static, cacheable prompt prefix.
 
-    return message
+    Returns:
+        Tuple of (prefix messages, course codes described in the catalog message)
+    """
+    messages = [{"role": "system", "content": _build_system_message()}]
 
+    catalog_codes: Set[str] = set()
+    if PROMPT_CATALOG_PREFIX and all_courses and catalog_version:
+        catalog_message = _build_catalog_message(all_courses, catalog_version)
+        if catalog_message is not None:
+            messages.append({"role": "system", "content": catalog_message})
+            catalog_codes = {code for _, code in catalog.iter_course_codes(all_courses)}
 
-def generate_course_recommendations(
+    return messages, catalog_codes
+
+
+def _build_messages(
     student_info: Dict,
     available_courses: List[Dict],
     major_requirements: Optional[Dict],
     major_progress: Optional[Dict],
     remaining_requirements: Optional[Dict],
     semester_info: Dict,
-) -> Optional[List[Dict]]:
+    catalog_version: Optional[str] = None,
+    all_courses: Optional[List[Dict]] = None,
+) -> List[Dict]:
+    """
+    Build the chat messages, ordered for provider-side prompt caching.
+
+    Layout: static system message, then (if enabled and a versioned catalog is
+    available) the catalog message, then the per-student user message. Only the
+    last message differs between students.
+
+    Returns:
+        List of chat message dictionaries
+    """
+    messages, catalog_codes = _prefix_messages(catalog_version, all_courses)
+    messages.append(
+        {
+            "role": "user",
+            "content": _build_user_message(
+                student_info,
+                available_courses,
+                major_requirements,
+                major_progress,
+                remaining_requirements,
+                semester_info,
+                catalog_version,
+                catalog_codes,
+            ),
+        }
+    )
+    return messages
+
+
+def _build_plan_messages(
+    student_info: Dict,
+    semester_candidates: List[Dict],
+    major_progress: Optional[Dict],
+    catalog_version: Optional[str] = None,
+    all_courses: Optional[List[Dict]] = None,
+) -> List[Dict]:
+    """
+    Build the chat messages for a multi-semester plan request.
+
+    Uses the same cacheable prefix as single-semester requests.
+
+    Returns:
+        List of chat message dictionaries
+    """
+    messages, catalog_codes = _prefix_messages(catalog_version, all_courses)
+    messages.append(
+        {
+            "role": "user",
+            "content": _build_plan_user_message(
+                student_info,
+                semester_candidates,
+                major_progress,
+                catalog_version,
+                catalog_codes,
+            ),
+        }
+    )
+    return messages
+
+
+def _usage_counts(usage) -> Tuple[int, int, int]:
+    """Get (prompt, cached, completion) token counts from a `usage` object (may be None)."""
+    if usage is None:
+        return 0, 0, 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    return prompt_tokens, cached_tokens, completion_tokens
+
+
+def _record_usage(usage) -> None:
     """
-    Generate course recommendations using OpenAI GPT-4.
+    Log token usage from an API response and add it to the running totals.
 
     Args:
-        student_info: Dictionary with student profile (name, major, year, completed_courses,
-                     interests, career_path, side_interests)
-        available_courses: List of available course dictionaries (already filtered)
-        major_requirements: Major requirements dictionary (from major_requirements.py)
-        major_progress: Major progress dictionary (from get_major_progress)
-        remaining_requirements: Remaining requirements dictionary (from get_remaining_requirements)
-        semester_info: Dictionary with semester name and target credits
+        usage: `usage` object from a chat completion response (may be None)
+    """
+    if usage is None:
+        return
+
+    prompt_tokens, cached_tokens, completion_tokens = _usage_counts(usage)
+
+    print(
+        f"DEBUG: OpenAI usage: prompt_tokens={prompt_tokens} "
+        f"(cached={cached_tokens}), completion_tokens={completion_tokens}"
+    )
+
+    with _usage_lock:
+        _usage_totals["calls"] += 1
+        _usage_totals["prompt_tokens"] += prompt_tokens
+        _usage_totals["cached_tokens"] += cached_tokens
+        _usage_totals["completion_tokens"] += completion_tokens
+
+
+def get_usage_stats() -> Dict:
+    """
+    Get token usage totals for this process.
 
     Returns:
-        List of recommended course dictionaries with structure:
-        [{"course_code": "...", "title": "...", "credits": 4, "reasoning": "..."}, ...]
-        Returns None if API call fails or response is invalid
+        Dictionary with calls, prompt/cached/completion token totals, the
+        fraction of prompt tokens served from the provider's prompt cache,
+        counts of invalid recommended courses and repair calls, request
+        latency percentiles, hedging metrics (hedged requests, wins, extra
+        tokens spent and latency saved) and per-model stats (see get_model_stats)
     """
-    # Check if OpenAI client is initialized
-    if client is None:
-        print("ERROR: OpenAI client not initialized. OPENAI_API_KEY may be missing.")
-        return None
+    with _usage_lock:
+        stats = dict(_usage_totals)
+        hedging = dict(_hedge_totals)
+        request_latencies = list(_request_latencies)
+    prompt_tokens = stats["prompt_tokens"]
+    stats["cache_hit_ratio"] = (
+        round(stats["cached_tokens"] / prompt_tokens, 4) if prompt_tokens else 0.0
+    )
 
-    try:
-        # Build messages
-        system_message = _build_system_message()
-        user_message = _build_user_message(
-            student_info,
-            available_courses,
-            major_requirements,
-            major_progress,
-            remaining_requirements,
-            semester_info,
-        )
+    stats["latency_seconds"] = {
+        f"p{percentile}": metrics.percentile(request_latencies, percentile)
+        for percentile in (50, 95, 99)
+    }
+    hedging["enabled"] = OPENAI_HEDGE
+    hedging["hedge_rate"] = (
+        round(hedging["hedged_requests"] / hedging["requests"], 4)
+        if hedging["requests"]
+        else 0.0
+    )
+    hedging["latency_saved_seconds"] = round(hedging["latency_saved_seconds"], 3)
+    stats["hedging"] = hedging
+    stats["models"] = get_model_stats()
+    return stats
 
-        print(
-            f"DEBUG: Calling OpenAI API with {len(available_courses)} available courses"
-        )
 
-        # Use a model that supports JSON mode
-        # gpt-4-turbo, gpt-4o, or gpt-3.5-turbo support JSON mode
-        # gpt-4 (base) does NOT support JSON mode
-        model = os.getenv("OPENAI_MODEL", "gpt-4-turbo")
+def _hedge_delay(model: str) -> float:
+    """Seconds to wait before hedging: the model's recent latency percentile, once known."""
+    with _usage_lock:
+        latencies = list(_get_model_stats(model)["latencies"])
+    if len(latencies) < HEDGE_MIN_SAMPLES:
+        return OPENAI_HEDGE_DELAY_SECONDS
+    return metrics.percentile(latencies, OPENAI_HEDGE_PERCENTILE)
 
-        # Call OpenAI API (catch authentication errors explicitly so we don't
-        # crash the app and so we can log a clear, non-secret-bearing message)
-        try:
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": user_message},
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.7,  # Balance between creativity and consistency
-            )
-        except Exception as e:
-            # Some openai SDK versions expose AuthenticationError differently.
-            # Avoid referencing openai.error to prevent AttributeError in
-            # environments where that attribute is missing. Inspect the
-            # exception name/message for authentication failures instead
-            # and log a concise non-secret-bearing message.
-            exc_name = type(e).__name__ or ""
-            exc_text = str(e).lower()
-            is_auth_error = (
-                "authentication" in exc_name.lower()
-                or "invalid_api_key" in exc_text
-                or "invalid api key" in exc_text
-                or "401" in exc_text
+
+def _get_model_stats(model: str) -> Dict:
+    """Get the running stats for a model (caller holds _usage_lock)."""
+    if model not in _model_stats:
+        _model_stats[model] = {
+            "calls": 0,
+            "latency_total": 0.0,
+            "latencies": deque(maxlen=LATENCY_WINDOW),
+            "first_token_latencies": deque(maxlen=LATENCY_WINDOW),
+            "responses": 0,
+            "valid_responses": 0,
+            "escalations": 0,
+        }
+    return _model_stats[model]
+
+
+def _record_model_result(model: str, valid: bool) -> None:
+    """Record whether a model's response passed validation."""
+    with _usage_lock:
+        stats = _get_model_stats(model)
+        stats["responses"] += 1
+        stats["valid_responses"] += valid
+
+
+def _record_escalation(model: str) -> None:
+    """Record that a request routed to a model was escalated to the strong model."""
+    with _usage_lock:
+        _get_model_stats(model)["escalations"] += 1
+
+
+def get_model_stats() -> Dict[str, Dict]:
+    """
+    Get per-model latency and validity stats for tuning the routing policy.
+
+    Returns:
+        Model name -> {"calls", "avg_latency_seconds", "p95_latency_seconds",
+        "p50_first_token_seconds" (streaming only), "responses",
+        "valid_responses", "validity_rate", "escalations", "hedge_delay_seconds"}
+    """
+    with _usage_lock:
+        snapshot = {
+            model: dict(
+                stats,
+                latencies=list(stats["latencies"]),
+                first_token_latencies=list(stats["first_token_latencies"]),
             )
+            for model, stats in _model_stats.items()
+        }
 
-            if is_auth_error:
-                print(
-                    "ERROR: OpenAI authentication failed — invalid API key. "
-                    "Set a valid OPENAI_API_KEY in your environment or .env file."
-                )
-                return None
+    result = {}
+    for model, stats in snapshot.items():
+        calls = stats["calls"]
+        responses = stats["responses"]
+        result[model] = {
+            "calls": calls,
+            "avg_latency_seconds": (
+                round(stats["latency_total"] / calls, 3) if calls else None
+            ),
+            "p95_latency_seconds": metrics.percentile(stats["latencies"], 95),
+            "p50_first_token_seconds": metrics.percentile(
+                stats["first_token_latencies"], 50
+            ),
+            "responses": responses,
+            "valid_responses": stats["valid_responses"],
+            "validity_rate": (
+                round(stats["valid_responses"] / responses, 4) if responses else None
+            ),
+            "escalations": stats["escalations"],
+            "hedge_delay_seconds": _hedge_delay(model),
+        }
+    return result
 
-            # Avoid printing the full exception which may contain sensitive
-            # information (like an API key). Truncate the message.
-            msg = str(e)
-            print(f"ERROR calling OpenAI API: {exc_name}: {msg[:200]}")
-            return None
 
-        # Extract response content
-        response_content = response.choices[0].message.content
-        if not response_content:
-            print("ERROR: OpenAI API returned empty response")
-            return None
+def _strong_model() -> str:
+    """Model for complex requests, plan generation and escalations."""
+    # Use a model that supports JSON mode
+    # gpt-4-turbo, gpt-4o, or gpt-3.5-turbo support JSON mode
+    # gpt-4 (base) does NOT support JSON mode
+    return os.getenv("OPENAI_MODEL", "gpt-4-turbo")
 
-        # Parse JSON response
-        try:
-            response_data = json.loads(response_content)
-        except json.JSONDecodeError as e:
-            print(
-                f"ERROR: Failed to parse JSON response. Raw response: {response_content[:500]}"
+
+def _fast_model() -> str:
+    """Faster, cheaper model for simple requests (must also support JSON mode)."""
+    return os.getenv("OPENAI_FAST_MODEL", "gpt-4o-mini")
+
+
+def _request_complexity(
+    student_info: Dict,
+    available_courses: List[Dict],
+    remaining_requirements: Optional[Dict],
+) -> int:
+    """
+    Score how much judgment a recommendation request needs.
+
+    One point each for a medium eligible set, a large eligible set, electives
+    to choose among, and side interests to balance against requirements.
+
+    Args:
+        student_info: Student profile (side_interests)
+        available_courses: Eligible courses for the semester
+        remaining_requirements: Output of get_remaining_requirements (optional)
+
+    Returns:
+        Complexity score (0-4)
+    """
+    eligible_codes = {course.get("course_code") for course in available_courses}
+    score = 0
+    if len(eligible_codes) > ROUTING_SMALL_ELIGIBLE:
+        score += 1
+    if len(eligible_codes) > ROUTING_LARGE_ELIGIBLE:
+        score += 1
+
+    if remaining_requirements and "error" not in remaining_requirements:
+        electives = remaining_requirements.get("remaining_electives", {})
+        if electives.get("count_needed", 0) > 0 and any(
+            elective.get("course_code") in eligible_codes
+            for elective in electives.get("available_courses", [])
+        ):
+            score += 1
+
+    if any(
+        str(interest).strip() for interest in student_info.get("side_interests") or []
+    ):
+        score += 1
+    return score
+
+
+def _route_model(complexity: int) -> str:
+    """Pick the fast model for simple requests and the strong model otherwise."""
+    if MODEL_ROUTING and complexity <= MODEL_ROUTING_MAX_FAST_COMPLEXITY:
+        return _fast_model()
+    return _strong_model()
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    """Get the worker pool for hedged calls (created on first use)."""
+    global _hedge_executor  # pylint: disable=global-statement
+
+    with _hedge_executor_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=OPENAI_HEDGE_WORKERS, thread_name_prefix="llm-hedge"
             )
-            # Try to extract JSON from markdown code blocks if present
-            if "```json" in response_content:
-                json_start = response_content.find("```json") + 7
-                json_end = response_content.find("```", json_start)
-                if json_end != -1:
-                    response_content = response_content[json_start:json_end].strip()
-                    response_data = json.loads(response_content)
-                else:
-                    raise ValueError("Invalid JSON response format") from e
-            elif "```" in response_content:
-                # Try to extract from generic code block
-                json_start = response_content.find("```") + 3
-                json_end = response_content.find("```", json_start)
-                if json_end != -1:
-                    response_content = response_content[json_start:json_end].strip()
-                    response_data = json.loads(response_content)
-                else:
-                    raise ValueError("Invalid JSON response format") from e
-            else:
-                raise ValueError(f"Failed to parse JSON response: {e}") from e
-
-        # Extract courses from response
-        courses = response_data.get("courses", [])
-
-        if not courses:
-            print("WARNING: OpenAI API returned no courses in response")
-            return None
+        return _hedge_executor
+
+
+def _completion_args(messages: List[Dict], model: str) -> Dict:
+    """Keyword arguments of a chat completion call in JSON mode."""
+    args = {
+        "model": model,
+        "messages": messages,
+        "response_format": {"type": "json_object"},
+        "temperature": 0.7,  # Balance between creativity and consistency
+        "timeout": OPENAI_TIMEOUT_SECONDS,
+    }
+    if OPENAI_STREAM:
+        args.update(stream=True, stream_options={"include_usage": True})
+    return args
+
+
+def _create_completion(messages: List[Dict], model: str):
+    """
+    Make one chat completion API call in JSON mode and record its usage.
+
+    Args:
+        messages: Chat messages (see _build_messages)
+        model: Model name
+
+    Returns:
+        The API response
 
-        # Validate course structure
-        validated_courses = []
-        for course in courses:
-            if isinstance(course, dict) and "course_code" in course:
-                validated_courses.append(
-                    {
-                        "course_code": course.get("course_code", ""),
-                        "title": course.get("title", ""),
-                        "credits": course.get("credits", 0),
-                        "reasoning": course.get("reasoning", ""),
-                    }
+    Raises:
+        Exception: Any error raised by the OpenAI client
+    """
+    start = time.perf_counter()
+    response = get_client().chat.completions.create(**_completion_args(messages, model))
+    if OPENAI_STREAM:
+        stream = _new_stream(model, start)
+        for chunk in response:
+            _add_stream_chunk(stream, chunk)
+        response = _streamed_response(stream)
+    _record_completion(model, time.perf_counter() - start, response)
+    return response
+
+
+async def _create_completion_async(messages: List[Dict], model: str):
+    """
+    Async version of _create_completion using the AsyncOpenAI client.
+
+    Raises:
+        Exception: Any error raised by the OpenAI client
+    """
+    start = time.perf_counter()
+    response = await get_async_client().chat.completions.create(
+        **_completion_args(messages, model)
+    )
+    if OPENAI_STREAM:
+        stream = _new_stream(model, start)
+        async for chunk in response:
+            _add_stream_chunk(stream, chunk)
+        response = _streamed_response(stream)
+    _record_completion(model, time.perf_counter() - start, response)
+    return response
+
+
+def _record_completion(model: str, latency: float, response) -> None:
+    """Add a successful API call's latency and token usage to the running stats."""
+    with _usage_lock:
+        stats = _get_model_stats(model)
+        stats["calls"] += 1
+        stats["latency_total"] += latency
+        stats["latencies"].append(latency)
+    _record_usage(getattr(response, "usage", None))
+
+
+def _new_stream(model: str, start: float) -> Dict:
+    """State of a streamed call (see _add_stream_chunk)."""
+    return {
+        "model": model,
+        "start": start,
+        "parts": [],
+        "usage": None,
+        "first_token_seconds": None,
+    }
+
+
+def _add_stream_chunk(stream: Dict, chunk) -> None:
+    """Collect a streamed chunk's content and usage, timing the first token."""
+    if chunk.choices:
+        content = chunk.choices[0].delta.content
+        if content:
+            if not stream["parts"]:
+                stream["first_token_seconds"] = _record_first_token(
+                    stream["model"], stream["start"]
                 )
+            stream["parts"].append(content)
+    if getattr(chunk, "usage", None) is not None:
+        stream["usage"] = chunk.usage
 
-        if not validated_courses:
-            print("WARNING: No valid courses found in OpenAI response")
-            return None
 
+def _record_first_token(model: str, start: float) -> float:
+    """Record the time to first token of a streamed call and return it."""
+    first_token_seconds = time.perf_counter() - start
+    with _usage_lock:
+        _get_model_stats(model)["first_token_latencies"].append(first_token_seconds)
+    return first_token_seconds
+
+
+def _streamed_response(stream: Dict):
+    """Build a response-like object from the content parts of a streamed call."""
+    return SimpleNamespace(
+        choices=[
+            SimpleNamespace(message=SimpleNamespace(content="".join(stream["parts"])))
+        ],
+        usage=stream["usage"],
+        first_token_seconds=stream["first_token_seconds"],
+    )
+
+
+def _start_hedged_request() -> None:
+    with _usage_lock:
+        _hedge_totals["requests"] += 1
+
+
+def _claim_hedge(model: str, delay: float, event: Optional[Dict]) -> bool:
+    """
+    Count a hedge for a call slower than delay, unless OPENAI_HEDGE_MAX_RATE
+    of the requests have already been hedged.
+
+    The allowance is at least one hedge, so the first slow calls after startup
+    (when tail latency is worst) can be hedged before enough requests have
+    been seen for the rate to allow one.
+
+    Returns:
+        True if the caller should send the hedged call
+    """
+    with _usage_lock:
+        allowed = OPENAI_HEDGE_MAX_RATE > 0 and _hedge_totals["hedged_requests"] < max(
+            1.0, OPENAI_HEDGE_MAX_RATE * _hedge_totals["requests"]
+        )
+        if allowed:
+            _hedge_totals["hedged_requests"] += 1
+    if allowed:
         print(
-            f"DEBUG: Successfully generated {len(validated_courses)} course recommendations"
+            f"DEBUG: OpenAI call to {model} slower than {delay:.2f}s, "
+            "sending hedged request"
         )
-        return validated_courses
+        if event is not None:
+            event["retries"] = event.get("retries", 0) + 1
+    return allowed
 
-    except Exception as e:
+
+def _record_hedge_win() -> None:
+    with _usage_lock:
+        _hedge_totals["hedge_wins"] += 1
+
+
+def _record_hedge_loser(
+    future, start: float, winner_latency: float, hedge_won: bool
+) -> None:
+    """Account for the discarded call of a hedged request once it finishes."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    usage = getattr(future.result(), "usage", None)
+    with _usage_lock:
+        _hedge_totals["extra_prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+        _hedge_totals["extra_completion_tokens"] += (
+            getattr(usage, "completion_tokens", 0) or 0
+        )
+        if hedge_won:
+            # The caller would otherwise have waited for the primary call
+            _hedge_totals["latency_saved_seconds"] += max(
+                0.0, time.perf_counter() - start - winner_latency
+            )
+
+
+def _submit_completion(
+    executor: ThreadPoolExecutor, messages: List[Dict], model: str
+) -> Tuple[Future, threading.Event]:
+    """Submit a completion call; the returned event is set once the call starts running."""
+    started = threading.Event()
+
+    def run():
+        started.set()
+        return _create_completion(messages, model)
+
+    return executor.submit(run), started
+
+
+def _create_completion_hedged(
+    messages: List[Dict], model: str, event: Optional[Dict] = None
+):
+    """
+    Make a chat completion call, hedging it with a second identical call if
+    the first one is slower than the recent OPENAI_HEDGE_PERCENTILE latency
+    (timed from when it starts running in the hedge pool).
+
+    The first successful response wins. The other call is cancelled if it has
+    not started; a call already in flight cannot be aborted with the sync
+    client, so its response is discarded and its tokens reported as extra spend.
+
+    Args:
+        messages: Chat messages (see _build_messages)
+        model: Model name
+        event: Telemetry event; its "retries" is incremented if a hedge is sent
+
+    Returns:
+        The first successful API response
+
+    Raises:
+        Exception: The last error if every call failed
+    """
+    executor = _get_hedge_executor()
+    delay = _hedge_delay(model)
+    primary, started = _submit_completion(executor, messages, model)
+
+    _start_hedged_request()
+    # Time spent queued for a pool worker is not provider latency
+    started.wait()
+    start = time.perf_counter()
+    done, _ = wait([primary], timeout=delay)
+    if done or not _claim_hedge(model, delay, event):
+        return primary.result()
+
+    hedge, _ = _submit_completion(executor, messages, model)
+    pending = {primary, hedge}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is not None:
+                error = future.exception()
+                continue
+            winner_latency = time.perf_counter() - start
+            hedge_won = future is hedge
+            for other in pending:
+                if not other.cancel():
+                    other.add_done_callback(
+                        lambda f, w=winner_latency, h=hedge_won: _record_hedge_loser(
+                            f, start, w, h
+                        )
+                    )
+            if hedge_won:
+                _record_hedge_win()
+            return future.result()
+    raise error
+
+
+async def _create_completion_hedged_async(
+    messages: List[Dict], model: str, event: Optional[Dict] = None
+):
+    """
+    Async version of _create_completion_hedged. The losing call is cancelled
+    even if it is already in flight, so it adds no extra token spend (and the
+    latency saved is not measured).
+
+    Raises:
+        Exception: The last error if every call failed
+    """
+    delay = _hedge_delay(model)
+    primary = asyncio.ensure_future(_create_completion_async(messages, model))
+
+    _start_hedged_request()
+    done, _ = await asyncio.wait([primary], timeout=delay)
+    if done or not _claim_hedge(model, delay, event):
+        return await primary
+
+    hedge = asyncio.ensure_future(_create_completion_async(messages, model))
+    pending = {primary, hedge}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                    continue
+                if task is hedge:
+                    _record_hedge_win()
+                return task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+    raise error
+
+
+def _call_openai(
+    messages: List[Dict], model: Optional[str] = None, event: Optional[Dict] = None
+):
+    """
+    Send a chat completion request in JSON mode (hedged if OPENAI_HEDGE is set).
+
+    Args:
+        messages: Chat messages (see _build_messages)
+        model: Model name (default: OPENAI_MODEL)
+        event: Telemetry event to fill in with the model, latency, tokens,
+               retries and (on failure) the outcome; the caller records it
+
+    Returns:
+        The API response, or None if the call failed (the error is logged)
+    """
+    # Call OpenAI API (catch authentication errors explicitly so we don't
+    # crash the app and so we can log a clear, non-secret-bearing message)
+    model = model or _strong_model()
+    if event is None:
+        event = {}
+    event.update(model=model, retries=0)
+    start = time.perf_counter()
+    try:
+        if OPENAI_HEDGE:
+            response = _create_completion_hedged(messages, model, event)
+        else:
+            response = _create_completion(messages, model)
+    except Exception as e:
+        _handle_call_error(e, event, start)
+        return None
+
+    _finish_call_event(event, response, start)
+    return response
+
+
+async def _call_openai_async(
+    messages: List[Dict], model: Optional[str] = None, event: Optional[Dict] = None
+):
+    """
+    Async version of _call_openai.
+
+    Returns:
+        The API response, or None if the call failed (the error is logged)
+    """
+    model = model or _strong_model()
+    if event is None:
+        event = {}
+    event.update(model=model, retries=0)
+    start = time.perf_counter()
+    try:
+        if OPENAI_HEDGE:
+            response = await _create_completion_hedged_async(messages, model, event)
+        else:
+            response = await _create_completion_async(messages, model)
+    except Exception as e:
+        _handle_call_error(e, event, start)
+        return None
+
+    _finish_call_event(event, response, start)
+    return response
+
+
+def _handle_call_error(error: Exception, event: Dict, start: float) -> None:
+    """Log a failed API call and set the telemetry event's outcome."""
+    event["latency_seconds"] = round(time.perf_counter() - start, 4)
+    event["error_type"] = type(error).__name__
+
+    # Some openai SDK versions expose AuthenticationError differently.
+    # Avoid referencing openai.error to prevent AttributeError in
+    # environments where that attribute is missing. Inspect the
+    # exception name/message for authentication failures instead
+    # and log a concise non-secret-bearing message.
+    exc_name = type(error).__name__ or ""
+    exc_text = str(error).lower()
+    is_auth_error = (
+        "authentication" in exc_name.lower()
+        or "invalid_api_key" in exc_text
+        or "invalid api key" in exc_text
+        or "401" in exc_text
+    )
+
+    if is_auth_error:
+        print(
+            "ERROR: OpenAI authentication failed — invalid API key. "
+            "Set a valid OPENAI_API_KEY in your environment or .env file."
+        )
+        event["outcome"] = "auth_error"
+        return
+
+    # Avoid printing the full exception which may contain sensitive
+    # information (like an API key). Truncate the message.
+    msg = str(error)
+    print(f"ERROR calling OpenAI API: {exc_name}: {msg[:200]}")
+    event["outcome"] = "error"
+
+
+def _finish_call_event(event: Dict, response, start: float) -> None:
+    """Record a successful call's end-to-end latency and fill its telemetry event."""
+    latency = time.perf_counter() - start
+    with _usage_lock:
+        _request_latencies.append(latency)
+    prompt_tokens, cached_tokens, completion_tokens = _usage_counts(
+        getattr(response, "usage", None)
+    )
+    first_token_seconds = getattr(response, "first_token_seconds", None)
+    event.update(
+        latency_seconds=round(latency, 4),
+        first_token_seconds=(
+            round(first_token_seconds, 4) if first_token_seconds is not None else None
+        ),
+        prompt_tokens=prompt_tokens,
+        cached_tokens=cached_tokens,
+        completion_tokens=completion_tokens,
+    )
+
+
+def _course_outcome(returned: int, valid: int) -> str:
+    """Telemetry outcome for a response with `returned` items of which `valid` passed."""
+    if not returned:
+        return "empty"
+    if valid == returned:
+        return "ok"
+    return "partial" if valid else "invalid"
+
+
+def _parse_response_json(response) -> Optional[Dict]:
+    """
+    Extract and parse the JSON object from a chat completion response.
+
+    Args:
+        response: Chat completion response
+
+    Returns:
+        Parsed JSON dictionary, or None if the response is empty
+
+    Raises:
+        ValueError: If the content is not valid JSON (even inside code blocks)
+    """
+    # Extract response content
+    response_content = response.choices[0].message.content
+    if not response_content:
+        print("ERROR: OpenAI API returned empty response")
+        return None
+
+    # Parse JSON response
+    try:
+        return json.loads(response_content)
+    except json.JSONDecodeError as e:
+        print(
+            f"ERROR: Failed to parse JSON response. Raw response: {response_content[:500]}"
+        )
+        # Try to extract JSON from markdown code blocks if present
+        if "```json" in response_content:
+            json_start = response_content.find("```json") + 7
+            json_end = response_content.find("```", json_start)
+            if json_end != -1:
+                return json.loads(response_content[json_start:json_end].strip())
+            raise ValueError("Invalid JSON response format") from e
+        if "```" in response_content:
+            # Try to extract from generic code block
+            json_start = response_content.find("```") + 3
+            json_end = response_content.find("```", json_start)
+            if json_end != -1:
+                return json.loads(response_content[json_start:json_end].strip())
+            raise ValueError("Invalid JSON response format") from e
+        raise ValueError(f"Failed to parse JSON response: {e}") from e
+
+
+def _normalize_courses(courses) -> List[Dict]:
+    """
+    Keep well-formed course items from the response, with a fixed set of fields.
+
+    Args:
+        courses: "courses" value from the parsed response
+
+    Returns:
+        List of {"course_code", "title", "credits", "reasoning"} dictionaries
+    """
+    validated_courses = []
+    for course in courses if isinstance(courses, list) else []:
+        if isinstance(course, dict) and "course_code" in course:
+            validated_courses.append(
+                {
+                    "course_code": course.get("course_code", ""),
+                    "title": course.get("title", ""),
+                    "credits": course.get("credits", 0),
+                    "reasoning": course.get("reasoning", ""),
+                }
+            )
+    return validated_courses
+
+
+def _validate_courses(
+    courses: List[Dict],
+    available_courses: List[Dict],
+    completed_courses: List[str],
+    catalog_index: Dict[str, Dict],
+    chosen_codes: Optional[Set[str]] = None,
+) -> Tuple[List[Dict], List[Tuple[str, str]]]:
+    """
+    Check recommended courses against the eligible set and the catalog.
+
+    Valid items get their title and credits from the catalog (the model's
+    values are not trusted); only the reasoning is kept from the response.
+
+    Args:
+        courses: Normalized course items (see _normalize_courses)
+        available_courses: Eligible courses for the semester (already filtered)
+        completed_courses: Course codes completed or planned by the student
+        catalog_index: Course code -> course (from course_filtering.get_catalog_index)
+        chosen_codes: Codes already recommended (repeats are invalid)
+
+    Returns:
+        (valid items, [(course_code, reason), ...] for invalid items)
+    """
+    eligible: Dict[str, Dict] = {}
+    for course in available_courses:
+        eligible.setdefault(course.get("course_code"), course)
+    completed = set(completed_courses)
+    chosen = set(chosen_codes or ())
+
+    valid = []
+    invalid = []
+    for item in courses:
+        code = str(item.get("course_code", "")).strip()
+        course = eligible.get(code)
+        if code in chosen:
+            invalid.append((code, "recommended more than once"))
+        elif course is not None:
+            valid.append(
+                {
+                    "course_code": code,
+                    "title": course.get(
+                        "title", course.get("name", item.get("title", ""))
+                    ),
+                    "credits": course_filtering.get_course_credits(course),
+                    "reasoning": item.get("reasoning", ""),
+                }
+            )
+            chosen.add(code)
+        elif code in completed:
+            invalid.append((code, "already completed or planned"))
+        elif code in catalog_index:
+            invalid.append(
+                (code, "not eligible this semester (prerequisites or offering)")
+            )
+        else:
+            invalid.append((code or "(blank)", "not in the course catalog"))
+
+    if invalid:
+        print(
+            f"WARNING: Dropped {len(invalid)} invalid recommended courses: "
+            + ", ".join(f"{code} ({reason})" for code, reason in invalid)
+        )
+        with _usage_lock:
+            _usage_totals["invalid_courses"] += len(invalid)
+    return valid, invalid
+
+
+def _build_repair_message(
+    invalid: List[Tuple[str, str]], needed: int, chosen_codes: Set[str]
+) -> str:
+    """Build the follow-up message asking to replace invalid courses."""
+    lines = "\n".join(f"- {code}: {reason}" for code, reason in invalid)
+    return (
+        f"These recommended courses are invalid:\n{lines}\n\n"
+        f"Recommend {needed} different course(s) to replace them, chosen ONLY from "
+        "the AVAILABLE COURSES for this semester. Already recommended (do not "
+        f"repeat): {_format_list(sorted(chosen_codes))}.\n"
+        'Respond in the same JSON format: {"courses": [...]}'
+    )
+
+
+def _repair_courses(
+    messages: List[Dict],
+    response,
+    valid: List[Dict],
+    invalid: List[Tuple[str, str]],
+    available_courses: List[Dict],
+    completed_courses: List[str],
+    catalog_index: Dict[str, Dict],
+    model: Optional[str] = None,
+):
+    """
+    Replace invalid recommendations with one targeted follow-up call.
+
+    The follow-up continues the original conversation (so the cached prompt
+    prefix is reused) and only asks for the missing courses instead of
+    regenerating the whole semester. It is never retried.
+
+    Request steps (see _run_calls).
+
+    Args:
+        messages: Messages of the original request
+        response: Original API response
+        valid: Valid items from the original response
+        invalid: (course_code, reason) pairs for the dropped items
+        available_courses: Eligible courses for the semester
+        completed_courses: Course codes completed or planned by the student
+        catalog_index: Course code -> course
+        model: Model for the follow-up call (default: OPENAI_MODEL)
+
+    Returns:
+        Valid items plus any valid replacements
+    """
+    needed = min(len(invalid), MAX_RECOMMENDED_COURSES - len(valid))
+    if needed <= 0:
+        return valid
+
+    chosen_codes = {course["course_code"] for course in valid}
+    repair_messages = messages + [
+        {"role": "assistant", "content": response.choices[0].message.content},
+        {
+            "role": "user",
+            "content": _build_repair_message(invalid, needed, chosen_codes),
+        },
+    ]
+    _log_prompt_size(repair_messages, f"repair request for {needed} courses")
+    with _usage_lock:
+        _usage_totals["repair_calls"] += 1
+
+    event = {"kind": "repair"}
+    repair_response = yield repair_messages, model, event
+    if repair_response is None:
+        llm_telemetry.record_call(event)
+        return valid
+    try:
+        response_data = _parse_response_json(repair_response)
+    except ValueError as e:
+        print(f"WARNING: Ignoring unparseable repair response: {e}")
+        llm_telemetry.record_call(dict(event, outcome="unparseable"))
+        return valid
+    if not response_data:
+        llm_telemetry.record_call(dict(event, outcome="unparseable"))
+        return valid
+
+    returned = _normalize_courses(response_data.get("courses", []))
+    replacements, _ = _validate_courses(
+        returned,
+        available_courses,
+        completed_courses,
+        catalog_index,
+        chosen_codes,
+    )
+    llm_telemetry.record_call(
+        dict(
+            event,
+            courses_returned=len(returned),
+            courses_valid=len(replacements),
+            outcome=_course_outcome(len(returned), len(replacements)),
+        )
+    )
+    print(f"DEBUG: Repair call returned {len(replacements)} valid replacement courses")
+    return valid + replacements[:needed]
+
+
+def _request_courses(
+    messages: List[Dict],
+    model: str,
+    available_courses: List[Dict],
+    completed_courses: List[str],
+    catalog_index: Dict[str, Dict],
+    escalated_from: Optional[str] = None,
+):
+    """
+    Call a model for recommendations and validate its response.
+
+    Request steps (see _run_calls).
+
+    Args:
+        messages: Chat messages (see _build_messages)
+        model: Model name
+        available_courses: Eligible courses for the semester
+        completed_courses: Course codes completed or planned by the student
+        catalog_index: Course code -> course
+        escalated_from: Model whose response this call replaces (telemetry)
+
+    Returns:
+        (valid items, [(course_code, reason), ...], response); response is None
+        if the call failed
+    """
+    event = {"kind": "recommendations", "escalated_from": escalated_from}
+    response = yield messages, model, event
+    if response is None:
+        llm_telemetry.record_call(event)
+        return [], [], None
+
+    try:
+        response_data = _parse_response_json(response)
+    except ValueError as e:
+        print(f"WARNING: Unparseable response from {model}: {e}")
+        event["outcome"] = "unparseable"
+        response_data = None
+
+    # Extract courses from response
+    courses = (response_data or {}).get("courses", [])
+    if not courses:
+        print(f"WARNING: OpenAI API ({model}) returned no courses in response")
+        _record_model_result(model, False)
+        event.setdefault("outcome", "empty")
+        llm_telemetry.record_call(dict(event, courses_returned=0, courses_valid=0))
+        return [], [], response
+
+    # Validate course structure, then check items against the eligible
+    # courses and the catalog
+    normalized = _normalize_courses(courses)
+    valid, invalid = _validate_courses(
+        normalized,
+        available_courses,
+        completed_courses,
+        catalog_index,
+    )
+    _record_model_result(model, bool(valid) and not invalid)
+    llm_telemetry.record_call(
+        dict(
+            event,
+            courses_returned=len(normalized),
+            courses_valid=len(valid),
+            outcome=_course_outcome(len(normalized), len(valid)),
+        )
+    )
+    return valid, invalid, response
+
+
+def _run_calls(steps):
+    """
+    Run request steps, making their API calls with the sync client.
+
+    Request steps are generators that yield each API call as
+    (messages, model, telemetry event), receive its response (None if the
+    call failed) and return the result. The request logic is written once and
+    run by _run_calls (WSGI) or _run_calls_async (ASGI).
+
+    Args:
+        steps: Request steps generator
+
+    Returns:
+        The generator's return value
+    """
+    try:
+        call = next(steps)
+        while True:
+            call = steps.send(_call_openai(*call))
+    except StopIteration as done:
+        return done.value
+
+
+async def _run_calls_async(steps):
+    """Async version of _run_calls (calls use the AsyncOpenAI client)."""
+    try:
+        call = next(steps)
+        while True:
+            call = steps.send(await _call_openai_async(*call))
+    except StopIteration as done:
+        return done.value
+
+
+def _log_prompt_size(messages: List[Dict], description: str) -> None:
+    """
+    Log the prompt size before an API call.
+
+    Only the per-request messages are tokenized; the counts of the prefix
+    (system) messages are cached.
+    """
+    prompt_tokens = 0
+    for message in messages:
+        content = message["content"]
+        if message["role"] != "system":
+            prompt_tokens += prompt_encoding.count_tokens(content)
+            continue
+        tokens = _prefix_token_counts.get(content)
+        if tokens is None:
+            tokens = prompt_encoding.count_tokens(content)
+            _prefix_token_counts[content] = tokens
+        prompt_tokens += tokens
+    print(
+        f"DEBUG: Calling OpenAI API with {description} "
+        f"(prompt size: ~{prompt_tokens} tokens)"
+    )
+
+
+def _course_recommendation_steps(
+    student_info: Dict,
+    available_courses: List[Dict],
+    major_requirements: Optional[Dict],
+    major_progress: Optional[Dict],
+    remaining_requirements: Optional[Dict],
+    semester_info: Dict,
+    catalog_version: Optional[str],
+    all_courses: Optional[List[Dict]],
+):
+    """Request steps of generate_course_recommendations (see _run_calls)."""
+    try:
+        # Build messages (static prefix first, per-student content last)
+        messages = _build_messages(
+            student_info,
+            available_courses,
+            major_requirements,
+            major_progress,
+            remaining_requirements,
+            semester_info,
+            catalog_version,
+            all_courses,
+        )
+        model = _route_model(
+            _request_complexity(student_info, available_courses, remaining_requirements)
+        )
+        strong_model = _strong_model()
+        _log_prompt_size(
+            messages, f"{len(available_courses)} available courses on {model}"
+        )
+
+        completed_courses = student_info.get("completed_courses", [])
+        catalog_index = (
+            course_filtering.get_catalog_index(all_courses, catalog_version)
+            if all_courses
+            else {}
+        )
+        validated_courses, invalid, response = yield from _request_courses(
+            messages, model, available_courses, completed_courses, catalog_index
+        )
+
+        if response is not None and not validated_courses and model != strong_model:
+            # Fast model answered but nothing was valid: regenerate with the
+            # strong model (failed calls are not retried, to bound latency)
+            print(
+                f"DEBUG: Escalating recommendation request from {model} to {strong_model}"
+            )
+            _record_escalation(model)
+            validated_courses, invalid, response = yield from _request_courses(
+                messages,
+                strong_model,
+                available_courses,
+                completed_courses,
+                catalog_index,
+                escalated_from=model,
+            )
+        elif invalid and model != strong_model:
+            _record_escalation(model)
+
+        if invalid and response is not None:
+            # One follow-up call (on the strong model) replaces invalid items
+            validated_courses = yield from _repair_courses(
+                messages,
+                response,
+                validated_courses,
+                invalid,
+                available_courses,
+                completed_courses,
+                catalog_index,
+                strong_model,
+            )
+
+        if not validated_courses:
+            print("WARNING: No valid courses found in OpenAI response")
+            return None
+
+        print(
+            f"DEBUG: Successfully generated {len(validated_courses)} course recommendations"
+        )
+        return validated_courses
+
+    except Exception as e:
         # Log error with full traceback
         print(f"ERROR generating course recommendations: {type(e).__name__}: {e}")
         import traceback
 
         traceback.print_exc()
         return None
+
+
+def generate_course_recommendations(
+    student_info: Dict,
+    available_courses: List[Dict],
+    major_requirements: Optional[Dict],
+    major_progress: Optional[Dict],
+    remaining_requirements: Optional[Dict],
+    semester_info: Dict,
+    catalog_version: Optional[str] = None,
+    all_courses: Optional[List[Dict]] = None,
+) -> Optional[List[Dict]]:
+    """
+    Generate course recommendations using an OpenAI chat model.
+
+    Simple requests are routed to OPENAI_FAST_MODEL and the rest to
+    OPENAI_MODEL (see _request_complexity). Recommended courses are validated
+    against the eligible courses and the catalog; invalid items are dropped
+    and replaced with one follow-up call on OPENAI_MODEL, and titles/credits
+    are taken from the catalog. A fast-model response with no valid courses
+    is regenerated on OPENAI_MODEL.
+
+    Args:
+        student_info: Dictionary with student profile (name, major, year, completed_courses,
+                     interests, career_path, side_interests)
+        available_courses: List of available course dictionaries (already filtered)
+        major_requirements: Major requirements dictionary (from major_requirements.py)
+        major_progress: Major progress dictionary (from get_major_progress)
+        remaining_requirements: Remaining requirements dictionary (from get_remaining_requirements)
+        semester_info: Dictionary with semester name and target credits
+        catalog_version: Catalog version (from course_filtering.get_catalog_version)
+                         used to reuse precomputed prompt rows
+        all_courses: Full catalog, sent as a cacheable prompt prefix when
+                     PROMPT_CATALOG_PREFIX is enabled
+
+    Returns:
+        List of recommended course dictionaries with structure:
+        [{"course_code": "...", "title": "...", "credits": 4, "reasoning": "..."}, ...]
+        Returns None if API call fails or response is invalid
+    """
+    # Check if OpenAI client is initialized
+    if get_client() is None:
+        print("ERROR: OpenAI client not initialized. OPENAI_API_KEY may be missing.")
+        return None
+
+    return _run_calls(
+        _course_recommendation_steps(
+            student_info,
+            available_courses,
+            major_requirements,
+            major_progress,
+            remaining_requirements,
+            semester_info,
+            catalog_version,
+            all_courses,
+        )
+    )
+
+
+async def generate_course_recommendations_async(
+    student_info: Dict,
+    available_courses: List[Dict],
+    major_requirements: Optional[Dict],
+    major_progress: Optional[Dict],
+    remaining_requirements: Optional[Dict],
+    semester_info: Dict,
+    catalog_version: Optional[str] = None,
+    all_courses: Optional[List[Dict]] = None,
+) -> Optional[List[Dict]]:
+    """Async version of generate_course_recommendations (ASGI serving mode)."""
+    if get_async_client() is None:
+        print("ERROR: OpenAI client not initialized. OPENAI_API_KEY may be missing.")
+        return None
+
+    return await _run_calls_async(
+        _course_recommendation_steps(
+            student_info,
+            available_courses,
+            major_requirements,
+            major_progress,
+            remaining_requirements,
+            semester_info,
+            catalog_version,
+            all_courses,
+        )
+    )
+
+
+def _plan_recommendation_steps(
+    student_info: Dict,
+    semester_candidates: List[Dict],
+    major_progress: Optional[Dict],
+    catalog_version: Optional[str],
+    all_courses: Optional[List[Dict]],
+):
+    """Request steps of generate_plan_recommendations (see _run_calls)."""
+    try:
+        messages = _build_plan_messages(
+            student_info,
+            semester_candidates,
+            major_progress,
+            catalog_version,
+            all_courses,
+        )
+        _log_prompt_size(messages, f"{len(semester_candidates)} semesters")
+
+        # Whole-plan requests always go to the strong model
+        event = {"kind": "plan"}
+        response = yield messages, _strong_model(), event
+        if response is None:
+            llm_telemetry.record_call(event)
+            return None
+
+        try:
+            response_data = _parse_response_json(response)
+        except ValueError:
+            llm_telemetry.record_call(dict(event, outcome="unparseable"))
+            raise
+        if response_data is None:
+            llm_telemetry.record_call(dict(event, outcome="unparseable"))
+            return None
+
+        semesters = response_data.get("semesters", {})
+        if not isinstance(semesters, dict) or not semesters:
+            print("WARNING: OpenAI API returned no semesters in response")
+            llm_telemetry.record_call(dict(event, outcome="empty", courses_returned=0))
+            return None
+
+        plan = {}
+        for entry in semester_candidates:
+            semester = entry["semester"]
+            plan[semester] = _normalize_courses(semesters.get(semester, []))
+
+        # Items are validated later, in sequence (plan_recommender.sequence_plan)
+        llm_telemetry.record_call(
+            dict(
+                event,
+                outcome="ok",
+                courses_returned=sum(len(courses) for courses in plan.values()),
+            )
+        )
+
+        print(
+            f"DEBUG: Successfully generated recommendations for {len(plan)} semesters"
+        )
+        return plan
+
+    except Exception as e:
+        print(f"ERROR generating plan recommendations: {type(e).__name__}: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return None
+
+
+def generate_plan_recommendations(
+    student_info: Dict,
+    semester_candidates: List[Dict],
+    major_progress: Optional[Dict],
+    catalog_version: Optional[str] = None,
+    all_courses: Optional[List[Dict]] = None,
+) -> Optional[Dict[str, List[Dict]]]:
+    """
+    Generate recommendations for several semesters with a single OpenAI call.
+
+    Args:
+        student_info: Dictionary with student profile (see generate_course_recommendations)
+        semester_candidates: One entry per semester, in plan order:
+            {"semester": "Sophomore Fall", "candidates": [course, ...],
+             "eligible_count": 25, "remaining_requirements": {...},
+             "target_credits_min": 16, "target_credits_max": 24}
+        major_progress: Major progress dictionary (from get_major_progress)
+        catalog_version: Catalog version (from course_filtering.get_catalog_version)
+        all_courses: Full catalog, sent as a cacheable prompt prefix when
+                     PROMPT_CATALOG_PREFIX is enabled
+
+    Returns:
+        Dictionary mapping semester names to recommended course lists
+        (same item structure as generate_course_recommendations), or None
+        if the API call fails or the response is invalid
+    """
+    if get_client() is None:
+        print("ERROR: OpenAI client not initialized. OPENAI_API_KEY may be missing.")
+        return None
+
+    return _run_calls(
+        _plan_recommendation_steps(
+            student_info,
+            semester_candidates,
+            major_progress,
+            catalog_version,
+            all_courses,
+        )
+    )
+
+
+async def generate_plan_recommendations_async(
+    student_info: Dict,
+    semester_candidates: List[Dict],
+    major_progress: Optional[Dict],
+    catalog_version: Optional[str] = None,
+    all_courses: Optional[List[Dict]] = None,
+) -> Optional[Dict[str, List[Dict]]]:
+    """Async version of generate_plan_recommendations (ASGI serving mode)."""
+    if get_async_client() is None:
+        print("ERROR: OpenAI client not initialized. OPENAI_API_KEY may be missing.")
+        return None
+
+    return await _run_calls_async(
+        _plan_recommendation_steps(
+            student_info,
+            semester_candidates,
+            major_progress,
+            catalog_version,
+            all_courses,
+        )
+    )
@@ -0,0 +1,323 @@
+"""
+llm_telemetry.py
+
+Structured per-call telemetry for OpenAI calls made by llm_service.
+
+Each call produces one event (model, tokens, cached tokens, latency, time to
+first token, retries, courses returned vs. valid, outcome). Events are kept
+in in-process aggregates and queued for a background writer that stores them
+in a capped MongoDB collection or appends them to a JSON Lines file, so
+recording never blocks the request. If the queue is full, events are dropped
+and counted.
+
+Event fields:
+    timestamp, kind ("recommendations", "repair" or "plan"), model,
+    escalated_from (model, for escalated requests), prompt_tokens,
+    cached_tokens, completion_tokens, latency_seconds, first_token_seconds
+    (streaming only), retries (extra API attempts, e.g. hedged calls),
+    courses_returned, courses_valid, outcome ("ok", "partial", "invalid",
+    "empty", "unparseable", "error", "auth_error"), error_type
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from pymongo.errors import CollectionInvalid
+
+from . import metrics, user_model
+
+# "mongo" (capped collection), "file" (JSON Lines) or "off"
+LLM_TELEMETRY = os.getenv("LLM_TELEMETRY", "mongo").lower()
+LLM_TELEMETRY_FILE = os.getenv("LLM_TELEMETRY_FILE", "llm_telemetry.jsonl")
+LLM_TELEMETRY_COLLECTION = "llm_calls"
+# Size of the capped collection; the oldest events are overwritten
+LLM_TELEMETRY_MAX_BYTES = int(
+    os.getenv("LLM_TELEMETRY_MAX_BYTES", str(64 * 1024 * 1024))
+)
+
+QUEUE_SIZE = 10000
+BATCH_SIZE = 100
+# Seconds the writer waits for more events before writing a partial batch
+BATCH_WAIT_SECONDS = 1.0
+LATENCY_WINDOW = 200
+
+
+class MongoTelemetryBackend:
+    """Writes events to a capped MongoDB collection."""
+
+    def __init__(self, collection: str = LLM_TELEMETRY_COLLECTION):
+        self.collection = collection
+        self._ready = False
+
+    def _ensure_collection(self, db) -> None:
+        if self._ready:
+            return
+        if self.collection not in db.list_collection_names():
+            try:
+                db.create_collection(
+                    self.collection, capped=True, size=LLM_TELEMETRY_MAX_BYTES
+                )
+            except CollectionInvalid:
+                pass  # created by another worker in the meantime
+        self._ready = True
+
+    def write(self, events: List[Dict]) -> None:
+        """Insert a batch of events."""
+        db = user_model.db
+        self._ensure_collection(db)
+        db[self.collection].insert_many(
+            [dict(event) for event in events], ordered=False
+        )
+
+
+class FileTelemetryBackend:
+    """Appends events to a JSON Lines file."""
+
+    def __init__(self, path: str = LLM_TELEMETRY_FILE):
+        self.path = path
+
+    def write(self, events: List[Dict]) -> None:
+        """Append a batch of events, one JSON object per line."""
+        with open(self.path, "a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event, default=str) + "\n")
+
+
+_queue: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+_writer = None
+_writer_lock = threading.Lock()
+_backend = None
+
+_stats_lock = threading.Lock()
+_counters = {"recorded": 0, "written": 0, "dropped": 0, "write_errors": 0}
+_aggregates: Dict[str, Dict] = {}
+
+
+def _get_backend():
+    """Get the configured backend (created on first use), or None if off."""
+    global _backend  # pylint: disable=global-statement
+
+    with _writer_lock:
+        if _backend is None:
+            if LLM_TELEMETRY == "mongo":
+                _backend = MongoTelemetryBackend()
+            elif LLM_TELEMETRY == "file":
+                _backend = FileTelemetryBackend()
+        return _backend
+
+
+def _write_loop() -> None:
+    """Background writer: drain the queue in batches and write them."""
+    while True:
+        batch = [_queue.get()]
+        deadline = time.monotonic() + BATCH_WAIT_SECONDS
+        while len(batch) < BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        try:
+            _get_backend().write(batch)
+            with _stats_lock:
+                _counters["written"] += len(batch)
+        except Exception as e:
+            with _stats_lock:
+                _counters["write_errors"] += 1
+            print(f"WARNING: Failed to write {len(batch)} LLM telemetry events: {e}")
+        finally:
+            for _ in batch:
+                _queue.task_done()
+
+
+def _ensure_writer() -> None:
+    """Start the background writer thread if it is not running."""
+    global _writer  # pylint: disable=global-statement
+
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(
+                target=_write_loop, name="llm-telemetry", daemon=True
+            )
+            _writer.start()
+
+
+def _aggregate_key(event: Dict) -> str:
+    return f"{event.get('kind')}:{event.get('model')}"
+
+
+def _update_aggregates(event: Dict) -> None:
+    """Add an event to the in-process aggregates (caller holds _stats_lock)."""
+    key = _aggregate_key(event)
+    if key not in _aggregates:
+        _aggregates[key] = {
+            "kind": event.get("kind"),
+            "model": event.get("model"),
+            "calls": 0,
+            "outcomes": {},
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "completion_tokens": 0,
+            "retries": 0,
+            "courses_returned": 0,
+            "courses_valid": 0,
+            "latencies": deque(maxlen=LATENCY_WINDOW),
+            "first_token_latencies": deque(maxlen=LATENCY_WINDOW),
+        }
+    aggregate = _aggregates[key]
+    aggregate["calls"] += 1
+    outcome = event.get("outcome", "unknown")
+    aggregate["outcomes"][outcome] = aggregate["outcomes"].get(outcome, 0) + 1
+    for field in (
+        "prompt_tokens",
+        "cached_tokens",
+        "completion_tokens",
+        "retries",
+        "courses_returned",
+        "courses_valid",
+    ):
+        aggregate[field] += event.get(field) or 0
+    if event.get("latency_seconds") is not None:
+        aggregate["latencies"].append(event["latency_seconds"])
+    if event.get("first_token_seconds") is not None:
+        aggregate["first_token_latencies"].append(event["first_token_seconds"])
+
+
+def record_call(event: Dict) -> None:
+    """
+    Record one LLM call without blocking.
+
+    Args:
+        event: Call fields (see module docstring); a timestamp is added
+    """
+    if LLM_TELEMETRY == "off":
+        return
+
+    event = dict(event, timestamp=datetime.now(timezone.utc).isoformat())
+    with _stats_lock:
+        _counters["recorded"] += 1
+        _update_aggregates(event)
+
+    if _get_backend() is None:
+        return
+    _ensure_writer()
+    try:
+        _queue.put_nowait(event)
+    except queue.Full:
+        with _stats_lock:
+            _counters["dropped"] += 1
+
+
+def flush(timeout: float = 5.0) -> bool:
+    """
+    Wait until every queued event has been written.
+
+    Args:
+        timeout: Maximum seconds to wait
+
+    Returns:
+        True if the queue was drained, False on timeout
+    """
+    deadline = time.monotonic() + timeout
+    while _queue.unfinished_tasks:
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def get_telemetry_stats() -> Dict:
+    """
+    Get this process's telemetry counters and per (kind, model) aggregates.
+
+    Returns:
+        Dictionary with backend, recorded/written/dropped/write_errors
+        counts, queue depth and "calls": a list of aggregates with kind,
+        model, calls, outcomes, token totals, retries, courses returned and
+        valid, validity_rate and latency / first-token percentiles
+    """
+    with _stats_lock:
+        stats = dict(_counters)
+        aggregates = [
+            dict(
+                aggregate,
+                outcomes=dict(aggregate["outcomes"]),
+                latencies=list(aggregate["latencies"]),
+                first_token_latencies=list(aggregate["first_token_latencies"]),
+            )
+            for aggregate in _aggregates.values()
+        ]
+
+    calls = []
+    for aggregate in sorted(
+        aggregates, key=lambda a: (str(a["kind"]), str(a["model"]))
+    ):
+        latencies = aggregate.pop("latencies")
+        first_token_latencies = aggregate.pop("first_token_latencies")
+        returned = aggregate["courses_returned"]
+        aggregate["validity_rate"] = (
+            round(aggregate["courses_valid"] / returned, 4) if returned else None
+        )
+        aggregate["latency_seconds"] = {
+            "p50": metrics.percentile(latencies, 50),
+            "p95": metrics.percentile(latencies, 95),
+        }
+        aggregate["first_token_seconds"] = {
+            "p50": metrics.percentile(first_token_latencies, 50),
+            "p95": metrics.percentile(first_token_latencies, 95),
+        }
+        calls.append(aggregate)
+
+    stats["backend"] = LLM_TELEMETRY
+    stats["queue_depth"] = _queue.qsize()
+    stats["calls"] = calls
+    return stats
+
+
+def summarize_stored_calls(db, hours: float = 24) -> List[Dict]:
+    """
+    Aggregate stored events (mongo backend) across all workers.
+
+    Args:
+        db: MongoDB database instance
+        hours: Only include events from the last this many hours
+
+    Returns:
+        One entry per (kind, model, outcome) with calls, token totals,
+        courses returned/valid, average and max latency, most calls first
+    """
+    since = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
+    pipeline = [
+        {"$match": {"timestamp": {"$gte": since}}},
+        {
+            "$group": {
+                "_id": {"kind": "$kind", "model": "$model", "outcome": "$outcome"},
+                "calls": {"$sum": 1},
+                "prompt_tokens": {"$sum": "$prompt_tokens"},
+                "cached_tokens": {"$sum": "$cached_tokens"},
+                "completion_tokens": {"$sum": "$completion_tokens"},
+                "courses_returned": {"$sum": "$courses_returned"},
+                "courses_valid": {"$sum": "$courses_valid"},
+                "avg_latency_seconds": {"$avg": "$latency_seconds"},
+                "max_latency_seconds": {"$max": "$latency_seconds"},
+            }
+        },
+        {"$sort": {"calls": -1}},
+    ]
+    summary = []
+    for row in db[LLM_TELEMETRY_COLLECTION].aggregate(pipeline):
+        key = row.pop("_id")
+        row.update(key)
+        if row.get("avg_latency_seconds") is not None:
+            row["avg_latency_seconds"] = round(row["avg_latency_seconds"], 3)
+        summary.append(row)
+    return summary
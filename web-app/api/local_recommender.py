@@ -0,0 +1,210 @@
+"""
+local_recommender.py
+
+Deterministic, in-process course recommendations (no LLM call).
+
+Eligible courses are scored by remaining core requirements, elective pattern
+matches and interest keyword overlap (see course_ranking.rank_courses), then
+picked greedily into a 16-24 credit semester while keeping the average
+difficulty balanced. Used as a fast recommendation mode and as the fallback
+when the LLM is slow or unavailable.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from . import course_filtering, course_ranking
+
+TARGET_CREDITS_MIN = 16
+TARGET_CREDITS_MAX = 24
+MAX_COURSES_PER_SEMESTER = 6
+
+# Difficulty balance: penalize picks that push the semester's average
+# difficulty (1-5) above the target, and cap the number of hard courses
+TARGET_AVERAGE_DIFFICULTY = 3.0
+DIFFICULTY_PENALTY = 1.0
+HARD_DIFFICULTY = 4
+MAX_HARD_COURSES = 2
+
+
+def _requirement_roles(remaining_requirements: Optional[Dict]) -> Dict[str, str]:
+    """Map course codes to "core", "elective" or "substitution"."""
+    roles: Dict[str, str] = {}
+    if not remaining_requirements or "error" in remaining_requirements:
+        return roles
+
+    electives = remaining_requirements.get("remaining_electives", {})
+    if electives.get("count_needed", 0) > 0:
+        for sub_course in electives.get("substitutions_available", []):
+            roles[sub_course.get("course_code", "")] = "substitution"
+        for elective in electives.get("available_courses", []):
+            roles[elective.get("course_code", "")] = "elective"
+    for req in remaining_requirements.get("remaining_core", []):
+        roles[req.get("course_code", "")] = "core"
+
+    roles.pop("", None)
+    return roles
+
+
+def _difficulty(course: Dict) -> int:
+    """Course difficulty (1-5), treating missing values as average."""
+    try:
+        return int(course.get("difficulty") or TARGET_AVERAGE_DIFFICULTY)
+    except (TypeError, ValueError):
+        return int(TARGET_AVERAGE_DIFFICULTY)
+
+
+def _reasoning(
+    course: Dict,
+    role: Optional[str],
+    student_info: Dict,
+    remaining_requirements: Optional[Dict],
+) -> str:
+    """Explain a pick from the factors that scored it."""
+    reasons = []
+    major = student_info.get("major") or "your major"
+    if role == "core":
+        reasons.append(f"Required core course for {major}.")
+    elif role == "elective":
+        count = remaining_requirements["remaining_electives"]["count_needed"]
+        reasons.append(f"Counts toward your major electives ({count} still needed).")
+    elif role == "substitution":
+        reasons.append("Can substitute for a major elective.")
+
+    matches = course_ranking.matching_interest_terms(course, student_info)
+    if matches:
+        reasons.append(f"Matches your interests ({', '.join(matches[:3])}).")
+
+    if not reasons:
+        reasons.append("Eligible this semester and fills out your credit load.")
+    reasons.append(f"Difficulty {_difficulty(course)}/5.")
+    return " ".join(reasons)
+
+
+def pick_courses(
+    available_courses: List[Dict],
+    student_info: Dict,
+    remaining_requirements: Optional[Dict] = None,
+    target_credits_min: int = TARGET_CREDITS_MIN,
+    target_credits_max: int = TARGET_CREDITS_MAX,
+    max_courses: int = MAX_COURSES_PER_SEMESTER,
+) -> List[Tuple[Dict, str]]:
+    """
+    Pick a balanced semester of courses from the eligible ones.
+
+    Courses are taken greedily by relevance score until the credit target is
+    met. A course is skipped if it would exceed the credit maximum, and its
+    score is lowered if it would push the average difficulty above
+    TARGET_AVERAGE_DIFFICULTY. Once the remaining electives are covered,
+    further electives lose their requirement boost.
+
+    Args:
+        available_courses: Eligible course dictionaries (already filtered)
+        student_info: Student profile (major, career_path, side_interests, interests)
+        remaining_requirements: Output of get_remaining_requirements (optional)
+        target_credits_min: Stop once this many credits are picked
+        target_credits_max: Never exceed this many credits
+        max_courses: Maximum number of courses
+
+    Returns:
+        List of (course, reasoning) tuples in pick order
+    """
+    roles = _requirement_roles(remaining_requirements)
+    electives_needed = 0
+    if roles:
+        electives_needed = remaining_requirements["remaining_electives"]["count_needed"]
+
+    pool = []
+    seen_codes = set()
+    for score, course in course_ranking.rank_courses(
+        available_courses, student_info, remaining_requirements
+    ):
+        code = course.get("course_code")
+        if code in seen_codes:
+            continue
+        seen_codes.add(code)
+        pool.append((score, course))
+
+    picks: List[Tuple[Dict, str]] = []
+    picked_credits = 0
+    difficulty_total = 0
+    hard_count = 0
+    elective_count = 0
+
+    while pool and picked_credits < target_credits_min and len(picks) < max_courses:
+        best_index = None
+        best_score = None
+        for index, (score, course) in enumerate(pool):
+            if (
+                picked_credits + course_filtering.get_course_credits(course)
+                > target_credits_max
+            ):
+                continue
+            difficulty = _difficulty(course)
+            if difficulty >= HARD_DIFFICULTY and hard_count >= MAX_HARD_COURSES:
+                continue
+
+            role = roles.get(course.get("course_code"))
+            if (
+                role in ("elective", "substitution")
+                and elective_count >= electives_needed
+            ):
+                score -= course_ranking.ELECTIVE_REQUIREMENT_BOOST
+            average = (difficulty_total + difficulty) / (len(picks) + 1)
+            score -= DIFFICULTY_PENALTY * max(0.0, average - TARGET_AVERAGE_DIFFICULTY)
+
+            # Strict ">" keeps the earlier (higher ranked) course on ties
+            if best_score is None or score > best_score:
+                best_index, best_score = index, score
+
+        if best_index is None:
+            break
+
+        _, course = pool.pop(best_index)
+        role = roles.get(course.get("course_code"))
+        picks.append(
+            (course, _reasoning(course, role, student_info, remaining_requirements))
+        )
+        picked_credits += course_filtering.get_course_credits(course)
+        difficulty_total += _difficulty(course)
+        hard_count += _difficulty(course) >= HARD_DIFFICULTY
+        elective_count += role in ("elective", "substitution")
+
+    return picks
+
+
+def generate_course_recommendations(
+    student_info: Dict,
+    available_courses: List[Dict],
+    remaining_requirements: Optional[Dict],
+    semester_info: Dict,
+) -> List[Dict]:
+    """
+    Generate course recommendations locally (same structure as llm_service).
+
+    Args:
+        student_info: Dictionary with student profile (name, major, year, completed_courses,
+                     interests, career_path, side_interests)
+        available_courses: List of available course dictionaries (already filtered)
+        remaining_requirements: Remaining requirements dictionary (from get_remaining_requirements)
+        semester_info: Dictionary with semester name and target credits
+
+    Returns:
+        List of recommended course dictionaries with structure:
+        [{"course_code": "...", "title": "...", "credits": 4, "reasoning": "..."}, ...]
+    """
+    picks = pick_courses(
+        available_courses,
+        student_info,
+        remaining_requirements,
+        target_credits_min=semester_info.get("target_credits_min", TARGET_CREDITS_MIN),
+        target_credits_max=semester_info.get("target_credits_max", TARGET_CREDITS_MAX),
+    )
+    return [
+        {
+            "course_code": course.get("course_code", ""),
+            "title": course.get("title", course.get("name", "")),
+            "credits": course_filtering.get_course_credits(course),
+            "reasoning": reasoning,
+        }
+        for course, reasoning in picks
+    ]
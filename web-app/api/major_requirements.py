@@ -3,10 +3,23 @@ major_requirements.py
 
 Flexible system for defining and checking major requirements across different majors.
 Supports core requirements, electives, substitutions, and courses not in the database.
+
+Majors and minors are defined declaratively in JSON files (REQUIREMENTS_DIR),
+loaded once into a registry keyed by normalized name and alias, and compiled
+into CompiledProgram evaluators when loaded.
 """
 
-from typing import Dict, List, Optional, Set, Union
+import bisect
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple, Union
 
+from .catalog import CatalogSnapshot, iter_course_codes
+from .course import to_plain
 
 # ============================================================================
 # MAJOR REQUIREMENTS DEFINITIONS
@@ -27,141 +40,179 @@ MATH_COURSES = {
 
 def get_major_requirements(major_name: str) -> Optional[Dict]:
     """
-    Get major requirements for a given major.
+    Get major requirements for a given major (or minor).
 
     Args:
-        major_name: Name of the major (e.g., "Computer Science")
+        major_name: Name or alias of the major (e.g., "Computer Science", "CS")
 
     Returns:
         Dictionary containing major requirements structure, or None if major not found
     """
-    major_name_lower = major_name.lower().strip()
+    program = get_program(major_name)
+    return program.requirements if program else None
 
-    if major_name_lower == "computer science":
-        return CS_MAJOR_REQUIREMENTS
 
-    # Add other majors here as they are defined
-    # if major_name_lower == "mathematics":
-    #     return MATH_MAJOR_REQUIREMENTS
+# ============================================================================
+# HELPER FUNCTIONS FOR REQUIREMENT CHECKING
+# ============================================================================
 
-    return None
 
+# Compiled pattern kinds; malformed patterns are exact (match only a course
+# code equal to the pattern text)
+PATTERN_EXACT = "exact"
+PATTERN_WILDCARD = "wildcard"
+PATTERN_NUMBER_RANGE = "number_range"
 
-# ============================================================================
-# COMPUTER SCIENCE MAJOR REQUIREMENTS
-# ============================================================================
+# "PREFIX.NNNN-NNNN" or "PREFIX.NNNN-PREFIX.NNNN"
+RANGE_PATTERN = re.compile(
+    r"^(?P<prefix>.+)\.(?P<low>\d+)-(?:(?P<end_prefix>.+)\.)?(?P<high>\d+)$"
+)
 
-CS_MAJOR_REQUIREMENTS = {
-    "major_name": "Computer Science",
-    "total_courses_required": 12,
-    "total_credits_required": 48,
-    "min_gpa": 2.0,
-    "min_grade": "C",
-    "core_requirements": {
-        "description": "7 core courses required",
-        "courses": [
-            {
-                "course_code": "CSCI-UA.0101",
-                "name": "Introduction to Computer Science",
-                "semesters_offered": ["Fall", "Spring"],
-                "prerequisites": [
-                    "CSCI-UA.0002",
-                    "CSCI-UA.0003",
-                ],  # OR logic handled separately
-                "notes": "Prerequisite: CSCI-UA.0002 or CSCI-UA.0003 or placement exam",
-            },
-            {
-                "course_code": "CSCI-UA.0102",
-                "name": "Data Structures",
-                "semesters_offered": ["Fall", "Spring"],
-                "prerequisites": ["CSCI-UA.0101"],
-            },
-            {
-                "course_code": "CSCI-UA.0201",
-                "name": "Computer Systems Organization",
-                "semesters_offered": ["Fall", "Spring"],
-                "prerequisites": ["CSCI-UA.0102"],
-            },
-            {
-                "course_code": "CSCI-UA.0202",
-                "name": "Operating Systems",
-                "semesters_offered": ["Fall", "Spring"],
-                "prerequisites": ["CSCI-UA.0201"],
-            },
-            {
-                "course_code": "CSCI-UA.0310",
-                "name": "Basic Algorithms",
-                "semesters_offered": ["Fall", "Spring"],
-                "prerequisites": ["CSCI-UA.0102"],
-                "additional_requirements": [
-                    "MATH-UA.0120",  # Discrete Mathematics
-                    "MATH-UA.0121",  # Calculus I (OR MATH-UA.0131 Math for Economics I)
-                ],
-                "notes": "Also requires Discrete Mathematics and a Calculus course",
-            },
-            {
-                "course_code": "MATH-UA.0121",
-                "name": "Calculus I",
-                "semesters_offered": ["Fall", "Spring", "Summer"],
-                "prerequisites": ["MATH-UA.0009"],
-                "is_math_course": True,  # Flag to indicate not in main DB
-                "notes": "Prerequisite: MATH-UA.0009",
-            },
-        ],
-    },
-    "elective_requirements": {
-        "description": "5 electives required",
-        "count": 5,
-        "type": "CSCI-UA.04xx",  # Pattern: courses numbered 0400-0499
-        "substitutions": {
-            "allowed": True,
-            "max_count": 2,
-            "courses": [
-                {
-                    "course_code": "MATH-UA.0122",
-                    "name": "Calculus II",
-                    "is_math_course": True,
-                    "semesters_offered": ["Fall", "Spring", "Summer"],
-                },
-                {
-                    "course_code": "MATH-UA.0140",
-                    "name": "Linear Algebra",
-                    "is_math_course": True,
-                    "semesters_offered": ["Fall", "Spring"],
-                },
-                {
-                    "course_code": "MATH-UA.0185",
-                    "name": "Probability and Statistics",
-                    "is_math_course": True,
-                    "semesters_offered": ["Fall", "Spring"],
-                },
-            ],
-        },
-    },
-    "notes": [
-        "Only grades of 'C' or higher are applicable to the major",
-        "Minimum GPA of 2.0 required",
-        "Electives vary every fall and spring semester",
-        "One elective option offered in summer semester",
-    ],
-}
 
+def _course_number(number_str: str) -> Optional[int]:
+    try:
+        return int(number_str)
+    except ValueError:
+        return None
 
-# ============================================================================
-# HELPER FUNCTIONS FOR REQUIREMENT CHECKING
-# ============================================================================
 
+class CoursePattern:
+    """
+    A course code pattern compiled once (see compile_course_pattern).
+
+    Attributes:
+        pattern: Pattern text
+        kind: One of the PATTERN_* kinds
+        prefix: Wildcard prefix, or subject prefix ("MATH-UA") of numeric patterns
+        length: Code length matched by a wildcard
+        low, high: Inclusive course number bounds of numeric patterns (None = open)
+    """
 
-def check_course_code_pattern(course_code: str, pattern: str) -> bool:
+    __slots__ = ("pattern", "kind", "prefix", "length", "low", "high")
+
+    def __init__(
+        self,
+        pattern: str,
+        kind: str,
+        prefix: str = "",
+        length: int = 0,
+        low: Optional[int] = None,
+        high: Optional[int] = None,
+    ):
+        self.pattern = pattern
+        self.kind = kind
+        self.prefix = prefix
+        self.length = length
+        self.low = low
+        self.high = high
+
+    def matches(self, course_code: str) -> bool:
+        """True if a course code matches the pattern (see check_course_code_pattern)."""
+        if course_code == self.pattern:
+            return True
+        if self.kind == PATTERN_EXACT:
+            return False
+        if not isinstance(course_code, str) or "." not in course_code:
+            return False
+        if self.kind == PATTERN_WILDCARD:
+            return len(course_code) == self.length and course_code.startswith(
+                self.prefix
+            )
+        course_prefix, course_num_str = course_code.rsplit(".", 1)
+        if course_prefix != self.prefix:
+            return False
+        course_num = _course_number(course_num_str)
+        return course_num is not None and self._in_range(course_num)
+
+    def _in_range(self, number: int) -> bool:
+        return (self.low is None or number >= self.low) and (
+            self.high is None or number <= self.high
+        )
+
+    def __repr__(self) -> str:
+        return f"CoursePattern({self.pattern!r}, {self.kind!r})"
+
+
+def _number_pattern(
+    pattern: str, base: str, low_bound: bool, high_bound: bool
+) -> CoursePattern:
+    """Compile "PREFIX.NNNN" with the number as lower and/or upper bound."""
+    if "." not in base:
+        return CoursePattern(pattern, PATTERN_EXACT)
+    prefix, number_str = base.rsplit(".", 1)
+    number = _course_number(number_str)
+    if number is None:
+        return CoursePattern(pattern, PATTERN_EXACT)
+    return CoursePattern(
+        pattern,
+        PATTERN_NUMBER_RANGE,
+        prefix,
+        low=number if low_bound else None,
+        high=number if high_bound else None,
+    )
+
+
+def _range_pattern(pattern: str) -> CoursePattern:
+    """Compile "PREFIX.NNNN-NNNN" or "PREFIX.NNNN-PREFIX.NNNN"."""
+    match = RANGE_PATTERN.match(pattern)
+    if not match or match["end_prefix"] not in (None, match["prefix"]):
+        return CoursePattern(pattern, PATTERN_EXACT)
+    return CoursePattern(
+        pattern,
+        PATTERN_NUMBER_RANGE,
+        match["prefix"],
+        low=int(match["low"]),
+        high=int(match["high"]),
+    )
+
+
+_compiled_patterns: Dict[str, CoursePattern] = {}
+
+
+def compile_course_pattern(pattern: str) -> CoursePattern:
     """
-    Check if a course code matches a pattern.
+    Compile a course code pattern into a matcher, once per pattern.
 
     Supports multiple pattern types:
     - Exact match: "CSCI-UA.0101"
     - Wildcard: "CSCI-UA.04xx" (matches 0400-0499)
     - Numeric comparison: "MATH-UA.0121+" (matches >= 0121)
     - Numeric comparison: "MATH-UA.0121-" (matches <= 0121)
-    - Range: "MATH-UA.0120-0140" (matches 0120 to 0140 inclusive)
+    - Range: "MATH-UA.0120-0140" or "MATH-UA.0120-MATH-UA.0140" (matches 0120
+      to 0140 inclusive)
+
+    Args:
+        pattern: Pattern to compile (e.g., "CSCI-UA.04xx", "MATH-UA.0121+")
+
+    Returns:
+        CoursePattern
+    """
+    compiled = _compiled_patterns.get(pattern)
+    if compiled is not None:
+        return compiled
+
+    if "xx" in pattern:
+        compiled = CoursePattern(
+            pattern, PATTERN_WILDCARD, pattern.replace("xx", ""), len(pattern)
+        )
+    elif pattern.endswith("+"):
+        compiled = _number_pattern(pattern, pattern[:-1], True, False)
+    elif pattern.endswith("-"):
+        compiled = _number_pattern(pattern, pattern[:-1], False, True)
+    elif "-" in pattern and "." in pattern:
+        compiled = _range_pattern(pattern)
+    else:
+        compiled = CoursePattern(pattern, PATTERN_EXACT)
+
+    _compiled_patterns[pattern] = compiled
+    return compiled
+
+
+def check_course_code_pattern(course_code: str, pattern: str) -> bool:
+    """
+    Check if a course code matches a pattern.
+
+    See compile_course_pattern for the supported pattern types.
 
     Args:
         course_code: Course code to check (e.g., "CSCI-UA.0421", "MATH-UA.0125")
@@ -170,98 +221,623 @@ def check_course_code_pattern(course_code: str, pattern: str) -> bool:
     Returns:
         True if course matches pattern
     """
-    # Exact match
-    if course_code == pattern:
-        return True
+    return compile_course_pattern(pattern).matches(course_code)
 
-    # Extract subject prefix and course number from course_code
-    # Format: "SUBJECT-XX.NNNN" or "SUBJECT-XX.NNN"
-    try:
-        if "." not in course_code:
-            return False
 
-        course_prefix, course_num_str = course_code.rsplit(".", 1)
+class CourseCodeIndex:
+    """
+    Sorted course code indexes of a catalog, for finding the courses that
+    match a pattern with binary search instead of a catalog scan.
 
-        # Try to extract numeric part
-        try:
-            course_num = int(course_num_str)
-        except ValueError:
-            # If not numeric, fall back to string matching
-            course_num = None
-    except Exception:
-        return False
-
-    # Pattern: "SUBJECT-XX.04xx" - wildcard matching
-    if "xx" in pattern:
-        pattern_prefix = pattern.replace("xx", "")
-        return course_code.startswith(pattern_prefix) and len(course_code) == len(
-            pattern
+    - codes/code_positions: all codes, sorted (exact and wildcard patterns)
+    - numbers: subject prefix -> sorted (course number, position) pairs
+      (numeric patterns)
+    """
+
+    def __init__(self, all_courses):
+        pairs = sorted(
+            (code, position)
+            for position, code in iter_course_codes(all_courses)
+            if isinstance(code, str)
         )
+        self.codes = [code for code, _ in pairs]
+        self.code_positions = [position for _, position in pairs]
+        numbers: Dict[str, List] = {}
+        for code, position in pairs:
+            if "." in code:
+                prefix, number_str = code.rsplit(".", 1)
+                number = _course_number(number_str)
+                if number is not None:
+                    numbers.setdefault(prefix, []).append((number, position))
+        for entries in numbers.values():
+            entries.sort()
+        self.numbers = numbers
+
+    def _exact(self, code: str) -> List[int]:
+        start = bisect.bisect_left(self.codes, code)
+        end = bisect.bisect_right(self.codes, code, start)
+        return self.code_positions[start:end]
+
+    def match(self, pattern: CoursePattern) -> List[int]:
+        """
+        Find the catalog positions of courses matching a compiled pattern.
+
+        Returns:
+            Positions in catalog order
+        """
+        positions = self._exact(pattern.pattern)
+        if pattern.kind == PATTERN_WILDCARD:
+            prefix = pattern.prefix
+            i = bisect.bisect_left(self.codes, prefix)
+            while i < len(self.codes) and self.codes[i].startswith(prefix):
+                code = self.codes[i]
+                if (
+                    len(code) == pattern.length
+                    and "." in code
+                    and code != pattern.pattern
+                ):
+                    positions.append(self.code_positions[i])
+                i += 1
+        elif pattern.kind == PATTERN_NUMBER_RANGE:
+            entries = self.numbers.get(pattern.prefix, [])
+            start = (
+                0
+                if pattern.low is None
+                else bisect.bisect_left(entries, (pattern.low, -1))
+            )
+            end = (
+                len(entries)
+                if pattern.high is None
+                else bisect.bisect_right(entries, (pattern.high, math.inf))
+            )
+            exact = set(positions)
+            positions.extend(
+                position for _, position in entries[start:end] if position not in exact
+            )
+        return sorted(positions)
 
-    # Pattern: "SUBJECT-XX.NNNN+" - numeric >= comparison
-    if pattern.endswith("+"):
-        pattern_base = pattern[:-1]  # Remove the "+"
-        if "." not in pattern_base:
-            return False
 
-        pattern_prefix, pattern_num_str = pattern_base.rsplit(".", 1)
-        try:
-            pattern_num = int(pattern_num_str)
-            return (
-                course_prefix == pattern_prefix
-                and course_num is not None
-                and course_num >= pattern_num
+# Index of the last immutable catalog seen (a CatalogSnapshot or the tuple
+# of Course records from course_filtering.get_all_courses_from_db)
+_code_index: Dict = {}
+_code_index_lock = threading.Lock()
+
+
+def _get_code_index(all_courses) -> Optional[CourseCodeIndex]:
+    """Code index of an immutable catalog, built once; None for other sequences."""
+    global _code_index  # pylint: disable=global-statement
+
+    if not isinstance(all_courses, (CatalogSnapshot, tuple)):
+        return None
+    with _code_index_lock:
+        cached = _code_index
+    if cached.get("catalog") is all_courses:
+        return cached["index"]
+    index = CourseCodeIndex(all_courses)
+    with _code_index_lock:
+        _code_index = {"catalog": all_courses, "index": index}
+    return index
+
+
+def find_matching_courses(
+    pattern: Union[str, CoursePattern], all_courses
+) -> List[Tuple[int, str]]:
+    """
+    Find the catalog courses whose code matches a pattern.
+
+    Immutable catalogs (snapshot, cached Course tuple) are answered from a
+    code index built once per catalog, so the cost scales with the number
+    of matches; other course lists are scanned.
+
+    Args:
+        pattern: Course code pattern (see compile_course_pattern), or the
+                 compiled CoursePattern
+        all_courses: List of all courses (or a catalog snapshot)
+
+    Returns:
+        (position, course code) pairs, in catalog order
+    """
+    compiled = (
+        pattern
+        if isinstance(pattern, CoursePattern)
+        else compile_course_pattern(pattern)
+    )
+    index = _get_code_index(all_courses)
+    if index is None:
+        return [
+            (position, course_code)
+            for position, course_code in iter_course_codes(all_courses)
+            if compiled.matches(course_code)
+        ]
+    if isinstance(all_courses, CatalogSnapshot):
+        return [
+            (position, all_courses.code(position)) for position in index.match(compiled)
+        ]
+    return [
+        (position, all_courses[position].get("course_code", ""))
+        for position in index.match(compiled)
+    ]
+
+
+# ============================================================================
+# REQUIREMENT REGISTRY
+# ============================================================================
+
+# One JSON file per major or minor; adding a program is a data change
+REQUIREMENTS_DIR = os.getenv(
+    "MAJOR_REQUIREMENTS_DIR",
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "database",
+        "data",
+        "requirements",
+    ),
+)
+PROGRAM_TYPES = ("major", "minor")
+
+
+def normalize_program_name(name: str) -> str:
+    """Registry key of a program name or alias ("  computer  Science" -> "computer science")."""
+    return " ".join(name.lower().split())
+
+
+def requirements_fingerprint(requirements: Dict) -> str:
+    """Short hex digest of a requirements dictionary (changes with its content)."""
+    payload = json.dumps(requirements, sort_keys=True, default=str).encode()
+    return hashlib.sha1(payload).hexdigest()[:16]
+
+
+class _Identity(NamedTuple):
+    """What a program is called and defined as."""
+
+    name: str
+    program_type: str
+    aliases: Tuple[str, ...]
+    requirements: Dict
+    fingerprint: str
+
+
+class _ElectiveRule(NamedTuple):
+    """How a program's electives are counted."""
+
+    pattern: Optional[CoursePattern]
+    count: int
+    substitution_codes: Tuple[str, ...]
+    max_substitutions: Optional[int]
+
+
+class CompiledProgram:
+    """
+    Requirements of one major or minor, compiled once (see compile_requirements).
+
+    Attributes:
+        name: Program name (e.g., "Computer Science")
+        program_type: "major" or "minor"
+        aliases: Other names the program is found by (e.g., "CS")
+        requirements: Requirements dictionary, as defined
+        core: (course code, remaining-core details) pairs, in definition order
+        core_codes: Set of the core course codes
+        elective_pattern: Compiled elective CoursePattern, or None
+        elective_count: Number of electives required
+        substitution_codes: Codes of the allowed substitutions, in definition order
+        max_substitutions: Most substitutions counted as electives (None = no cap)
+        fingerprint: Short hex digest of the definition (changes with it)
+    """
+
+    __slots__ = ("_identity", "core", "core_codes", "_elective_rule", "_electives")
+
+    def __init__(self, requirements: Dict):
+        self._identity = _Identity(
+            requirements.get("major_name", ""),
+            requirements.get("program_type", "major"),
+            tuple(requirements.get("aliases", [])),
+            requirements,
+            requirements_fingerprint(requirements),
+        )
+
+        core = []
+        for req in requirements.get("core_requirements", {}).get("courses", []):
+            course_code = req["course_code"]
+            core.append(
+                (
+                    course_code,
+                    {
+                        "course_code": course_code,
+                        "name": req.get("name", ""),
+                        "prerequisites": req.get("prerequisites", []),
+                        "semesters_offered": req.get("semesters_offered", []),
+                        "notes": req.get("notes", ""),
+                    },
+                )
             )
-        except ValueError:
-            return False
+        self.core = tuple(core)
+        self.core_codes = frozenset(code for code, _ in core)
+
+        elective_reqs = requirements.get("elective_requirements", {})
+        pattern = elective_reqs.get("type", "")
+        substitutions = elective_reqs.get("substitutions", {})
+        if substitutions.get("allowed", False):
+            substitution_codes = tuple(
+                sub_course.get("course_code", "")
+                for sub_course in substitutions.get("courses", [])
+            )
+        else:
+            substitution_codes = ()
+        self._elective_rule = _ElectiveRule(
+            compile_course_pattern(pattern) if pattern else None,
+            elective_reqs.get("count", 0),
+            substitution_codes,
+            substitutions.get("max_count"),
+        )
+        # (catalog, electives) of the last immutable catalog seen
+        self._electives = None
+
+    @property
+    def name(self) -> str:
+        """Program name (e.g., "Computer Science")."""
+        return self._identity.name
+
+    @property
+    def program_type(self) -> str:
+        """ "major" or "minor"."""
+        return self._identity.program_type
+
+    @property
+    def aliases(self) -> Tuple[str, ...]:
+        """Other names the program is found by (e.g., "CS")."""
+        return self._identity.aliases
+
+    @property
+    def requirements(self) -> Dict:
+        """Requirements dictionary, as defined."""
+        return self._identity.requirements
+
+    @property
+    def fingerprint(self) -> str:
+        """Short hex digest of the definition (changes with it)."""
+        return self._identity.fingerprint
+
+    @property
+    def elective_pattern(self) -> Optional[CoursePattern]:
+        """Compiled elective CoursePattern, or None."""
+        return self._elective_rule.pattern
+
+    @property
+    def elective_count(self) -> int:
+        """Number of electives required."""
+        return self._elective_rule.count
+
+    @property
+    def substitution_codes(self) -> Tuple[str, ...]:
+        """Codes of the allowed substitutions, in definition order."""
+        return self._elective_rule.substitution_codes
+
+    @property
+    def max_substitutions(self) -> Optional[int]:
+        """Most substitutions counted as electives (None = no cap)."""
+        return self._elective_rule.max_substitutions
+
+    def electives(self, all_courses) -> Tuple[Tuple[str, Dict], ...]:
+        """
+        Catalog courses matching the elective pattern, other than core courses.
+
+        The result is cached for the last immutable catalog (a CatalogSnapshot
+        or the cached Course tuple), so requests only check completion.
+
+        Args:
+            all_courses: List of all courses (or a catalog snapshot)
+
+        Returns:
+            (course code, available-elective details) pairs, in catalog order
+        """
+        if self.elective_pattern is None or not all_courses:
+            return ()
+        cached = self._electives
+        if cached is not None and cached[0] is all_courses:
+            return cached[1]
+
+        electives = []
+        for position, course_code in find_matching_courses(
+            self.elective_pattern, all_courses
+        ):
+            if course_code in self.core_codes:
+                continue
+            course = all_courses[position]
+            electives.append(
+                (
+                    course_code,
+                    {
+                        "course_code": course_code,
+                        "name": course.get("title", ""),
+                        "prerequisites": to_plain(course.get("prerequisites", [])),
+                        "difficulty": course.get("difficulty", 0),
+                        "credits": course.get("credits", 0),
+                    },
+                )
+            )
+        electives = tuple(electives)
+        if isinstance(all_courses, (CatalogSnapshot, tuple)):
+            self._electives = (all_courses, electives)
+        return electives
+
+    def core_status(self, completed_set: Set[str]) -> Tuple[Dict, List[Dict]]:
+        """
+        Completed and remaining core courses.
+
+        Returns:
+            (status as get_completed_core_requirements, details of the
+            remaining core courses)
+        """
+        completed = []
+        remaining = []
+        remaining_details = []
+        for course_code, details in self.core:
+            if course_code in completed_set:
+                completed.append(course_code)
+            else:
+                remaining.append(course_code)
+                remaining_details.append(details)
+        status = {
+            "completed": completed,
+            "remaining": remaining,
+            "count": len(completed),
+            "total": len(self.core),
+        }
+        return status, remaining_details
+
+    def elective_status(
+        self, completed_set: Set[str], all_courses=None
+    ) -> Tuple[Dict, List[Dict]]:
+        """
+        Completed electives (substitutions up to the cap) and available ones.
+
+        Returns:
+            (status as get_completed_electives, details of the catalog
+            electives not yet completed)
+        """
+        completed = []
+        available = []
+        for course_code, details in self.electives(all_courses):
+            if course_code in completed_set:
+                completed.append(course_code)
+            else:
+                available.append(details)
+
+        substitutions_used = [
+            course_code
+            for course_code in self.substitution_codes
+            if course_code in completed_set
+        ]
+        if self.max_substitutions is not None:
+            substitutions_used = substitutions_used[: self.max_substitutions]
+        completed.extend(substitutions_used)
+
+        status = {
+            "completed": completed,
+            "remaining_count": max(0, self.elective_count - len(completed)),
+            "substitutions_used": substitutions_used,
+            "max_substitutions": self.max_substitutions or 0,
+        }
+        return status, available
+
+    def __repr__(self) -> str:
+        return f"CompiledProgram({self.name!r}, {self.program_type!r})"
+
+
+def compile_requirements(requirements: Dict) -> CompiledProgram:
+    """
+    Compile a requirements dictionary into a CompiledProgram.
 
-    # Pattern: "SUBJECT-XX.NNNN-" - numeric <= comparison
-    if pattern.endswith("-"):
-        pattern_base = pattern[:-1]  # Remove the "-"
-        if "." not in pattern_base:
-            return False
+    Args:
+        requirements: Requirements dictionary (the structure of the files in
+                      REQUIREMENTS_DIR)
 
-        pattern_prefix, pattern_num_str = pattern_base.rsplit(".", 1)
+    Returns:
+        CompiledProgram
+
+    Raises:
+        ValueError: If the definition is malformed
+    """
+    if not isinstance(requirements, dict):
+        raise ValueError("requirements must be a JSON object")
+    program_type = requirements.get("program_type", "major")
+    if program_type not in PROGRAM_TYPES:
+        raise ValueError(f"unknown program_type {program_type!r}")
+    aliases = _list_field(requirements, "aliases", "aliases")
+    if any(not isinstance(alias, str) for alias in aliases):
+        raise ValueError("aliases must be strings")
+
+    core_reqs = _dict_field(requirements, "core_requirements", "core_requirements")
+    core = _list_field(core_reqs, "courses", "core_requirements.courses")
+    for req in core:
+        if not isinstance(req, dict):
+            raise ValueError(f"core requirement {req!r} is not an object")
+        if not req.get("course_code") or not isinstance(req["course_code"], str):
+            raise ValueError("core requirement without course_code")
+
+    elective_reqs = _dict_field(
+        requirements, "elective_requirements", "elective_requirements"
+    )
+    count = elective_reqs.get("count", 0)
+    if not isinstance(count, int) or count < 0:
+        raise ValueError(f"invalid elective count {count!r}")
+    if not isinstance(elective_reqs.get("type", ""), str):
+        raise ValueError("elective type must be a course pattern string")
+    substitutions = _dict_field(
+        elective_reqs, "substitutions", "elective_requirements.substitutions"
+    )
+    subs = _list_field(substitutions, "courses", "substitutions.courses")
+    if any(not isinstance(sub_course, dict) for sub_course in subs):
+        raise ValueError("substitution courses must be objects")
+    max_count = substitutions.get("max_count")
+    if max_count is not None and (not isinstance(max_count, int) or max_count < 0):
+        raise ValueError(f"invalid substitution max_count {max_count!r}")
+    return CompiledProgram(requirements)
+
+
+def _dict_field(section: Dict, key: str, label: str) -> Dict:
+    """Optional object field of a requirements section ({} if missing)."""
+    value = section.get(key, {})
+    if not isinstance(value, dict):
+        raise ValueError(f"{label} must be an object")
+    return value
+
+
+def _list_field(section: Dict, key: str, label: str) -> List:
+    """Optional array field of a requirements section ([] if missing)."""
+    value = section.get(key, [])
+    if not isinstance(value, list):
+        raise ValueError(f"{label} must be an array")
+    return value
+
+
+def load_requirement_registry(
+    directory: Optional[str] = None,
+) -> Dict[str, CompiledProgram]:
+    """
+    Load and compile the requirement definitions of a directory.
+
+    Definitions that cannot be read or compiled, or whose name or alias is
+    already taken, are skipped with an error message.
+
+    Args:
+        directory: Directory of *.json definitions (default: REQUIREMENTS_DIR)
+
+    Returns:
+        Dictionary of normalized name or alias -> CompiledProgram
+    """
+    directory = directory or REQUIREMENTS_DIR
+    registry: Dict[str, CompiledProgram] = {}
+    try:
+        filenames = sorted(
+            name for name in os.listdir(directory) if name.endswith(".json")
+        )
+    except OSError as e:
+        print(f"ERROR: Failed to list requirement definitions in {directory}: {e}")
+        return registry
+
+    for filename in filenames:
         try:
-            pattern_num = int(pattern_num_str)
-            return (
-                course_prefix == pattern_prefix
-                and course_num is not None
-                and course_num <= pattern_num
+            with open(os.path.join(directory, filename), encoding="utf-8") as f:
+                requirements = json.load(f)
+            program = compile_requirements(requirements)
+            if not isinstance(program.name, str) or not program.name.strip():
+                raise ValueError("missing major_name")
+        except (OSError, ValueError, AttributeError, KeyError, TypeError) as e:
+            # One malformed definition must not take down the whole registry
+            print(
+                f"ERROR: Skipping requirement definition {filename}: "
+                f"{type(e).__name__}: {e}"
             )
-        except ValueError:
-            return False
+            continue
 
-    # Pattern: "SUBJECT-XX.NNNN-NNNN" - range matching
-    if "-" in pattern and "." in pattern:
-        # Check if it's a range (has both . and -)
-        parts = pattern.split("-")
-        if len(parts) == 2:
-            start_pattern = parts[0]
-            end_pattern = parts[1]
-
-            # Extract start and end numbers
-            if "." in start_pattern and "." in end_pattern:
-                start_prefix, start_num_str = start_pattern.rsplit(".", 1)
-                end_prefix, end_num_str = end_pattern.rsplit(".", 1)
-
-                # Both should have same prefix
-                if start_prefix != end_prefix:
-                    return False
-
-                try:
-                    start_num = int(start_num_str)
-                    end_num = int(end_num_str)
-                    return (
-                        course_prefix == start_prefix
-                        and course_num is not None
-                        and start_num <= course_num <= end_num
-                    )
-                except ValueError:
-                    return False
-
-    # Default: exact match (already checked at top, but return False for safety)
-    return False
+        keys = list(
+            dict.fromkeys(
+                normalize_program_name(name)
+                for name in (program.name, *program.aliases)
+            )
+        )
+        taken = [key for key in keys if key in registry]
+        if taken:
+            print(
+                f"ERROR: Skipping requirement definition {filename}: "
+                f"name already defined ({', '.join(taken)})"
+            )
+            continue
+        for key in keys:
+            registry[key] = program
+
+    programs = {id(program) for program in registry.values()}
+    print(f"DEBUG: Loaded {len(programs)} requirement definitions from {directory}")
+    return registry
+
+
+# Normalized name or alias -> CompiledProgram, loaded on first use
+_registry: Optional[Dict[str, CompiledProgram]] = None
+_registry_lock = threading.Lock()
+
+
+def _get_registry() -> Dict[str, CompiledProgram]:
+    global _registry  # pylint: disable=global-statement
+
+    registry = _registry
+    if registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = load_requirement_registry()
+            registry = _registry
+    return registry
+
+
+def get_program(name: str) -> Optional[CompiledProgram]:
+    """
+    Find a compiled major or minor by name or alias (case and spacing insensitive).
+
+    Args:
+        name: Program name or alias (e.g., "Computer Science", "cs", "Math Minor")
+
+    Returns:
+        CompiledProgram, or None if no program has that name
+    """
+    if not isinstance(name, str):
+        return None
+    return _get_registry().get(normalize_program_name(name))
+
+
+def list_programs(program_type: Optional[str] = None) -> List[str]:
+    """
+    Names of the registered programs, in definition file order.
+
+    Args:
+        program_type: Only list "major" or "minor" programs (default: all)
+
+    Returns:
+        List of program names
+    """
+    names = []
+    for program in _get_registry().values():
+        if program_type in (None, program.program_type) and program.name not in names:
+            names.append(program.name)
+    return names
+
+
+# Most requirements dictionaries outside the registry kept compiled
+COMPILED_CACHE_SIZE = 64
+
+# (major name, requirements fingerprint) -> CompiledProgram of a dictionary
+# that is not the registry's own
+_compiled: Dict[Tuple[str, str], CompiledProgram] = {}
+_compiled_lock = threading.Lock()
+
+
+def _program_for(major_requirements: Dict) -> CompiledProgram:
+    """
+    Compiled program of a requirements dictionary.
+
+    The registry's own dictionaries map to their registry program. Any other
+    dictionary is compiled once per content and cached by major name and
+    requirements fingerprint, so equal copies share a program.
+    """
+    major_name = major_requirements.get("major_name", "")
+    program = get_program(major_name)
+    if program is not None and program.requirements is major_requirements:
+        return program
+
+    key = (major_name, requirements_fingerprint(major_requirements))
+    with _compiled_lock:
+        program = _compiled.get(key)
+    if program is None:
+        program = compile_requirements(major_requirements)
+        with _compiled_lock:
+            if len(_compiled) >= COMPILED_CACHE_SIZE:
+                _compiled.clear()
+            program = _compiled.setdefault(key, program)
+    return program
+
+
+# ============================================================================
+# REQUIREMENT CHECKING
+# ============================================================================
 
 
 def get_completed_core_requirements(
@@ -277,25 +853,8 @@ def get_completed_core_requirements(
     Returns:
         Dictionary with 'completed' and 'remaining' lists, and 'count' of completed
     """
-    completed = []
-    remaining = []
-    completed_set = set(completed_courses)
-
-    core_reqs = major_requirements.get("core_requirements", {}).get("courses", [])
-
-    for req in core_reqs:
-        course_code = req["course_code"]
-        if course_code in completed_set:
-            completed.append(course_code)
-        else:
-            remaining.append(course_code)
-
-    return {
-        "completed": completed,
-        "remaining": remaining,
-        "count": len(completed),
-        "total": len(core_reqs),
-    }
+    status, _ = _program_for(major_requirements).core_status(set(completed_courses))
+    return status
 
 
 def get_completed_electives(
@@ -314,41 +873,143 @@ def get_completed_electives(
     Returns:
         Dictionary with 'completed', 'remaining_count', and 'substitutions_used'
     """
-    completed = []
-    substitutions_used = []
-    completed_set = set(completed_courses)
+    status, _ = _program_for(major_requirements).elective_status(
+        set(completed_courses), all_courses
+    )
+    return status
 
-    elective_reqs = major_requirements.get("elective_requirements", {})
-    pattern = elective_reqs.get("type", "")
-    required_count = elective_reqs.get("count", 0)
-
-    # Check regular electives (match pattern)
-    if pattern and all_courses:
-        for course in all_courses:
-            course_code = course.get("course_code", "")
-            if course_code in completed_set and check_course_code_pattern(
-                course_code, pattern
-            ):
-                completed.append(course_code)
 
-    # Check substitutions
-    substitutions = elective_reqs.get("substitutions", {})
-    if substitutions.get("allowed", False):
-        substitution_courses = substitutions.get("courses", [])
-        for sub_course in substitution_courses:
-            course_code = sub_course.get("course_code", "")
-            if course_code in completed_set:
-                substitutions_used.append(course_code)
-                completed.append(course_code)
+class DegreeAudit:
+    """
+    Result of a single-pass degree audit (see audit_degree).
+
+    Attributes:
+        major_name: Name of the major as requested
+        major_requirements: Major requirements dictionary (None if the major
+                            is not found; the other fields are then empty)
+        core_status: Completed/remaining core courses (as
+                     get_completed_core_requirements)
+        elective_status: Completed electives and substitutions (as
+                         get_completed_electives)
+        remaining_core: Details of the core courses not yet completed
+        available_electives: Details of the catalog electives not yet completed
+    """
 
-    remaining_count = max(0, required_count - len(completed))
+    __slots__ = (
+        "major_name",
+        "major_requirements",
+        "core_status",
+        "elective_status",
+        "remaining_core",
+        "available_electives",
+    )
 
-    return {
-        "completed": completed,
-        "remaining_count": remaining_count,
-        "substitutions_used": substitutions_used,
-        "max_substitutions": substitutions.get("max_count", 0) if substitutions else 0,
-    }
+    def __init__(
+        self,
+        major_name: str,
+        major_requirements: Optional[Dict] = None,
+        core_status: Optional[Dict] = None,
+        elective_status: Optional[Dict] = None,
+        remaining_core: Optional[List[Dict]] = None,
+        available_electives: Optional[List[Dict]] = None,
+    ):
+        self.major_name = major_name
+        self.major_requirements = major_requirements
+        self.core_status = core_status or {}
+        self.elective_status = elective_status or {}
+        self.remaining_core = remaining_core or []
+        self.available_electives = available_electives or []
+
+    def _not_found(self) -> Dict:
+        return {
+            "error": f"Major '{self.major_name}' not found",
+            "major_name": self.major_name,
+        }
+
+    def progress(self) -> Dict:
+        """Overall progress toward the major (the get_major_progress result)."""
+        if not self.major_requirements:
+            return self._not_found()
+
+        total_required = self.major_requirements.get("total_courses_required", 0)
+        total_completed = self.core_status["count"] + len(
+            self.elective_status["completed"]
+        )
+        progress_percentage = (
+            (total_completed / total_required * 100) if total_required > 0 else 0
+        )
+
+        return {
+            "major_name": self.major_name,
+            "core_requirements": self.core_status,
+            "elective_requirements": self.elective_status,
+            "overall_progress": {
+                "completed": total_completed,
+                "required": total_required,
+                "percentage": round(progress_percentage, 2),
+            },
+        }
+
+    def remaining(self) -> Dict:
+        """Remaining core and elective requirements (the get_remaining_requirements result)."""
+        if not self.major_requirements:
+            return self._not_found()
+
+        elective_reqs = self.major_requirements.get("elective_requirements", {})
+        return {
+            "major_name": self.major_name,
+            "remaining_core": self.remaining_core,
+            "remaining_electives": {
+                "count_needed": self.elective_status["remaining_count"],
+                "available_courses": self.available_electives,
+                "substitutions_available": elective_reqs.get("substitutions", {}).get(
+                    "courses", []
+                ),
+            },
+        }
+
+
+def audit_degree(
+    major_name: str,
+    completed_courses: List[str],
+    all_courses: Optional[List[Dict]] = None,
+) -> DegreeAudit:
+    """
+    Audit a student's courses against their major in one pass.
+
+    Core status, elective status, substitutions and available electives are
+    computed together from the compiled program (see get_program): the core
+    requirements are walked once, and the catalog electives matching the
+    elective pattern (looked up once per catalog) are split into completed
+    and available. The detail dictionaries are shared between audits and
+    must not be modified.
+
+    Args:
+        major_name: Name or alias of the major (or minor)
+        completed_courses: List of course codes the student has completed
+        all_courses: Optional list of all course dictionaries from DB
+
+    Returns:
+        DegreeAudit; progress() and remaining() give the get_major_progress
+        and get_remaining_requirements results
+    """
+    program = get_program(major_name)
+    if program is None:
+        return DegreeAudit(major_name)
+
+    completed_set = set(completed_courses)
+    core_status, remaining_core = program.core_status(completed_set)
+    elective_status, available_electives = program.elective_status(
+        completed_set, all_courses
+    )
+    return DegreeAudit(
+        major_name,
+        program.requirements,
+        core_status=core_status,
+        elective_status=elective_status,
+        remaining_core=remaining_core,
+        available_electives=available_electives,
+    )
 
 
 def get_major_progress(
@@ -359,6 +1020,8 @@ def get_major_progress(
     """
     Get overall progress toward completing major requirements.
 
+    Use audit_degree directly when the remaining requirements are needed too.
+
     Args:
         major_name: Name of the major
         completed_courses: List of course codes the student has completed
@@ -370,32 +1033,7 @@ def get_major_progress(
         - electives: completed/remaining
         - overall_progress: percentage
     """
-    major_reqs = get_major_requirements(major_name)
-
-    if not major_reqs:
-        return {"error": f"Major '{major_name}' not found", "major_name": major_name}
-
-    core_status = get_completed_core_requirements(major_reqs, completed_courses)
-    elective_status = get_completed_electives(
-        major_reqs, completed_courses, all_courses
-    )
-
-    total_required = major_reqs.get("total_courses_required", 0)
-    total_completed = core_status["count"] + len(elective_status["completed"])
-    progress_percentage = (
-        (total_completed / total_required * 100) if total_required > 0 else 0
-    )
-
-    return {
-        "major_name": major_name,
-        "core_requirements": core_status,
-        "elective_requirements": elective_status,
-        "overall_progress": {
-            "completed": total_completed,
-            "required": total_required,
-            "percentage": round(progress_percentage, 2),
-        },
-    }
+    return audit_degree(major_name, completed_courses, all_courses).progress()
 
 
 def get_remaining_requirements(
@@ -406,6 +1044,8 @@ def get_remaining_requirements(
     """
     Get list of remaining requirements for a major.
 
+    Use audit_degree directly when the progress is needed too.
+
     Args:
         major_name: Name of the major
         completed_courses: List of course codes the student has completed
@@ -414,65 +1054,7 @@ def get_remaining_requirements(
     Returns:
         Dictionary with remaining core and elective requirements
     """
-    major_reqs = get_major_requirements(major_name)
-
-    if not major_reqs:
-        return {"error": f"Major '{major_name}' not found", "major_name": major_name}
-
-    elective_status = get_completed_electives(
-        major_reqs, completed_courses, all_courses
-    )
-
-    # Get remaining core courses with details
-    remaining_core = []
-    core_reqs = major_reqs.get("core_requirements", {}).get("courses", [])
-    completed_set = set(completed_courses)
-
-    for req in core_reqs:
-        if req["course_code"] not in completed_set:
-            remaining_core.append(
-                {
-                    "course_code": req["course_code"],
-                    "name": req.get("name", ""),
-                    "prerequisites": req.get("prerequisites", []),
-                    "semesters_offered": req.get("semesters_offered", []),
-                    "notes": req.get("notes", ""),
-                }
-            )
-
-    # Get available electives that match pattern
-    available_electives = []
-    elective_reqs = major_reqs.get("elective_requirements", {})
-    pattern = elective_reqs.get("type", "")
-
-    if pattern and all_courses:
-        completed_set = set(completed_courses)
-        for course in all_courses:
-            course_code = course.get("course_code", "")
-            if course_code not in completed_set and check_course_code_pattern(
-                course_code, pattern
-            ):
-                available_electives.append(
-                    {
-                        "course_code": course_code,
-                        "name": course.get("title", ""),
-                        "prerequisites": course.get("prerequisites", []),
-                        "difficulty": course.get("difficulty", 0),
-                        "credits": course.get("credits", 0),
-                    }
-                )
-
-    return {
-        "major_name": major_name,
-        "remaining_core": remaining_core,
-        "remaining_electives": {
-            "count_needed": elective_status["remaining_count"],
-            "available_courses": available_electives,
-            "substitutions_available": elective_reqs.get("substitutions", {}).get(
-                "courses", []
-            ),
-        },
-    }
+    return audit_degree(major_name, completed_courses, all_courses).remaining()
 
 
 def is_math_course(course_code: str) -> bool:
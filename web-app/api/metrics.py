@@ -0,0 +1,31 @@
+"""
+metrics.py
+
+Summary statistics shared by the latency and usage reports (admission
+control, LLM service and telemetry stats, benchmarks).
+"""
+
+from typing import Iterable, Optional
+
+
+def percentile(
+    values: Iterable[float], percentile_rank: float, digits: int = 3
+) -> Optional[float]:
+    """
+    Nearest-rank percentile of values.
+
+    Args:
+        values: Sample values (any order)
+        percentile_rank: Percentile to return, 0-100
+        digits: Decimal places to round the result to
+
+    Returns:
+        The percentile, or None if values is empty
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(
+        0, min(len(ordered) - 1, round(percentile_rank / 100 * len(ordered)) - 1)
+    )
+    return round(ordered[rank], digits)
@@ -0,0 +1,502 @@
+"""
+plan_recommender.py
+
+Whole-plan recommendations: fills all remaining semesters of the four-year
+plan in one request instead of one "Generate" round trip per semester.
+
+Eligibility is projected locally, semester by semester: courses provisionally
+picked for semester k count as completed when computing the candidates for
+semester k+1. The final courses are then chosen by a single LLM call (or a
+bounded parallel fan-out of per-semester calls), or taken directly from the
+local recommender's provisional picks, and re-validated in order.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from . import (
+    course_filtering,
+    course_ranking,
+    llm_service,
+    local_recommender,
+    major_requirements,
+)
+
+# "single": one LLM call for all semesters; "fanout": one call per semester in parallel
+PLAN_GENERATION_STRATEGY = os.getenv("PLAN_GENERATION_STRATEGY", "single")
+PLAN_FANOUT_WORKERS = int(os.getenv("PLAN_FANOUT_WORKERS", "4"))
+PLAN_CANDIDATES_PER_SEMESTER = int(os.getenv("PLAN_CANDIDATES_PER_SEMESTER", "15"))
+
+TARGET_CREDITS_MIN = local_recommender.TARGET_CREDITS_MIN
+TARGET_CREDITS_MAX = local_recommender.TARGET_CREDITS_MAX
+MAX_COURSES_PER_SEMESTER = local_recommender.MAX_COURSES_PER_SEMESTER
+
+
+def project_semester_candidates(
+    student_info: Dict,
+    completed_courses: List[str],
+    semesters: List[str],
+    all_courses: List[Dict],
+    major: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Compute each semester's eligible candidates in plan order.
+
+    Each semester is provisionally filled by the local recommender, and those
+    courses are treated as completed when computing the following semesters,
+    so prerequisite chains advance through the plan.
+
+    Args:
+        student_info: Student profile (career_path, side_interests, interests)
+        completed_courses: Course codes completed or planned outside these semesters
+        semesters: Semester names to plan, in order
+        all_courses: List of all course dictionaries from database
+        major: Student's major (optional)
+
+    Returns:
+        List of per-semester entries:
+        {"semester", "completed_courses", "candidates", "eligible_count",
+         "remaining_requirements", "major_progress", "provisional",
+         "provisional_reasoning", "target_credits_min", "target_credits_max"}
+    """
+    projected = list(completed_courses)
+    entries = []
+
+    for semester in semesters:
+        available = course_filtering.get_available_courses_for_semester(
+            completed_courses=projected,
+            target_semester=semester,
+            all_courses=all_courses,
+            major_name=major or None,
+        )
+        # One audit per semester serves the remaining requirements here and
+        # the progress of fan-out requests
+        audit = (
+            major_requirements.audit_degree(major, projected, all_courses)
+            if major
+            else None
+        )
+        remaining = audit.remaining() if audit else None
+        candidates = course_ranking.select_candidates(
+            available,
+            student_info,
+            remaining,
+            max_candidates=PLAN_CANDIDATES_PER_SEMESTER,
+        )
+        picks = local_recommender.pick_courses(candidates, student_info, remaining)
+        provisional = [course for course, _ in picks]
+
+        entries.append(
+            {
+                "semester": semester,
+                "completed_courses": list(projected),
+                "candidates": candidates,
+                "eligible_count": len(available),
+                "remaining_requirements": remaining,
+                "major_progress": audit.progress() if audit else None,
+                "provisional": provisional,
+                "provisional_reasoning": {
+                    course["course_code"]: reasoning for course, reasoning in picks
+                },
+                "target_credits_min": TARGET_CREDITS_MIN,
+                "target_credits_max": TARGET_CREDITS_MAX,
+            }
+        )
+        projected.extend(course["course_code"] for course in provisional)
+
+    return entries
+
+
+def _to_recommendation(course: Dict, reasoning: str) -> Dict:
+    """Convert a catalog course into the recommendation item structure."""
+    return {
+        "course_code": course.get("course_code", ""),
+        "title": course.get("title", course.get("name", "")),
+        "credits": course_filtering.get_course_credits(course),
+        "reasoning": reasoning,
+    }
+
+
+def _eligible_course(
+    code: Optional[str],
+    semester: str,
+    taken: set,
+    chosen_codes: set,
+    lookup: Dict[str, Dict],
+    all_courses: List[Dict],
+) -> Optional[Dict]:
+    """
+    Return the course if it can be taken in this semester, else None.
+
+    Args:
+        code: Course code
+        semester: Semester name
+        taken: Codes completed before this semester (satisfy prerequisites)
+        chosen_codes: Codes already chosen for this semester (excluded only)
+        lookup: Catalog and candidate courses by code
+        all_courses: List of all course dictionaries from database
+    """
+    if not code or code in taken or code in chosen_codes:
+        return None
+    course = lookup.get(code) or course_filtering.get_course_by_code(code, all_courses)
+    if course is None:
+        return None
+    if not course_filtering.filter_by_semester_availability([course], semester):
+        return None
+    if not course_filtering.check_prerequisites_met(course, list(taken), all_courses):
+        return None
+    return course
+
+
+def sequence_plan(
+    plan: Dict[str, List[Dict]],
+    entries: List[Dict],
+    completed_courses: List[str],
+    all_courses: List[Dict],
+    catalog_version: Optional[str] = None,
+) -> Dict[str, List[Dict]]:
+    """
+    Re-validate a generated plan in semester order and fill gaps locally.
+
+    A course is kept only if it exists, is not already taken, is offered in
+    that semester and has its prerequisites met by completed courses plus the
+    courses kept for earlier semesters; its title and credits are filled in
+    from the catalog. Semesters left under the credit target are topped up
+    with still-valid provisional picks and candidates.
+
+    Args:
+        plan: Semester name -> recommended course items
+        entries: Output of project_semester_candidates
+        completed_courses: Course codes completed or planned outside these semesters
+        all_courses: List of all course dictionaries from database
+        catalog_version: Catalog version, to reuse the catalog index (optional)
+
+    Returns:
+        Semester name -> validated course items, in plan order
+    """
+    # Candidates carry semester offerings for major math courses not in the DB
+    lookup = dict(course_filtering.get_catalog_index(all_courses, catalog_version))
+    for entry in entries:
+        for course in entry["candidates"]:
+            lookup.setdefault(course.get("course_code"), course)
+
+    taken = set(completed_courses)
+    result = {}
+
+    for entry in entries:
+        semester = entry["semester"]
+        chosen: List[Dict] = []
+        chosen_codes = set()
+        semester_credits = 0
+
+        for item in plan.get(semester, []):
+            if len(chosen) >= MAX_COURSES_PER_SEMESTER:
+                break
+            course = _eligible_course(
+                item.get("course_code"),
+                semester,
+                taken,
+                chosen_codes,
+                lookup,
+                all_courses,
+            )
+            if course is None:
+                print(
+                    f"DEBUG: Dropping {item.get('course_code')} from {semester} "
+                    "(not eligible in plan sequence)"
+                )
+                continue
+            # Title and credits come from the catalog, not the model
+            chosen.append(_to_recommendation(course, item.get("reasoning", "")))
+            chosen_codes.add(course["course_code"])
+            semester_credits += course_filtering.get_course_credits(course)
+
+        for course in entry["provisional"] + entry["candidates"]:
+            if (
+                semester_credits >= TARGET_CREDITS_MIN
+                or len(chosen) >= MAX_COURSES_PER_SEMESTER
+            ):
+                break
+            if (
+                _eligible_course(
+                    course.get("course_code"),
+                    semester,
+                    taken,
+                    chosen_codes,
+                    lookup,
+                    all_courses,
+                )
+                is None
+            ):
+                continue
+            chosen.append(
+                _to_recommendation(
+                    course,
+                    entry.get("provisional_reasoning", {}).get(
+                        course["course_code"],
+                        "Added by the local planner to complete this semester's credits.",
+                    ),
+                )
+            )
+            chosen_codes.add(course["course_code"])
+            semester_credits += course_filtering.get_course_credits(course)
+
+        result[semester] = chosen
+        taken.update(chosen_codes)
+
+    return result
+
+
+def _fanout_request(
+    student_info: Dict,
+    entry: Dict,
+    catalog_version: Optional[str],
+    all_courses: List[Dict],
+) -> Dict:
+    """Keyword arguments of the per-semester recommendation call for a fan-out entry."""
+    semester_student = dict(student_info, completed_courses=entry["completed_courses"])
+    return {
+        "student_info": semester_student,
+        "available_courses": entry["candidates"],
+        "major_requirements": None,
+        "major_progress": entry["major_progress"],
+        "remaining_requirements": entry["remaining_requirements"],
+        "semester_info": {
+            "semester": entry["semester"],
+            "target_credits_min": entry["target_credits_min"],
+            "target_credits_max": entry["target_credits_max"],
+        },
+        "catalog_version": catalog_version,
+        "all_courses": all_courses,
+    }
+
+
+def _single_request(
+    student_info: Dict,
+    entries: List[Dict],
+    completed_courses: List[str],
+    all_courses: List[Dict],
+    major: Optional[str],
+    catalog_version: Optional[str],
+) -> Dict:
+    """Keyword arguments of the single whole-plan recommendation call."""
+    if entries:
+        # Audited for the first semester's completed courses (= completed_courses)
+        progress = entries[0]["major_progress"]
+    else:
+        progress = (
+            major_requirements.get_major_progress(major, completed_courses, all_courses)
+            if major
+            else None
+        )
+    return {
+        "student_info": student_info,
+        "semester_candidates": entries,
+        "major_progress": progress,
+        "catalog_version": catalog_version,
+        "all_courses": all_courses,
+    }
+
+
+def _prepare_plan(
+    student_info: Dict,
+    completed_courses: List[str],
+    semesters: List[str],
+    all_courses: List[Dict],
+    major: Optional[str],
+    strategy: Optional[str],
+) -> Dict:
+    """
+    Project the semester candidates and build the LLM requests of generate_plan.
+
+    Returns:
+        Dictionary with strategy, entries (see project_semester_candidates),
+        catalog_version and requests: the keyword arguments of each
+        generate_course_recommendations call ("fanout") or of the one
+        generate_plan_recommendations call ("single")
+    """
+    strategy = (strategy or PLAN_GENERATION_STRATEGY).lower()
+    entries = project_semester_candidates(
+        student_info, completed_courses, semesters, all_courses, major
+    )
+    catalog_version = course_filtering.get_catalog_version(all_courses)
+
+    if strategy == "fanout":
+        requests = [
+            _fanout_request(student_info, entry, catalog_version, all_courses)
+            for entry in entries
+        ]
+    else:
+        requests = [
+            _single_request(
+                student_info,
+                entries,
+                completed_courses,
+                all_courses,
+                major,
+                catalog_version,
+            )
+        ]
+    return {
+        "strategy": strategy,
+        "entries": entries,
+        "catalog_version": catalog_version,
+        "requests": requests,
+    }
+
+
+def _finish_plan(
+    prepared: Dict,
+    results: List,
+    completed_courses: List[str],
+    all_courses: List[Dict],
+) -> Optional[Dict[str, List[Dict]]]:
+    """
+    Combine the results of a plan's LLM requests and validate them in sequence.
+
+    Args:
+        prepared: Output of _prepare_plan
+        results: Result of each of prepared["requests"], in order
+
+    Returns:
+        See generate_plan
+    """
+    entries = prepared["entries"]
+    if prepared["strategy"] == "fanout":
+        # Semesters whose call failed stay empty (None if every call failed)
+        plan = (
+            {
+                entry["semester"]: courses or []
+                for entry, courses in zip(entries, results)
+            }
+            if any(results)
+            else None
+        )
+    else:
+        plan = results[0]
+
+    if plan is None:
+        return None
+
+    return sequence_plan(
+        plan, entries, completed_courses, all_courses, prepared["catalog_version"]
+    )
+
+
+def generate_plan(
+    student_info: Dict,
+    completed_courses: List[str],
+    semesters: List[str],
+    all_courses: List[Dict],
+    major: Optional[str] = None,
+    strategy: Optional[str] = None,
+) -> Optional[Dict[str, List[Dict]]]:
+    """
+    Generate recommendations for several semesters in one request.
+
+    Args:
+        student_info: Student profile (name, major, year, completed_courses,
+                      interests, career_path, side_interests)
+        completed_courses: Course codes completed or planned outside these semesters
+        semesters: Semester names to plan, in order
+        all_courses: List of all course dictionaries from database
+        major: Student's major (optional)
+        strategy: "single" or "fanout" (default: PLAN_GENERATION_STRATEGY)
+
+    Returns:
+        Semester name -> recommended course items (validated in sequence),
+        or None if the LLM could not generate a plan
+    """
+    prepared = _prepare_plan(
+        student_info, completed_courses, semesters, all_courses, major, strategy
+    )
+
+    if prepared["strategy"] == "fanout":
+        # One call per semester, in parallel (bounded)
+        with ThreadPoolExecutor(max_workers=max(1, PLAN_FANOUT_WORKERS)) as executor:
+            results = list(
+                executor.map(
+                    lambda request: llm_service.generate_course_recommendations(
+                        **request
+                    ),
+                    prepared["requests"],
+                )
+            )
+    else:
+        results = [llm_service.generate_plan_recommendations(**prepared["requests"][0])]
+
+    return _finish_plan(prepared, results, completed_courses, all_courses)
+
+
+async def generate_plan_async(
+    student_info: Dict,
+    completed_courses: List[str],
+    semesters: List[str],
+    all_courses: List[Dict],
+    major: Optional[str] = None,
+    strategy: Optional[str] = None,
+) -> Optional[Dict[str, List[Dict]]]:
+    """Async version of generate_plan (used by the ASGI serving mode)."""
+    prepared = _prepare_plan(
+        student_info, completed_courses, semesters, all_courses, major, strategy
+    )
+
+    if prepared["strategy"] == "fanout":
+        # At most PLAN_FANOUT_WORKERS calls at once
+        semaphore = asyncio.Semaphore(max(1, PLAN_FANOUT_WORKERS))
+
+        async def generate(request):
+            async with semaphore:
+                return await llm_service.generate_course_recommendations_async(
+                    **request
+                )
+
+        results = list(
+            await asyncio.gather(*(generate(r) for r in prepared["requests"]))
+        )
+    else:
+        results = [
+            await llm_service.generate_plan_recommendations_async(
+                **prepared["requests"][0]
+            )
+        ]
+
+    return _finish_plan(prepared, results, completed_courses, all_courses)
+
+
+def generate_local_plan(
+    student_info: Dict,
+    completed_courses: List[str],
+    semesters: List[str],
+    all_courses: List[Dict],
+    major: Optional[str] = None,
+) -> Dict[str, List[Dict]]:
+    """
+    Generate recommendations for several semesters without calling the LLM.
+
+    Args:
+        student_info: Student profile (name, major, year, completed_courses,
+                      interests, career_path, side_interests)
+        completed_courses: Course codes completed or planned outside these semesters
+        semesters: Semester names to plan, in order
+        all_courses: List of all course dictionaries from database
+        major: Student's major (optional)
+
+    Returns:
+        Semester name -> recommended course items (validated in sequence)
+    """
+    entries = project_semester_candidates(
+        student_info, completed_courses, semesters, all_courses, major
+    )
+    plan = {
+        entry["semester"]: [
+            _to_recommendation(
+                course, entry["provisional_reasoning"][course["course_code"]]
+            )
+            for course in entry["provisional"]
+        ]
+        for entry in entries
+    }
+    return sequence_plan(plan, entries, completed_courses, all_courses)
@@ -11,6 +11,7 @@ from functools import wraps
 import jwt
 from flask import Blueprint, g, jsonify, request
 
+from . import student_snapshot
 from .plan_utils import (
     get_all_semester_plans,
     get_semester_plan,
@@ -109,6 +110,11 @@ def save_semester_plan():
             500,
         )
 
+    # Planned courses count as taken: recompute eligibility and progress
+    student_snapshot.get_student_snapshot(
+        db.students.find_one({"email": user_email}), db
+    )
+
     return (
         jsonify(
             {
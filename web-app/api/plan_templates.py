@@ -0,0 +1,204 @@
+"""
+plan_templates.py
+
+Canonical semester-by-semester plans for common (major, career path,
+starting semester) combinations. They are precomputed offline by
+database/precompute_plans.py and stored in the canonical_plans collection,
+then served as starting templates with a single indexed read.
+
+Each template assumes the student completed the template's own earlier
+semesters. A student whose completed and planned courses differ from that by
+more than TEMPLATE_MAX_DIVERGENCE courses is reported as divergent and
+should get a live plan instead.
+"""
+
+import os
+import re
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from . import course_filtering, plan_recommender
+from .plan_utils import SEMESTERS
+
+# Career paths precomputed by default ("" is the plan without a career path)
+CANONICAL_CAREER_PATHS = [
+    "",
+    "Software Engineering",
+    "AI/ML",
+    "Data Science",
+    "Systems",
+    "Cybersecurity",
+    "Web Development",
+]
+CANONICAL_MAJORS = ["Computer Science"]
+
+# Courses a student may differ from a template's assumptions by and still use it
+TEMPLATE_MAX_DIVERGENCE = int(os.getenv("TEMPLATE_MAX_DIVERGENCE", "3"))
+
+
+def normalize_career_path(career_path: Optional[str]) -> str:
+    """
+    Normalize a career path for template lookup.
+
+    Args:
+        career_path: Career path as typed by the student
+
+    Returns:
+        Lowercase career path with punctuation and extra whitespace removed
+    """
+    words = re.findall(r"[a-z0-9]+", (career_path or "").lower())
+    return " ".join(words)
+
+
+def build_templates(
+    major: str,
+    career_path: str,
+    all_courses: List[Dict],
+    mode: str = "local",
+) -> List[Dict]:
+    """
+    Build the templates for one major and career path, one per starting semester.
+
+    A full four-year plan is generated from Freshman Fall; the template for a
+    later starting semester is its remaining semesters, assuming the earlier
+    ones were completed.
+
+    Args:
+        major: Major name
+        career_path: Career path (may be empty)
+        all_courses: List of all course dictionaries from database
+        mode: "local" (deterministic recommender) or "llm" (LLM plan, falling
+              back to local if it fails)
+
+    Returns:
+        List of template documents (see find_template for the fields)
+    """
+    student_info = {
+        "name": "Student",
+        "major": major,
+        "year": "Freshman",
+        "completed_courses": [],
+        "interests": [],
+        "career_path": career_path,
+        "side_interests": [],
+    }
+
+    plan = None
+    source = "local"
+    if mode == "llm":
+        plan = plan_recommender.generate_plan(
+            student_info, [], list(SEMESTERS), all_courses, major
+        )
+        source = "llm"
+    if plan is None:
+        plan = plan_recommender.generate_local_plan(
+            student_info, [], list(SEMESTERS), all_courses, major
+        )
+        source = "local"
+
+    catalog_version = course_filtering.get_catalog_version(all_courses)
+    generated_at = datetime.now(timezone.utc).isoformat()
+    templates = []
+    assumed_completed: List[str] = []
+    for index, start_semester in enumerate(SEMESTERS):
+        templates.append(
+            {
+                "major": major,
+                "career_path": normalize_career_path(career_path),
+                "career_path_label": career_path,
+                "start_semester": start_semester,
+                "assumed_completed": list(assumed_completed),
+                "semesters": [
+                    {"semester": semester, "courses": plan.get(semester, [])}
+                    for semester in SEMESTERS[index:]
+                ],
+                "source": source,
+                "catalog_version": catalog_version,
+                "generated_at": generated_at,
+            }
+        )
+        assumed_completed.extend(
+            course["course_code"] for course in plan.get(start_semester, [])
+        )
+    return templates
+
+
+def save_templates(templates: List[Dict], db) -> int:
+    """
+    Store templates, replacing any with the same major, career path and start.
+
+    Args:
+        templates: Documents from build_templates
+        db: MongoDB database instance
+
+    Returns:
+        Number of templates stored
+    """
+    for template in templates:
+        db.canonical_plans.replace_one(
+            {
+                "major": template["major"],
+                "career_path": template["career_path"],
+                "start_semester": template["start_semester"],
+            },
+            template,
+            upsert=True,
+        )
+    return len(templates)
+
+
+def find_template(
+    major: str,
+    career_path: str,
+    start_semester: str,
+    excluded_courses: List[str],
+    db,
+) -> Optional[Dict]:
+    """
+    Find the precomputed template for a student.
+
+    Args:
+        major: Student's major
+        career_path: Career path as typed by the student
+        start_semester: First semester to plan
+        excluded_courses: Courses the student completed or planned
+        db: MongoDB database instance
+
+    Returns:
+        Dictionary with career_path (as precomputed), start_semester, source,
+        catalog_version, generated_at, semesters ([{"semester", "courses"}],
+        without courses the student already has), divergence (number of
+        courses the student's history differs from the template's
+        assumptions by) and divergent (divergence > TEMPLATE_MAX_DIVERGENCE),
+        or None if no template exists for the combination
+    """
+    template = db.canonical_plans.find_one(
+        {
+            "major": major,
+            "career_path": normalize_career_path(career_path),
+            "start_semester": start_semester,
+        },
+        {"_id": 0},
+    )
+    if template is None:
+        return None
+
+    excluded = set(excluded_courses)
+    assumed = set(template.pop("assumed_completed", []))
+    divergence = len(excluded ^ assumed)
+
+    template["career_path"] = template.pop("career_path_label", template["career_path"])
+    template["semesters"] = [
+        {
+            "semester": entry["semester"],
+            "courses": [
+                course
+                for course in entry["courses"]
+                if course["course_code"] not in excluded
+            ],
+        }
+        for entry in template["semesters"]
+    ]
+    template["divergence"] = divergence
+    template["divergent"] = divergence > TEMPLATE_MAX_DIVERGENCE
+    return template
@@ -8,6 +8,18 @@ and managing semester plans in the database.
 import re
 from typing import Dict, List, Optional
 
+# Semesters of the four-year plan, in order
+SEMESTERS = [
+    "Freshman Fall",
+    "Freshman Spring",
+    "Sophomore Fall",
+    "Sophomore Spring",
+    "Junior Fall",
+    "Junior Spring",
+    "Senior Fall",
+    "Senior Spring",
+]
+
 
 def parse_course_string(course_string: str) -> Optional[Dict]:
     """
@@ -189,22 +201,78 @@ def get_all_semester_plans(user_email: str, db) -> Dict[str, List[str]]:
         if not user:
             return {}
 
-        planned_semesters = user.get("planned_semesters", [])
-        result = {}
-
-        for plan in planned_semesters:
-            semester = plan.get("semester")
-            courses = plan.get("courses", [])
-            # Format courses as strings
-            course_strings = [format_course_string(course) for course in courses]
-            result[semester] = course_strings
-
-        return result
+        return format_semester_plans(user.get("planned_semesters", []))
     except Exception as e:
         print(f"Error getting all semester plans: {e}")
         return {}
 
 
+def format_semester_plans(planned_semesters: List[Dict]) -> Dict[str, List[str]]:
+    """
+    Format a student's planned semesters for the frontend.
+
+    Args:
+        planned_semesters: Student's planned_semesters list
+
+    Returns:
+        Dictionary mapping semester names to lists of course strings
+        (see get_all_semester_plans)
+    """
+    result = {}
+    for plan in planned_semesters:
+        semester = plan.get("semester")
+        courses = plan.get("courses", [])
+        # Format courses as strings
+        course_strings = [format_course_string(course) for course in courses]
+        result[semester] = course_strings
+    return result
+
+
+def get_planned_course_codes(planned_semesters: List[Dict]) -> List[str]:
+    """
+    Extract course codes from a user's planned semesters.
+
+    Args:
+        planned_semesters: User's planned_semesters list
+
+    Returns:
+        List of course codes planned in any semester
+    """
+    all_planned_courses = []
+    for plan in planned_semesters:
+        planned_courses = plan.get("courses", [])
+        # Extract course codes from planned courses
+        for course in planned_courses:
+            if isinstance(course, dict):
+                course_code = course.get("course_code", "")
+                if course_code:
+                    all_planned_courses.append(course_code)
+            elif isinstance(course, str):
+                # Parse course code from string like "CSCI-UA.0101 Intro to CS (4 credits)"
+                parts = course.split()
+                if parts:
+                    all_planned_courses.append(parts[0])
+    return all_planned_courses
+
+
+def excluded_course_codes(user: Dict) -> List[str]:
+    """
+    Get the course codes to exclude from recommendations for a user.
+
+    Args:
+        user: Student document
+
+    Returns:
+        Completed course codes plus courses planned in any semester
+    """
+    return list(
+        set(
+            user.get("completed_courses", [])
+            + get_planned_course_codes(user.get("planned_semesters", []))
+        )
+    )
+
+
 def _get_semester_index(semester: str) -> int:
     """
     Get semester index (0-7) from semester name.
@@ -215,18 +283,7 @@ def _get_semester_index(semester: str) -> int:
     Returns:
         Index (0-7) or 0 if not found
     """
-    semesters = [
-        "Freshman Fall",
-        "Freshman Spring",
-        "Sophomore Fall",
-        "Sophomore Spring",
-        "Junior Fall",
-        "Junior Spring",
-        "Senior Fall",
-        "Senior Spring",
-    ]
-
     try:
-        return semesters.index(semester)
+        return SEMESTERS.index(semester)
     except ValueError:
         return 0
@@ -0,0 +1,179 @@
+"""
+prompt_encoding.py
+
+Compact, token-efficient encoding of courses for LLM prompts.
+
+Courses are rendered as one pipe-separated table row each instead of a
+multi-line block. Rows are precomputed once per catalog version and reused
+across requests; a token counter reports the size of each prompt.
+
+The tiktoken encoding is loaded by warmup (load_encoder), never on a request
+path: tiktoken downloads it on first use unless it is in TIKTOKEN_CACHE_DIR
+(the Docker image pre-fetches it there), and that download has no timeout.
+"""
+
+import threading
+from collections.abc import Mapping
+from typing import Dict, List, Optional
+
+from .course_ranking import estimate_tokens
+
+try:  # Exact token counts when tiktoken is installed, estimate otherwise
+    import tiktoken  # pyright: ignore[reportMissingImports]
+except ImportError:
+    tiktoken = None
+
+TOKEN_ENCODING = "cl100k_base"
+
+COURSE_TABLE_HEADER = "code|title|credits|difficulty|prereqs|offered|about"
+
+# Max characters of description kept per course row
+DESCRIPTION_CHARS = 90
+
+SEMESTER_ABBREVIATIONS = {
+    "Fall": "Fa",
+    "Spring": "Sp",
+    "Summer": "Su",
+    "Occasionally": "Occ",
+}
+
+_row_cache: Dict[str, str] = {}
+_row_cache_version: Optional[str] = None
+_row_cache_lock = threading.Lock()
+# tiktoken encoding; False if unavailable
+_encoder = None
+_encoder_lock = threading.Lock()
+_encoder_loader: Optional[threading.Thread] = None
+
+
+def _format_prerequisites(prerequisites) -> str:
+    """Render prerequisites compactly: 'A+B' = all required, 'A/B' = any one."""
+    if not prerequisites:
+        return "-"
+    if isinstance(prerequisites, Mapping):
+        courses = prerequisites.get("courses", [])
+        joiner = "+" if str(prerequisites.get("logic", "or")).lower() == "and" else "/"
+        return joiner.join(courses) if courses else "-"
+    return "+".join(prerequisites)
+
+
+def _shorten(text: str, limit: int = DESCRIPTION_CHARS) -> str:
+    """Truncate text at a word boundary."""
+    text = " ".join(str(text).split())
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + "…"
+
+
+def encode_course_row(course: Dict) -> str:
+    """
+    Encode a course as a single compact table row (see COURSE_TABLE_HEADER).
+
+    Args:
+        course: Course dictionary
+
+    Returns:
+        Row like "CSCI-UA.0102|Data Structures|4|3|CSCI-UA.0101|Fa,Sp|Use and design..."
+    """
+    title = course.get("title", course.get("name", "Unknown Title"))
+    offered = ",".join(
+        SEMESTER_ABBREVIATIONS.get(semester, semester)
+        for semester in course.get("semester_offered", []) or []
+    )
+    return "|".join(
+        [
+            course.get("course_code", "Unknown"),
+            str(title).replace("|", "/"),
+            str(course.get("credits", 0)),
+            str(course.get("difficulty", 0)),
+            _format_prerequisites(course.get("prerequisites", [])),
+            offered or "?",
+            _shorten(course.get("description", "")).replace("|", "/"),
+        ]
+    )
+
+
+def get_course_rows(
+    courses: List[Dict], catalog_version: Optional[str] = None
+) -> List[str]:
+    """
+    Get compact rows for courses, reusing rows precomputed for this catalog version.
+
+    The cache is reset whenever the catalog version changes, so each course row
+    is encoded once per published catalog rather than once per request.
+
+    Args:
+        courses: Course dictionaries to encode (e.g. the ranked candidates)
+        catalog_version: Published catalog version; rows are not cached if None
+
+    Returns:
+        List of rows in the same order as courses
+    """
+    global _row_cache_version  # pylint: disable=global-statement
+
+    if catalog_version is None:
+        return [encode_course_row(course) for course in courses]
+
+    rows = []
+    with _row_cache_lock:
+        if catalog_version != _row_cache_version:
+            _row_cache.clear()
+            _row_cache_version = catalog_version
+        for course in courses:
+            code = course.get("course_code", "")
+            row = _row_cache.get(code)
+            if row is None:
+                row = encode_course_row(course)
+                _row_cache[code] = row
+            rows.append(row)
+    return rows
+
+
+def load_encoder() -> bool:
+    """
+    Load the tiktoken encoding used by count_tokens (called by warmup).
+
+    Returns:
+        True if token counts are exact, False if they are estimated
+    """
+    global _encoder  # pylint: disable=global-statement
+
+    if tiktoken is None:
+        return False
+    with _encoder_lock:
+        if _encoder is None:
+            try:
+                _encoder = tiktoken.get_encoding(TOKEN_ENCODING)
+            except Exception as e:
+                # Encoding data unavailable (e.g. offline); don't retry
+                print(f"WARNING: Token counts are estimated: {type(e).__name__}: {e}")
+                _encoder = False
+    return _encoder is not False
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count prompt tokens (exact with tiktoken, ~4 chars/token estimate otherwise).
+
+    Until the encoding is loaded (see load_encoder) the count is estimated
+    and the encoding is loaded in a background thread.
+
+    Args:
+        text: Prompt text
+
+    Returns:
+        Number of tokens
+    """
+    global _encoder_loader  # pylint: disable=global-statement
+
+    encoder = _encoder
+    if encoder:
+        return len(encoder.encode(text))
+    if encoder is None and tiktoken is not None and _encoder_loader is None:
+        with _encoder_lock:
+            if _encoder_loader is None:
+                _encoder_loader = threading.Thread(
+                    target=load_encoder, name="tiktoken-load", daemon=True
+                )
+                _encoder_loader.start()
+    return estimate_tokens(text)
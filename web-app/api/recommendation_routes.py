@@ -11,13 +11,75 @@ from functools import wraps
 import jwt
 from flask import Blueprint, g, jsonify, request
 
-from . import course_filtering, llm_service, major_requirements
+from . import (
+    admission,
+    course_filtering,
+    llm_service,
+    llm_telemetry,
+    local_recommender,
+    major_requirements,
+    plan_recommender,
+    plan_templates,
+    recommendation_store,
+    student_snapshot,
+)
+from .plan_utils import SEMESTERS, excluded_course_codes, get_planned_course_codes
 from .user_model import db
 
 recommendations = Blueprint("recommendations", __name__)
 
 SECRET = os.getenv("JWT_SECRET", "defaultsecret")
 
+# "llm": OpenAI only; "local": deterministic in-process recommender only;
+# "auto": OpenAI, falling back to the local recommender if it fails or times out
+RECOMMENDATION_MODES = ("llm", "local", "auto")
+RECOMMENDATION_MODE = os.getenv("RECOMMENDATION_MODE", "auto").lower()
+
+# Accounts allowed to read the server-wide LLM stats and telemetry
+ADMIN_EMAILS = {
+    email.strip().lower()
+    for email in os.getenv("ADMIN_EMAILS", "").split(",")
+    if email.strip()
+}
+
+
+def authenticate(auth_header):
+    """
+    Verify a JWT Authorization header and fetch the student it belongs to.
+
+    Args:
+        auth_header: Authorization header value ("Bearer <token>") or None
+
+    Returns:
+        (user, None), or (None, (error body, 401)) if authentication failed
+    """
+    if not auth_header:
+        return None, ({"error": "Unauthorized: Missing token"}, 401)
+
+    # Check for Bearer token format
+    try:
+        token = auth_header.split(" ")[1]  # "Bearer <token>"
+    except IndexError:
+        return None, ({"error": "Unauthorized: Invalid token format"}, 401)
+
+    # Verify and decode token
+    try:
+        decoded = jwt.decode(token, SECRET, algorithms=["HS256"])
+        email = decoded.get("email")
+    except jwt.ExpiredSignatureError:
+        return None, ({"error": "Unauthorized: Token expired"}, 401)
+    except jwt.InvalidTokenError:
+        return None, ({"error": "Unauthorized: Invalid token"}, 401)
+
+    # Fetch user from database
+    if not email:
+        return None, ({"error": "Unauthorized: Invalid token payload"}, 401)
+
+    user = db.students.find_one({"email": email})
+    if not user:
+        return None, ({"error": "Unauthorized: User not found"}, 401)
+    return user, None
+
 
 def require_auth(f):
     """
@@ -31,42 +93,413 @@ def require_auth(f):
 
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        # Extract token from Authorization header
-        auth_header = request.headers.get("Authorization")
-        if not auth_header:
-            return jsonify({"error": "Unauthorized: Missing token"}), 401
+        user, error = authenticate(request.headers.get("Authorization"))
+        if error:
+            body, status = error
+            return jsonify(body), status
 
-        # Check for Bearer token format
-        try:
-            token = auth_header.split(" ")[1]  # "Bearer <token>"
-        except IndexError:
-            return jsonify({"error": "Unauthorized: Invalid token format"}), 401
+        # Attach user to Flask's g object
+        g.user = user
 
-        # Verify and decode token
-        try:
-            decoded = jwt.decode(token, SECRET, algorithms=["HS256"])
-            email = decoded.get("email")
-        except jwt.ExpiredSignatureError:
-            return jsonify({"error": "Unauthorized: Token expired"}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({"error": "Unauthorized: Invalid token"}), 401
+        return f(*args, **kwargs)
 
-        # Fetch user from database
-        if not email:
-            return jsonify({"error": "Unauthorized: Invalid token payload"}), 401
+    return decorated_function
 
-        user = db.students.find_one({"email": email})
-        if not user:
-            return jsonify({"error": "Unauthorized: User not found"}), 401
 
-        # Attach user to Flask's g object
-        g.user = user
+def require_admin(f):
+    """
+    Decorator to restrict a route to admins (ADMIN_EMAILS).
+
+    Must be applied after require_auth (uses the user on Flask's g object).
+
+    Returns 403 if the user is not an admin.
+    """
 
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if str(g.user.get("email", "")).lower() not in ADMIN_EMAILS:
+            return jsonify({"error": "Forbidden: Admin access required"}), 403
         return f(*args, **kwargs)
 
     return decorated_function
 
 
+def _get_recommendation_mode(data):
+    """
+    Get the recommendation mode from the request body or RECOMMENDATION_MODE.
+
+    Args:
+        data: Request JSON body
+
+    Returns:
+        "llm", "local" or "auto", or None if the requested mode is invalid
+    """
+    mode = str(data.get("mode") or RECOMMENDATION_MODE).lower()
+    return mode if mode in RECOMMENDATION_MODES else None
+
+
+def llm_unavailable_error():
+    """Build the 503 error (body, status) returned when the LLM could not generate recommendations."""
+    # External LLM failed — return 503 Service Unavailable with guidance
+    if not os.getenv("OPENAI_API_KEY"):
+        error_msg = (
+            "Service unavailable: OPENAI_API_KEY is not configured. "
+            "Set OPENAI_API_KEY in your environment or .env file."
+        )
+    else:
+        error_msg = (
+            "Service unavailable: failed to generate recommendations. "
+            "Check server logs for details."
+        )
+
+    print(f"ERROR: {error_msg}")
+    return {"error": error_msg}, 503
+
+
+def _llm_unavailable_response():
+    """Build the 503 response returned when the LLM could not generate recommendations."""
+    body, status = llm_unavailable_error()
+    return jsonify(body), status
+
+
+def admission_rejected_error(error):
+    """Build the 429/503 error (body, status, headers) for a rejected LLM request."""
+    print(f"WARNING: LLM request rejected ({error.status}): {error}")
+    return (
+        {"error": str(error), "retry_after": error.retry_after},
+        error.status,
+        {"Retry-After": str(error.retry_after)},
+    )
+
+
+def _admission_rejected_response(error):
+    """Build the 429/503 response (with Retry-After) for a rejected LLM request."""
+    body, status, headers = admission_rejected_error(error)
+    response = jsonify(body)
+    response.headers.update(headers)
+    return response, status
+
+
+def prepare_semester_request(user, data):
+    """
+    Validate a /generate request and compute everything but the recommendations.
+
+    Shared by the Flask view and the ASGI handler (api/asgi.py).
+
+    Args:
+        user: Authenticated student document
+        data: Request JSON body
+
+    Returns:
+        (context, None), or (None, (error body, status)) if the request is
+        invalid or no courses are available. The context has semester, mode,
+        career_path, side_interests, major, all_excluded_courses, all_courses,
+        available_courses, major_reqs, major_progress, remaining_reqs,
+        student_info and semester_info.
+    """
+    if not data:
+        return None, ({"error": "Missing request body"}, 400)
+
+    semester = data.get("semester")
+    if not semester:
+        return None, ({"error": "Missing required field: semester"}, 400)
+
+    mode = _get_recommendation_mode(data)
+    if mode is None:
+        return None, ({"error": f"mode must be one of: {RECOMMENDATION_MODES}"}, 400)
+
+    career_path = data.get("career_path", "")
+    side_interests = data.get("side_interests", [])
+    if not isinstance(side_interests, list):
+        side_interests = []
+
+    # Get user data
+    completed_courses = user.get("completed_courses", [])
+    planned_semesters = user.get("planned_semesters", [])
+    major = user.get("major", "")
+    year = user.get("year", "")
+    interests = user.get("interests", [])
+    name = user.get("name", "Student")
+
+    # Exclude courses already planned in ANY semester (including previous semesters)
+    # This prevents recommending courses that were already planned/taken in past semesters
+    all_planned_courses = get_planned_course_codes(planned_semesters)
+
+    # Combine completed and ALL planned courses (from all semesters) for filtering
+    all_excluded_courses = list(set(completed_courses + all_planned_courses))
+
+    print(
+        f"DEBUG: Excluding {len(completed_courses)} completed courses and {len(all_planned_courses)} planned courses (from all semesters) for {semester}"
+    )
+
+    # Get all courses from database
+    all_courses = course_filtering.get_all_courses_from_db()
+
+    # Eligibility and progress materialized for the student's current state
+    snapshot = student_snapshot.get_student_snapshot(user, db, all_courses)
+    available_courses = (
+        student_snapshot.get_available_courses(snapshot, semester, all_courses)
+        if snapshot
+        else None
+    )
+    if available_courses is None:
+        # Get available courses for the semester (exclude both completed and planned)
+        available_courses = course_filtering.get_available_courses_for_semester(
+            completed_courses=all_excluded_courses,
+            target_semester=semester,
+            all_courses=all_courses,
+            major_name=major if major else None,
+        )
+
+    if not available_courses:
+        # Provide more helpful error message
+        total_courses = len(all_courses)
+        # Safely compute current semester's planned courses for the message
+        current_semester_planned = []
+        for plan in planned_semesters:
+            if plan.get("semester") == semester:
+                current_semester_planned = plan.get("courses", [])
+                break
+
+        error_msg = (
+            f"No available courses found for {semester}. "
+            f"Total courses in database: {total_courses}. "
+            f"Completed courses: {len(completed_courses)}, "
+            f"Planned courses for this semester: {len(current_semester_planned)}. "
+        )
+        if total_courses == 0:
+            error_msg += (
+                "Database appears to be empty. Please ensure the database is seeded."
+            )
+        else:
+            error_msg += (
+                "This may be because: (1) all available courses have prerequisites you haven't met, "
+                "(2) no courses are offered in this semester, (3) you've completed all available courses, "
+                "or (4) you've already planned all available courses for this semester."
+            )
+
+        print(f"WARNING: {error_msg}")
+        return None, ({"error": error_msg}, 404)
+
+    # Get major requirements and progress (if major is specified)
+    major_reqs = None
+    major_progress = None
+    remaining_reqs = None
+
+    if major and snapshot:
+        major_reqs = major_requirements.get_major_requirements(major)
+        major_progress = snapshot["major_progress"]
+        remaining_reqs = snapshot["remaining_requirements"]
+    elif major:
+        # One audit pass for both progress and remaining requirements
+        audit = major_requirements.audit_degree(
+            major, all_excluded_courses, all_courses
+        )
+        major_reqs = audit.major_requirements
+        major_progress = audit.progress()
+        remaining_reqs = audit.remaining()
+
+    # Build student info
+    student_info = {
+        "name": name,
+        "major": major,
+        "year": year,
+        "completed_courses": all_excluded_courses,  # Include both completed and planned
+        "interests": interests,
+        "career_path": career_path,
+        "side_interests": side_interests,
+    }
+
+    # Build semester info
+    semester_info = {
+        "semester": semester,
+        "target_credits_min": 16,
+        "target_credits_max": 24,
+    }
+
+    context = {
+        "semester": semester,
+        "mode": mode,
+        "career_path": career_path,
+        "side_interests": side_interests,
+        "major": major,
+        "all_excluded_courses": all_excluded_courses,
+        "all_courses": all_courses,
+        "available_courses": available_courses,
+        "major_reqs": major_reqs,
+        "major_progress": major_progress,
+        "remaining_reqs": remaining_reqs,
+        "student_info": student_info,
+        "semester_info": semester_info,
+    }
+    return context, None
+
+
+def llm_recommendation_args(context):
+    """Keyword arguments of llm_service.generate_course_recommendations(_async)."""
+    return {
+        "student_info": context["student_info"],
+        "available_courses": context["available_courses"],
+        "major_requirements": context["major_reqs"],
+        "major_progress": context["major_progress"],
+        "remaining_requirements": context["remaining_reqs"],
+        "semester_info": context["semester_info"],
+        "catalog_version": course_filtering.get_catalog_version(context["all_courses"]),
+        "all_courses": context["all_courses"],
+    }
+
+
+def local_recommendations(context):
+    """Generate recommendations for a prepared request with the local recommender."""
+    return local_recommender.generate_course_recommendations(
+        student_info=context["student_info"],
+        available_courses=context["available_courses"],
+        remaining_requirements=context["remaining_reqs"],
+        semester_info=context["semester_info"],
+    )
+
+
+def recommendation_fingerprint(user, semester):
+    """
+    Fingerprint of the student state a semester's recommendations depend on.
+
+    The semester's own planned courses are left out, so saving the
+    recommended courses into it does not make the saved set stale.
+
+    Args:
+        user: Student document
+        semester: Semester the recommendations are for
+
+    Returns:
+        recommendation_store.compute_input_fingerprint() of the completed
+        courses, the courses planned in other semesters and the major
+    """
+    other_semesters = [
+        plan
+        for plan in user.get("planned_semesters", [])
+        if plan.get("semester") != semester
+    ]
+    return recommendation_store.compute_input_fingerprint(
+        user.get("completed_courses", []) + get_planned_course_codes(other_semesters),
+        user.get("major", ""),
+    )
+
+
+def saved_recommendation_args(user, context, courses, source):
+    """Keyword arguments of recommendation_store.save_recommendations(_async)."""
+    return {
+        "user_email": user.get("email"),
+        "semester": context["semester"],
+        "courses": courses,
+        "source": source,
+        "fingerprint": recommendation_fingerprint(user, context["semester"]),
+        "career_path": context["career_path"],
+        "side_interests": context["side_interests"],
+    }
+
+
+def prepare_plan_request(user, data):
+    """
+    Validate a /generate-plan request and build the student info.
+
+    Shared by the Flask view and the ASGI handler (api/asgi.py).
+
+    Args:
+        user: Authenticated student document
+        data: Request JSON body
+
+    Returns:
+        (context, None), or (None, (error body, status)) if the request is
+        invalid. The context has mode, strategy, major, semesters,
+        all_excluded_courses, all_courses and student_info.
+    """
+    if not data:
+        return None, ({"error": "Missing request body"}, 400)
+
+    career_path = data.get("career_path", "")
+    side_interests = data.get("side_interests", [])
+    if not isinstance(side_interests, list):
+        side_interests = []
+
+    mode = _get_recommendation_mode(data)
+    if mode is None:
+        return None, ({"error": f"mode must be one of: {RECOMMENDATION_MODES}"}, 400)
+
+    completed_courses = user.get("completed_courses", [])
+    planned_semesters = user.get("planned_semesters", [])
+    major = user.get("major", "")
+
+    semesters = data.get("semesters")
+    if semesters is None:
+        semesters_with_courses = {
+            plan.get("semester") for plan in planned_semesters if plan.get("courses")
+        }
+        semesters = [s for s in SEMESTERS if s not in semesters_with_courses]
+    elif not isinstance(semesters, list) or any(s not in SEMESTERS for s in semesters):
+        return None, ({"error": f"semesters must be a list of: {SEMESTERS}"}, 400)
+    else:
+        # Always plan in chronological order
+        semesters = [s for s in SEMESTERS if s in semesters]
+
+    if not semesters:
+        return None, ({"error": "No remaining semesters to plan"}, 400)
+
+    all_planned_courses = get_planned_course_codes(planned_semesters)
+    all_excluded_courses = list(set(completed_courses + all_planned_courses))
+
+    all_courses = course_filtering.get_all_courses_from_db()
+    if not all_courses:
+        return None, (
+            {
+                "error": "Database appears to be empty. Please ensure the database is seeded."
+            },
+            404,
+        )
+
+    student_info = {
+        "name": user.get("name", "Student"),
+        "major": major,
+        "year": user.get("year", ""),
+        "completed_courses": all_excluded_courses,
+        "interests": user.get("interests", []),
+        "career_path": career_path,
+        "side_interests": side_interests,
+    }
+
+    context = {
+        "mode": mode,
+        "strategy": data.get("strategy"),
+        "major": major,
+        "semesters": semesters,
+        "all_excluded_courses": all_excluded_courses,
+        "all_courses": all_courses,
+        "student_info": student_info,
+    }
+    return context, None
+
+
+def plan_args(context):
+    """Keyword arguments of plan_recommender.generate_local_plan for a prepared request."""
+    return {
+        "student_info": context["student_info"],
+        "completed_courses": context["all_excluded_courses"],
+        "semesters": context["semesters"],
+        "all_courses": context["all_courses"],
+        "major": context["major"] or None,
+    }
+
+
+def plan_body(source, plan, semesters):
+    """Build the /generate-plan response body (semesters in chronological order)."""
+    return {
+        "source": source,
+        "semesters": [
+            {"semester": semester, "courses": plan.get(semester, [])}
+            for semester in semesters
+        ],
+    }
+
+
 @recommendations.route("/generate", methods=["POST"])
 @require_auth
 def generate_recommendations():
@@ -78,10 +511,15 @@ def generate_recommendations():
     {
         "semester": "Freshman Fall",
         "career_path": "Software Engineering",
-        "side_interests": ["Philosophy", "Music"]
+        "side_interests": ["Philosophy", "Music"],
+        "mode": "auto"                  # optional: "llm", "local" or "auto"
     }
 
-    Returns:
+    LLM requests go through admission control. In "llm" mode a request over the
+    user's quota gets 429 and a request shed under load gets 503, both with a
+    Retry-After header; in "auto" mode the local recommender is used instead.
+
+    Returns ("source" is "llm" or "local"):
     {
         "courses": [
             {
@@ -91,164 +529,315 @@ def generate_recommendations():
                 "reasoning": "..."
             },
             ...
-        ]
+        ],
+        "source": "llm"
     }
     """
     try:
         # Get authenticated user
         user = g.user
 
-        # Get request data
-        data = request.json
-        if not data:
-            return jsonify({"error": "Missing request body"}), 400
-
-        semester = data.get("semester")
-        if not semester:
-            return jsonify({"error": "Missing required field: semester"}), 400
-
-        career_path = data.get("career_path", "")
-        side_interests = data.get("side_interests", [])
-        if not isinstance(side_interests, list):
-            side_interests = []
-
-        # Get user data
-        completed_courses = user.get("completed_courses", [])
-        planned_semesters = user.get("planned_semesters", [])
-        major = user.get("major", "")
-        year = user.get("year", "")
-        interests = user.get("interests", [])
-        name = user.get("name", "Student")
-
-        # Exclude courses already planned in ANY semester (including previous semesters)
-        # This prevents recommending courses that were already planned/taken in past semesters
-        all_planned_courses = []
-        for plan in planned_semesters:
-            planned_courses = plan.get("courses", [])
-            # Extract course codes from planned courses
-            for course in planned_courses:
-                if isinstance(course, dict):
-                    course_code = course.get("course_code", "")
-                    if course_code:
-                        all_planned_courses.append(course_code)
-                elif isinstance(course, str):
-                    # Parse course code from string like "CSCI-UA.0101 Intro to CS (4 credits)"
-                    parts = course.split()
-                    if parts:
-                        all_planned_courses.append(parts[0])
-
-        # Combine completed and ALL planned courses (from all semesters) for filtering
-        all_excluded_courses = list(set(completed_courses + all_planned_courses))
-
-        print(
-            f"DEBUG: Excluding {len(completed_courses)} completed courses and {len(all_planned_courses)} planned courses (from all semesters) for {semester}"
-        )
-
-        # Get all courses from database
-        all_courses = course_filtering.get_all_courses_from_db()
+        context, error = prepare_semester_request(user, request.json)
+        if error:
+            body, status = error
+            return jsonify(body), status
+        mode = context["mode"]
+
+        recommended_courses = None
+        source = "local"
+
+        if mode != "local":
+            # Generate recommendations using LLM (subject to admission control)
+            try:
+                with admission.admit(user.get("email")):
+                    recommended_courses = llm_service.generate_course_recommendations(
+                        **llm_recommendation_args(context)
+                    )
+            except admission.AdmissionRejected as e:
+                if mode == "llm":
+                    return _admission_rejected_response(e)
+                print(f"WARNING: {e}")
+            source = "llm"
+
+            if not recommended_courses:
+                if mode == "llm":
+                    return _llm_unavailable_response()
+                print(
+                    "WARNING: LLM recommendations unavailable, using local recommender"
+                )
 
-        # Get available courses for the semester (exclude both completed and planned)
-        available_courses = course_filtering.get_available_courses_for_semester(
-            completed_courses=all_excluded_courses,
-            target_semester=semester,
-            all_courses=all_courses,
-            major_name=major if major else None,
-        )
+        if not recommended_courses:
+            recommended_courses = local_recommendations(context)
+            source = "local"
 
-        if not available_courses:
-            # Provide more helpful error message
-            total_courses = len(all_courses)
-            # Safely compute current semester's planned courses for the message
-            current_semester_planned = []
-            for plan in planned_semesters:
-                if plan.get("semester") == semester:
-                    current_semester_planned = plan.get("courses", [])
-                    break
-
-            error_msg = (
-                f"No available courses found for {semester}. "
-                f"Total courses in database: {total_courses}. "
-                f"Completed courses: {len(completed_courses)}, "
-                f"Planned courses for this semester: {len(current_semester_planned)}. "
+        # Keep the set so revisiting the semester doesn't need another call;
+        # failing to store it must not lose the recommendations
+        try:
+            recommendation_store.save_recommendations(
+                **saved_recommendation_args(user, context, recommended_courses, source),
+                db=db,
             )
-            if total_courses == 0:
-                error_msg += "Database appears to be empty. Please ensure the database is seeded."
-            else:
-                error_msg += (
-                    "This may be because: (1) all available courses have prerequisites you haven't met, "
-                    "(2) no courses are offered in this semester, (3) you've completed all available courses, "
-                    "or (4) you've already planned all available courses for this semester."
-                )
+        except Exception as e:
+            print(f"ERROR: Failed to save recommendations: {e}")
 
-            print(f"WARNING: {error_msg}")
-            return jsonify({"error": error_msg}), 404
+        return jsonify({"courses": recommended_courses, "source": source}), 200
 
-        # Get major requirements and progress (if major is specified)
-        major_reqs = None
-        major_progress = None
-        remaining_reqs = None
+    except Exception as e:
+        # Catch any unexpected errors and return JSON instead of HTML
+        print(f"ERROR in generate_recommendations: {e}")
+        import traceback
 
-        if major:
-            major_reqs = major_requirements.get_major_requirements(major)
-            major_progress = major_requirements.get_major_progress(
-                major, all_excluded_courses, all_courses
-            )
-            remaining_reqs = major_requirements.get_remaining_requirements(
-                major, all_excluded_courses, all_courses
-            )
+        traceback.print_exc()
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
-        # Build student info
-        student_info = {
-            "name": name,
-            "major": major,
-            "year": year,
-            "completed_courses": all_excluded_courses,  # Include both completed and planned
-            "interests": interests,
-            "career_path": career_path,
-            "side_interests": side_interests,
-        }
 
-        # Build semester info
-        semester_info = {
-            "semester": semester,
-            "target_credits_min": 16,
-            "target_credits_max": 24,
-        }
+@recommendations.route("/last", methods=["GET"])
+@require_auth
+def last_recommendations():
+    """
+    Get the last recommendations generated for a semester.
+
+    Requires JWT authentication.
+    Query parameters:
+        semester: Semester name (e.g. "Freshman Fall")
+
+    Returns 404 if none have been generated for the semester.
+    Returns ("stale" is true if the completed courses, the courses planned in
+    other semesters or the major changed since):
+    {
+        "semester": "Freshman Fall",
+        "courses": [...],
+        "source": "llm",
+        "career_path": "Software Engineering",
+        "side_interests": ["Music"],
+        "generated_at": "2025-01-01T12:00:00+00:00",
+        "stale": false
+    }
+    """
+    user = g.user
+    semester = request.args.get("semester")
+    if not semester:
+        return jsonify({"error": "Missing required parameter: semester"}), 400
+
+    record = recommendation_store.get_last_recommendations(
+        user_email=user.get("email"),
+        semester=semester,
+        fingerprint=recommendation_fingerprint(user, semester),
+        db=db,
+    )
+    if record is None:
+        return jsonify({"error": f"No recommendations saved for {semester}"}), 404
 
-        # Generate recommendations using LLM
-        recommended_courses = llm_service.generate_course_recommendations(
-            student_info=student_info,
-            available_courses=available_courses,
-            major_requirements=major_reqs,
-            major_progress=major_progress,
-            remaining_requirements=remaining_reqs,
-            semester_info=semester_info,
+    return jsonify(record), 200
+
+
+@recommendations.route("/templates", methods=["GET"])
+@require_auth
+def plan_template():
+    """
+    Get the precomputed canonical plan for the student's major and a career path.
+
+    Served from the canonical_plans collection (see database/precompute_plans.py)
+    without any LLM call. Courses the student already completed or planned are
+    left out. If "divergent" is true, the student's history differs too much
+    from the template's assumptions and /generate-plan should be used instead.
+
+    Requires JWT authentication.
+    Query parameters:
+        career_path: Career path (optional)
+        start: First semester to plan (default: first semester without planned courses)
+
+    Returns 404 if no template exists for the combination.
+    Returns:
+    {
+        "career_path": "Software Engineering",
+        "start_semester": "Sophomore Fall",
+        "semesters": [{"semester": "Sophomore Fall", "courses": [...]}, ...],
+        "source": "local",
+        "catalog_version": "...",
+        "generated_at": "...",
+        "divergence": 1,
+        "divergent": false
+    }
+    """
+    user = g.user
+    planned_semesters = user.get("planned_semesters", [])
+
+    start = request.args.get("start")
+    if start is None:
+        semesters_with_courses = {
+            plan.get("semester") for plan in planned_semesters if plan.get("courses")
+        }
+        start = next((s for s in SEMESTERS if s not in semesters_with_courses), None)
+        if start is None:
+            return jsonify({"error": "Every semester already has planned courses"}), 404
+    elif start not in SEMESTERS:
+        return jsonify({"error": f"start must be one of: {SEMESTERS}"}), 400
+
+    template = plan_templates.find_template(
+        major=user.get("major", ""),
+        career_path=request.args.get("career_path", ""),
+        start_semester=start,
+        excluded_courses=excluded_course_codes(user),
+        db=db,
+    )
+    if template is None:
+        return (
+            jsonify({"error": "No precomputed plan for this major and career path"}),
+            404,
         )
 
-        if not recommended_courses:
-            # External LLM failed — return 503 Service Unavailable with guidance
-            if not os.getenv("OPENAI_API_KEY"):
-                error_msg = (
-                    "Service unavailable: OPENAI_API_KEY is not configured. "
-                    "Set OPENAI_API_KEY in your environment or .env file."
-                )
-                status_code = 503
-            else:
-                error_msg = (
-                    "Service unavailable: failed to generate recommendations. "
-                    "Check server logs for details."
-                )
-                status_code = 503
+    return jsonify(template), 200
+
+
+@recommendations.route("/generate-plan", methods=["POST"])
+@require_auth
+def generate_plan_recommendations():
+    """
+    Generate course recommendations for all remaining semesters in one request.
+
+    Eligibility is projected semester by semester (courses recommended for an
+    earlier semester satisfy prerequisites for later ones) and the courses are
+    chosen with a single LLM call or by the local recommender. Nothing is saved; the client saves the
+    semesters it accepts via /api/plans/save.
+
+    Requires JWT authentication.
+    Request body:
+    {
+        "career_path": "Software Engineering",
+        "side_interests": ["Philosophy", "Music"],
+        "semesters": ["Sophomore Fall", "Sophomore Spring"],   # optional
+        "strategy": "single",                                 # optional: "single" or "fanout"
+        "mode": "auto"                                        # optional: "llm", "local" or "auto"
+    }
+
+    If "semesters" is omitted, every semester without planned courses is generated.
 
-            print(f"ERROR: {error_msg}")
-            return jsonify({"error": error_msg}), status_code
+    LLM requests go through admission control. In "llm" mode a request over the
+    user's quota gets 429 and a request shed under load gets 503, both with a
+    Retry-After header; in "auto" mode the local recommender is used instead.
+
+    Returns (semesters in chronological order; "source" is "llm" or "local"):
+    {
+        "source": "llm",
+        "semesters": [
+            {
+                "semester": "Sophomore Fall",
+                "courses": [
+                    {"course_code": "...", "title": "...", "credits": 4, "reasoning": "..."},
+                    ...
+                ]
+            },
+            ...
+        ]
+    }
+    """
+    try:
+        user = g.user
 
-        return jsonify({"courses": recommended_courses}), 200
+        context, error = prepare_plan_request(user, request.json)
+        if error:
+            body, status = error
+            return jsonify(body), status
+        mode = context["mode"]
+
+        plan = None
+        source = "local"
+
+        if mode != "local":
+            # One admission slot covers all of the plan's LLM calls
+            try:
+                with admission.admit(user.get("email")):
+                    plan = plan_recommender.generate_plan(
+                        **plan_args(context), strategy=context["strategy"]
+                    )
+            except admission.AdmissionRejected as e:
+                if mode == "llm":
+                    return _admission_rejected_response(e)
+                print(f"WARNING: {e}")
+            source = "llm"
+
+            if plan is None:
+                if mode == "llm":
+                    return _llm_unavailable_response()
+                print("WARNING: LLM plan unavailable, using local recommender")
+
+        if plan is None:
+            plan = plan_recommender.generate_local_plan(**plan_args(context))
+            source = "local"
+
+        return jsonify(plan_body(source, plan, context["semesters"])), 200
 
     except Exception as e:
-        # Catch any unexpected errors and return JSON instead of HTML
-        print(f"ERROR in generate_recommendations: {e}")
+        print(f"ERROR in generate_plan_recommendations: {e}")
         import traceback
 
         traceback.print_exc()
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+@recommendations.route("/stats", methods=["GET"])
+@require_auth
+@require_admin
+def recommendation_stats():
+    """
+    Get LLM token usage, latency, hedging, admission and telemetry metrics for this server process.
+
+    Requires JWT authentication as an admin (ADMIN_EMAILS).
+
+    Returns:
+    {
+        "calls": 12,
+        "prompt_tokens": 48000,
+        "cached_tokens": 36864,
+        "completion_tokens": 3600,
+        "invalid_courses": 2,
+        "repair_calls": 1,
+        "cache_hit_ratio": 0.768,
+        "latency_seconds": {"p50": 4.1, "p95": 9.8, "p99": 14.2},
+        "hedging": {"enabled": true, "hedged_requests": 1, "hedge_wins": 1, ...},
+        "admission": {"active": 2, "queue_depth": 0, "shed": 0, "rate_limited": 1, ...},
+        "telemetry": {"recorded": 14, "written": 14, "dropped": 0, "calls": [...], ...}
+    }
+    """
+    stats = llm_service.get_usage_stats()
+    stats["admission"] = admission.get_admission_stats()
+    stats["telemetry"] = llm_telemetry.get_telemetry_stats()
+    return jsonify(stats), 200
+
+
+@recommendations.route("/telemetry", methods=["GET"])
+@require_auth
+@require_admin
+def recommendation_telemetry():
+    """
+    Summarize stored LLM call telemetry across all workers (mongo backend).
+
+    Requires JWT authentication as an admin (ADMIN_EMAILS).
+    Query parameters:
+        hours: Time window in hours (default 24)
+
+    Returns:
+    {
+        "hours": 24,
+        "summary": [
+            {"kind": "recommendations", "model": "gpt-4o-mini", "outcome": "ok",
+             "calls": 120, "prompt_tokens": 480000, "cached_tokens": 350000,
+             "completion_tokens": 36000, "courses_returned": 600,
+             "courses_valid": 590, "avg_latency_seconds": 3.2,
+             "max_latency_seconds": 11.8},
+            ...
+        ]
+    }
+    """
+    try:
+        hours = float(request.args.get("hours", 24))
+    except ValueError:
+        return jsonify({"error": "hours must be a number"}), 400
+
+    return (
+        jsonify(
+            {"hours": hours, "summary": llm_telemetry.summarize_stored_calls(db, hours)}
+        ),
+        200,
+    )
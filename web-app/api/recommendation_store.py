@@ -0,0 +1,98 @@
+"""
+recommendation_store.py
+
+Persistence of the last recommendation set per student and semester, so a
+revisit can show it again without another LLM call.
+
+Each record stores a fingerprint of the student state it was generated from
+(completed courses, courses planned in other semesters, major). It is
+reported as stale once that state changes.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+
+def compute_input_fingerprint(excluded_courses: List[str], major: str) -> str:
+    """
+    Fingerprint the student state a recommendation set depends on.
+
+    Args:
+        excluded_courses: Completed course codes and the codes planned in other
+                          semesters (any order)
+        major: Student's major
+
+    Returns:
+        Short hex digest, equal for equal inputs
+    """
+    payload = json.dumps(
+        {"courses": sorted(set(excluded_courses)), "major": major or ""},
+        sort_keys=True,
+    ).encode()
+    return hashlib.sha1(payload).hexdigest()[:16]
+
+
+def save_recommendations(
+    user_email: str,
+    semester: str,
+    courses: List[Dict],
+    source: str,
+    fingerprint: str,
+    career_path: str,
+    side_interests: List[str],
+    db,
+) -> None:
+    """
+    Store (replace) the last recommendation set for a student's semester.
+
+    Args:
+        user_email: User's email
+        semester: Semester the recommendations are for
+        courses: Recommended course dictionaries
+        source: "llm" or "local"
+        fingerprint: compute_input_fingerprint() of the inputs used
+        career_path: Career path the recommendations were generated for
+        side_interests: Side interests the recommendations were generated for
+        db: MongoDB database instance
+    """
+    db.recommendations.update_one(
+        {"email": user_email, "semester": semester},
+        {
+            "$set": {
+                "courses": courses,
+                "source": source,
+                "fingerprint": fingerprint,
+                "career_path": career_path,
+                "side_interests": side_interests,
+                "generated_at": datetime.now(timezone.utc).isoformat(),
+            }
+        },
+        upsert=True,
+    )
+
+
+def get_last_recommendations(
+    user_email: str, semester: str, fingerprint: str, db
+) -> Optional[Dict]:
+    """
+    Get the last recommendation set for a student's semester.
+
+    Args:
+        user_email: User's email
+        semester: Semester name
+        fingerprint: compute_input_fingerprint() of the student's current state
+        db: MongoDB database instance
+
+    Returns:
+        Stored record with a "stale" flag (True if the student's courses or
+        major changed since it was generated), or None if there is none
+    """
+    record = db.recommendations.find_one(
+        {"email": user_email, "semester": semester}, {"_id": 0, "email": 0}
+    )
+    if record is None:
+        return None
+    record["stale"] = record.pop("fingerprint", None) != fingerprint
+    return record
@@ -0,0 +1,185 @@
+"""
+student_snapshot.py
+
+Materialized degree progress and eligibility per student.
+
+The courses a student is eligible for in each semester type (Fall, Spring,
+Summer) and their degree audit only change when their completed courses,
+planned courses or major change, or when a new catalog is published. They
+are computed when the profile, completed courses or plans are written and
+stored in the student_snapshots collection, stamped with a fingerprint of
+the student state and with the catalog version. Recommendation requests and
+GET /api/user/progress read the snapshot; a missing or stale one is
+recomputed on read.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from . import course_filtering, major_requirements
+from .plan_utils import excluded_course_codes
+
+# "false" computes eligibility and progress on every recommendation request
+STUDENT_SNAPSHOTS = os.getenv("STUDENT_SNAPSHOTS", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# Semester types eligibility is materialized for
+SEMESTER_TYPES = ("Fall", "Spring", "Summer")
+
+
+def compute_snapshot_fingerprint(user: Dict) -> str:
+    """
+    Fingerprint the student state a snapshot depends on.
+
+    Args:
+        user: Student document
+
+    Returns:
+        Short hex digest of the completed and planned courses, the major and
+        the major's requirement definition
+    """
+    major = user.get("major", "") or ""
+    program = major_requirements.get_program(major) if major else None
+    payload = json.dumps(
+        {
+            "courses": sorted(excluded_course_codes(user)),
+            "major": major,
+            "requirements": program.fingerprint if program else None,
+        },
+        sort_keys=True,
+    ).encode()
+    return hashlib.sha1(payload).hexdigest()[:16]
+
+
+def build_snapshot(
+    user: Dict, all_courses: List[Dict], catalog_version: Optional[str] = None
+) -> Dict:
+    """
+    Compute a student's snapshot.
+
+    Args:
+        user: Student document
+        all_courses: List of all course dictionaries from database
+        catalog_version: Catalog version (computed if None)
+
+    Returns:
+        Snapshot document: email, major, fingerprint, catalog_version,
+        eligible (semester type -> {"catalog": [...], "math": [...]} course
+        codes), major_progress and remaining_requirements (None without a
+        major) and computed_at
+    """
+    excluded = excluded_course_codes(user)
+    major = user.get("major", "") or ""
+
+    eligible = {}
+    for semester_type in SEMESTER_TYPES:
+        available = course_filtering.get_available_courses_for_semester(
+            completed_courses=excluded,
+            target_semester=semester_type,
+            all_courses=all_courses,
+            major_name=major or None,
+        )
+        eligible[semester_type] = course_filtering.split_available_course_codes(
+            available
+        )
+
+    major_progress = None
+    remaining_requirements = None
+    if major:
+        audit = major_requirements.audit_degree(major, excluded, all_courses)
+        major_progress = audit.progress()
+        remaining_requirements = audit.remaining()
+
+    return {
+        "email": user.get("email"),
+        "major": major,
+        "fingerprint": compute_snapshot_fingerprint(user),
+        "catalog_version": catalog_version
+        or course_filtering.get_catalog_version(all_courses),
+        "eligible": eligible,
+        "major_progress": major_progress,
+        "remaining_requirements": remaining_requirements,
+        "computed_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def get_student_snapshot(
+    user: Dict, db, all_courses: Optional[List[Dict]] = None
+) -> Optional[Dict]:
+    """
+    Get a student's current snapshot, recomputing and storing it if it is
+    missing or stale (student state or catalog version changed).
+
+    Called after writes to the student (to materialize the snapshot) and by
+    readers. Errors are logged, not raised.
+
+    Args:
+        user: Current student document
+        db: MongoDB database instance
+        all_courses: List of all course dictionaries (fetched if None)
+
+    Returns:
+        Snapshot document (see build_snapshot), or None if snapshots are
+        disabled or it could not be computed
+    """
+    if not STUDENT_SNAPSHOTS:
+        return None
+
+    try:
+        if all_courses is None:
+            all_courses = course_filtering.get_all_courses_from_db()
+        if not all_courses:
+            return None
+        catalog_version = course_filtering.get_catalog_version(all_courses)
+        email = user.get("email")
+
+        snapshot = db.student_snapshots.find_one({"email": email}, {"_id": 0})
+        if (
+            snapshot is not None
+            and snapshot.get("catalog_version") == catalog_version
+            and snapshot.get("fingerprint") == compute_snapshot_fingerprint(user)
+        ):
+            return snapshot
+
+        print(f"DEBUG: Computing student snapshot for {email}")
+        snapshot = build_snapshot(user, all_courses, catalog_version)
+        db.student_snapshots.replace_one({"email": email}, dict(snapshot), upsert=True)
+        return snapshot
+    except Exception as e:
+        print(f"ERROR: Failed to get student snapshot: {e}")
+        return None
+
+
+def get_available_courses(
+    snapshot: Dict, target_semester: str, all_courses: List[Dict]
+) -> Optional[List[Dict]]:
+    """
+    Get the courses available in a semester from a snapshot.
+
+    Args:
+        snapshot: Current snapshot (from get_student_snapshot)
+        target_semester: Semester name like "Freshman Fall"
+        all_courses: List of all course dictionaries the snapshot was computed on
+
+    Returns:
+        Available courses, as get_available_courses_for_semester, or None if
+        the semester has no semester type in the snapshot
+    """
+    # Same parsing as the live availability filter
+    # pylint: disable=protected-access
+    semester_type = course_filtering._extract_semester_type(target_semester)
+    course_codes = snapshot.get("eligible", {}).get(semester_type)
+    if course_codes is None:
+        return None
+    return course_filtering.get_available_courses_from_codes(
+        course_codes,
+        target_semester,
+        all_courses,
+        major_name=snapshot.get("major") or None,
+        catalog_version=snapshot.get("catalog_version"),
+    )
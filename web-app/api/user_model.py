@@ -1,14 +1,15 @@
 import os
 
 import bcrypt
-from mongomock import DuplicateKeyError
 from pymongo import MongoClient
-
+from pymongo.errors import DuplicateKeyError
 
 MONGO_URI = os.getenv("MONGO_URI")
 DB_NAME = os.getenv("MONGO_DB_NAME")
 
-client = MongoClient(MONGO_URI)
+# connect=False: no server selection or monitor threads until the first query.
+# Shared by every module of the app (course_filtering, admission, stores).
+client = MongoClient(MONGO_URI, connect=False)
 db = client[DB_NAME]
 
 
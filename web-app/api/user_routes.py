@@ -11,6 +11,7 @@ from functools import wraps
 import jwt
 from flask import Blueprint, g, jsonify, request
 
+from . import student_snapshot
 from .user_model import db
 
 user_profile = Blueprint("user_profile", __name__)
@@ -56,6 +57,28 @@ def require_auth(f):
     return decorated_function
 
 
+def public_profile(user):
+    """
+    Build the profile returned to the client, without sensitive fields.
+
+    Args:
+        user: Student document
+
+    Returns:
+        Dictionary with name, email, netid, major, year, interests and
+        completed_courses
+    """
+    return {
+        "name": user.get("name", ""),
+        "email": user.get("email", ""),
+        "netid": user.get("netid", ""),
+        "major": user.get("major", ""),
+        "year": user.get("year", ""),
+        "interests": user.get("interests", []),
+        "completed_courses": user.get("completed_courses", []),
+    }
+
+
 @user_profile.route("/profile", methods=["GET"])
 @require_auth
 def get_profile():
@@ -75,20 +98,7 @@ def get_profile():
         "completed_courses": [...]
     }
     """
-    user = g.user
-
-    # Remove sensitive fields
-    profile = {
-        "name": user.get("name", ""),
-        "email": user.get("email", ""),
-        "netid": user.get("netid", ""),
-        "major": user.get("major", ""),
-        "year": user.get("year", ""),
-        "interests": user.get("interests", []),
-        "completed_courses": user.get("completed_courses", []),
-    }
-
-    return jsonify(profile), 200
+    return jsonify(public_profile(g.user)), 200
 
 
 @user_profile.route("/profile", methods=["PUT"])
@@ -142,6 +152,9 @@ def update_profile():
         # Fetch updated user
         updated_user = db.students.find_one({"email": user_email})
 
+        # Recompute degree progress and eligibility if the major changed
+        student_snapshot.get_student_snapshot(updated_user, db)
+
         # Build response profile
         profile = {
             "name": updated_user.get("name", ""),
@@ -199,6 +212,11 @@ def update_completed_courses():
             {"$set": {"completed_courses": completed_courses}},
         )
 
+        # Recompute degree progress and eligibility for the new courses
+        student_snapshot.get_student_snapshot(
+            dict(user, completed_courses=completed_courses), db
+        )
+
         return (
             jsonify(
                 {
@@ -211,3 +229,45 @@ def update_completed_courses():
     except Exception as e:
         print(f"Error updating completed courses: {e}")
         return jsonify({"error": "Failed to update completed courses"}), 500
+
+
+@user_profile.route("/progress", methods=["GET"])
+@require_auth
+def get_progress():
+    """
+    Get current user's degree progress and eligible courses.
+
+    Requires JWT authentication.
+    Served from the student's materialized snapshot (recomputed if stale).
+
+    Returns 503 if the course catalog is not available.
+    Returns (major_progress and remaining_requirements are null without a major):
+    {
+        "major": "Computer Science",
+        "major_progress": {...},
+        "remaining_requirements": {...},
+        "eligible": {"Fall": ["CSCI-UA.0101", ...], "Spring": [...], "Summer": [...]},
+        "catalog_version": "...",
+        "computed_at": "2025-01-01T12:00:00+00:00"
+    }
+    """
+    snapshot = student_snapshot.get_student_snapshot(g.user, db)
+    if snapshot is None:
+        return jsonify({"error": "Degree progress is not available"}), 503
+
+    return (
+        jsonify(
+            {
+                "major": snapshot["major"],
+                "major_progress": snapshot["major_progress"],
+                "remaining_requirements": snapshot["remaining_requirements"],
+                "eligible": {
+                    semester_type: codes["catalog"] + codes["math"]
+                    for semester_type, codes in snapshot["eligible"].items()
+                },
+                "catalog_version": snapshot["catalog_version"],
+                "computed_at": snapshot["computed_at"],
+            }
+        ),
+        200,
+    )
@@ -0,0 +1,116 @@
+"""
+warmup.py
+
+Warms the per-process caches before a server process takes traffic: the
+catalog index, the compact prompt rows and cached catalog prompt prefix, the
+tokenizer, the OpenAI clients and the compiled major and minor requirements.
+With CATALOG_SNAPSHOT on, loading the catalog also builds the memory-mapped
+catalog snapshot (api/catalog.py) if it is missing or stale.
+
+With the production server (gunicorn.conf.py) this runs once in the master
+process before workers are forked, so the warmed objects are shared
+copy-on-write. GET /readyz reports ready only once warmup has completed.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict
+
+from . import course_filtering, llm_service, major_requirements, prompt_encoding
+
+# Minimum seconds between background retries of a failed warmup
+WARMUP_RETRY_SECONDS = 10
+
+_lock = threading.Lock()
+_last_attempt = 0.0
+_status = {
+    "ready": False,
+    "started_at": None,
+    "finished_at": None,
+    "duration_seconds": None,
+    "courses": 0,
+    "catalog_version": None,
+    "error": None,
+}
+
+
+def warm_up() -> Dict:
+    """
+    Warm the caches and mark this process ready.
+
+    Safe to call more than once (later calls rewarm for the current catalog).
+    A failure is logged and leaves the process not ready.
+
+    Returns:
+        Warmup status (see get_warmup_status)
+    """
+    global _last_attempt  # pylint: disable=global-statement
+
+    with _lock:
+        start = time.perf_counter()
+        _last_attempt = time.monotonic()
+        _status["started_at"] = datetime.now(timezone.utc).isoformat()
+        try:
+            all_courses = course_filtering.get_all_courses_from_db()
+            if not all_courses:
+                raise RuntimeError("course catalog is empty")
+            catalog_version = course_filtering.get_catalog_version(all_courses)
+            course_filtering.get_catalog_index(all_courses, catalog_version)
+            # Before the prefix, whose token count is cached per catalog version
+            prompt_encoding.load_encoder()
+            llm_service.prime_prompt_prefix(all_courses, catalog_version)
+            llm_service.get_client()  # imports openai and creates the clients
+            # Loads and compiles the requirement registry, and looks up the
+            # catalog electives of every major and minor
+            for program in major_requirements.list_programs():
+                major_requirements.get_remaining_requirements(program, [], all_courses)
+        except Exception as e:
+            _status.update(ready=False, error=f"{type(e).__name__}: {e}")
+            print(f"ERROR: Warmup failed: {_status['error']}")
+        else:
+            _status.update(
+                ready=True,
+                error=None,
+                courses=len(all_courses),
+                catalog_version=catalog_version,
+            )
+        _status["finished_at"] = datetime.now(timezone.utc).isoformat()
+        _status["duration_seconds"] = round(time.perf_counter() - start, 3)
+        # Same format as the seeder's startup phase timings (database/seed.py)
+        print(
+            f"Startup phase warmup: {_status['duration_seconds']:.3f}s "
+            f"({'completed' if _status['ready'] else 'failed'})"
+        )
+        return dict(_status)
+
+
+def retry_in_background() -> None:
+    """
+    Start a warmup attempt in a background thread if this process is not ready.
+
+    Does nothing while an attempt is running or within WARMUP_RETRY_SECONDS
+    of the last one (e.g. MongoDB was not reachable yet at startup).
+    """
+    if _status["ready"] or time.monotonic() - _last_attempt < WARMUP_RETRY_SECONDS:
+        return
+    if _lock.locked():
+        return
+    threading.Thread(target=warm_up, name="warmup", daemon=True).start()
+
+
+def is_ready() -> bool:
+    """Return True once warmup has completed in this process."""
+    return _status["ready"]
+
+
+def get_warmup_status() -> Dict:
+    """
+    Get this process's warmup status.
+
+    Returns:
+        Dictionary with ready, started_at, finished_at, duration_seconds,
+        courses, catalog_version and error (None unless warmup failed)
+    """
+    # Not under _lock, so a readiness probe never waits for a running warmup
+    return dict(_status)
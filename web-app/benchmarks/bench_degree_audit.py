@@ -0,0 +1,174 @@
+"""
+bench_degree_audit.py
+
+Benchmark of the per-request degree audit: the separate get_major_requirements,
+get_major_progress and get_remaining_requirements calls the /generate route
+used to make, against one major_requirements.audit_degree pass.
+
+The catalog is the seed catalog plus synthetic courses (a share of them CS
+electives), served as a course list, a tuple of Course records (snapshot
+disabled) or a catalog snapshot.
+
+Usage (from web-app/):
+    python -m benchmarks.bench_degree_audit --courses 30000 --requests 500
+    python -m benchmarks.bench_degree_audit --catalog list --courses 5000
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+CATALOG_TYPES = ["list", "tuple", "snapshot"]
+SUBJECTS = ["CSCI-UA", "MATH-UA", "ECON-UA", "PHYS-UA", "DS-UA", "PHIL-UA"]
+
+
+def build_catalog(count: int, seed: int) -> List[Dict]:
+    """
+    Build a course catalog of the seed courses plus synthetic ones.
+
+    Args:
+        count: Total number of courses
+        seed: Random seed (the catalog is deterministic)
+
+    Returns:
+        List of course dictionaries with unique course codes
+    """
+    # pylint: disable=import-outside-toplevel
+    from database.app_db import load_courses
+
+    rng = random.Random(seed)
+    courses = load_courses()
+    codes = [course["course_code"] for course in courses]
+    seen = set(codes)
+    templates = list(courses)
+    while len(courses) < count:
+        code = f"{rng.choice(SUBJECTS)}.{rng.randrange(10000):04d}"
+        if code in seen:
+            continue
+        course = dict(rng.choice(templates), course_code=code)
+        course["prerequisites"] = rng.sample(codes, rng.randrange(3))
+        codes.append(code)
+        seen.add(code)
+        courses.append(course)
+    return courses
+
+
+def build_workload(courses: List[Dict], count: int, seed: int) -> List[List[str]]:
+    """Completed (and planned) course codes of count simulated students."""
+    rng = random.Random(seed)
+    codes = [course["course_code"] for course in courses]
+    cs_codes = [code for code in codes if code.startswith("CSCI-UA.")]
+    other_codes = [code for code in codes if not code.startswith("CSCI-UA.")]
+    return [
+        rng.sample(cs_codes, min(len(cs_codes), rng.randrange(12)))
+        + rng.sample(other_codes, min(len(other_codes), rng.randrange(20)))
+        for _ in range(count)
+    ]
+
+
+def _separate(major: str, completed: List[str], all_courses) -> tuple:
+    # pylint: disable=import-outside-toplevel
+    from api import major_requirements
+
+    return (
+        major_requirements.get_major_requirements(major),
+        major_requirements.get_major_progress(major, completed, all_courses),
+        major_requirements.get_remaining_requirements(major, completed, all_courses),
+    )
+
+
+def _audit(major: str, completed: List[str], all_courses) -> tuple:
+    # pylint: disable=import-outside-toplevel
+    from api import major_requirements
+
+    audit = major_requirements.audit_degree(major, completed, all_courses)
+    return audit.major_requirements, audit.progress(), audit.remaining()
+
+
+def _time_requests(function, workload: List[List[str]], all_courses) -> Dict:
+    latencies = []
+    for completed in workload:
+        start = time.perf_counter()
+        function("Computer Science", completed, all_courses)
+        latencies.append(time.perf_counter() - start)
+    return {
+        "mean_ms": round(statistics.mean(latencies) * 1000, 4),
+        "p50_ms": round(statistics.median(latencies) * 1000, 4),
+        "total_seconds": round(sum(latencies), 4),
+    }
+
+
+def run_benchmark(args) -> Dict:
+    """
+    Run the benchmark for each requested catalog type.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        Dictionary with per-request timings of both variants per catalog type
+    """
+    os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+    os.environ.setdefault("MONGO_DB_NAME", "benchmark")
+    # pylint: disable=import-outside-toplevel
+    from api import catalog
+    from api.course import Course
+
+    courses = build_catalog(args.courses, args.seed)
+    workload = build_workload(courses, args.requests, args.seed)
+    report = {"courses": len(courses), "requests": len(workload), "catalogs": {}}
+
+    for catalog_type in args.catalog or CATALOG_TYPES:
+        snapshot_path = None
+        if catalog_type == "list":
+            all_courses = courses
+        elif catalog_type == "tuple":
+            all_courses = tuple(Course.from_dict(course) for course in courses)
+        else:
+            snapshot_path = tempfile.mktemp(suffix=".snap")
+            catalog.write_snapshot(courses, "benchmark", 1, snapshot_path)
+            all_courses = catalog.CatalogSnapshot(snapshot_path)
+
+        # Same results; the first calls also build the per-catalog code index
+        assert _separate("Computer Science", workload[0], all_courses) == _audit(
+            "Computer Science", workload[0], all_courses
+        )
+        separate = _time_requests(_separate, workload, all_courses)
+        audit = _time_requests(_audit, workload, all_courses)
+        report["catalogs"][catalog_type] = {
+            "separate": separate,
+            "audit": audit,
+            "saving_percent": round(
+                (1 - audit["total_seconds"] / separate["total_seconds"]) * 100, 1
+            ),
+        }
+
+        if snapshot_path:
+            all_courses.close()
+            os.remove(snapshot_path)
+    return report
+
+
+def main():
+    """Parse arguments, run the benchmark and print the report."""
+    parser = argparse.ArgumentParser(description="Benchmark the degree audit")
+    parser.add_argument("--courses", type=int, default=30000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--catalog",
+        action="append",
+        choices=CATALOG_TYPES,
+        help="Catalog type to benchmark (repeatable; default: all)",
+    )
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+bench_recommendations.py
+
+Offline benchmark of the LLM recommendation path (prompt building, API call,
+validation) against the local fake OpenAI server or a replay server.
+
+Request arguments (eligible courses, requirements) are computed from the
+seed catalog before timing, so the numbers cover llm_service only.
+
+Usage (from web-app/):
+    python -m benchmarks.bench_recommendations --requests 200 --concurrency 16 \\
+        --latency lognormal:0.8,0.6 --error-rate 0.02 --hedge
+    python -m benchmarks.bench_recommendations --stream --tokens-per-second 80
+    python -m benchmarks.bench_recommendations --telemetry-file /tmp/llm_calls.jsonl
+    python -m benchmarks.bench_recommendations --async --concurrency 256 --latency fixed:1
+    python -m benchmarks.bench_recommendations --base-url http://localhost:8089/v1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from .fake_openai import start_server
+
+CAREER_PATHS = [
+    "Software Engineering",
+    "AI/ML",
+    "Systems",
+    "Data Science",
+    "Cybersecurity",
+    "Web Development",
+    "",
+]
+SIDE_INTERESTS = [[], [], ["Music"], ["Philosophy", "Economics"]]
+BENCH_SEMESTERS = ["Freshman Spring", "Sophomore Fall", "Junior Spring", "Senior Fall"]
+
+
+def _configure_environment(args, base_url: str) -> None:
+    """Set the environment llm_service reads at import time."""
+    os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+    os.environ.setdefault("MONGO_DB_NAME", "benchmark")
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "fake-key")
+    os.environ["OPENAI_STREAM"] = "true" if args.stream else "false"
+    os.environ["OPENAI_HEDGE"] = "true" if args.hedge else "false"
+    os.environ["OPENAI_TIMEOUT_SECONDS"] = str(args.timeout)
+    os.environ["MODEL_ROUTING"] = "false" if args.no_routing else "true"
+    if args.telemetry_file:
+        os.environ["LLM_TELEMETRY"] = "file"
+        os.environ["LLM_TELEMETRY_FILE"] = args.telemetry_file
+    else:
+        os.environ["LLM_TELEMETRY"] = "off"
+
+
+def build_workload(count: int, seed: int) -> List[Dict]:
+    """
+    Build recommendation requests from the seed catalog and students.
+
+    Args:
+        count: Number of requests
+        seed: Random seed (the workload is deterministic)
+
+    Returns:
+        List of generate_course_recommendations keyword arguments
+    """
+    # pylint: disable=import-outside-toplevel
+    from api import course_filtering, course_ranking, major_requirements
+    from database.app_db import load_courses, load_students
+
+    all_courses = load_courses()
+    students = load_students()
+    catalog_version = course_filtering.get_catalog_version(all_courses)
+    rng = random.Random(seed)
+
+    workload = []
+    for index in range(count):
+        student = students[index % len(students)]
+        semester = BENCH_SEMESTERS[index % len(BENCH_SEMESTERS)]
+        completed = list(student["completed_courses"])
+        major = student.get("major") or None
+
+        available = course_filtering.get_available_courses_for_semester(
+            completed, semester, all_courses, major
+        )
+        student_info = {
+            "name": student["name"],
+            "major": student.get("major", ""),
+            "year": student.get("year", ""),
+            "completed_courses": completed,
+            "interests": student.get("interests", []),
+            "career_path": rng.choice(CAREER_PATHS),
+            "side_interests": rng.choice(SIDE_INTERESTS),
+        }
+        remaining = (
+            major_requirements.get_remaining_requirements(major, completed, all_courses)
+            if major
+            else None
+        )
+        workload.append(
+            {
+                "student_info": student_info,
+                "available_courses": course_ranking.select_candidates(
+                    available, student_info, remaining
+                ),
+                "major_requirements": None,
+                "major_progress": (
+                    major_requirements.get_major_progress(major, completed, all_courses)
+                    if major
+                    else None
+                ),
+                "remaining_requirements": remaining,
+                "semester_info": {
+                    "semester": semester,
+                    "target_credits_min": 16,
+                    "target_credits_max": 24,
+                },
+                "catalog_version": catalog_version,
+                "all_courses": all_courses,
+            }
+        )
+    return workload
+
+
+def run_benchmark(args) -> Dict:
+    """
+    Run the benchmark and collect results.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        Dictionary with throughput, latency percentiles, failures, llm_service
+        usage stats and fake server stats
+    """
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server = start_server(
+            latency=args.latency,
+            tokens_per_second=args.tokens_per_second,
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+            invalid_rate=args.invalid_rate,
+            seed=args.seed,
+        )
+        base_url = server.base_url
+    _configure_environment(args, base_url)
+
+    # pylint: disable=import-outside-toplevel
+    from api import llm_service, llm_telemetry, metrics
+
+    workload = build_workload(args.requests, args.seed)
+
+    def timed(kwargs):
+        start = time.perf_counter()
+        courses = llm_service.generate_course_recommendations(**kwargs)
+        return time.perf_counter() - start, courses is not None
+
+    async def timed_async(kwargs, semaphore):
+        async with semaphore:
+            start = time.perf_counter()
+            courses = await llm_service.generate_course_recommendations_async(**kwargs)
+            return time.perf_counter() - start, courses is not None
+
+    async def run_async():
+        semaphore = asyncio.Semaphore(args.concurrency)
+        return await asyncio.gather(
+            *(timed_async(kwargs, semaphore) for kwargs in workload)
+        )
+
+    started = time.perf_counter()
+    if args.use_async:
+        # One event loop, the AsyncOpenAI client and no worker threads
+        results = asyncio.run(run_async())
+    else:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results = list(executor.map(timed, workload))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for latency, _ in results]
+    failures = sum(1 for _, ok in results if not ok)
+    report = {
+        "requests": len(results),
+        "concurrency": args.concurrency,
+        "client": "async" if args.use_async else "threads",
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(results) / elapsed, 2) if elapsed else None,
+        "failures": failures,
+        "latency_seconds": {
+            "p50": metrics.percentile(latencies, 50, 4),
+            "p95": metrics.percentile(latencies, 95, 4),
+            "p99": metrics.percentile(latencies, 99, 4),
+            "max": round(max(latencies), 4) if latencies else 0.0,
+        },
+        "llm_service": llm_service.get_usage_stats(),
+    }
+    if args.telemetry_file:
+        llm_telemetry.flush()
+        report["telemetry"] = llm_telemetry.get_telemetry_stats()
+    if server is not None:
+        with server.lock:
+            report["fake_server"] = dict(server.stats)
+        server.shutdown()
+        server.server_close()
+    return report
+
+
+def main():
+    """Parse arguments, run the benchmark and print the report."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark LLM recommendations offline"
+    )
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", default="lognormal:0.5,0.5")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--invalid-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--hedge", action="store_true")
+    parser.add_argument("--no-routing", action="store_true")
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Use the async client on one event loop instead of a thread pool",
+    )
+    parser.add_argument(
+        "--telemetry-file", help="Write per-call telemetry to this JSON Lines file"
+    )
+    parser.add_argument(
+        "--base-url", help="Use a running server (e.g. a replay server) instead"
+    )
+    args = parser.parse_args()
+
+    # Keep llm_service's per-request DEBUG logging out of the report
+    stdout = sys.stdout
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        sys.stdout = devnull
+        try:
+            report = run_benchmark(args)
+        finally:
+            sys.stdout = stdout
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,542 @@
+"""
+fake_openai.py
+
+Local OpenAI-compatible stand-in server for benchmarks and end-to-end tests.
+
+Serves POST /v1/chat/completions (JSON and SSE streaming) with configurable
+latency distributions and error injection. Responses are synthesized from the
+course codes listed in the prompt, so they pass the app's validation. It can
+also proxy to the real API and record the responses to disk, then replay them
+deterministically without network access.
+
+Usage (from web-app/):
+    python -m benchmarks.fake_openai --port 8089 --latency lognormal:0.8,0.5 --error-rate 0.02
+    python -m benchmarks.fake_openai --record fixtures/llm --upstream https://api.openai.com/v1
+    python -m benchmarks.fake_openai --replay fixtures/llm
+
+Point the app at it with OPENAI_BASE_URL=http://localhost:8089/v1 (any
+OPENAI_API_KEY works, except in record mode where it is forwarded upstream).
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+COURSE_CODE_RE = re.compile(r"\b[A-Z]{2,5}-[A-Z]{2}\.\d{4}(?:-\d{3})?\b")
+
+# Code returned for injected invalid recommendations
+HALLUCINATED_CODE = "CSCI-UA.9999"
+
+# Courses per synthesized semester
+COURSES_PER_SEMESTER = 4
+
+# Provider-style prompt caching: prefixes of at least this many tokens are
+# cached, in blocks of CACHE_BLOCK_TOKENS
+CACHE_MIN_TOKENS = 1024
+CACHE_BLOCK_TOKENS = 128
+
+# Characters per streamed chunk
+STREAM_CHUNK_CHARS = 16
+
+
+def parse_latency(spec: str):
+    """
+    Parse a latency distribution spec into a sampler.
+
+    Specs (seconds):
+        fixed:S                     always S
+        uniform:LO,HI               uniform between LO and HI
+        normal:MEAN,STDDEV          normal, clamped at 0
+        lognormal:MEDIAN,SIGMA      log-normal (heavy right tail)
+        bimodal:FAST,SLOW,P_SLOW    FAST, or SLOW with probability P_SLOW
+
+    Args:
+        spec: Distribution spec
+
+    Returns:
+        Function taking a random.Random and returning a latency in seconds
+
+    Raises:
+        ValueError: If the spec is not recognized
+    """
+    name, _, raw = spec.partition(":")
+    try:
+        params = [float(value) for value in raw.split(",")] if raw else []
+    except ValueError as e:
+        raise ValueError(f"Invalid latency spec: {spec}") from e
+
+    if name == "fixed" and len(params) == 1:
+        return lambda rng: params[0]
+    if name == "uniform" and len(params) == 2:
+        return lambda rng: rng.uniform(params[0], params[1])
+    if name == "normal" and len(params) == 2:
+        return lambda rng: max(0.0, rng.gauss(params[0], params[1]))
+    if name == "lognormal" and len(params) == 2 and params[0] > 0:
+        return lambda rng: rng.lognormvariate(math.log(params[0]), params[1])
+    if name == "bimodal" and len(params) == 3:
+        return lambda rng: params[1] if rng.random() < params[2] else params[0]
+    raise ValueError(f"Invalid latency spec: {spec}")
+
+
+def request_key(body: Dict) -> str:
+    """Recording key for a chat completion request (model + messages)."""
+    payload = json.dumps(
+        {"model": body.get("model"), "messages": body.get("messages")},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def _estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / 4) if text else 0
+
+
+def _available_codes(text: str) -> List[str]:
+    """Course codes listed after the first AVAILABLE COURSES header in text."""
+    index = text.find("AVAILABLE COURSES")
+    if index == -1:
+        return []
+    codes = []
+    for code in COURSE_CODE_RE.findall(text[index:]):
+        if code not in codes:
+            codes.append(code)
+    return codes
+
+
+def _course_item(code: str) -> Dict:
+    return {
+        "course_code": code,
+        "title": code,
+        "credits": 4,
+        "reasoning": "Synthesized by the local fake OpenAI server.",
+    }
+
+
+def synthesize_content(
+    messages: List[Dict], rng: random.Random, invalid_rate: float
+) -> str:
+    """
+    Build a plausible JSON answer for a recommendation prompt.
+
+    Picks the top-ranked available courses from the prompt. Whole-plan prompts
+    ("SEMESTER:" sections) get one course list per semester without repeats;
+    repair prompts get the requested number of replacements.
+
+    Args:
+        messages: Request messages
+        rng: Random source (for invalid item injection)
+        invalid_rate: Probability of replacing an item with a hallucinated code
+
+    Returns:
+        JSON string
+    """
+
+    def pick(codes: List[str], count: int, used: set) -> List[Dict]:
+        items = []
+        for code in codes:
+            if len(items) >= count:
+                break
+            if code in used:
+                continue
+            used.add(code)
+            items.append(
+                _course_item(HALLUCINATED_CODE if rng.random() < invalid_rate else code)
+            )
+        return items
+
+    user_messages = [m.get("content", "") for m in messages if m.get("role") == "user"]
+    last = user_messages[-1] if user_messages else ""
+
+    if "SEMESTER: " in last:
+        used: set = set()
+        semesters = {}
+        for block in last.split("SEMESTER: ")[1:]:
+            name = block.split(" (", 1)[0].strip()
+            semesters[name] = pick(_available_codes(block), COURSES_PER_SEMESTER, used)
+        return json.dumps({"semesters": semesters})
+
+    needed = re.search(r"Recommend (\d+) different course", last)
+    if needed and len(user_messages) > 1:
+        # Repair request: skip every code already mentioned in the conversation
+        used = set(COURSE_CODE_RE.findall(last))
+        for message in messages[:-1]:
+            if message.get("role") == "assistant":
+                used.update(COURSE_CODE_RE.findall(message.get("content", "")))
+        return json.dumps(
+            {
+                "courses": pick(
+                    _available_codes(user_messages[0]), int(needed.group(1)), used
+                )
+            }
+        )
+
+    return json.dumps(
+        {"courses": pick(_available_codes(last), COURSES_PER_SEMESTER, set())}
+    )
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the fake's configuration and state."""
+
+    daemon_threads = True
+    # The default listen backlog (5) drops connections under a burst of
+    # concurrent clients, which shows up as 1s/3s SYN retransmit stalls
+    request_queue_size = 1024
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        latency: str = "fixed:0",
+        tokens_per_second: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        invalid_rate: float = 0.0,
+        seed: int = 0,
+        record_dir: Optional[str] = None,
+        upstream: Optional[str] = None,
+        replay_dir: Optional[str] = None,
+    ):
+        if record_dir and not upstream:
+            raise ValueError("record mode requires an upstream URL")
+        self.sample_latency = parse_latency(latency)
+        super().__init__(address, FakeOpenAIHandler)
+        # Injected slowness and failures
+        self.faults = {
+            "tokens_per_second": tokens_per_second,
+            "error_rate": error_rate,
+            "error_status": error_status,
+            "invalid_rate": invalid_rate,
+        }
+        # Record/replay mode
+        self.recording = {
+            "record_dir": record_dir,
+            "upstream": upstream.rstrip("/") if upstream else None,
+            "replay_dir": replay_dir,
+        }
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.seen_prefixes: set = set()
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "streamed": 0,
+            "recorded": 0,
+            "replayed": 0,
+        }
+
+        if record_dir:
+            os.makedirs(record_dir, exist_ok=True)
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to use as OPENAI_BASE_URL."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def draw(self) -> Tuple[float, float]:
+        """Draw (latency, uniform) from the seeded random source."""
+        with self.lock:
+            return self.sample_latency(self.rng), self.rng.random()
+
+    def usage(self, messages: List[Dict], content: str) -> Dict:
+        """Token usage with provider-style caching of repeated prompt prefixes."""
+        prompt_tokens = sum(_estimate_tokens(m.get("content", "")) for m in messages)
+        prefix = json.dumps(messages[:-1], sort_keys=True)
+        prefix_tokens = prompt_tokens - _estimate_tokens(
+            messages[-1].get("content", "")
+        )
+        with self.lock:
+            cached = prefix in self.seen_prefixes
+            self.seen_prefixes.add(prefix)
+        cached_tokens = 0
+        if cached and prefix_tokens >= CACHE_MIN_TOKENS:
+            cached_tokens = prefix_tokens // CACHE_BLOCK_TOKENS * CACHE_BLOCK_TOKENS
+        completion_tokens = _estimate_tokens(content)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        }
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Request handler implementing the chat completions endpoint."""
+
+    server: FakeOpenAIServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Silence per-request logging (benchmarks issue many requests)."""
+
+    def _send_json(self, status: int, payload: Dict) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: int, message: str, error_type: str) -> None:
+        self._send_json(
+            status, {"error": {"message": message, "type": error_type, "code": None}}
+        )
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Expose server stats for benchmarks."""
+        if self.path.rstrip("/") == "/stats":
+            with self.server.lock:
+                stats = dict(self.server.stats)
+            self._send_json(200, stats)
+        else:
+            self._send_error(404, f"Unknown path: {self.path}", "invalid_request_error")
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Handle /v1/chat/completions."""
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_error(404, f"Unknown path: {self.path}", "invalid_request_error")
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_error(400, "Invalid JSON body", "invalid_request_error")
+            return
+
+        server = self.server
+        latency, roll = server.draw()
+        with server.lock:
+            server.stats["requests"] += 1
+
+        if roll < server.faults["error_rate"]:
+            time.sleep(latency)
+            with server.lock:
+                server.stats["errors"] += 1
+            self._send_error(
+                server.faults["error_status"],
+                "Injected error from fake server",
+                "server_error",
+            )
+            return
+
+        messages = body.get("messages") or []
+        if server.recording["replay_dir"]:
+            completion = self._replay(body)
+            if completion is None:
+                return
+        elif server.recording["record_dir"]:
+            completion = self._record(body)
+            if completion is None:
+                return
+        else:
+            with server.lock:
+                content = synthesize_content(
+                    messages, server.rng, server.faults["invalid_rate"]
+                )
+            completion = {
+                "id": f"chatcmpl-fake-{request_key(body)[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake-model"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": server.usage(messages, content),
+            }
+
+        time.sleep(latency)
+        if body.get("stream"):
+            self._stream(body, completion)
+        else:
+            content = completion["choices"][0]["message"]["content"] or ""
+            if server.faults["tokens_per_second"]:
+                time.sleep(
+                    _estimate_tokens(content) / server.faults["tokens_per_second"]
+                )
+            self._send_json(200, completion)
+
+    def _stream(self, body: Dict, completion: Dict) -> None:
+        """Send a completion as server-sent events, chunk by chunk."""
+        server = self.server
+        with server.lock:
+            server.stats["streamed"] += 1
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def send(payload) -> None:
+            data = payload if isinstance(payload, str) else json.dumps(payload)
+            self.wfile.write(f"data: {data}\n\n".encode())
+            self.wfile.flush()
+
+        base = {
+            "id": completion.get("id", "chatcmpl-fake"),
+            "object": "chat.completion.chunk",
+            "created": completion.get("created", int(time.time())),
+            "model": completion.get("model", body.get("model", "fake-model")),
+        }
+        content = completion["choices"][0]["message"]["content"] or ""
+        chunk_delay = 0.0
+        if server.faults["tokens_per_second"]:
+            chunk_delay = STREAM_CHUNK_CHARS / 4 / server.faults["tokens_per_second"]
+
+        send(
+            dict(
+                base,
+                choices=[
+                    {"index": 0, "delta": {"role": "assistant"}, "finish_reason": None}
+                ],
+            )
+        )
+        for start in range(0, len(content), STREAM_CHUNK_CHARS):
+            send(
+                dict(
+                    base,
+                    choices=[
+                        {
+                            "index": 0,
+                            "delta": {
+                                "content": content[start : start + STREAM_CHUNK_CHARS]
+                            },
+                            "finish_reason": None,
+                        }
+                    ],
+                )
+            )
+            if chunk_delay:
+                time.sleep(chunk_delay)
+        send(dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}]))
+        if (body.get("stream_options") or {}).get("include_usage"):
+            send(dict(base, choices=[], usage=completion.get("usage")))
+        send("[DONE]")
+
+    def _record(self, body: Dict) -> Optional[Dict]:
+        """Forward the request upstream (non-streaming) and save the response."""
+        server = self.server
+        upstream_body = {
+            k: v for k, v in body.items() if k not in ("stream", "stream_options")
+        }
+        request = urllib.request.Request(
+            server.recording["upstream"] + "/chat/completions",
+            data=json.dumps(upstream_body).encode(),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": self.headers.get("Authorization", ""),
+            },
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                completion = json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            self._send_json(e.code, json.loads(e.read() or b"{}"))
+            return None
+        except (urllib.error.URLError, OSError) as e:
+            self._send_error(502, f"Upstream unavailable: {e}", "server_error")
+            return None
+
+        path = os.path.join(server.recording["record_dir"], f"{request_key(body)}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"request": upstream_body, "response": completion}, f, indent=2)
+        with server.lock:
+            server.stats["recorded"] += 1
+        return completion
+
+    def _replay(self, body: Dict) -> Optional[Dict]:
+        """Load the recorded response for this request."""
+        server = self.server
+        path = os.path.join(server.recording["replay_dir"], f"{request_key(body)}.json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                completion = json.load(f)["response"]
+        except FileNotFoundError:
+            self._send_error(
+                404,
+                f"No recording for request {request_key(body)}",
+                "invalid_request_error",
+            )
+            return None
+        with server.lock:
+            server.stats["replayed"] += 1
+        return completion
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0, **options) -> FakeOpenAIServer:
+    """
+    Start a fake server on a background thread.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        **options: FakeOpenAIServer options (latency, error_rate, ...)
+
+    Returns:
+        Running server; use server.base_url and call server.shutdown() when done
+    """
+    server = FakeOpenAIServer((host, port), **options)
+    # Short poll interval so shutdown() returns quickly in tests
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    return server
+
+
+def main():
+    """Run the fake server in the foreground."""
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible fake server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", default="fixed:0", help="e.g. lognormal:0.8,0.5")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--invalid-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--record", dest="record_dir")
+    parser.add_argument("--upstream", help="e.g. https://api.openai.com/v1")
+    parser.add_argument("--replay", dest="replay_dir")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(
+        (args.host, args.port),
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        invalid_rate=args.invalid_rate,
+        seed=args.seed,
+        record_dir=args.record_dir,
+        upstream=args.upstream,
+        replay_dir=args.replay_dir,
+    )
+    print(f"Fake OpenAI server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+database/ingest.py
+
+Streaming bulk ingestion of course records from JSON Lines or CSV files.
+
+Records are read one at a time, validated and normalized to the catalog's
+course shape, and upserted by course_code in unordered bulk_write batches, so
+memory stays bounded by the batch size whatever the file size.
+
+CSV files have one column per course field; list fields (prerequisites,
+semester_offered) are separated by ";" or "|".
+
+    python -m database.ingest catalog.jsonl
+    python -m database.ingest catalog.csv --batch-size 5000
+    python -m database.ingest catalog.csv --dry-run
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from .app_db import (
+    CATALOG_COLLECTION,
+    CATALOG_META_COLLECTION,
+    connect_db,
+    create_course_indexes,
+)
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ENV_PATH = os.path.join(BASE_DIR, ".env")
+
+DEFAULT_BATCH_SIZE = 1000
+# Rejected records kept in the report (the rest are only counted)
+MAX_REJECT_SAMPLES = 20
+
+# "csci-ua 101", "CSCI-UA.0101" and "CSCI-UA.0480-041" style codes
+COURSE_CODE_PATTERN = re.compile(
+    r"^([A-Z]{2,})(?:-([A-Z]{2,}))?\s*[.\s]\s*(\d{1,4})(?:-(\d{1,3}))?$"
+)
+CREDITS_PATTERN = re.compile(r"^\d+(?:\s*-\s*\d+)?$")
+LIST_SEPARATOR_PATTERN = re.compile(r"[;|]")
+# Lowercase spelling -> catalog spelling
+OFFERINGS = {
+    offering.lower(): offering
+    for offering in ["Fall", "Spring", "Summer", "Winter", "Occasionally"]
+}
+TEXT_FIELDS = ["title", "type", "subject", "description"]
+
+
+class RecordRejected(ValueError):
+    """Raised when a course record cannot be normalized."""
+
+
+def canonicalize_course_code(code):
+    """
+    Canonicalize a course code to the catalog's SUBJECT-SCHOOL.NNNN[-SSS] form.
+
+    Args:
+        code: Course code as found in the source file
+
+    Returns:
+        Canonical course code
+
+    Raises:
+        RecordRejected: If the code is not a recognizable course code
+    """
+    match = COURSE_CODE_PATTERN.match(str(code or "").strip().upper())
+    if not match:
+        raise RecordRejected(f"Invalid course code: {code!r}")
+    subject, school, number, section = match.groups()
+    canonical = f"{subject}-{school}" if school else subject
+    canonical += f".{int(number):04d}"
+    if section:
+        canonical += f"-{int(section):03d}"
+    return canonical
+
+
+def _split_list(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [
+            item.strip() for item in LIST_SEPARATOR_PATTERN.split(value) if item.strip()
+        ]
+    if isinstance(value, (list, tuple)):
+        return [str(item).strip() for item in value if str(item).strip()]
+    raise RecordRejected(f"Expected a list, got {type(value).__name__}")
+
+
+def _normalize_credits(value):
+    if value is None or value == "":
+        return 4
+    if isinstance(value, bool):
+        raise RecordRejected(f"Invalid credits: {value!r}")
+    if isinstance(value, (int, float)):
+        if value < 0 or value != int(value):
+            raise RecordRejected(f"Invalid credits: {value!r}")
+        return int(value)
+    text = str(value).strip()
+    if not CREDITS_PATTERN.match(text):
+        raise RecordRejected(f"Invalid credits: {value!r}")
+    # Ranges ("2-4") are kept as strings, like the seeded catalog
+    return int(text) if text.isdigit() else text
+
+
+def _normalize_difficulty(value):
+    if value is None or value == "":
+        return None
+    try:
+        difficulty = int(value)
+    except (TypeError, ValueError):
+        raise RecordRejected(f"Invalid difficulty: {value!r}") from None
+    if not 0 <= difficulty <= 5:
+        raise RecordRejected(f"Difficulty out of range: {value!r}")
+    return difficulty
+
+
+def normalize_record(record):
+    """
+    Validate and normalize one raw course record.
+
+    Args:
+        record: Dictionary read from a JSON Lines or CSV file
+
+    Returns:
+        Course dictionary in the catalog's shape
+
+    Raises:
+        RecordRejected: If the record is invalid
+    """
+    if not isinstance(record, dict):
+        raise RecordRejected("Record is not an object")
+
+    course_code = canonicalize_course_code(record.get("course_code"))
+    course = {"course_code": course_code}
+    for field in TEXT_FIELDS:
+        value = record.get(field)
+        course[field] = " ".join(str(value).split()) if value is not None else ""
+    if not course["title"]:
+        raise RecordRejected("Missing title")
+    if not course["subject"]:
+        course["subject"] = course_code.split(".")[0]
+
+    course["credits"] = _normalize_credits(record.get("credits"))
+    difficulty = _normalize_difficulty(record.get("difficulty"))
+    if difficulty is not None:
+        course["difficulty"] = difficulty
+
+    prerequisites = []
+    for code in _split_list(record.get("prerequisites")):
+        prerequisite = canonicalize_course_code(code)
+        if prerequisite != course_code and prerequisite not in prerequisites:
+            prerequisites.append(prerequisite)
+    course["prerequisites"] = prerequisites
+
+    semester_offered = []
+    for term in _split_list(record.get("semester_offered")):
+        offering = OFFERINGS.get(term.lower())
+        if offering is None:
+            raise RecordRejected(f"Unknown offering: {term!r}")
+        if offering not in semester_offered:
+            semester_offered.append(offering)
+    course["semester_offered"] = semester_offered
+
+    return course
+
+
+def iter_records(path, file_format=None):
+    """
+    Stream raw records from a JSON Lines or CSV file.
+
+    Args:
+        path: File path
+        file_format: "jsonl" or "csv" (default: from the file extension)
+
+    Yields:
+        (line number, record) tuples; record is None for unparseable lines
+    """
+    file_format = file_format or ("csv" if path.lower().endswith(".csv") else "jsonl")
+    with open(path, newline="", encoding="utf-8") as f:
+        if file_format == "csv":
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+            return
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError:
+                yield line_number, None
+
+
+def _write_batch(collection, batch, stats):
+    codes = list(batch)
+    operations = [
+        UpdateOne({"course_code": code}, {"$set": batch[code]}, upsert=True)
+        for code in codes
+    ]
+    try:
+        result = collection.bulk_write(operations, ordered=False)
+        details = result.bulk_api_result
+    except BulkWriteError as e:
+        details = e.details
+        for error in details.get("writeErrors", []):
+            code = codes[error["index"]]
+            _reject(stats, None, f"Write error for {code}: {error.get('errmsg')}")
+    stats["upserted"] += details.get("nUpserted", 0)
+    stats["modified"] += details.get("nModified", 0)
+    stats["batches"] += 1
+
+
+def _reject(stats, line_number, reason):
+    stats["rejected"] += 1
+    if len(stats["rejects"]) < MAX_REJECT_SAMPLES:
+        stats["rejects"].append({"line": line_number, "reason": reason})
+
+
+def ingest_courses(
+    db,
+    records,
+    batch_size=DEFAULT_BATCH_SIZE,
+    collection=CATALOG_COLLECTION,
+    dry_run=False,
+):
+    """
+    Upsert a stream of course records into a catalog collection.
+
+    Duplicate course codes within a batch keep the last record. After a real
+    ingestion the catalog_meta version of the collection is bumped, and it is
+    marked as ingested so seeding does not replace it with the bundled catalog.
+
+    Args:
+        db: MongoDB database instance
+        records: Iterable of (line number, raw record) tuples (see iter_records)
+        batch_size: Upserts per bulk_write call
+        collection: Target collection name
+        dry_run: Only validate, write nothing
+
+    Returns:
+        Dictionary with read, valid, rejected, upserted, modified, batches,
+        seconds, records_per_second and up to MAX_REJECT_SAMPLES rejects
+    """
+    started = time.perf_counter()
+    stats = {
+        "read": 0,
+        "valid": 0,
+        "rejected": 0,
+        "upserted": 0,
+        "modified": 0,
+        "batches": 0,
+        "rejects": [],
+    }
+    target = db[collection]
+    if not dry_run:
+        create_course_indexes(target)
+
+    batch = {}
+    for line_number, record in records:
+        stats["read"] += 1
+        if record is None:
+            _reject(stats, line_number, "Unparseable record")
+            continue
+        try:
+            course = normalize_record(record)
+        except RecordRejected as e:
+            _reject(stats, line_number, str(e))
+            continue
+        stats["valid"] += 1
+        batch[course["course_code"]] = course
+        if len(batch) >= batch_size:
+            if not dry_run:
+                _write_batch(target, batch, stats)
+            batch = {}
+    if batch and not dry_run:
+        _write_batch(target, batch, stats)
+
+    if not dry_run and stats["upserted"] + stats["modified"]:
+        # Server processes rebuild their catalog snapshot (api/catalog.py) when
+        # they see the new version, so the catalog is never held in memory here
+        db[CATALOG_META_COLLECTION].update_one(
+            {"_id": collection},
+            {
+                "$inc": {"version": 1},
+                "$set": {
+                    "content_hash": None,
+                    "count": target.count_documents({}),
+                    "source": "ingest",
+                    "published_at": datetime.now(timezone.utc).isoformat(),
+                },
+            },
+            upsert=True,
+        )
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    stats["records_per_second"] = (
+        round(stats["read"] / stats["seconds"]) if stats["seconds"] else stats["read"]
+    )
+    return stats
+
+
+def main():
+    """Parse arguments, connect to MongoDB and ingest the file."""
+    load_dotenv(ENV_PATH)
+    parser = argparse.ArgumentParser(description="Ingest course records")
+    parser.add_argument("path", help="JSON Lines (.jsonl) or CSV (.csv) file")
+    parser.add_argument("--format", choices=["jsonl", "csv"], dest="file_format")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--collection", default=CATALOG_COLLECTION)
+    parser.add_argument("--dry-run", action="store_true", help="Only validate")
+    args = parser.parse_args()
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+
+    try:
+        db = connect_db(
+            os.getenv("MONGO_URI", "mongodb://mongo:27017/course_planner"),
+            os.getenv("MONGO_DB_NAME", "course_planner"),
+        )
+    except Exception as e:
+        print("Failed to connect to MongoDB:", e)
+        sys.exit(1)
+
+    stats = ingest_courses(
+        db,
+        iter_records(args.path, args.file_format),
+        batch_size=args.batch_size,
+        collection=args.collection,
+        dry_run=args.dry_run,
+    )
+    for reject in stats.pop("rejects"):
+        print(f"WARNING: Rejected line {reject['line']}: {reject['reason']}")
+    print("Ingest complete:", stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+database/precompute_plans.py
+
+Offline batch job that precomputes canonical plans for common (major, career
+path, starting semester) combinations into the canonical_plans collection.
+They are served by GET /api/recommendations/templates.
+
+Run after seeding and whenever the course catalog changes:
+    python -m database.precompute_plans
+    python -m database.precompute_plans --mode llm --career-path "Game Development"
+"""
+
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+from .app_db import connect_db
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ENV_PATH = os.path.join(BASE_DIR, ".env")
+
+
+def precompute_plans(db, majors=None, career_paths=None, mode="local"):
+    """
+    Precompute and store canonical plans for the current course catalog.
+
+    Templates from an older catalog version are removed.
+
+    Args:
+        db: MongoDB database instance
+        majors: Majors to precompute (default: CANONICAL_MAJORS)
+        career_paths: Career paths to precompute (default: CANONICAL_CAREER_PATHS)
+        mode: "local" or "llm" (see plan_templates.build_templates)
+
+    Returns:
+        Dictionary with catalog_version, templates stored and stale templates removed
+    """
+    # pylint: disable=import-outside-toplevel
+    from api import course_filtering, plan_templates
+
+    all_courses = list(db.courses.find({}))
+    catalog_version = course_filtering.get_catalog_version(all_courses)
+
+    stored = 0
+    for major in majors or plan_templates.CANONICAL_MAJORS:
+        for career_path in (
+            career_paths
+            if career_paths is not None
+            else plan_templates.CANONICAL_CAREER_PATHS
+        ):
+            templates = plan_templates.build_templates(
+                major, career_path, all_courses, mode=mode
+            )
+            stored += plan_templates.save_templates(templates, db)
+            print(
+                f"Precomputed {len(templates)} plans for {major} / {career_path or '-'}"
+            )
+
+    removed = db.canonical_plans.delete_many(
+        {"catalog_version": {"$ne": catalog_version}}
+    ).deleted_count
+
+    return {"catalog_version": catalog_version, "stored": stored, "removed": removed}
+
+
+def main():
+    """Parse arguments, connect to MongoDB and precompute the plans."""
+    load_dotenv(ENV_PATH)
+    parser = argparse.ArgumentParser(description="Precompute canonical plans")
+    parser.add_argument("--major", action="append", dest="majors")
+    parser.add_argument("--career-path", action="append", dest="career_paths")
+    parser.add_argument("--mode", choices=["local", "llm"], default="local")
+    args = parser.parse_args()
+
+    try:
+        db = connect_db(
+            os.getenv("MONGO_URI", "mongodb://mongo:27017/course_planner"),
+            os.getenv("MONGO_DB_NAME", "course_planner"),
+        )
+    except Exception as e:
+        print("Failed to connect to MongoDB:", e)
+        sys.exit(1)
+
+    result = precompute_plans(db, args.majors, args.career_paths, args.mode)
+    print("Precompute complete:", result)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ import time
 
 from dotenv import load_dotenv
 
-from .app_db import connect_db, seed_db
+from .app_db import connect_db, seed_db, wait_for_db
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 ENV_PATH = os.path.join(BASE_DIR, ".env")
@@ -12,17 +12,21 @@ ENV_PATH = os.path.join(BASE_DIR, ".env")
 load_dotenv(ENV_PATH)
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://mongo:27017/course_planner")
 DB_NAME = os.getenv("MONGO_DB_NAME", "course_planner")
-WAIT = int(os.getenv("WAIT_BEFORE_CONNECT", "2"))
+# Seconds to keep pinging MongoDB before giving up (it is usually starting
+# alongside this container)
+DB_WAIT_TIMEOUT = float(os.getenv("DB_WAIT_TIMEOUT", "60"))
 ENV = os.getenv("ENVIRONMENT", "development")
 
-if WAIT:
-    time.sleep(WAIT)
-
+start = time.perf_counter()
 try:
     db = connect_db(MONGO_URI, DB_NAME)
+    pings = wait_for_db(db, DB_WAIT_TIMEOUT)
 except Exception as e:
     print("Failed to connect to MongoDB:", e)
     sys.exit(1)
+print(f"Startup phase connect: {time.perf_counter() - start:.3f}s ({pings} ping(s))")
 
 result = seed_db(db, environment=ENV)
+for phase, seconds in result.pop("timings").items():
+    print(f"Startup phase {phase}: {seconds:.3f}s")
 print("Seed complete:", result)
@@ -0,0 +1,89 @@
+"""
+gunicorn.conf.py
+
+Production WSGI server configuration (used by start.sh):
+    gunicorn -c gunicorn.conf.py api.app:app
+
+The app is preloaded and warmed up (api/warmup.py) once in the master
+process, then workers are forked and share the warmed objects copy-on-write.
+The garbage collector is disabled in the master and everything allocated
+before forking is frozen (gc.freeze), so collections in the workers don't
+write to the shared pages; each worker re-enables the collector after fork.
+
+LLM admission limits must hold across workers, so ADMISSION_BACKEND defaults
+to "mongo" here; the per-process "memory" backend is refused with more than
+one worker.
+"""
+
+import gc
+import multiprocessing
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Before reading any setting, as the app does (api/app.py); values already in
+# the environment win
+load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"))
+
+PRELOAD = os.getenv("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes")
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("GUNICORN_WORKERS", str(multiprocessing.cpu_count() * 2 + 1)))
+# Threads per worker: requests mostly wait on OpenAI and MongoDB
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+worker_class = "gthread"
+preload_app = PRELOAD
+# Longer than a whole-plan request (several LLM calls plus admission wait)
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+accesslog = "-"
+
+# Read by api/admission.py when the app is loaded (after this file)
+ADMISSION_BACKEND = os.environ.setdefault("ADMISSION_BACKEND", "mongo").lower()
+if workers > 1 and ADMISSION_BACKEND == "memory":
+    sys.exit(
+        "ADMISSION_BACKEND=memory applies the LLM limits per worker; "
+        "use ADMISSION_BACKEND=mongo or GUNICORN_WORKERS=1"
+    )
+
+if PRELOAD:
+    # Avoid leaving freed "holes" in pages that workers will share
+    gc.disable()
+
+
+def when_ready(server):
+    """Warm up in the master (preloaded app) and freeze the heap before forking."""
+    if not PRELOAD:
+        return
+    # pylint: disable=import-outside-toplevel
+    from api import user_model, warmup
+
+    status = warmup.warm_up()
+    server.log.info(
+        "Warmup %s in %ss (%s courses)",
+        "completed" if status["ready"] else "failed",
+        status["duration_seconds"],
+        status["courses"],
+    )
+    # MongoClient is not fork-safe: close the process's one client (warmup read
+    # the catalog through it); workers reconnect on first use
+    user_model.client.close()
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):  # pylint: disable=unused-argument
+    """Re-enable the garbage collector in each worker."""
+    if PRELOAD:
+        gc.enable()
+
+
+def post_worker_init(worker):  # pylint: disable=unused-argument
+    """Warm up in the worker if the app was not preloaded or warmup failed in the master."""
+    # pylint: disable=import-outside-toplevel
+    from api import warmup
+
+    if not warmup.is_ready():
+        warmup.warm_up()
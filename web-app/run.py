@@ -1,4 +1,7 @@
 from api.app import app
+from api.warmup import warm_up
 
 if __name__ == "__main__":
+    # Development server; use gunicorn.conf.py (see start.sh) in production
+    warm_up()
     app.run(host="0.0.0.0", port=5000)
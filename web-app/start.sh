@@ -1,6 +1,7 @@
 #!/bin/bash
 # Startup script for Docker container
-# Seeds the database, then starts the Flask app
+# Seeds the database, precomputes canonical plans, then starts gunicorn
+# (or the ASGI app with SERVER_MODE=asgi, the Flask dev server with SERVER_MODE=dev)
 
 set -e
 
@@ -11,6 +12,23 @@ python -m database.seed || {
     # Continue anyway - database might already be seeded
 }
 
-echo "Starting Flask application..."
-exec python run.py
+echo "Precomputing canonical plans..."
+python -m database.precompute_plans || {
+    echo "WARNING: Precomputing canonical plans failed; templates may be missing or stale"
+}
+
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+    # Async LLM endpoints, with the Flask app serving everything else (api/asgi.py)
+    echo "Starting ASGI application..."
+    exec uvicorn api.asgi:app --host 0.0.0.0 --port 5000
+fi
+
+if [ "${SERVER_MODE:-wsgi}" = "dev" ]; then
+    echo "Starting Flask development server..."
+    exec python run.py
+fi
+
+# Preloaded, warmed-up workers (see gunicorn.conf.py); GET /readyz turns 200 when ready
+echo "Starting gunicorn..."
+exec gunicorn -c gunicorn.conf.py api.app:app
 
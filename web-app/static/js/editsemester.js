@@ -71,8 +71,8 @@ document.addEventListener("DOMContentLoaded", () => {
     clearAllBtn.addEventListener("click", clearAllCourses);
   }
 
-  // Load existing courses for this semester
-  loadExistingCourses();
+  // Load existing courses for this semester, then the last recommendations
+  loadExistingCourses().then(loadLastRecommendations);
 
   // Setup autocomplete for course search
   if (courseSearch) {
@@ -180,23 +180,7 @@ async function generateCourseIdeas() {
     }
 
     // Populate courses
-    data.courses.forEach((course, idx) => {
-      const li = document.createElement("li");
-
-      const checkbox = document.createElement("input");
-      checkbox.type = "checkbox";
-      checkbox.id = `course${idx}`;
-      checkbox.value = `${course.course_code} ${course.title} (${course.credits} credits)`;
-      checkbox.checked = true; // Default to selected
-
-      const label = document.createElement("label");
-      label.htmlFor = checkbox.id;
-      label.textContent = `${course.course_code} ${course.title} (${course.credits} credits)`;
-
-      li.appendChild(checkbox);
-      li.appendChild(label);
-      courseList.appendChild(li);
-    });
+    appendRecommendedCourses(data.courses, true); // Default to selected
 
     // Show clear all button if there are courses
     updateClearAllButtonVisibility();
@@ -209,6 +193,27 @@ async function generateCourseIdeas() {
   }
 }
 
+// --- Add recommended courses to the list ---
+function appendRecommendedCourses(courses, checked) {
+  courses.forEach((course, idx) => {
+    const li = document.createElement("li");
+
+    const checkbox = document.createElement("input");
+    checkbox.type = "checkbox";
+    checkbox.id = `course${idx}`;
+    checkbox.value = `${course.course_code} ${course.title} (${course.credits} credits)`;
+    checkbox.checked = checked;
+
+    const label = document.createElement("label");
+    label.htmlFor = checkbox.id;
+    label.textContent = `${course.course_code} ${course.title} (${course.credits} credits)`;
+
+    li.appendChild(checkbox);
+    li.appendChild(label);
+    courseList.appendChild(li);
+  });
+}
+
 // --- Course search autocomplete ---
 async function handleCourseSearch(e) {
   const query = e.target.value.trim();
@@ -404,6 +409,57 @@ async function loadExistingCourses() {
   }
 }
 
+// --- Load the last recommendations for current semester ---
+// Shown without another LLM call when completed and planned courses are
+// unchanged since they were generated; otherwise only the inputs are restored.
+async function loadLastRecommendations() {
+  const token = localStorage.getItem("token");
+  if (!token) {
+    return; // Not logged in, skip loading
+  }
+
+  try {
+    const semester = encodeURIComponent(semesters[currentSemesterIndex]);
+    const response = await fetch(`/api/recommendations/last?semester=${semester}`, {
+      method: "GET",
+      headers: {
+        Authorization: `Bearer ${token}`,
+      },
+    });
+
+    if (!response.ok) {
+      return; // None saved (404) or not authorized, nothing to restore
+    }
+
+    const data = await response.json();
+
+    // Restore the inputs the recommendations were generated for
+    if (careerPath && !careerPath.value) careerPath.value = data.career_path || "";
+    const sideInterests = data.side_interests || [];
+    if (sideInterest1 && !sideInterest1.value) sideInterest1.value = sideInterests[0] || "";
+    if (sideInterest2 && !sideInterest2.value) sideInterest2.value = sideInterests[1] || "";
+
+    if (data.stale || !courseList || !Array.isArray(data.courses)) {
+      return; // Courses changed since; the user regenerates
+    }
+
+    // Keep already planned courses; skip recommendations that are among them
+    const listed = new Set(
+      Array.from(courseList.querySelectorAll("input[type='checkbox']")).map(
+        (cb) => cb.value.split(" ")[0]
+      )
+    );
+    const courses = data.courses.filter((course) => !listed.has(course.course_code));
+
+    // Previously generated, so not selected until the user picks them
+    appendRecommendedCourses(courses, false);
+    updateClearAllButtonVisibility();
+  } catch (err) {
+    console.error("Error loading last recommendations:", err);
+    // Continue without them
+  }
+}
+
 // --- Update clear all button visibility ---
 function updateClearAllButtonVisibility() {
   if (!clearAllBtn || !courseList) return;
@@ -23,7 +23,11 @@ def pytest_configure(config):
     os.environ["MONGO_DB_NAME"] = "test_course_planner"
     os.environ["ENVIRONMENT"] = "testing"
     os.environ["FLASK_SECRET"] = "test_secret_key"
-    os.environ["WAIT_BEFORE_CONNECT"] = "0"
+    os.environ["DB_WAIT_TIMEOUT"] = "0"
+    # Tests that cover telemetry configure a backend explicitly
+    os.environ["LLM_TELEMETRY"] = "off"
+    # Tests that cover the catalog snapshot enable it explicitly
+    os.environ["CATALOG_SNAPSHOT"] = "off"
 
 
 @pytest.fixture
@@ -38,3 +42,43 @@ def mock_db():
 
     # Cleanup
     client.drop_database("test_course_planner")
+
+
+@pytest.fixture
+def make_course():
+    """Factory for course dictionaries as stored in the courses collection."""
+
+    def _make_course(
+        code,
+        title,
+        prerequisites=None,
+        offered=("Fall", "Spring"),
+        course_credits=4,
+        difficulty=3,
+        description="",
+    ):
+        return {
+            "course_code": code,
+            "title": title,
+            "credits": course_credits,
+            "difficulty": difficulty,
+            "prerequisites": list(prerequisites or []),
+            "semester_offered": list(offered),
+            "description": description or title,
+        }
+
+    return _make_course
+
+
+@pytest.fixture
+def auth_header():
+    """Factory for the Authorization header of a logged-in student."""
+    import jwt
+
+    from api.auth_routes import SECRET
+
+    def _auth_header(email="ada@example.edu"):
+        token = jwt.encode({"email": email}, SECRET, algorithm="HS256")
+        return {"Authorization": f"Bearer {token}"}
+
+    return _auth_header
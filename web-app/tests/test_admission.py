@@ -0,0 +1,218 @@
+"""
+test_admission.py
+
+Unit tests for admission.py (LLM concurrency limits, load shedding, per-user quotas).
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.fixture
+def fresh_admission():
+    """Reset admission metrics and use a memory backend with 2 slots."""
+    from api import admission
+
+    stats = {key: 0 for key in admission._stats}
+    with patch.object(admission, "_backend", admission.MemoryBackend(2)), patch.dict(
+        admission._stats, stats
+    ), patch.object(admission, "_wait_times", admission.deque()), patch.object(
+        admission, "_hold_times", admission.deque()
+    ):
+        yield admission
+
+
+class TestMemoryBackend:
+    """Tests for MemoryBackend."""
+
+    def test_slots_capped(self):
+        """Test that no more than max_concurrency slots are handed out."""
+        from api.admission import MemoryBackend
+
+        backend = MemoryBackend(2)
+        first = backend.acquire_slot(0.1)
+        second = backend.acquire_slot(0.1)
+
+        assert first and second
+        assert backend.acquire_slot(0.05) is None
+        backend.release_slot(first)
+        assert backend.acquire_slot(0.05) is not None
+
+    def test_waiter_woken_on_release(self):
+        """Test that a waiting request gets the slot as soon as it is released."""
+        from api.admission import MemoryBackend
+
+        backend = MemoryBackend(1)
+        token = backend.acquire_slot(0.1)
+        threading.Timer(0.05, backend.release_slot, args=[token]).start()
+
+        start = time.monotonic()
+        assert backend.acquire_slot(2) is not None
+        assert time.monotonic() - start < 1
+
+    def test_token_bucket(self):
+        """Test that a burst is allowed and then the rate applies."""
+        from api.admission import MemoryBackend
+
+        backend = MemoryBackend(1)
+        assert backend.take_token("a@example.edu", 1.0, 2) == 0
+        assert backend.take_token("a@example.edu", 1.0, 2) == 0
+        assert 0 < backend.take_token("a@example.edu", 1.0, 2) <= 1
+        assert backend.take_token("b@example.edu", 1.0, 2) == 0
+
+
+class TestMongoBackend:
+    """Tests for MongoBackend (shared state across workers)."""
+
+    def test_slots_shared_between_workers(self, mock_db):
+        """Test that two backends (workers) share the same slots."""
+        from api.admission import MongoBackend
+
+        with patch("api.user_model.db", mock_db):
+            worker_a = MongoBackend(2)
+            worker_b = MongoBackend(2)
+
+            token = worker_a.acquire_slot(0.1)
+            assert worker_b.acquire_slot(0.1) is not None
+            assert worker_b.acquire_slot(0.05) is None
+            assert worker_a.active_slots() == 2
+
+            worker_a.release_slot(token)
+            assert worker_b.acquire_slot(0.1) is not None
+
+    def test_expired_lease_reclaimed(self, mock_db):
+        """Test that a slot held by a dead worker is reclaimed after its lease."""
+        from api.admission import MongoBackend
+
+        with patch("api.user_model.db", mock_db):
+            crashed = MongoBackend(1, lease_seconds=0.05)
+            stale = crashed.acquire_slot(0.1)
+            crashed._held.clear()  # the worker died: its lease is not renewed
+            time.sleep(0.1)
+
+            worker = MongoBackend(1)
+            assert worker.acquire_slot(0.1) is not None
+            crashed.release_slot(stale)  # no longer the holder: no effect
+            assert worker.active_slots() == 1
+
+    def test_lease_renewed_while_held(self, mock_db):
+        """Test that a slot held longer than its lease is not reclaimed."""
+        from api.admission import MongoBackend
+
+        with patch("api.user_model.db", mock_db):
+            busy = MongoBackend(1, lease_seconds=0.1)
+            token = busy.acquire_slot(0.1)
+            time.sleep(0.3)
+
+            other = MongoBackend(1)
+            assert other.acquire_slot(0.05) is None
+            busy.release_slot(token)
+            assert other.acquire_slot(0.1) is not None
+
+    def test_token_bucket_shared(self, mock_db):
+        """Test that the user's quota is shared between workers."""
+        from api.admission import MongoBackend
+
+        with patch("api.user_model.db", mock_db):
+            worker_a = MongoBackend(1)
+            worker_b = MongoBackend(1)
+
+            assert worker_a.take_token("a@example.edu", 0.1, 2) == 0
+            assert worker_b.take_token("a@example.edu", 0.1, 2) == 0
+            assert worker_a.take_token("a@example.edu", 0.1, 2) > 0
+
+
+class TestAdmit:
+    """Tests for the admit context manager."""
+
+    def test_admit_records_stats(self, fresh_admission):
+        """Test that admitted requests are counted and release their slot."""
+        with fresh_admission.admit("a@example.edu"):
+            assert fresh_admission.get_admission_stats()["active"] == 1
+
+        stats = fresh_admission.get_admission_stats()
+        assert stats["admitted"] == 1
+        assert stats["active"] == 0
+        assert stats["wait_seconds"]["p50"] is not None
+
+    def test_quota_exceeded(self, fresh_admission):
+        """Test that requests over the user's burst get 429 with Retry-After."""
+        with patch.object(fresh_admission, "LLM_USER_BURST", 1), patch.object(
+            fresh_admission, "LLM_USER_REQUESTS_PER_MINUTE", 6
+        ):
+            with fresh_admission.admit("a@example.edu"):
+                pass
+            with pytest.raises(fresh_admission.AdmissionRejected) as error:
+                with fresh_admission.admit("a@example.edu"):
+                    pass
+
+        assert error.value.status == 429
+        assert 1 <= error.value.retry_after <= 10
+        assert fresh_admission.get_admission_stats()["rate_limited"] == 1
+
+    def test_quota_disabled(self, fresh_admission):
+        """Test that a zero rate disables per-user quotas."""
+        with patch.object(fresh_admission, "LLM_USER_REQUESTS_PER_MINUTE", 0):
+            for _ in range(10):
+                with fresh_admission.admit("a@example.edu"):
+                    pass
+
+        assert fresh_admission.get_admission_stats()["admitted"] == 10
+
+    def test_queue_timeout(self, fresh_admission):
+        """Test that a request waiting too long for a slot gets 503."""
+        backend = fresh_admission._backend
+        tokens = [backend.acquire_slot(0.1), backend.acquire_slot(0.1)]
+
+        with patch.object(
+            fresh_admission, "LLM_QUEUE_TIMEOUT_SECONDS", 0.05
+        ), patch.object(fresh_admission, "LLM_USER_REQUESTS_PER_MINUTE", 0):
+            with pytest.raises(fresh_admission.AdmissionRejected) as error:
+                with fresh_admission.admit("a@example.edu"):
+                    pass
+
+        for token in tokens:
+            backend.release_slot(token)
+        assert error.value.status == 503
+        assert error.value.retry_after >= 1
+        assert fresh_admission.get_admission_stats()["queue_timeouts"] == 1
+
+    def test_load_shedding(self, fresh_admission):
+        """Test that requests beyond the queue bound are shed immediately."""
+        backend = fresh_admission._backend
+        tokens = [backend.acquire_slot(0.1), backend.acquire_slot(0.1)]
+        results = []
+
+        def wait_for_slot():
+            try:
+                with fresh_admission.admit("waiter@example.edu"):
+                    results.append("admitted")
+            except fresh_admission.AdmissionRejected:
+                results.append("rejected")
+
+        with patch.object(fresh_admission, "LLM_MAX_QUEUE", 1), patch.object(
+            fresh_admission, "LLM_USER_REQUESTS_PER_MINUTE", 0
+        ), patch.object(fresh_admission, "LLM_QUEUE_TIMEOUT_SECONDS", 2):
+            waiter = threading.Thread(target=wait_for_slot)
+            waiter.start()
+            while fresh_admission.get_admission_stats()["queue_depth"] < 1:
+                time.sleep(0.01)
+
+            start = time.monotonic()
+            with pytest.raises(fresh_admission.AdmissionRejected) as error:
+                with fresh_admission.admit("b@example.edu"):
+                    pass
+            assert time.monotonic() - start < 1
+
+            backend.release_slot(tokens.pop())
+            waiter.join()
+
+        backend.release_slot(tokens.pop())
+        assert error.value.status == 503
+        assert results == ["admitted"]
+        stats = fresh_admission.get_admission_stats()
+        assert stats["shed"] == 1
+        assert stats["max_queue_depth"] == 1
@@ -1,7 +1,8 @@
 """
 test_app_db.py
 
-Unit tests for database/app_db.py (connect_db, seed_db, create_indexes).
+Unit tests for database/app_db.py (connect_db, seed_db, create_indexes,
+publish_catalog).
 """
 
 import pytest
@@ -53,6 +54,46 @@ class TestConnectDb:
         client.drop_database("db2_test")
 
 
+class TestWaitForDb:
+    """Tests for wait_for_db function."""
+
+    def test_reachable(self, mock_db):
+        """Test that a reachable server is used after a single ping."""
+        from database.app_db import wait_for_db
+
+        assert wait_for_db(mock_db, timeout=5) == 1
+
+    def test_backoff_until_reachable(self):
+        """Test that failed pings are retried with exponential backoff."""
+        from pymongo.errors import ServerSelectionTimeoutError
+
+        from database.app_db import wait_for_db
+
+        db = MagicMock()
+        db.command.side_effect = [
+            ServerSelectionTimeoutError("down"),
+            ServerSelectionTimeoutError("down"),
+            {"ok": 1},
+        ]
+        with patch("database.app_db.time.sleep") as sleep:
+            assert wait_for_db(db, timeout=60) == 3
+
+        assert [call.args[0] for call in sleep.call_args_list] == [0.1, 0.2]
+
+    def test_deadline(self):
+        """Test that the last error is raised once the deadline has passed."""
+        from pymongo.errors import ServerSelectionTimeoutError
+
+        from database.app_db import wait_for_db
+
+        db = MagicMock()
+        db.command.side_effect = ServerSelectionTimeoutError("down")
+        with pytest.raises(ServerSelectionTimeoutError):
+            wait_for_db(db, timeout=0)
+
+        assert db.command.call_count == 1
+
+
 class TestCreateIndexes:
     """Tests for create_indexes function."""
 
@@ -181,3 +222,103 @@ class TestSeedDb:
 
         # Should still work but may insert different data
         assert result is not None
+
+
+def _catalog(*codes):
+    return [
+        {
+            "course_code": code,
+            "title": f"Course {code}",
+            "credits": 4,
+            "prerequisites": [],
+        }
+        for code in codes
+    ]
+
+
+class TestPublishCatalog:
+    """Tests for publish_catalog (shadow collection + atomic rename)."""
+
+    def test_first_publish(self, mock_db):
+        """Test that the first publish creates version 1 with the course index."""
+        from database.app_db import get_catalog_meta, publish_catalog
+
+        result = publish_catalog(mock_db, _catalog("A-1", "A-2"))
+
+        assert result["published"] is True
+        assert result["version"] == 1
+        assert mock_db.courses.count_documents({}) == 2
+        assert "course_code_1" in mock_db.courses.index_information()
+        meta = get_catalog_meta(mock_db)
+        assert meta["content_hash"] == result["content_hash"]
+        assert meta["count"] == 2
+
+    def test_unchanged_catalog_skipped(self, mock_db):
+        """Test that an identical catalog (in any order) is not republished."""
+        from database.app_db import publish_catalog
+
+        publish_catalog(mock_db, _catalog("A-1", "A-2"))
+        with patch("database.app_db.create_course_indexes") as create:
+            result = publish_catalog(mock_db, _catalog("A-2", "A-1"))
+
+        assert result["published"] is False
+        assert result["version"] == 1
+        create.assert_not_called()
+
+    def test_changed_catalog_replaces_live_collection(self, mock_db):
+        """Test that changed content bumps the version and leaves no shadow behind."""
+        from database.app_db import publish_catalog
+
+        publish_catalog(mock_db, _catalog("A-1", "A-2"))
+        result = publish_catalog(mock_db, _catalog("A-1", "A-3", "A-4"))
+
+        assert result["published"] is True
+        assert result["version"] == 2
+        codes = {c["course_code"] for c in mock_db.courses.find()}
+        assert codes == {"A-1", "A-3", "A-4"}
+        assert not [n for n in mock_db.list_collection_names() if "_shadow_" in n]
+
+    def test_old_catalog_served_until_swap(self, mock_db):
+        """Test that the live collection keeps the old catalog while the shadow is built."""
+        from database import app_db
+
+        app_db.publish_catalog(mock_db, _catalog("A-1", "A-2"))
+        live_counts = []
+
+        def create_course_indexes(collection):
+            live_counts.append(mock_db.courses.count_documents({}))
+
+        with patch.object(app_db, "create_course_indexes", create_course_indexes):
+            app_db.publish_catalog(mock_db, _catalog("A-1", "A-2", "A-3"))
+
+        assert live_counts == [2]
+        assert mock_db.courses.count_documents({}) == 3
+
+    def test_failed_publish_keeps_live_catalog(self, mock_db):
+        """Test that a failure before the swap drops the shadow and keeps the old catalog."""
+        from database import app_db
+
+        app_db.publish_catalog(mock_db, _catalog("A-1"))
+        with patch.object(
+            app_db,
+            "create_course_indexes",
+            side_effect=RuntimeError("index build failed"),
+        ):
+            with pytest.raises(RuntimeError):
+                app_db.publish_catalog(mock_db, _catalog("A-1", "A-2"))
+
+        assert mock_db.courses.count_documents({}) == 1
+        assert app_db.get_catalog_meta(mock_db)["version"] == 1
+        assert not [n for n in mock_db.list_collection_names() if "_shadow_" in n]
+
+    def test_seed_db_reports_publish(self, mock_db):
+        """Test that reseeding an unchanged catalog skips the publish."""
+        from database.app_db import seed_db
+
+        first = seed_db(mock_db)
+        second = seed_db(mock_db)
+
+        assert set(first["timings"]) == {"catalog", "students", "indexes"}
+        assert first["catalog_published"] is True
+        assert second["catalog_published"] is False
+        assert second["catalog_version"] == first["catalog_version"] == 1
@@ -0,0 +1,373 @@
+"""
+test_asgi.py
+
+Unit tests for asgi.py (ASGI serving mode) and the async paths of
+llm_service, plan_recommender and admission. MongoDB is mocked with
+mongomock; no API calls are made.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.fixture
+def seeded_db(mock_db, make_course):
+    """Small catalog and one student, wired into the Flask and ASGI apps."""
+    mock_db.courses.insert_many(
+        [
+            make_course("CSCI-UA.0101", "Introduction to Computer Science"),
+            make_course("CSCI-UA.0102", "Data Structures", ["CSCI-UA.0101"]),
+            make_course("CSCI-UA.0004", "Web Design"),
+            make_course("CSCI-UA.0060", "Database Design"),
+            make_course("CSCI-UA.0061", "Web Development"),
+        ]
+    )
+    mock_db.students.insert_one(
+        {
+            "name": "Ada",
+            "email": "ada@example.edu",
+            "netid": "ada",
+            "password": "hashed",
+            "major": "",
+            "year": "Freshman",
+            "interests": ["Web"],
+            "completed_courses": ["CSCI-UA.0101"],
+            "planned_semesters": [
+                {
+                    "semester": "Freshman Fall",
+                    "courses": [
+                        {
+                            "course_code": "CSCI-UA.0004",
+                            "title": "Web Design",
+                            "credits": 4,
+                        }
+                    ],
+                }
+            ],
+        }
+    )
+    with patch("api.user_model.db", mock_db), patch(
+        "api.course_filtering.db", mock_db
+    ), patch("api.recommendation_routes.db", mock_db), patch(
+        "api.plan_routes.db", mock_db
+    ), patch(
+        "api.user_routes.db", mock_db
+    ):
+        yield mock_db
+
+
+def _call(method, path, body=None, headers=None, query=""):
+    """Send one HTTP request through the ASGI app; return (status, headers, JSON)."""
+    from api.asgi import app
+
+    payload = json.dumps(body).encode() if body is not None else b""
+    raw_headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(payload)).encode()),
+    ] + [
+        (name.lower().encode(), value.encode())
+        for name, value in (headers or {}).items()
+    ]
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": raw_headers,
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 12345),
+    }
+    messages = [{"type": "http.request", "body": payload, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = sent[0]
+    response_headers = {
+        name.decode(): value.decode() for name, value in start["headers"]
+    }
+    body = b"".join(message.get("body", b"") for message in sent[1:])
+    return start["status"], response_headers, json.loads(body or b"null")
+
+
+class TestAsyncRoutes:
+    """Tests for the endpoints served by coroutines."""
+
+    def test_missing_and_unknown_user(self, seeded_db, auth_header):
+        """Test the same 401 responses as the Flask views."""
+        status, _, body = _call(
+            "POST", "/api/recommendations/generate", {"semester": "Freshman Spring"}
+        )
+        assert status == 401
+        assert body["error"] == "Unauthorized: Missing token"
+
+        status, _, body = _call(
+            "POST",
+            "/api/recommendations/generate",
+            {"semester": "Freshman Spring"},
+            auth_header("nobody@example.edu"),
+        )
+        assert status == 401
+        assert body["error"] == "Unauthorized: User not found"
+
+    def test_generate_local_then_last(self, seeded_db, auth_header):
+        """Test that generated recommendations are saved and served by /last (Flask)."""
+        status, _, body = _call(
+            "POST",
+            "/api/recommendations/generate",
+            {"semester": "Freshman Spring", "mode": "local"},
+            auth_header(),
+        )
+        assert status == 200
+        assert body["source"] == "local"
+        codes = {course["course_code"] for course in body["courses"]}
+        assert codes and not codes & {"CSCI-UA.0101", "CSCI-UA.0004"}
+
+        status, _, last = _call(
+            "GET",
+            "/api/recommendations/last",
+            headers=auth_header(),
+            query="semester=Freshman+Spring",
+        )
+        assert status == 200
+        assert last["courses"] == body["courses"]
+        assert last["stale"] is False
+
+    def test_generate_llm(self, seeded_db, auth_header):
+        """Test that llm mode awaits the async OpenAI path under admission control."""
+        from api import llm_service
+
+        courses = [
+            {
+                "course_code": "CSCI-UA.0102",
+                "title": "Data Structures",
+                "credits": 4,
+                "reasoning": "r",
+            }
+        ]
+
+        async def fake_generate(**kwargs):
+            return courses
+
+        with patch.object(
+            llm_service, "generate_course_recommendations_async", fake_generate
+        ):
+            status, _, body = _call(
+                "POST",
+                "/api/recommendations/generate",
+                {"semester": "Freshman Spring", "mode": "llm"},
+                auth_header(),
+            )
+
+        assert status == 200
+        assert body == {"courses": courses, "source": "llm"}
+
+    def test_generate_rejected(self, seeded_db, auth_header):
+        """Test that an over-quota request gets 429 with a Retry-After header."""
+        from api import admission
+
+        with patch.object(
+            admission,
+            "check_quota",
+            side_effect=admission.AdmissionRejected(429, "Too many requests", 7),
+        ):
+            status, headers, body = _call(
+                "POST",
+                "/api/recommendations/generate",
+                {"semester": "Freshman Spring", "mode": "llm"},
+                auth_header(),
+            )
+
+        assert status == 429
+        assert headers["retry-after"] == "7"
+        assert body["retry_after"] == 7
+
+    def test_generate_invalid_request(self, seeded_db, auth_header):
+        """Test that validation errors match the Flask view."""
+        status, _, body = _call(
+            "POST", "/api/recommendations/generate", {"mode": "local"}, auth_header()
+        )
+
+        assert status == 400
+        assert body["error"] == "Missing required field: semester"
+
+    def test_generate_plan_local(self, seeded_db, auth_header):
+        """Test that a local plan covers every semester without planned courses."""
+        status, _, body = _call(
+            "POST",
+            "/api/recommendations/generate-plan",
+            {"mode": "local", "semesters": ["Freshman Spring", "Sophomore Fall"]},
+            auth_header(),
+        )
+
+        assert status == 200
+        assert body["source"] == "local"
+        assert [s["semester"] for s in body["semesters"]] == [
+            "Freshman Spring",
+            "Sophomore Fall",
+        ]
+
+
+class TestWSGIFallback:
+    """Tests for requests passed to the Flask app."""
+
+    def test_flask_route(self, seeded_db):
+        """Test that other routes reach Flask with their body and headers."""
+        status, headers, body = _call(
+            "POST", "/auth/login", {"email": "ada@example.edu"}
+        )
+
+        assert status == 400
+        assert headers["content-type"] == "application/json"
+        assert body == {"error": "Missing email or password"}
+
+    def test_profile(self, seeded_db, auth_header):
+        """Test that the profile is served by Flask without sensitive fields."""
+        status, _, body = _call("GET", "/api/user/profile", headers=auth_header())
+
+        assert status == 200
+        assert body["email"] == "ada@example.edu"
+        assert "password" not in body
+
+    def test_load_plans(self, seeded_db, auth_header):
+        """Test that query strings and auth headers reach Flask."""
+        status, _, body = _call("GET", "/api/plans/load", headers=auth_header())
+
+        assert status == 200
+        assert body == {"Freshman Fall": ["CSCI-UA.0004 Web Design (4 credits)"]}
+
+
+def _fake_async_client(content):
+    usage = SimpleNamespace(
+        prompt_tokens=900,
+        completion_tokens=100,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=512),
+    )
+    response = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=usage,
+    )
+
+    async def create(**kwargs):
+        await asyncio.sleep(0)
+        return response
+
+    return SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+
+
+class TestAsyncServices:
+    """Tests for the async paths used by the ASGI handlers."""
+
+    def test_request_courses_async(self, make_course):
+        """Test that the async call path validates courses like the sync one."""
+        from api import llm_service
+
+        course = make_course("CSCI-UA.0102", "Data Structures")
+        content = json.dumps(
+            {
+                "courses": [
+                    {
+                        "course_code": "CSCI-UA.0102",
+                        "title": "?",
+                        "credits": 4,
+                        "reasoning": "r",
+                    },
+                    {
+                        "course_code": "CSCI-UA.9999",
+                        "title": "?",
+                        "credits": 4,
+                        "reasoning": "r",
+                    },
+                ]
+            }
+        )
+        with patch.object(llm_service, "async_client", _fake_async_client(content)):
+            valid, invalid, response = asyncio.run(
+                llm_service._run_calls_async(
+                    llm_service._request_courses(
+                        [{"role": "user", "content": "hi"}],
+                        "gpt-test",
+                        [course],
+                        [],
+                        {"CSCI-UA.0102": course},
+                    )
+                )
+            )
+
+        assert [c["course_code"] for c in valid] == ["CSCI-UA.0102"]
+        assert valid[0]["title"] == "Data Structures"
+        assert invalid[0][0] == "CSCI-UA.9999"
+        assert response is not None
+
+    def test_generate_plan_async_fanout(self, make_course):
+        """Test that the async fan-out runs one call per semester."""
+        from api import llm_service, plan_recommender
+
+        catalog = [
+            make_course("CSCI-UA.0101", "Introduction to Computer Science"),
+            make_course("CSCI-UA.0102", "Data Structures", ["CSCI-UA.0101"]),
+            make_course("CSCI-UA.0004", "Web Design"),
+        ]
+        calls = []
+
+        async def fake_generate(**kwargs):
+            calls.append(kwargs["semester_info"]["semester"])
+            return [
+                {
+                    "course_code": c["course_code"],
+                    "title": c["title"],
+                    "credits": 4,
+                    "reasoning": "r",
+                }
+                for c in kwargs["available_courses"][:1]
+            ]
+
+        student = {"name": "Ada", "major": "", "completed_courses": []}
+        with patch.object(
+            llm_service, "generate_course_recommendations_async", fake_generate
+        ):
+            plan = asyncio.run(
+                plan_recommender.generate_plan_async(
+                    student,
+                    [],
+                    ["Freshman Fall", "Freshman Spring"],
+                    catalog,
+                    strategy="fanout",
+                )
+            )
+
+        assert sorted(calls) == ["Freshman Fall", "Freshman Spring"]
+        assert set(plan) == {"Freshman Fall", "Freshman Spring"}
+
+    def test_admit_async_releases_slot(self):
+        """Test that admit_async holds a slot only inside the block."""
+        from api import admission
+
+        backend = admission.MemoryBackend(1)
+
+        async def run():
+            async with admission.admit_async("ada@example.edu"):
+                held = backend.active_slots()
+            return held
+
+        with patch.object(admission, "_backend", backend), patch.object(
+            admission, "LLM_USER_REQUESTS_PER_MINUTE", 0
+        ):
+            held = asyncio.run(run())
+
+        assert held == 1
+        assert backend.active_slots() == 0
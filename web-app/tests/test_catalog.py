@@ -0,0 +1,317 @@
+"""
+test_catalog.py
+
+Unit tests for catalog.py (memory-mapped catalog snapshot) and the snapshot
+paths in course_filtering, course_routes and major_requirements.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.fixture
+def seed_courses():
+    """The bundled sample catalog."""
+    from database.app_db import load_courses
+
+    return load_courses()
+
+
+@pytest.fixture
+def snapshot(seed_courses, tmp_path):
+    """Snapshot of the sample catalog."""
+    from api import catalog, course_filtering
+
+    path = str(tmp_path / "catalog.snap")
+    catalog.write_snapshot(
+        seed_courses, course_filtering.get_catalog_version(seed_courses), 1, path
+    )
+    snapshot = catalog.CatalogSnapshot(path)
+    yield snapshot
+    snapshot.close()
+
+
+class TestCatalogSnapshot:
+    """Tests for write_snapshot and CatalogSnapshot."""
+
+    def test_round_trip(self, seed_courses, snapshot):
+        """Test that every course reads back equal, in catalog order."""
+        from api import course_filtering
+        from api.course import Course
+
+        assert len(snapshot) == len(seed_courses)
+        assert isinstance(snapshot[0], Course)
+        assert list(snapshot) == seed_courses
+        assert snapshot.meta_version == 1
+        assert snapshot.catalog_version == course_filtering.get_catalog_version(
+            seed_courses
+        )
+
+    def test_unusual_values_round_trip(self, tmp_path):
+        """Test that values outside the fixed-width layout are kept as extras."""
+        from api import catalog
+
+        courses = [
+            {
+                "_id": "ignored",
+                "course_code": "CSCI-UA.0480-041",
+                "title": "Special Topics",
+                "difficulty": 4.5,
+                "credits": 2.5,
+                "prerequisites": {
+                    "logic": "or",
+                    "courses": ["CSCI-UA.0201", "CSCI-UA.0202"],
+                },
+                "semester_offered": ["Spring", "Fall"],
+                "instructor": "Staff",
+            },
+            {"course_code": "CSCI-UA.0002", "title": "Intro", "prerequisites": "none"},
+        ]
+        path = str(tmp_path / "catalog.snap")
+        catalog.write_snapshot(courses, "v", 7, path)
+        snapshot = catalog.CatalogSnapshot(path)
+
+        expected = dict(courses[0])
+        del expected["_id"]
+        assert snapshot[0] == expected
+        assert snapshot[1] == courses[1]
+        assert snapshot.prerequisites(0) == courses[0]["prerequisites"]
+        assert snapshot.offered_in(0, "Fall") and not snapshot.offered_in(0, "Summer")
+        assert snapshot.credits(0) == 2.5
+        assert snapshot.credits(1) == 4
+
+    def test_lookup_by_code(self, seed_courses, snapshot):
+        """Test binary search by course code and the index mapping."""
+        position = snapshot.position("CSCI-UA.0102")
+
+        assert seed_courses[position]["course_code"] == "CSCI-UA.0102"
+        assert snapshot.position("CSCI-UA.9999") == -1
+        assert snapshot.get("CSCI-UA.9999") is None
+        assert (
+            snapshot.index["MATH-UA.0121"]["title"]
+            == snapshot.get("MATH-UA.0121")["title"]
+        )
+        assert "CSCI-UA.9999" not in snapshot.index
+
+    def test_duplicate_codes_first_wins(self, tmp_path):
+        """Test that lookups return the first course with a code, like get_catalog_index."""
+        from api import catalog
+
+        courses = [
+            {"course_code": "B", "title": "first"},
+            {"course_code": "A", "title": "a"},
+            {"course_code": "B", "title": "second"},
+        ]
+        path = str(tmp_path / "catalog.snap")
+        catalog.write_snapshot(courses, "v", 1, path)
+
+        assert catalog.CatalogSnapshot(path).get("B")["title"] == "first"
+
+    @pytest.mark.parametrize(
+        "query", ["csci-ua.01", "calculus", "THEORY", "0480", "zzz"]
+    )
+    def test_search_matches_scan(self, seed_courses, snapshot, query):
+        """Test that search finds the same courses as scanning code and title."""
+        expected = [
+            position
+            for position, course in enumerate(seed_courses)
+            if query.lower() in course["course_code"].lower()
+            or query.lower() in course["title"].lower()
+        ]
+
+        assert snapshot.search(query) == expected
+
+
+class TestSnapshotConsumers:
+    """Tests that snapshot paths return the same results as course lists."""
+
+    @pytest.mark.parametrize(
+        "completed, semester",
+        [
+            ([], "Freshman Fall"),
+            (["CSCI-UA.0101"], "Sophomore Spring"),
+            (["CSCI-UA.0101", "CSCI-UA.0102", "MATH-UA.0121"], "Junior Summer"),
+            (["CSCI-UA.0002"], "Gap Year"),
+        ],
+    )
+    def test_available_courses(self, seed_courses, snapshot, completed, semester):
+        """Test get_available_courses_for_semester on a snapshot."""
+        from api.course_filtering import get_available_courses_for_semester
+
+        assert get_available_courses_for_semester(
+            completed, semester, snapshot, "Computer Science"
+        ) == get_available_courses_for_semester(
+            completed, semester, seed_courses, "Computer Science"
+        )
+
+    def test_course_lookup_and_version(self, seed_courses, snapshot):
+        """Test get_course_by_code, get_catalog_index and get_catalog_version."""
+        from api import course_filtering
+
+        assert course_filtering.get_course_by_code(
+            "CSCI-UA.0201", snapshot
+        ) == course_filtering.get_course_by_code("CSCI-UA.0201", seed_courses)
+        index = course_filtering.get_catalog_index(snapshot, snapshot.catalog_version)
+        assert dict(index) == course_filtering.get_catalog_index(seed_courses)
+        assert (
+            course_filtering.get_catalog_version(snapshot) == snapshot.catalog_version
+        )
+
+    def test_major_requirements(self, seed_courses, snapshot):
+        """Test elective matching in major_requirements on a snapshot."""
+        from api.major_requirements import (
+            get_major_progress,
+            get_remaining_requirements,
+        )
+
+        completed = ["CSCI-UA.0101", "CSCI-UA.0102", "CSCI-UA.0472"]
+        assert get_remaining_requirements(
+            "Computer Science", completed, snapshot
+        ) == get_remaining_requirements("Computer Science", completed, seed_courses)
+        assert get_major_progress(
+            "Computer Science", completed, snapshot
+        ) == get_major_progress("Computer Science", completed, seed_courses)
+
+    def test_search_route(self, snapshot):
+        """Test that /api/courses/search serves matches from the snapshot."""
+        from api.app import app
+
+        with patch("api.course_routes.get_all_courses_from_db", return_value=snapshot):
+            response = app.test_client().get(
+                "/api/courses/search?q=csci-ua.010&limit=2"
+            )
+
+        assert response.status_code == 200
+        assert [c["course_code"] for c in response.get_json()["courses"]] == [
+            "CSCI-UA.0101",
+            "CSCI-UA.0102",
+        ]
+
+
+class TestGetSnapshot:
+    """Tests for get_snapshot (loading, rebuilding, version checks)."""
+
+    @pytest.fixture
+    def published_db(self, mock_db, seed_courses):
+        """Catalog published at catalog_meta version 1."""
+        from api import catalog
+
+        mock_db.courses.insert_many([dict(course) for course in seed_courses])
+        mock_db.catalog_meta.insert_one({"_id": "courses", "version": 1})
+        with patch.object(catalog, "_snapshot", None), patch.object(
+            catalog, "_snapshot_checked", 0.0
+        ):
+            yield mock_db
+
+    def test_unpublished_catalog(self, mock_db, tmp_path):
+        """Test that there is no snapshot without a published catalog."""
+        from api import catalog
+
+        with patch.object(catalog, "_snapshot", None):
+            assert catalog.get_snapshot(mock_db, str(tmp_path / "catalog.snap")) is None
+
+    def test_builds_and_reuses(self, published_db, seed_courses, tmp_path):
+        """Test that a missing snapshot is built once and then reused."""
+        from api import catalog
+
+        path = str(tmp_path / "catalog.snap")
+        snapshot = catalog.get_snapshot(published_db, path)
+
+        assert list(snapshot) == seed_courses
+        assert snapshot.meta_version == 1
+        assert catalog.get_snapshot(published_db, path) is snapshot
+
+    def test_rebuilds_on_new_version(self, published_db, tmp_path):
+        """Test that a new catalog_meta version replaces the snapshot."""
+        from api import catalog
+
+        path = str(tmp_path / "catalog.snap")
+        first = catalog.get_snapshot(published_db, path)
+        published_db.courses.delete_one({"course_code": "CSCI-UA.0002"})
+        published_db.catalog_meta.update_one(
+            {"_id": "courses"}, {"$inc": {"version": 1}}
+        )
+        with patch.object(catalog, "CATALOG_SNAPSHOT_CHECK_SECONDS", 0):
+            second = catalog.get_snapshot(published_db, path)
+
+        assert second.meta_version == 2
+        assert len(second) == len(first) - 1
+        assert second.get("CSCI-UA.0002") is None
+
+    def test_rebuilds_for_other_database(self, published_db, tmp_path):
+        """Test that a snapshot written from another database is not served."""
+        from api import catalog
+
+        path = str(tmp_path / "catalog.snap")
+        catalog.write_snapshot([{"course_code": "X-1"}], "v", 1, path, "other_app")
+
+        snapshot = catalog.get_snapshot(published_db, path)
+
+        assert snapshot.db_name == published_db.name
+        assert snapshot.get("X-1") is None
+        assert snapshot.get("CSCI-UA.0002") is not None
+
+    def test_rebuilds_on_content_hash_change(self, published_db, tmp_path):
+        """Test that the same version with another content hash is rebuilt."""
+        from api import catalog
+
+        path = str(tmp_path / "catalog.snap")
+        catalog.write_snapshot(
+            [{"course_code": "X-1"}], "v", 1, path, published_db.name, "old-hash"
+        )
+        published_db.catalog_meta.update_one(
+            {"_id": "courses"}, {"$set": {"content_hash": "new-hash"}}
+        )
+
+        snapshot = catalog.get_snapshot(published_db, path)
+
+        assert snapshot.content_hash == "new-hash"
+        assert snapshot.get("X-1") is None
+
+    def test_built_after_publish(self, mock_db, tmp_path):
+        """Test that a catalog published by the seeder is picked up by the app."""
+        from api import catalog
+        from database.app_db import publish_catalog
+
+        path = str(tmp_path / "catalog.snap")
+        with patch.object(catalog, "_snapshot", None):
+            publish_catalog(mock_db, [{"course_code": "A-1", "title": "A"}])
+            snapshot = catalog.get_snapshot(mock_db, path)
+
+        assert snapshot.meta_version == 1
+        assert snapshot.content_hash == mock_db.catalog_meta.find_one()["content_hash"]
+        assert list(snapshot) == [{"course_code": "A-1", "title": "A"}]
+
+    def test_default_path_per_database(self, mock_db, tmp_path):
+        """Test that databases get separate snapshot files by default."""
+        from mongomock import MongoClient
+
+        from api import catalog
+
+        other_db = MongoClient()["other/app"]
+        with patch.object(catalog, "CATALOG_SNAPSHOT_PATH", None), patch(
+            "tempfile.gettempdir", return_value=str(tmp_path)
+        ):
+            paths = {catalog.snapshot_path(mock_db), catalog.snapshot_path(other_db)}
+        with patch.object(catalog, "CATALOG_SNAPSHOT_PATH", "/srv/catalog.snap"):
+            configured = catalog.snapshot_path(mock_db)
+
+        assert paths == {
+            str(tmp_path / "course_catalog-test_course_planner.snap"),
+            str(tmp_path / "course_catalog-other_app.snap"),
+        }
+        assert configured == "/srv/catalog.snap"
+
+    def test_served_by_get_all_courses(self, published_db, tmp_path):
+        """Test that get_all_courses_from_db returns the snapshot when enabled."""
+        from api import catalog, course_filtering
+
+        with patch.object(course_filtering, "db", published_db), patch.object(
+            catalog, "CATALOG_SNAPSHOT", True
+        ), patch.object(
+            catalog, "CATALOG_SNAPSHOT_PATH", str(tmp_path / "catalog.snap")
+        ):
+            courses = course_filtering.get_all_courses_from_db()
+
+        assert isinstance(courses, catalog.CatalogSnapshot)
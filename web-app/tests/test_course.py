@@ -0,0 +1,125 @@
+"""
+test_course.py
+
+Unit tests for course.py (immutable Course records).
+"""
+
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def course_doc():
+    """A course as stored in MongoDB."""
+    from bson import ObjectId
+
+    return {
+        "_id": ObjectId(),
+        "course_code": "CSCI-UA.0201",
+        "title": "Computer Systems Organization",
+        "subject": "CSCI",
+        "credits": 4,
+        "prerequisites": ["CSCI-UA.0102"],
+        "semester_offered": ["Fall", "Spring"],
+        "instructor": "Staff",
+    }
+
+
+class TestCourse:
+    """Tests for Course."""
+
+    def test_from_dict(self, course_doc):
+        """Test that fields read back like the document, without _id."""
+        from api.course import Course
+
+        course = Course.from_dict(course_doc)
+
+        assert course["course_code"] == "CSCI-UA.0201"
+        assert course.get("prerequisites") == ("CSCI-UA.0102",)
+        assert course.get("semester_offered") == ("Fall", "Spring")
+        assert course.get("instructor") == "Staff"
+        assert course.get("difficulty", 0) == 0
+        assert "difficulty" not in course and "_id" not in course
+        assert len(course) == len(course_doc) - 1
+        with pytest.raises(KeyError):
+            course["description"]  # pylint: disable=pointless-statement
+
+    def test_equal_to_plain_dict(self, course_doc):
+        """Test that a course equals its document and round-trips through to_dict."""
+        from api.course import Course
+
+        del course_doc["_id"]
+        course = Course.from_dict(course_doc)
+
+        assert course == course_doc
+        assert course.to_dict() == course_doc
+        assert Course.from_dict(course.to_dict()) == course
+
+    def test_immutable(self, course_doc):
+        """Test that fields cannot be set or deleted."""
+        from api.course import Course
+
+        course = Course.from_dict(course_doc)
+
+        with pytest.raises(AttributeError):
+            course.title = "Changed"
+        with pytest.raises(AttributeError):
+            del course.title
+        with pytest.raises(TypeError):
+            course["title"] = (
+                "Changed"  # pylint: disable=unsupported-assignment-operation
+            )
+
+    def test_shared_values(self, course_doc):
+        """Test that codes are interned and offerings tuples shared."""
+        from api.course import Course
+
+        first = Course.from_dict(course_doc)
+        second = Course.from_dict(
+            dict(course_doc, course_code="".join(["CSCI-UA.", "0201"]))
+        )
+
+        assert first.course_code is second.course_code
+        assert first.semester_offered is second.semester_offered
+
+    def test_prerequisite_logic(self):
+        """Test that logic prerequisites become an immutable mapping."""
+        from api.course import Course, PrerequisiteLogic, to_plain
+
+        prerequisites = {"logic": "or", "courses": ["MATH-UA.0121", "MATH-UA.0131"]}
+        course = Course.from_dict({"course_code": "X", "prerequisites": prerequisites})
+
+        assert isinstance(course["prerequisites"], PrerequisiteLogic)
+        assert course["prerequisites"]["courses"] == ("MATH-UA.0121", "MATH-UA.0131")
+        assert course["prerequisites"] == prerequisites
+        assert to_plain(course["prerequisites"]) == prerequisites
+
+    def test_smaller_than_documents(self):
+        """Test that the catalog takes less memory as Course records than as documents."""
+        from bson import ObjectId
+
+        from api.course import Course
+        from database.app_db import load_courses
+
+        documents = [dict(course, _id=ObjectId()) for course in load_courses()]
+        courses = [Course.from_dict(document) for document in documents]
+
+        assert _container_size(courses) < _container_size(documents) * 0.75
+
+
+def _container_size(value, seen=None) -> int:
+    """Size of the containers (and ObjectIds) reachable from a value, each counted once."""
+    from collections.abc import Mapping
+
+    from bson import ObjectId
+
+    seen = set() if seen is None else seen
+    if id(value) in seen or not isinstance(value, (list, tuple, Mapping, ObjectId)):
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    items = value.values() if isinstance(value, Mapping) else value
+    if not isinstance(value, ObjectId):
+        size += sum(_container_size(item, seen) for item in items)
+    return size
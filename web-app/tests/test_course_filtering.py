@@ -0,0 +1,142 @@
+"""
+test_course_filtering.py
+
+Unit tests for course_filtering.py (catalog versioning, indexing and Course
+records).
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.fixture
+def sample_courses():
+    """Minimal course catalog."""
+    return [
+        {"course_code": "CSCI-UA.0101", "title": "Intro to CS", "credits": 4},
+        {"course_code": "CSCI-UA.0102", "title": "Data Structures", "credits": 4},
+    ]
+
+
+class TestGetCatalogVersion:
+    """Tests for get_catalog_version function."""
+
+    def test_get_catalog_version_stable(self, sample_courses):
+        """Test that the version ignores ordering and non-content fields."""
+        from api.course_filtering import get_catalog_version
+
+        reordered = [dict(c, _id=i) for i, c in enumerate(reversed(sample_courses))]
+
+        assert get_catalog_version(sample_courses) == get_catalog_version(reordered)
+
+    def test_get_catalog_version_changes_with_content(self, sample_courses):
+        """Test that editing a course changes the version."""
+        from api.course_filtering import get_catalog_version
+
+        before = get_catalog_version(sample_courses)
+        sample_courses[1]["credits"] = 2
+
+        assert get_catalog_version(sample_courses) != before
+
+
+class TestGetCatalogIndex:
+    """Tests for get_catalog_index function."""
+
+    def test_get_catalog_index_lookup(self, sample_courses):
+        """Test looking up courses by code."""
+        from api.course_filtering import get_catalog_index
+
+        index = get_catalog_index(sample_courses)
+
+        assert index["CSCI-UA.0102"]["title"] == "Data Structures"
+        assert "CSCI-UA.9999" not in index
+
+    def test_get_catalog_index_reused_per_version(self, sample_courses):
+        """Test that the index is built once per catalog version."""
+        from api.course_filtering import get_catalog_index, get_catalog_version
+
+        version = get_catalog_version(sample_courses)
+        first = get_catalog_index(sample_courses, version)
+
+        assert get_catalog_index(sample_courses, version) is first
+        assert get_catalog_index(sample_courses[:1], "other-version") is not first
+
+
+class TestCourseRecords:
+    """Tests for the Course records served to the filtering pipeline."""
+
+    def test_courses_built_once_per_version(self, mock_db, sample_courses):
+        """Test that the published catalog is fetched and built once per version."""
+        from api import course_filtering
+        from api.course import Course
+
+        mock_db.courses.insert_many(sample_courses)
+        mock_db.catalog_meta.insert_one({"_id": "courses", "version": 1})
+        with patch.object(course_filtering, "db", mock_db):
+            first = course_filtering.get_all_courses_from_db()
+            assert course_filtering.get_all_courses_from_db() is first
+
+            mock_db.catalog_meta.update_one(
+                {"_id": "courses"}, {"$inc": {"version": 1}}
+            )
+            second = course_filtering.get_all_courses_from_db()
+
+        assert second is not first
+        assert all(isinstance(course, Course) for course in second)
+        assert [course["course_code"] for course in second] == [
+            "CSCI-UA.0101",
+            "CSCI-UA.0102",
+        ]
+
+    def test_math_courses_built_once(self):
+        """Test that normalized math courses are reused across requests."""
+        from api.course_filtering import (
+            _get_math_courses_for_semester,
+            get_course_by_code,
+        )
+
+        first = _get_math_courses_for_semester("Freshman Fall", "Computer Science")
+        second = _get_math_courses_for_semester("Sophomore Fall", "Computer Science")
+
+        assert first and all(a is b for a, b in zip(first, second))
+        assert get_course_by_code("MATH-UA.0121", []) is get_course_by_code(
+            "MATH-UA.0121", []
+        )
+        assert get_course_by_code("MATH-UA.0121", [])["title"]
+
+    def test_filters_accept_course_records(self):
+        """Test that prerequisites and offerings filters work on tuples and logic objects."""
+        from api.course import Course
+        from api.course_filtering import get_available_courses_for_semester
+
+        courses = [
+            Course.from_dict(course)
+            for course in [
+                {"course_code": "A", "prerequisites": [], "semester_offered": ["Fall"]},
+                {
+                    "course_code": "B",
+                    "prerequisites": ["A"],
+                    "semester_offered": ["Fall"],
+                },
+                {
+                    "course_code": "C",
+                    "prerequisites": {"logic": "or", "courses": ["A", "X"]},
+                    "semester_offered": ["Fall"],
+                },
+                {
+                    "course_code": "D",
+                    "prerequisites": ["A", "X"],
+                    "semester_offered": ["Fall"],
+                },
+                {
+                    "course_code": "E",
+                    "prerequisites": [],
+                    "semester_offered": ["Spring"],
+                },
+            ]
+        ]
+
+        available = get_available_courses_for_semester(["A"], "Junior Fall", courses)
+
+        assert [course["course_code"] for course in available] == ["B", "C"]
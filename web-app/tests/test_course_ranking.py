@@ -0,0 +1,158 @@
+"""
+test_course_ranking.py
+
+Unit tests for course_ranking.py (relevance ranking and candidate preselection).
+"""
+
+import pytest
+
+
+@pytest.fixture
+def sample_courses():
+    """Small catalog of eligible courses in arbitrary (database) order."""
+    return [
+        {
+            "course_code": "CSCI-UA.0004",
+            "title": "Introduction to Web Design & Computer Principles",
+            "description": "HTML, CSS and the basics of how computers work.",
+        },
+        {
+            "course_code": "CSCI-UA.0201",
+            "title": "Computer Systems Organization",
+            "description": "Machine-level programming, memory and processes.",
+        },
+        {
+            "course_code": "CSCI-UA.0473",
+            "title": "Fundamentals of Machine Learning",
+            "description": "Supervised and unsupervised learning algorithms.",
+        },
+        {
+            "course_code": "CSCI-UA.0480",
+            "title": "Special Topics: Cryptography",
+            "description": "Encryption, signatures and security protocols.",
+        },
+    ]
+
+
+class TestTokenize:
+    """Tests for tokenize function."""
+
+    def test_tokenize_drops_stopwords_and_punctuation(self):
+        """Test that tokens are lowercased and stopwords removed."""
+        from api.course_ranking import tokenize
+
+        assert tokenize("Introduction to Machine Learning!") == ["machine", "learning"]
+
+    def test_tokenize_empty(self):
+        """Test tokenizing empty or missing text."""
+        from api.course_ranking import tokenize
+
+        assert not tokenize("")
+        assert not tokenize(None)
+
+
+class TestRankCourses:
+    """Tests for rank_courses function."""
+
+    def test_rank_courses_interest_match_first(self, sample_courses):
+        """Test that courses matching the career path rank highest."""
+        from api.course_ranking import rank_courses
+
+        ranked = rank_courses(sample_courses, {"career_path": "Machine Learning"})
+
+        assert ranked[0][1]["course_code"] == "CSCI-UA.0473"
+
+    def test_rank_courses_expands_abbreviations(self, sample_courses):
+        """Test that abbreviations like 'AI/ML' match course text."""
+        from api.course_ranking import rank_courses
+
+        ranked = rank_courses(sample_courses, {"career_path": "AI/ML"})
+
+        assert ranked[0][1]["course_code"] == "CSCI-UA.0473"
+
+    def test_rank_courses_side_interests(self, sample_courses):
+        """Test that side interests contribute to the score."""
+        from api.course_ranking import rank_courses
+
+        ranked = rank_courses(sample_courses, {"side_interests": ["Cryptography"]})
+
+        assert ranked[0][1]["course_code"] == "CSCI-UA.0480"
+
+    def test_rank_courses_core_requirement_boost(self, sample_courses):
+        """Test that remaining core requirements outrank interest matches."""
+        from api.course_ranking import rank_courses
+
+        remaining = {
+            "remaining_core": [{"course_code": "CSCI-UA.0201"}],
+            "remaining_electives": {"count_needed": 0},
+        }
+        ranked = rank_courses(
+            sample_courses, {"career_path": "Machine Learning"}, remaining
+        )
+
+        assert ranked[0][1]["course_code"] == "CSCI-UA.0201"
+        assert ranked[1][1]["course_code"] == "CSCI-UA.0473"
+
+    def test_rank_courses_no_interests_keeps_order(self, sample_courses):
+        """Test that ranking is stable when nothing distinguishes courses."""
+        from api.course_ranking import rank_courses
+
+        ranked = rank_courses(sample_courses, {})
+
+        assert [c["course_code"] for _, c in ranked] == [
+            c["course_code"] for c in sample_courses
+        ]
+
+    def test_rank_courses_empty(self):
+        """Test ranking an empty course list."""
+        from api.course_ranking import rank_courses
+
+        assert not rank_courses([], {"career_path": "AI"})
+
+
+class TestSelectCandidates:
+    """Tests for select_candidates function."""
+
+    def test_select_candidates_max_candidates(self, sample_courses):
+        """Test that at most max_candidates courses are returned."""
+        from api.course_ranking import select_candidates
+
+        selected = select_candidates(
+            sample_courses, {"career_path": "Machine Learning"}, max_candidates=2
+        )
+
+        assert len(selected) == 2
+        assert selected[0]["course_code"] == "CSCI-UA.0473"
+
+    def test_select_candidates_token_budget(self, sample_courses):
+        """Test that the token budget bounds the selection."""
+        from api.course_ranking import select_candidates
+
+        selected = select_candidates(
+            sample_courses,
+            {"career_path": "Machine Learning"},
+            token_budget=10,
+            format_course=lambda course: "x" * 40,  # 10 tokens per course
+        )
+
+        assert [c["course_code"] for c in selected] == ["CSCI-UA.0473"]
+
+    def test_select_candidates_always_returns_top_course(self, sample_courses):
+        """Test that the best course is kept even if it exceeds the budget."""
+        from api.course_ranking import select_candidates
+
+        selected = select_candidates(
+            sample_courses, {"career_path": "Cryptography"}, token_budget=0
+        )
+
+        assert len(selected) == 1
+        assert selected[0]["course_code"] == "CSCI-UA.0480"
+
+    def test_select_candidates_deduplicates_codes(self, sample_courses):
+        """Test that a course listed twice is only selected once."""
+        from api.course_ranking import select_candidates
+
+        selected = select_candidates(sample_courses + [dict(sample_courses[2])], {})
+
+        codes = [c["course_code"] for c in selected]
+        assert len(codes) == len(set(codes)) == len(sample_courses)
@@ -0,0 +1,200 @@
+"""
+test_fake_openai.py
+
+End-to-end tests of llm_service against the local fake OpenAI server
+(benchmarks/fake_openai.py), using the real OpenAI client over HTTP.
+"""
+
+import json
+import random
+from unittest.mock import patch
+
+import pytest
+
+OpenAI = pytest.importorskip("openai").OpenAI
+
+
+@pytest.fixture
+def catalog():
+    """Small course catalog."""
+    return [
+        {
+            "course_code": code,
+            "title": title,
+            "credits": 4,
+            "difficulty": 3,
+            "prerequisites": [],
+            "semester_offered": ["Fall", "Spring"],
+            "description": title,
+        }
+        for code, title in [
+            ("CSCI-UA.0102", "Data Structures"),
+            ("CSCI-UA.0201", "Computer Systems Organization"),
+            ("CSCI-UA.0473", "Fundamentals of Machine Learning"),
+            ("CSCI-UA.0480-073", "Special Topics: Cryptography"),
+            ("CSCI-UA.0004", "Web Design"),
+        ]
+    ]
+
+
+@pytest.fixture
+def student():
+    """Student profile."""
+    return {
+        "name": "Test",
+        "major": "Computer Science",
+        "year": "Sophomore",
+        "completed_courses": ["CSCI-UA.0101"],
+        "interests": [],
+        "career_path": "AI",
+        "side_interests": [],
+    }
+
+
+@pytest.fixture
+def fake_server():
+    """Factory starting fake servers that are shut down after the test."""
+    from benchmarks.fake_openai import start_server
+
+    servers = []
+
+    def start(**options):
+        server = start_server(**options)
+        servers.append(server)
+        return server
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _client(server):
+    return OpenAI(base_url=server.base_url, api_key="test-key", max_retries=0)
+
+
+def _generate(student, catalog):
+    from api import llm_service
+
+    return llm_service.generate_course_recommendations(
+        student_info=student,
+        available_courses=catalog,
+        major_requirements=None,
+        major_progress=None,
+        remaining_requirements=None,
+        semester_info={"semester": "Junior Fall"},
+        catalog_version="test-v1",
+        all_courses=catalog,
+    )
+
+
+class TestParseLatency:
+    """Tests for latency distribution specs."""
+
+    def test_parse_latency_distributions(self):
+        """Test that every distribution samples non-negative latencies."""
+        from benchmarks.fake_openai import parse_latency
+
+        rng = random.Random(0)
+        for spec in [
+            "fixed:0.5",
+            "uniform:0.1,0.2",
+            "normal:0.5,0.1",
+            "lognormal:0.5,0.5",
+            "bimodal:0.1,2,0.5",
+        ]:
+            assert parse_latency(spec)(rng) >= 0
+        assert parse_latency("fixed:0.5")(rng) == 0.5
+
+    def test_parse_latency_invalid(self):
+        """Test that unknown specs are rejected."""
+        from benchmarks.fake_openai import parse_latency
+
+        with pytest.raises(ValueError):
+            parse_latency("gamma:1")
+
+
+class TestEndToEnd:
+    """Tests of generate_course_recommendations over HTTP."""
+
+    def test_generate_recommendations(self, fake_server, student, catalog):
+        """Test that the synthesized response passes validation."""
+        from api import llm_service
+
+        server = fake_server()
+        with patch.object(llm_service, "client", _client(server)):
+            courses = _generate(student, catalog)
+
+        assert courses
+        codes = {c["course_code"] for c in catalog}
+        assert all(c["course_code"] in codes for c in courses)
+        assert courses[0]["title"] != courses[0]["course_code"]  # filled from catalog
+
+    def test_streaming(self, fake_server, student, catalog):
+        """Test that streamed responses are assembled and time to first token recorded."""
+        from api import llm_service
+
+        server = fake_server()
+        with patch.object(llm_service, "client", _client(server)), patch.object(
+            llm_service, "OPENAI_STREAM", True
+        ):
+            courses = _generate(student, catalog)
+
+        assert courses
+        assert server.stats["streamed"] >= 1
+        models = llm_service.get_model_stats()
+        assert any(m["p50_first_token_seconds"] is not None for m in models.values())
+
+    def test_injected_errors(self, fake_server, student, catalog):
+        """Test that API errors make generation return None."""
+        from api import llm_service
+
+        server = fake_server(error_rate=1.0, error_status=503)
+        with patch.object(llm_service, "client", _client(server)):
+            assert _generate(student, catalog) is None
+        assert server.stats["errors"] == 1
+
+    def test_invalid_items_repaired(self, fake_server, student, catalog):
+        """Test that injected hallucinated codes are dropped and repaired."""
+        from api import llm_service
+
+        server = fake_server(invalid_rate=0.5, seed=3)
+        with patch.object(llm_service, "client", _client(server)):
+            courses = _generate(student, catalog)
+
+        assert courses
+        assert all(c["course_code"] != "CSCI-UA.9999" for c in courses)
+        assert server.stats["requests"] >= 2
+
+
+class TestRecordReplay:
+    """Tests for recording responses and replaying them."""
+
+    def test_record_then_replay(self, fake_server, tmp_path, student, catalog):
+        """Test that a recorded response is replayed for the same request."""
+        from api import llm_service
+
+        upstream = fake_server()
+        recorder = fake_server(record_dir=str(tmp_path), upstream=upstream.base_url)
+        with patch.object(llm_service, "client", _client(recorder)):
+            recorded = _generate(student, catalog)
+
+        files = list(tmp_path.glob("*.json"))
+        assert len(files) == 1
+        assert "request" in json.loads(files[0].read_text())
+
+        replayer = fake_server(replay_dir=str(tmp_path))
+        with patch.object(llm_service, "client", _client(replayer)):
+            replayed = _generate(student, catalog)
+
+        assert replayed == recorded
+        assert replayer.stats["replayed"] == 1
+
+    def test_replay_missing_recording(self, fake_server, tmp_path, student, catalog):
+        """Test that requests without a recording fail instead of calling out."""
+        from api import llm_service
+
+        replayer = fake_server(replay_dir=str(tmp_path))
+        with patch.object(llm_service, "client", _client(replayer)):
+            assert _generate(student, catalog) is None
@@ -0,0 +1,73 @@
+"""
+test_import_time.py
+
+Import-time budgets, measured with python -X importtime in a fresh
+interpreter: importing the app must not parse the catalog, hash passwords,
+import the OpenAI SDK or open database connections.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+WEB_APP_DIR = os.path.join(os.path.dirname(__file__), "..")
+
+# Cumulative import time budgets in microseconds; generous so slow CI
+# machines pass, small enough to catch import-time work coming back
+# (catalog literal + bcrypt took ~850ms, the OpenAI SDK ~700ms)
+IMPORT_BUDGETS_US = {
+    "api.app": 900_000,
+    "database.app_db": 450_000,
+}
+# Budget for database.app_db's own code, excluding the modules it imports
+APP_DB_SELF_BUDGET_US = 100_000
+# Modules that must only be imported when first used
+LAZY_MODULES = ["openai", "mongomock"]
+
+
+def _import_times(module):
+    """Import a module in a fresh interpreter; return {name: (self_us, cumulative_us)}."""
+    env = dict(
+        os.environ,
+        MONGO_URI="mongodb://localhost:27017",
+        MONGO_DB_NAME="test_course_planner",
+        OPENAI_API_KEY="test-key",
+    )
+    command = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    # The first run writes .pyc files; measure the second one
+    subprocess.run(command, cwd=WEB_APP_DIR, env=env, capture_output=True, check=True)
+    result = subprocess.run(
+        command, cwd=WEB_APP_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+class TestImportTime:
+    """Tests for import-time side effects."""
+
+    @pytest.mark.parametrize("module", sorted(IMPORT_BUDGETS_US))
+    def test_import_budget(self, module):
+        """Test that importing the module stays within its budget."""
+        _, cumulative_us = _import_times(module)[module]
+
+        assert cumulative_us < IMPORT_BUDGETS_US[module]
+
+    def test_app_db_does_no_work_at_import(self):
+        """Test that the catalog is not parsed and passwords not hashed at import."""
+        self_us, _ = _import_times("database.app_db")["database.app_db"]
+
+        assert self_us < APP_DB_SELF_BUDGET_US
+
+    def test_clients_created_on_first_use(self):
+        """Test that the app imports neither the OpenAI SDK nor mongomock."""
+        imported = {name.split(".")[0] for name in _import_times("api.app")}
+
+        assert not imported & set(LAZY_MODULES)
@@ -0,0 +1,222 @@
+"""
+test_ingest.py
+
+Unit tests for database/ingest.py (streaming course ingestion).
+"""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from mongomock import MongoClient
+from mongomock.collection import Collection
+
+
+def _bulk_write(self, requests, ordered=True):
+    """bulk_write for mongomock, whose own one rejects current pymongo UpdateOne objects."""
+    upserted = modified = 0
+    for request in requests:
+        # pylint: disable=protected-access
+        result = self.update_one(request._filter, request._doc, upsert=request._upsert)
+        upserted += result.upserted_id is not None
+        modified += result.modified_count
+    return SimpleNamespace(
+        bulk_api_result={"nUpserted": upserted, "nModified": modified}
+    )
+
+
+@pytest.fixture
+def mock_db():
+    """Fixture for in-memory MongoDB."""
+    client = MongoClient()
+    db = client["test_course_planner"]
+    with patch.object(Collection, "bulk_write", _bulk_write):
+        yield db
+    client.drop_database("test_course_planner")
+
+
+def _record(code, title="Course", **fields):
+    return {"course_code": code, "title": title, **fields}
+
+
+class TestNormalizeRecord:
+    """Tests for canonicalize_course_code and normalize_record."""
+
+    @pytest.mark.parametrize(
+        "raw, expected",
+        [
+            ("CSCI-UA.0101", "CSCI-UA.0101"),
+            (" csci-ua 101 ", "CSCI-UA.0101"),
+            ("MATH-UA.9", "MATH-UA.0009"),
+            ("CSCI-UA.480-41", "CSCI-UA.0480-041"),
+        ],
+    )
+    def test_canonical_codes(self, raw, expected):
+        """Test that code variants map to the catalog's format."""
+        from database.ingest import canonicalize_course_code
+
+        assert canonicalize_course_code(raw) == expected
+
+    def test_full_record(self):
+        """Test that fields are normalized to the catalog's course shape."""
+        from database.ingest import normalize_record
+
+        course = normalize_record(
+            _record(
+                "csci-ua 102",
+                "  Data   Structures ",
+                credits="4",
+                difficulty="3",
+                prerequisites="CSCI-UA.101; csci-ua.0101 | CSCI-UA.0102",
+                semester_offered=["fall", "SPRING", "Fall"],
+            )
+        )
+
+        assert course == {
+            "course_code": "CSCI-UA.0102",
+            "title": "Data Structures",
+            "type": "",
+            "subject": "CSCI-UA",
+            "description": "",
+            "credits": 4,
+            "difficulty": 3,
+            "prerequisites": ["CSCI-UA.0101"],
+            "semester_offered": ["Fall", "Spring"],
+        }
+
+    def test_credit_ranges_kept(self):
+        """Test that credit ranges stay strings, as in the seeded catalog."""
+        from database.ingest import normalize_record
+
+        assert (
+            normalize_record(_record("MATH-UA.0997", credits="1 - 4"))["credits"]
+            == "1 - 4"
+        )
+
+    @pytest.mark.parametrize(
+        "record",
+        [
+            _record("not a code"),
+            _record("CSCI-UA.0101", ""),
+            _record("CSCI-UA.0101", credits="four"),
+            _record("CSCI-UA.0101", difficulty=9),
+            _record("CSCI-UA.0101", semester_offered="Autumn"),
+            _record("CSCI-UA.0101", prerequisites="???"),
+            ["CSCI-UA.0101"],
+        ],
+    )
+    def test_invalid_records_rejected(self, record):
+        """Test that invalid records raise RecordRejected."""
+        from database.ingest import RecordRejected, normalize_record
+
+        with pytest.raises(RecordRejected):
+            normalize_record(record)
+
+
+class TestIterRecords:
+    """Tests for iter_records."""
+
+    def test_jsonl(self, tmp_path):
+        """Test that JSON Lines are streamed with line numbers, bad lines as None."""
+        from database.ingest import iter_records
+
+        path = tmp_path / "catalog.jsonl"
+        path.write_text(json.dumps(_record("CSCI-UA.0101")) + "\n\n{oops\n")
+
+        assert list(iter_records(str(path))) == [
+            (1, _record("CSCI-UA.0101")),
+            (3, None),
+        ]
+
+    def test_csv(self, tmp_path):
+        """Test that CSV rows are read as records."""
+        from database.ingest import iter_records, normalize_record
+
+        path = tmp_path / "catalog.csv"
+        path.write_text(
+            "course_code,title,credits,prerequisites,semester_offered\n"
+            'CSCI-UA.0102,Data Structures,4,CSCI-UA.0101,"Fall;Spring"\n'
+        )
+
+        ((line_number, record),) = list(iter_records(str(path)))
+        assert line_number == 2
+        assert normalize_record(record)["semester_offered"] == ["Fall", "Spring"]
+
+
+class TestIngestCourses:
+    """Tests for ingest_courses."""
+
+    def test_batched_upserts(self, mock_db):
+        """Test that records are upserted in batches and counted."""
+        from database.ingest import ingest_courses
+
+        records = enumerate([_record(f"CSCI-UA.{n:04d}") for n in range(1, 8)], start=1)
+        stats = ingest_courses(mock_db, records, batch_size=3)
+
+        assert stats["read"] == stats["valid"] == stats["upserted"] == 7
+        assert stats["batches"] == 3
+        assert stats["rejected"] == 0
+        assert mock_db.courses.count_documents({}) == 7
+        assert "course_code_1" in mock_db.courses.index_information()
+
+    def test_updates_and_rejects(self, mock_db):
+        """Test that existing courses are updated and invalid records reported."""
+        from database.ingest import ingest_courses
+
+        mock_db.courses.insert_one(_record("CSCI-UA.0101", "Old title"))
+        records = [
+            (1, _record("csci-ua 101", "New title")),
+            (2, _record("bad")),
+            (3, None),
+            (4, _record("CSCI-UA.0102")),
+        ]
+        stats = ingest_courses(mock_db, records)
+
+        assert stats["upserted"] == 1
+        assert stats["modified"] == 1
+        assert stats["rejected"] == 2
+        assert [r["line"] for r in stats["rejects"]] == [2, 3]
+        assert (
+            mock_db.courses.find_one({"course_code": "CSCI-UA.0101"})["title"]
+            == "New title"
+        )
+
+    def test_duplicate_codes_keep_last(self, mock_db):
+        """Test that a code repeated within a batch keeps the last record."""
+        from database.ingest import ingest_courses
+
+        records = [
+            (1, _record("CSCI-UA.0101", "First")),
+            (2, _record("CSCI-UA.101", "Second")),
+        ]
+        ingest_courses(mock_db, records)
+
+        assert mock_db.courses.count_documents({}) == 1
+        assert mock_db.courses.find_one()["title"] == "Second"
+
+    def test_dry_run(self, mock_db):
+        """Test that a dry run validates without writing."""
+        from database.ingest import ingest_courses
+
+        stats = ingest_courses(mock_db, [(1, _record("CSCI-UA.0101"))], dry_run=True)
+
+        assert stats["valid"] == 1
+        assert stats["batches"] == 0
+        assert "courses" not in mock_db.list_collection_names()
+
+    def test_marks_catalog_ingested(self, mock_db):
+        """Test that ingestion bumps the catalog version and seeding keeps the catalog."""
+        from database.app_db import get_catalog_meta, publish_catalog, seed_db
+        from database.ingest import ingest_courses
+
+        publish_catalog(mock_db, [_record("CSCI-UA.0101")])
+        ingest_courses(mock_db, [(1, _record("CSCI-UA.0102"))])
+        meta = get_catalog_meta(mock_db)
+
+        assert meta["version"] == 2
+        assert meta["source"] == "ingest"
+
+        result = seed_db(mock_db)
+        assert result["catalog_published"] is False
+        assert mock_db.courses.count_documents({}) == 2
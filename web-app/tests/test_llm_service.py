@@ -0,0 +1,543 @@
+"""
+test_llm_service.py
+
+Unit tests for llm_service.py prompt layout, output validation and usage
+accounting. These tests never call the OpenAI API.
+"""
+
+import json
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.fixture
+def catalog():
+    """Small course catalog."""
+    return [
+        {
+            "course_code": "CSCI-UA.0102",
+            "title": "Data Structures",
+            "credits": 4,
+            "difficulty": 3,
+            "prerequisites": ["CSCI-UA.0101"],
+            "semester_offered": ["Fall", "Spring"],
+            "description": "Stacks, queues, linked lists and trees.",
+        },
+        {
+            "course_code": "CSCI-UA.0473",
+            "title": "Fundamentals of Machine Learning",
+            "credits": 4,
+            "difficulty": 4,
+            "prerequisites": ["CSCI-UA.0102"],
+            "semester_offered": ["Fall"],
+            "description": "Supervised and unsupervised learning.",
+        },
+    ]
+
+
+def _student(name, career_path):
+    return {
+        "name": name,
+        "major": "Computer Science",
+        "year": "Sophomore",
+        "completed_courses": ["CSCI-UA.0101"],
+        "interests": [],
+        "career_path": career_path,
+        "side_interests": [],
+    }
+
+
+class TestBuildMessages:
+    """Tests for the cache-friendly prompt layout."""
+
+    def test_static_prefix_identical_across_students(self, catalog):
+        """Test that everything but the last message is shared by all students."""
+        from api.llm_service import _build_messages
+
+        semester = {"semester": "Sophomore Fall"}
+        first = _build_messages(
+            _student("A", "AI"), catalog, None, None, None, semester, "v1", catalog
+        )
+        second = _build_messages(
+            _student("B", "Systems"), catalog, None, None, None, semester, "v1", catalog
+        )
+
+        assert first[:-1] == second[:-1]
+        assert first[-1]["role"] == "user"
+        assert first[-1] != second[-1]
+
+    def test_catalog_message_stamped_with_version(self, catalog):
+        """Test that the catalog message carries the catalog version."""
+        from api.llm_service import _build_messages
+
+        messages = _build_messages(
+            _student("A", "AI"),
+            catalog,
+            None,
+            None,
+            None,
+            {"semester": "Sophomore Fall"},
+            "v1",
+            catalog,
+        )
+
+        assert len(messages) == 3
+        assert "COURSE CATALOG (version v1)" in messages[1]["content"]
+        assert "CSCI-UA.0473|Fundamentals of Machine Learning" in messages[1]["content"]
+        # Per-student message references catalog courses by code only
+        assert "CSCI-UA.0473" in messages[2]["content"]
+        assert "Fundamentals of Machine Learning" not in messages[2]["content"]
+
+    def test_no_catalog_message_without_version(self, catalog):
+        """Test that candidate rows are inlined when no catalog is provided."""
+        from api.llm_service import _build_messages
+
+        messages = _build_messages(
+            _student("A", "AI"), catalog, None, None, None, {"semester": "Fall"}
+        )
+
+        assert len(messages) == 2
+        assert "CSCI-UA.0473|Fundamentals of Machine Learning" in messages[1]["content"]
+
+    def test_no_catalog_message_over_token_budget(self, catalog):
+        """Test that a catalog over the token budget falls back to candidate rows."""
+        from api import llm_service
+
+        with patch.object(llm_service, "PROMPT_CATALOG_MAX_TOKENS", 10):
+            messages = llm_service._build_messages(
+                _student("A", "AI"),
+                catalog,
+                None,
+                None,
+                None,
+                {"semester": "Sophomore Fall"},
+                "v-large",
+                catalog,
+            )
+
+        assert len(messages) == 2
+        assert "COURSE CATALOG" not in messages[1]["content"]
+        assert "CSCI-UA.0473|Fundamentals of Machine Learning" in messages[1]["content"]
+
+    def test_prompt_size_tokenizes_only_request_messages(self, catalog):
+        """Test that the prefix token counts are reused across requests."""
+        from api import llm_service, prompt_encoding
+
+        semester = {"semester": "Sophomore Fall"}
+        requests = [
+            llm_service._build_messages(
+                _student(name, "AI"),
+                catalog,
+                None,
+                None,
+                None,
+                semester,
+                "v-count",
+                catalog,
+            )
+            for name in ("A", "B")
+        ]
+        with patch.object(
+            prompt_encoding, "count_tokens", side_effect=len
+        ) as count_tokens:
+            for messages in requests:
+                llm_service._log_prompt_size(messages, "test")
+
+        counted = [call.args[0] for call in count_tokens.call_args_list]
+        assert counted.count(requests[0][0]["content"]) <= 1
+        assert requests[0][1]["content"] not in counted
+        assert requests[0][2]["content"] in counted
+        assert requests[1][2]["content"] in counted
+
+
+class TestUsageStats:
+    """Tests for token usage accounting."""
+
+    def test_record_usage_counts_cached_tokens(self):
+        """Test that cached prompt tokens from the API response are recorded."""
+        from api import llm_service
+
+        before = llm_service.get_usage_stats()
+        llm_service._record_usage(
+            SimpleNamespace(
+                prompt_tokens=2000,
+                completion_tokens=300,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=1536),
+            )
+        )
+        after = llm_service.get_usage_stats()
+
+        assert after["calls"] == before["calls"] + 1
+        assert after["cached_tokens"] - before["cached_tokens"] == 1536
+        assert after["prompt_tokens"] - before["prompt_tokens"] == 2000
+        assert 0 < after["cache_hit_ratio"] <= 1
+
+    def test_record_usage_without_details(self):
+        """Test responses without prompt_tokens_details (older models/SDKs)."""
+        from api import llm_service
+
+        before = llm_service.get_usage_stats()
+        llm_service._record_usage(
+            SimpleNamespace(prompt_tokens=10, completion_tokens=5)
+        )
+        llm_service._record_usage(None)
+
+        after = llm_service.get_usage_stats()
+        assert after["calls"] == before["calls"] + 1
+        assert after["cached_tokens"] == before["cached_tokens"]
+
+
+def _response(courses):
+    """Fake chat completion response containing the given course items."""
+    content = json.dumps({"courses": courses})
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+    )
+
+
+def _item(code, course_credits=4):
+    return {
+        "course_code": code,
+        "title": "?",
+        "credits": course_credits,
+        "reasoning": "Why",
+    }
+
+
+class TestValidateCourses:
+    """Tests for validating recommended courses against the catalog."""
+
+    def test_validate_courses_drops_invalid_items(self, catalog):
+        """Test that hallucinated, completed, ineligible and repeated items are dropped."""
+        from api.course_filtering import get_catalog_index
+        from api.llm_service import _validate_courses
+
+        valid, invalid = _validate_courses(
+            [
+                _item("CSCI-UA.0102"),
+                _item("CSCI-UA.9999"),
+                _item("CSCI-UA.0101"),
+                _item("CSCI-UA.0473"),
+                _item("CSCI-UA.0102"),
+            ],
+            catalog[:1],  # only Data Structures is eligible
+            ["CSCI-UA.0101"],
+            get_catalog_index(catalog),
+        )
+
+        assert [c["course_code"] for c in valid] == ["CSCI-UA.0102"]
+        reasons = dict(invalid)
+        assert "catalog" in reasons["CSCI-UA.9999"]
+        assert "completed" in reasons["CSCI-UA.0101"]
+        assert "eligible" in reasons["CSCI-UA.0473"]
+        assert len(invalid) == 4
+
+    def test_validate_courses_fills_catalog_values(self, catalog):
+        """Test that title and credits come from the catalog."""
+        from api.llm_service import _validate_courses
+
+        valid, _ = _validate_courses(
+            [_item("CSCI-UA.0102", course_credits=2)], catalog, [], {}
+        )
+
+        assert valid[0]["title"] == "Data Structures"
+        assert valid[0]["credits"] == 4
+        assert valid[0]["reasoning"] == "Why"
+
+
+class TestRepairCourses:
+    """Tests for the follow-up call replacing invalid recommendations."""
+
+    def test_invalid_courses_replaced_with_one_call(self, catalog):
+        """Test that a single repair call replaces the invalid course."""
+        from api import llm_service
+
+        responses = [
+            _response([_item("CSCI-UA.0102"), _item("CSCI-UA.9999")]),
+            _response([_item("CSCI-UA.0473")]),
+        ]
+        with patch.object(llm_service, "client", object()), patch.object(
+            llm_service, "_call_openai", side_effect=responses
+        ) as mock_call:
+            courses = llm_service.generate_course_recommendations(
+                _student("A", "AI"),
+                catalog,
+                None,
+                None,
+                None,
+                {"semester": "Sophomore Fall"},
+                "v1",
+                catalog,
+            )
+
+        assert mock_call.call_count == 2
+        repair_messages = mock_call.call_args_list[1].args[0]
+        assert repair_messages[-2]["role"] == "assistant"
+        assert "CSCI-UA.9999" in repair_messages[-1]["content"]
+        assert [c["course_code"] for c in courses] == ["CSCI-UA.0102", "CSCI-UA.0473"]
+
+    def test_repair_is_not_retried(self, catalog):
+        """Test that invalid replacements do not trigger further calls."""
+        from api import llm_service
+
+        responses = [
+            _response([_item("CSCI-UA.0102"), _item("CSCI-UA.9999")]),
+            _response([_item("CSCI-UA.8888")]),
+        ]
+        with patch.object(llm_service, "client", object()), patch.object(
+            llm_service, "_call_openai", side_effect=responses
+        ) as mock_call:
+            courses = llm_service.generate_course_recommendations(
+                _student("A", "AI"), catalog, None, None, None, {"semester": "Fall"}
+            )
+
+        assert mock_call.call_count == 2
+        assert [c["course_code"] for c in courses] == ["CSCI-UA.0102"]
+
+    def test_valid_response_makes_one_call(self, catalog):
+        """Test that no repair call is made when every course is valid."""
+        from api import llm_service
+
+        with patch.object(llm_service, "client", object()), patch.object(
+            llm_service, "_call_openai", return_value=_response([_item("CSCI-UA.0473")])
+        ) as mock_call:
+            courses = llm_service.generate_course_recommendations(
+                _student("A", "AI"), catalog, None, None, None, {"semester": "Fall"}
+            )
+
+        assert mock_call.call_count == 1
+        assert courses[0]["title"] == "Fundamentals of Machine Learning"
+
+
+def _slow_then_fast(primary_seconds, usage=None):
+    """Fake _create_completion: the first call is slow, later calls are instant."""
+    calls = []
+    lock = threading.Lock()
+
+    def create(messages, model):
+        with lock:
+            calls.append(messages)
+            index = len(calls)
+        if index == 1:
+            time.sleep(primary_seconds)
+        return SimpleNamespace(name=f"call-{index}", usage=usage)
+
+    return create, calls
+
+
+class TestHedging:
+    """Tests for hedged OpenAI requests."""
+
+    @pytest.fixture
+    def hedging(self):
+        """Enable hedging with a short fixed delay and no rate cap."""
+        from api import llm_service
+
+        with patch.object(llm_service, "OPENAI_HEDGE", True), patch.object(
+            llm_service, "OPENAI_HEDGE_DELAY_SECONDS", 0.05
+        ), patch.object(llm_service, "HEDGE_MIN_SAMPLES", 10**6), patch.object(
+            llm_service, "OPENAI_HEDGE_MAX_RATE", 1.0
+        ):
+            yield llm_service
+
+    def test_slow_call_is_hedged(self, hedging):
+        """Test that the hedged call's response is used when the first is slow."""
+        usage = SimpleNamespace(prompt_tokens=100, completion_tokens=10)
+        create, calls = _slow_then_fast(0.3, usage)
+        before = hedging.get_usage_stats()["hedging"]
+
+        with patch.object(hedging, "_create_completion", side_effect=create):
+            response = hedging._call_openai([{"role": "user", "content": "hi"}])
+            time.sleep(0.4)  # let the discarded call finish
+
+        after = hedging.get_usage_stats()["hedging"]
+        assert response.name == "call-2"
+        assert len(calls) == 2
+        assert after["hedge_wins"] == before["hedge_wins"] + 1
+        assert after["extra_prompt_tokens"] == before["extra_prompt_tokens"] + 100
+        assert after["latency_saved_seconds"] > before["latency_saved_seconds"]
+
+    def test_slow_async_call_is_hedged(self, hedging):
+        """Test that the async path hedges too and cancels the slow call."""
+        import asyncio
+
+        calls = []
+        cancelled = []
+
+        async def create(messages, model):
+            calls.append(messages)
+            index = len(calls)
+            if index == 1:
+                try:
+                    await asyncio.sleep(0.3)
+                except asyncio.CancelledError:
+                    cancelled.append(index)
+                    raise
+            return SimpleNamespace(name=f"call-{index}", usage=None)
+
+        before = hedging.get_usage_stats()["hedging"]
+        with patch.object(hedging, "_create_completion_async", create):
+            response = asyncio.run(
+                hedging._call_openai_async([{"role": "user", "content": "hi"}])
+            )
+
+        after = hedging.get_usage_stats()["hedging"]
+        assert response.name == "call-2"
+        assert cancelled == [1]
+        assert after["hedge_wins"] == before["hedge_wins"] + 1
+
+    def test_fast_call_is_not_hedged(self, hedging):
+        """Test that no second call is made when the first returns in time."""
+        create, calls = _slow_then_fast(0)
+
+        with patch.object(hedging, "_create_completion", side_effect=create):
+            response = hedging._call_openai([{"role": "user", "content": "hi"}])
+
+        assert response.name == "call-1"
+        assert len(calls) == 1
+
+    def test_hedge_rate_cap(self, hedging):
+        """Test that no hedge is sent once the hedge rate cap is reached."""
+        create, calls = _slow_then_fast(0.1)
+
+        with patch.object(hedging, "OPENAI_HEDGE_MAX_RATE", 0.0), patch.object(
+            hedging, "_create_completion", side_effect=create
+        ):
+            response = hedging._call_openai([{"role": "user", "content": "hi"}])
+
+        assert response.name == "call-1"
+        assert len(calls) == 1
+
+    def test_first_slow_call_hedged_at_startup(self, hedging):
+        """Test that the rate cap allows a hedge before enough requests were seen."""
+        create, calls = _slow_then_fast(0.1)
+
+        with patch.object(hedging, "OPENAI_HEDGE_MAX_RATE", 0.1), patch.dict(
+            hedging._hedge_totals, {"requests": 0, "hedged_requests": 0}
+        ), patch.object(hedging, "_create_completion", side_effect=create):
+            response = hedging._call_openai([{"role": "user", "content": "hi"}])
+            second = hedging._claim_hedge("gpt-test", 0.05, None)
+
+        assert response.name == "call-2"
+        assert len(calls) == 2
+        assert second is False
+
+    def test_queue_time_does_not_trigger_hedge(self, hedging):
+        """Test that waiting for a hedge pool worker is not counted as call latency."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        create, calls = _slow_then_fast(0)
+        executor = ThreadPoolExecutor(max_workers=1)
+        executor.submit(time.sleep, 0.2)  # keeps the only worker busy
+
+        with patch.object(hedging, "_hedge_executor", executor), patch.object(
+            hedging, "_create_completion", side_effect=create
+        ):
+            response = hedging._call_openai([{"role": "user", "content": "hi"}])
+        executor.shutdown()
+
+        assert response.name == "call-1"
+        assert len(calls) == 1
+
+
+class TestModelRouting:
+    """Tests for routing requests between the fast and strong models."""
+
+    @pytest.fixture(autouse=True)
+    def routing_enabled(self):
+        """Enable model routing (off by default)."""
+        from api import llm_service
+
+        with patch.object(llm_service, "MODEL_ROUTING", True):
+            yield
+
+    def test_routing_disabled_uses_strong_model(self, catalog):
+        """Test that every request goes to the strong model with routing off."""
+        from api import llm_service
+
+        with patch.object(llm_service, "MODEL_ROUTING", False):
+            assert llm_service._route_model(0) == llm_service._strong_model()
+
+    def test_simple_request_uses_fast_model(self, catalog):
+        """Test that a small eligible set without side interests is simple."""
+        from api import llm_service
+
+        complexity = llm_service._request_complexity(_student("A", "AI"), catalog, None)
+
+        assert complexity <= llm_service.MODEL_ROUTING_MAX_FAST_COMPLEXITY
+        assert llm_service._route_model(complexity) == llm_service._fast_model()
+
+    def test_complex_request_uses_strong_model(self, catalog):
+        """Test that large eligible sets, electives and side interests add complexity."""
+        from api import llm_service
+
+        courses = [dict(catalog[0], course_code=f"CSCI-UA.{i:04d}") for i in range(50)]
+        remaining = {
+            "remaining_core": [],
+            "remaining_electives": {
+                "count_needed": 3,
+                "available_courses": [{"course_code": "CSCI-UA.0001"}],
+            },
+        }
+        student = dict(_student("A", "AI"), side_interests=["Music"])
+
+        complexity = llm_service._request_complexity(student, courses, remaining)
+
+        assert complexity == 4
+        assert llm_service._route_model(complexity) == llm_service._strong_model()
+
+    def test_invalid_fast_response_escalates(self, catalog):
+        """Test that a fast-model response with no valid courses is regenerated."""
+        from api import llm_service
+
+        responses = [
+            _response([_item("CSCI-UA.9999")]),
+            _response([_item("CSCI-UA.0473")]),
+        ]
+        with patch.object(llm_service, "client", object()), patch.object(
+            llm_service, "_call_openai", side_effect=responses
+        ) as mock_call:
+            courses = llm_service.generate_course_recommendations(
+                _student("A", "AI"), catalog, None, None, None, {"semester": "Fall"}
+            )
+
+        models = [call.args[1] for call in mock_call.call_args_list]
+        assert models == [llm_service._fast_model(), llm_service._strong_model()]
+        assert [c["course_code"] for c in courses] == ["CSCI-UA.0473"]
+
+    def test_failed_fast_call_not_escalated(self, catalog):
+        """Test that a failed API call is not retried on the strong model."""
+        from api import llm_service
+
+        with patch.object(llm_service, "client", object()), patch.object(
+            llm_service, "_call_openai", return_value=None
+        ) as mock_call:
+            courses = llm_service.generate_course_recommendations(
+                _student("A", "AI"), catalog, None, None, None, {"semester": "Fall"}
+            )
+
+        assert courses is None
+        assert mock_call.call_count == 1
+
+    def test_model_stats_recorded(self):
+        """Test that per-model latency and validity are recorded."""
+        from api import llm_service
+
+        fake_client = SimpleNamespace(
+            chat=SimpleNamespace(
+                completions=SimpleNamespace(create=lambda **kwargs: SimpleNamespace())
+            )
+        )
+        with patch.object(llm_service, "client", fake_client):
+            llm_service._create_completion([], "test-model")
+        llm_service._record_model_result("test-model", True)
+        llm_service._record_model_result("test-model", False)
+
+        stats = llm_service.get_usage_stats()["models"]["test-model"]
+        assert stats["calls"] >= 1
+        assert stats["avg_latency_seconds"] is not None
+        assert stats["validity_rate"] <= 1
@@ -0,0 +1,295 @@
+"""
+test_llm_telemetry.py
+
+Unit tests for llm_telemetry.py (per-call LLM telemetry, background writer,
+aggregates) and the events llm_service records. No API calls are made.
+"""
+
+import json
+import queue
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+
+class ListBackend:
+    """Backend collecting written batches in memory."""
+
+    def __init__(self):
+        self.events = []
+
+    def write(self, events):
+        self.events.extend(events)
+
+
+@pytest.fixture
+def telemetry():
+    """Enable telemetry with fresh counters, aggregates and queue."""
+    from api import llm_telemetry
+
+    counters = {key: 0 for key in llm_telemetry._counters}
+    with patch.object(llm_telemetry, "LLM_TELEMETRY", "file"), patch.object(
+        llm_telemetry, "BATCH_WAIT_SECONDS", 0.05
+    ), patch.object(llm_telemetry, "_backend", ListBackend()), patch.object(
+        llm_telemetry, "_queue", queue.Queue(maxsize=100)
+    ), patch.object(
+        llm_telemetry, "_writer", None
+    ), patch.dict(
+        llm_telemetry._counters, counters
+    ), patch.object(
+        llm_telemetry, "_aggregates", {}
+    ):
+        yield llm_telemetry
+        # Don't leave batches for the writer to deliver to another test's backend
+        llm_telemetry.flush(5)
+
+
+def _event(**fields):
+    event = {
+        "kind": "recommendations",
+        "model": "gpt-test",
+        "prompt_tokens": 1000,
+        "cached_tokens": 800,
+        "completion_tokens": 200,
+        "latency_seconds": 1.5,
+        "retries": 0,
+        "courses_returned": 5,
+        "courses_valid": 4,
+        "outcome": "partial",
+    }
+    event.update(fields)
+    return event
+
+
+class TestRecordCall:
+    """Tests for record_call and the background writer."""
+
+    def test_events_written_in_background(self, telemetry):
+        """Test that recorded events reach the backend with a timestamp."""
+        telemetry.record_call(_event())
+        telemetry.record_call(_event(outcome="ok", courses_valid=5))
+
+        assert telemetry.flush(5)
+        events = telemetry._backend.events
+        assert [e["outcome"] for e in events] == ["partial", "ok"]
+        assert events[0]["timestamp"]
+        assert telemetry.get_telemetry_stats()["written"] == 2
+
+    def test_full_queue_drops_events(self, telemetry):
+        """Test that recording never blocks when the writer falls behind."""
+        with patch.object(telemetry, "_queue", queue.Queue(maxsize=1)), patch.object(
+            telemetry, "_ensure_writer"
+        ):
+            telemetry.record_call(_event())
+            telemetry.record_call(_event())
+
+        stats = telemetry.get_telemetry_stats()
+        assert stats["recorded"] == 2
+        assert stats["dropped"] == 1
+
+    def test_off_records_nothing(self, telemetry):
+        """Test that LLM_TELEMETRY=off disables recording."""
+        with patch.object(telemetry, "LLM_TELEMETRY", "off"):
+            telemetry.record_call(_event())
+
+        assert telemetry.get_telemetry_stats()["recorded"] == 0
+
+    def test_file_backend(self, tmp_path):
+        """Test that the file backend appends JSON lines."""
+        from api.llm_telemetry import FileTelemetryBackend
+
+        path = tmp_path / "calls.jsonl"
+        backend = FileTelemetryBackend(str(path))
+        backend.write([_event()])
+        backend.write([_event(outcome="ok")])
+
+        lines = path.read_text().splitlines()
+        assert [json.loads(line)["outcome"] for line in lines] == ["partial", "ok"]
+
+    def test_mongo_backend_capped_collection(self, mock_db):
+        """Test that the mongo backend creates a capped collection and inserts events."""
+        from api.llm_telemetry import MongoTelemetryBackend
+
+        created = []
+        create_collection = mock_db.create_collection
+
+        def create_capped(name, **options):
+            # mongomock has no capped collections; record the options instead
+            created.append((name, options))
+            return create_collection(name)
+
+        backend = MongoTelemetryBackend()
+        with patch("api.user_model.db", mock_db), patch.object(
+            mock_db, "create_collection", side_effect=create_capped
+        ):
+            backend.write([_event(), _event()])
+            backend.write([_event()])
+
+        assert len(created) == 1
+        assert created[0][0] == "llm_calls"
+        assert created[0][1]["capped"] is True
+        assert mock_db.llm_calls.count_documents({}) == 3
+
+
+class TestAggregates:
+    """Tests for get_telemetry_stats and summarize_stored_calls."""
+
+    def test_aggregates_per_kind_and_model(self, telemetry):
+        """Test token totals, outcomes and validity rate per (kind, model)."""
+        telemetry.record_call(_event())
+        telemetry.record_call(
+            _event(outcome="ok", courses_valid=5, latency_seconds=2.5)
+        )
+        telemetry.record_call(
+            _event(kind="repair", courses_returned=1, courses_valid=1)
+        )
+
+        calls = telemetry.get_telemetry_stats()["calls"]
+
+        assert [c["kind"] for c in calls] == ["recommendations", "repair"]
+        recommendations = calls[0]
+        assert recommendations["calls"] == 2
+        assert recommendations["prompt_tokens"] == 2000
+        assert recommendations["cached_tokens"] == 1600
+        assert recommendations["outcomes"] == {"partial": 1, "ok": 1}
+        assert recommendations["validity_rate"] == 0.9
+        assert recommendations["latency_seconds"]["p95"] == 2.5
+
+    def test_summarize_stored_calls(self, mock_db):
+        """Test aggregation of stored events by kind, model and outcome."""
+        from api.llm_telemetry import summarize_stored_calls
+
+        old = _event(timestamp="2000-01-01T00:00:00+00:00")
+        recent = [
+            _event(timestamp="2999-01-01T00:00:00+00:00"),
+            _event(timestamp="2999-01-01T00:00:00+00:00", latency_seconds=2.5),
+            _event(timestamp="2999-01-01T00:00:00+00:00", outcome="error"),
+        ]
+        mock_db.llm_calls.insert_many([old] + recent)
+
+        summary = summarize_stored_calls(mock_db, hours=24)
+
+        assert summary[0]["outcome"] == "partial"
+        assert summary[0]["calls"] == 2
+        assert summary[0]["prompt_tokens"] == 2000
+        assert summary[0]["avg_latency_seconds"] == 2.0
+        assert summary[0]["max_latency_seconds"] == 2.5
+        assert sum(row["calls"] for row in summary) == 3
+
+
+def _fake_client(content, prompt_tokens=1200, cached_tokens=1024):
+    usage = SimpleNamespace(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=150,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=cached_tokens),
+    )
+    response = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=usage,
+    )
+    return SimpleNamespace(
+        chat=SimpleNamespace(
+            completions=SimpleNamespace(create=lambda **kwargs: response)
+        )
+    )
+
+
+class TestLLMServiceEvents:
+    """Tests for the events recorded by llm_service."""
+
+    def test_recommendation_call_event(self, telemetry):
+        """Test that a recommendation call records tokens, latency and validity."""
+        from api import llm_service
+
+        course = {
+            "course_code": "CSCI-UA.0102",
+            "title": "Data Structures",
+            "credits": 4,
+            "prerequisites": [],
+            "semester_offered": ["Fall"],
+        }
+        content = json.dumps(
+            {
+                "courses": [
+                    {
+                        "course_code": "CSCI-UA.0102",
+                        "title": "?",
+                        "credits": 4,
+                        "reasoning": "r",
+                    },
+                    {
+                        "course_code": "CSCI-UA.9999",
+                        "title": "?",
+                        "credits": 4,
+                        "reasoning": "r",
+                    },
+                ]
+            }
+        )
+        with patch.object(llm_service, "client", _fake_client(content)):
+            valid, invalid, _ = llm_service._run_calls(
+                llm_service._request_courses(
+                    [{"role": "user", "content": "hi"}], "gpt-test", [course], [], {}
+                )
+            )
+
+        assert len(valid) == 1 and len(invalid) == 1
+        assert telemetry.flush(5)
+        event = telemetry._backend.events[-1]
+        assert event["kind"] == "recommendations"
+        assert event["model"] == "gpt-test"
+        assert event["prompt_tokens"] == 1200
+        assert event["cached_tokens"] == 1024
+        assert event["completion_tokens"] == 150
+        assert event["latency_seconds"] >= 0
+        assert event["retries"] == 0
+        assert event["courses_returned"] == 2
+        assert event["courses_valid"] == 1
+        assert event["outcome"] == "partial"
+
+    def test_failed_call_event(self, telemetry):
+        """Test that an API error is recorded with its type."""
+        from api import llm_service
+
+        def fail(**kwargs):
+            raise TimeoutError("timed out")
+
+        failing = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=fail))
+        )
+        with patch.object(llm_service, "client", failing):
+            llm_service._run_calls(
+                llm_service._request_courses([], "gpt-test", [], [], {})
+            )
+
+        assert telemetry.flush(5)
+        event = telemetry._backend.events[-1]
+        assert event["outcome"] == "error"
+        assert event["error_type"] == "TimeoutError"
+
+
+class TestStatsEndpoints:
+    """Tests for access to GET /api/recommendations/stats and /telemetry."""
+
+    @pytest.mark.parametrize(
+        "path", ["/api/recommendations/stats", "/api/recommendations/telemetry"]
+    )
+    def test_admin_only(self, mock_db, auth_header, path):
+        """Test that only ADMIN_EMAILS accounts can read the server-wide stats."""
+        from api import recommendation_routes
+        from api.app import app
+
+        mock_db.students.insert_many(
+            [{"email": "ada@example.edu"}, {"email": "admin@example.edu"}]
+        )
+        client = app.test_client()
+        with patch.object(recommendation_routes, "db", mock_db), patch.object(
+            recommendation_routes, "ADMIN_EMAILS", {"admin@example.edu"}
+        ):
+            student = client.get(path, headers=auth_header())
+            admin = client.get(path, headers=auth_header("admin@example.edu"))
+
+        assert student.status_code == 403
+        assert student.get_json() == {"error": "Forbidden: Admin access required"}
+        assert admin.status_code == 200
@@ -0,0 +1,151 @@
+"""
+test_local_recommender.py
+
+Unit tests for local_recommender.py (deterministic recommendations without the LLM).
+"""
+
+import pytest
+
+
+@pytest.fixture
+def available_courses(make_course):
+    """Eligible courses in arbitrary (database) order."""
+    return [
+        make_course("CSCI-UA.0004", "Introduction to Web Design", difficulty=1),
+        make_course("CSCI-UA.0060", "Database Design and Implementation", difficulty=3),
+        make_course("CSCI-UA.0201", "Computer Systems Organization", difficulty=4),
+        make_course("CSCI-UA.0472", "Artificial Intelligence", difficulty=5),
+        make_course("CSCI-UA.0473", "Fundamentals of Machine Learning", difficulty=5),
+        make_course("CSCI-UA.0474", "Software Engineering", difficulty=3),
+        make_course("CSCI-UA.0480", "Special Topics: Cryptography", difficulty=4),
+    ]
+
+
+@pytest.fixture
+def remaining_requirements():
+    """Remaining CS requirements: one core course and two electives."""
+    return {
+        "major_name": "Computer Science",
+        "remaining_core": [{"course_code": "CSCI-UA.0201"}],
+        "remaining_electives": {
+            "count_needed": 2,
+            "available_courses": [
+                {"course_code": "CSCI-UA.0472"},
+                {"course_code": "CSCI-UA.0473"},
+                {"course_code": "CSCI-UA.0474"},
+                {"course_code": "CSCI-UA.0480"},
+            ],
+            "substitutions_available": [],
+        },
+    }
+
+
+class TestPickCourses:
+    """Tests for pick_courses function."""
+
+    def test_pick_courses_meets_credit_target(self, available_courses):
+        """Test that picks reach 16 credits without exceeding 24."""
+        from api.local_recommender import pick_courses
+
+        picks = pick_courses(available_courses, {"career_path": "Machine Learning"})
+        total_credits = sum(course["credits"] for course, _ in picks)
+
+        assert 16 <= total_credits <= 24
+        assert len({course["course_code"] for course, _ in picks}) == len(picks)
+
+    def test_pick_courses_core_first(self, available_courses, remaining_requirements):
+        """Test that a remaining core course is picked first."""
+        from api.local_recommender import pick_courses
+
+        picks = pick_courses(
+            available_courses,
+            {"major": "Computer Science", "career_path": "Machine Learning"},
+            remaining_requirements,
+        )
+
+        assert picks[0][0]["course_code"] == "CSCI-UA.0201"
+        assert "core" in picks[0][1]
+
+    def test_pick_courses_caps_hard_courses(self, available_courses):
+        """Test that at most MAX_HARD_COURSES hard courses are picked."""
+        from api.local_recommender import (
+            HARD_DIFFICULTY,
+            MAX_HARD_COURSES,
+            pick_courses,
+        )
+
+        picks = pick_courses(
+            available_courses,
+            {"career_path": "AI machine learning cryptography systems"},
+        )
+        hard = [c for c, _ in picks if c["difficulty"] >= HARD_DIFFICULTY]
+
+        assert len(hard) <= MAX_HARD_COURSES
+
+    def test_pick_courses_respects_credit_max(self, make_course):
+        """Test that courses that would exceed the credit maximum are skipped."""
+        from api.local_recommender import pick_courses
+
+        courses = [
+            make_course("CSCI-UA.0001", "Big Course", course_credits=12),
+            make_course("CSCI-UA.0002", "Another Big Course", course_credits=12),
+            make_course("CSCI-UA.0003", "Small Course", course_credits=4),
+        ]
+
+        picks = pick_courses(courses, {}, target_credits_min=20, target_credits_max=20)
+
+        assert sum(c["credits"] for c, _ in picks) <= 20
+
+    def test_pick_courses_deterministic(
+        self, available_courses, remaining_requirements
+    ):
+        """Test that the same input always gives the same picks."""
+        from api.local_recommender import pick_courses
+
+        student = {"career_path": "Software Engineering"}
+        first = pick_courses(available_courses, student, remaining_requirements)
+        second = pick_courses(list(available_courses), student, remaining_requirements)
+
+        assert first == second
+
+    def test_pick_courses_empty(self):
+        """Test picking from an empty course list."""
+        from api.local_recommender import pick_courses
+
+        assert not pick_courses([], {"career_path": "AI"})
+
+
+class TestGenerateCourseRecommendations:
+    """Tests for generate_course_recommendations function."""
+
+    def test_recommendation_structure(self, available_courses, remaining_requirements):
+        """Test that items have the same structure as the LLM recommendations."""
+        from api.local_recommender import generate_course_recommendations
+
+        courses = generate_course_recommendations(
+            {"major": "Computer Science", "career_path": "Machine Learning"},
+            available_courses,
+            remaining_requirements,
+            {
+                "semester": "Junior Fall",
+                "target_credits_min": 16,
+                "target_credits_max": 24,
+            },
+        )
+
+        assert courses
+        for course in courses:
+            assert set(course) == {"course_code", "title", "credits", "reasoning"}
+            assert isinstance(course["credits"], int)
+            assert course["reasoning"]
+
+    def test_reasoning_mentions_interests(self, available_courses):
+        """Test that interest keyword matches are explained."""
+        from api.local_recommender import generate_course_recommendations
+
+        courses = generate_course_recommendations(
+            {"career_path": "Cryptography"}, available_courses, None, {}
+        )
+
+        assert courses[0]["course_code"] == "CSCI-UA.0480"
+        assert "cryptography" in courses[0]["reasoning"]
@@ -0,0 +1,357 @@
+"""
+test_major_requirements.py
+
+Unit tests for major_requirements.py (compiled course code patterns, the
+code index used for elective matching, the requirement registry, and the
+degree audit).
+"""
+
+from unittest.mock import patch
+
+import json
+
+import pytest
+
+
+@pytest.fixture
+def catalog_courses():
+    """Catalog with electives, non-electives and unusual codes."""
+    from api.course import Course
+
+    codes = [
+        "CSCI-UA.0480",
+        "CSCI-UA.0101",
+        "CSCI-UA.0421",
+        "MATH-UA.0121",
+        "CSCI-UA.04ab",
+        "CSCI-UA.0472",
+        "MATH-UA.0140",
+        "CSCI-UA.0480",
+        "CSCI-UA.4000",
+    ]
+    return tuple(
+        Course.from_dict({"course_code": code, "title": code}) for code in codes
+    )
+
+
+class TestCoursePatterns:
+    """Tests for compile_course_pattern and check_course_code_pattern."""
+
+    @pytest.mark.parametrize(
+        "course_code, pattern, expected",
+        [
+            ("CSCI-UA.0101", "CSCI-UA.0101", True),
+            ("CSCI-UA.0102", "CSCI-UA.0101", False),
+            ("CSCI-UA.0421", "CSCI-UA.04xx", True),
+            ("CSCI-UA.04ab", "CSCI-UA.04xx", True),
+            ("CSCI-UA.4000", "CSCI-UA.04xx", False),
+            ("CSCI-UA.0521", "CSCI-UA.04xx", False),
+            ("MATH-UA.0122", "MATH-UA.0121+", True),
+            ("MATH-UA.0120", "MATH-UA.0121+", False),
+            ("MATH-UA.0120", "MATH-UA.0121-", True),
+            ("MATH-UA.0122", "MATH-UA.0121-", False),
+            ("CSCI-UA.0122", "MATH-UA.0121+", False),
+            ("MATH-UA.0130", "MATH-UA.0120-0140", True),
+            ("MATH-UA.0140", "MATH-UA.0120-MATH-UA.0140", True),
+            ("MATH-UA.0141", "MATH-UA.0120-0140", False),
+            ("MATH.0130", "MATH.0120-MATH.0140", True),
+            ("MATH.0130", "MATH.0120-CSCI.0140", False),
+            ("MATH-UA", "MATH-UA.0121+", False),
+            (None, "CSCI-UA.04xx", False),
+        ],
+    )
+    def test_check_course_code_pattern(self, course_code, pattern, expected):
+        """Test each pattern type."""
+        from api.major_requirements import check_course_code_pattern
+
+        assert check_course_code_pattern(course_code, pattern) is expected
+
+    def test_compiled_once(self):
+        """Test that a pattern is compiled once and reused."""
+        from api.major_requirements import PATTERN_NUMBER_RANGE, compile_course_pattern
+
+        compiled = compile_course_pattern("MATH-UA.0121+")
+
+        assert compile_course_pattern("MATH-UA.0121+") is compiled
+        assert compiled.kind == PATTERN_NUMBER_RANGE
+        assert (compiled.prefix, compiled.low, compiled.high) == ("MATH-UA", 121, None)
+
+
+class TestFindMatchingCourses:
+    """Tests for find_matching_courses and the code index."""
+
+    @pytest.mark.parametrize(
+        "pattern",
+        [
+            "CSCI-UA.04xx",
+            "CSCI-UA.0421+",
+            "CSCI-UA.0472-",
+            "MATH-UA.0100-0130",
+            "CSCI-UA.0480",
+        ],
+    )
+    def test_index_matches_scan(self, catalog_courses, pattern):
+        """Test that the index finds the same courses, in catalog order, as a scan."""
+        from api.major_requirements import (
+            check_course_code_pattern,
+            find_matching_courses,
+        )
+
+        expected = [
+            (position, course["course_code"])
+            for position, course in enumerate(catalog_courses)
+            if check_course_code_pattern(course["course_code"], pattern)
+        ]
+
+        assert find_matching_courses(pattern, catalog_courses) == expected
+        assert find_matching_courses(pattern, list(catalog_courses)) == expected
+
+    def test_index_built_once_per_catalog(self, catalog_courses):
+        """Test that the code index is reused for the same catalog only."""
+        from api.major_requirements import _get_code_index
+
+        index = _get_code_index(catalog_courses)
+
+        assert _get_code_index(catalog_courses) is index
+        assert _get_code_index(catalog_courses[:3]) is not index
+        assert _get_code_index(list(catalog_courses)) is None
+
+    def test_completed_electives(self, catalog_courses):
+        """Test elective and substitution matching through the index."""
+        from api.major_requirements import (
+            get_completed_electives,
+            get_major_requirements,
+        )
+
+        status = get_completed_electives(
+            get_major_requirements("Computer Science"),
+            ["CSCI-UA.0101", "CSCI-UA.0421", "CSCI-UA.0480", "MATH-UA.0140"],
+            catalog_courses,
+        )
+
+        assert status["completed"] == [
+            "CSCI-UA.0480",
+            "CSCI-UA.0421",
+            "CSCI-UA.0480",
+            "MATH-UA.0140",
+        ]
+        assert status["substitutions_used"] == ["MATH-UA.0140"]
+
+
+class TestRequirementRegistry:
+    """Tests for the data-driven registry of majors and minors."""
+
+    def test_lookup_by_name_and_alias(self):
+        """Test that programs are found by normalized name or alias."""
+        from api.major_requirements import (
+            get_major_requirements,
+            get_program,
+            list_programs,
+        )
+
+        program = get_program("Computer Science")
+
+        assert get_program("  computer   SCIENCE ") is program
+        assert get_program("cs") is program
+        assert get_major_requirements("CS") is program.requirements
+        assert get_program("Math Minor").program_type == "minor"
+        assert get_program("Basket Weaving") is None
+        assert {"Computer Science", "Mathematics"} <= set(list_programs("major"))
+        assert "Mathematics" not in list_programs("minor")
+
+    def test_compiled_program(self):
+        """Test the core set, elective pattern and substitution cap of a program."""
+        from api.major_requirements import PATTERN_WILDCARD, get_program
+
+        program = get_program("Computer Science")
+
+        assert "CSCI-UA.0310" in program.core_codes
+        assert program.elective_pattern.kind == PATTERN_WILDCARD
+        assert program.elective_count == 5
+        assert program.max_substitutions == 2
+
+    def test_substitution_cap(self, catalog_courses):
+        """Test that substitutions beyond the cap do not count as electives."""
+        from api.major_requirements import audit_degree
+
+        completed = ["MATH-UA.0122", "MATH-UA.0140", "MATH-UA.0185"]
+        status = audit_degree(
+            "Computer Science", completed, catalog_courses
+        ).elective_status
+
+        assert status["substitutions_used"] == ["MATH-UA.0122", "MATH-UA.0140"]
+        assert status["remaining_count"] == 3
+
+    def test_core_courses_not_counted_as_electives(self):
+        """Test that a core course matching the elective pattern counts once."""
+        from api.course import Course
+        from api.major_requirements import audit_degree
+        from database.app_db import load_courses
+
+        courses = tuple(Course.from_dict(course) for course in load_courses())
+        progress = audit_degree(
+            "Mathematics", ["MATH-UA.0325", "MATH-UA.0240"], courses
+        ).progress()
+
+        assert progress["core_requirements"]["completed"] == ["MATH-UA.0325"]
+        assert progress["elective_requirements"]["completed"] == ["MATH-UA.0240"]
+        assert progress["overall_progress"]["completed"] == 2
+
+    def test_electives_cached_per_catalog(self, catalog_courses):
+        """Test that the catalog electives are looked up once per immutable catalog."""
+        from api.major_requirements import get_program
+
+        program = get_program("Computer Science")
+        electives = program.electives(catalog_courses)
+
+        assert program.electives(catalog_courses) is electives
+        assert program.electives(list(catalog_courses)) == electives
+        assert program.electives(list(catalog_courses)) is not electives
+
+    def test_copied_requirements_compiled_once(self):
+        """Test that a requirements dictionary outside the registry is compiled once per content."""
+        import copy
+
+        from api import major_requirements
+        from api.major_requirements import get_completed_core_requirements, get_program
+
+        requirements = copy.deepcopy(get_program("Computer Science").requirements)
+
+        with patch.dict(major_requirements._compiled, clear=True), patch.object(
+            major_requirements,
+            "compile_requirements",
+            wraps=major_requirements.compile_requirements,
+        ) as compile_spy:
+            first = get_completed_core_requirements(requirements, ["CSCI-UA.0101"])
+            again = get_completed_core_requirements(
+                copy.deepcopy(requirements), ["CSCI-UA.0101"]
+            )
+            requirements["core_requirements"]["courses"].pop()
+            changed = get_completed_core_requirements(requirements, ["CSCI-UA.0101"])
+
+        assert compile_spy.call_count == 2
+        assert again == first
+        assert changed["total"] == first["total"] - 1
+
+    def test_load_skips_invalid_definitions(self, tmp_path):
+        """Test that malformed and duplicate definitions are skipped."""
+        from api.major_requirements import load_requirement_registry
+
+        definitions = {
+            "a_physics.json": {"major_name": "Physics", "aliases": ["Phys"]},
+            "b_duplicate.json": {"major_name": "Physics Major", "aliases": ["phys"]},
+            "c_bad_count.json": {
+                "major_name": "Chemistry",
+                "elective_requirements": {"count": "five"},
+            },
+            "d_no_name.json": {"total_courses_required": 4},
+        }
+        for filename, definition in definitions.items():
+            (tmp_path / filename).write_text(json.dumps(definition))
+        (tmp_path / "e_broken.json").write_text("{not json")
+
+        registry = load_requirement_registry(str(tmp_path))
+
+        assert sorted(registry) == ["phys", "physics"]
+        assert registry["phys"] is registry["physics"]
+
+    @pytest.mark.parametrize(
+        "definition",
+        [
+            {"core_requirements": {"courses": ["CSCI-UA.0101"]}},
+            {"core_requirements": {"courses": [{"course_code": 101}]}},
+            {"core_requirements": ["CSCI-UA.0101"]},
+            {"aliases": "Phys"},
+            {"elective_requirements": {"type": ["CSCI-UA.04xx"]}},
+            {"elective_requirements": {"substitutions": {"courses": ["MATH-UA.0122"]}}},
+            {"elective_requirements": {"substitutions": {"max_count": "two"}}},
+        ],
+    )
+    def test_load_skips_malformed_entries(self, tmp_path, definition):
+        """Test that entries of the wrong type skip only their own definition."""
+        from api.major_requirements import (
+            compile_requirements,
+            load_requirement_registry,
+        )
+
+        (tmp_path / "a_physics.json").write_text(json.dumps({"major_name": "Physics"}))
+        (tmp_path / "b_malformed.json").write_text(
+            json.dumps({"major_name": "Chemistry", **definition})
+        )
+
+        with pytest.raises(ValueError):
+            compile_requirements({"major_name": "Chemistry", **definition})
+        assert sorted(load_requirement_registry(str(tmp_path))) == ["physics"]
+
+
+class TestAuditDegree:
+    """Tests for audit_degree and the functions derived from it."""
+
+    COMPLETED = ["CSCI-UA.0101", "CSCI-UA.0421", "MATH-UA.0121", "MATH-UA.0140"]
+
+    def test_progress_and_remaining(self, catalog_courses):
+        """Test that one audit gives both the progress and the remaining requirements."""
+        from api.major_requirements import (
+            audit_degree,
+            get_major_progress,
+            get_remaining_requirements,
+        )
+
+        audit = audit_degree("Computer Science", self.COMPLETED, catalog_courses)
+        progress = audit.progress()
+        remaining = audit.remaining()
+
+        assert progress == get_major_progress(
+            "Computer Science", self.COMPLETED, catalog_courses
+        )
+        assert remaining == get_remaining_requirements(
+            "Computer Science", self.COMPLETED, catalog_courses
+        )
+        assert progress["core_requirements"]["completed"] == [
+            "CSCI-UA.0101",
+            "MATH-UA.0121",
+        ]
+        assert progress["elective_requirements"]["completed"] == [
+            "CSCI-UA.0421",
+            "MATH-UA.0140",
+        ]
+        assert [
+            c["course_code"]
+            for c in remaining["remaining_electives"]["available_courses"]
+        ] == [
+            "CSCI-UA.0480",
+            "CSCI-UA.04ab",
+            "CSCI-UA.0472",
+            "CSCI-UA.0480",
+        ]
+        assert remaining["remaining_electives"]["count_needed"] == 3
+
+    def test_single_catalog_lookup(self, catalog_courses):
+        """Test that the audit looks up the catalog electives once."""
+        from api import major_requirements
+
+        with patch.object(
+            major_requirements,
+            "find_matching_courses",
+            wraps=major_requirements.find_matching_courses,
+        ) as find:
+            audit = major_requirements.audit_degree(
+                "Computer Science", self.COMPLETED, catalog_courses
+            )
+            audit.progress()
+            audit.remaining()
+
+        assert find.call_count == 1
+
+    def test_unknown_major(self, catalog_courses):
+        """Test that an unknown major gives the not-found results."""
+        from api.major_requirements import audit_degree
+
+        audit = audit_degree("Basket Weaving", self.COMPLETED, catalog_courses)
+
+        assert audit.major_requirements is None
+        assert audit.progress() == {
+            "error": "Major 'Basket Weaving' not found",
+            "major_name": "Basket Weaving",
+        }
+        assert audit.remaining() == audit.progress()
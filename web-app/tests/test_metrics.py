@@ -0,0 +1,28 @@
+"""
+test_metrics.py
+
+Unit tests for metrics.py (summary statistics shared by the stats reports).
+"""
+
+
+class TestPercentile:
+    """Tests for percentile."""
+
+    def test_nearest_rank(self):
+        """Test nearest-rank percentiles of unordered values."""
+        from api.metrics import percentile
+
+        values = [float(i) for i in range(100, 0, -1)]
+
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 99) == 99.0
+        assert percentile(values, 0) == 1.0
+        assert percentile(iter(values), 100) == 100.0
+
+    def test_empty_and_rounding(self):
+        """Test that no values give None and results are rounded."""
+        from api.metrics import percentile
+
+        assert percentile([], 95) is None
+        assert percentile([0.123456], 50) == 0.123
+        assert percentile([0.123456], 50, 4) == 0.1235
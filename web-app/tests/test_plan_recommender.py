@@ -0,0 +1,184 @@
+"""
+test_plan_recommender.py
+
+Unit tests for plan_recommender.py (sequential eligibility projection and
+plan validation). The LLM call is mocked.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.fixture
+def catalog(make_course):
+    """Catalog with a prerequisite chain: 0101 -> 0102 -> 0201 -> 0202."""
+    return [
+        make_course("CSCI-UA.0101", "Introduction to Computer Science"),
+        make_course("CSCI-UA.0102", "Data Structures", ["CSCI-UA.0101"]),
+        make_course("CSCI-UA.0201", "Computer Systems Organization", ["CSCI-UA.0102"]),
+        make_course("CSCI-UA.0202", "Operating Systems", ["CSCI-UA.0201"]),
+        make_course("CSCI-UA.0004", "Web Design", offered=("Fall",)),
+        make_course("CSCI-UA.0060", "Database Design", offered=("Spring",)),
+    ]
+
+
+@pytest.fixture
+def student():
+    """Student profile without a declared major."""
+    return {
+        "name": "Test",
+        "major": "",
+        "completed_courses": [],
+        "interests": [],
+        "career_path": "Systems",
+        "side_interests": [],
+    }
+
+
+def _item(code):
+    return {"course_code": code, "title": code, "credits": 4, "reasoning": ""}
+
+
+class TestProjectSemesterCandidates:
+    """Tests for project_semester_candidates function."""
+
+    def test_prerequisite_chain_advances(self, catalog, student):
+        """Test that provisional picks unlock courses in the next semester."""
+        from api.plan_recommender import project_semester_candidates
+
+        entries = project_semester_candidates(
+            student, [], ["Freshman Fall", "Freshman Spring"], catalog
+        )
+
+        fall_codes = {c["course_code"] for c in entries[0]["candidates"]}
+        spring_codes = {c["course_code"] for c in entries[1]["candidates"]}
+
+        assert "CSCI-UA.0101" in fall_codes
+        assert "CSCI-UA.0102" not in fall_codes
+        assert "CSCI-UA.0102" in spring_codes
+        assert "CSCI-UA.0101" in entries[1]["completed_courses"]
+
+    def test_semester_availability(self, catalog, student):
+        """Test that each semester only offers courses given that term."""
+        from api.plan_recommender import project_semester_candidates
+
+        entries = project_semester_candidates(
+            student, [], ["Freshman Fall", "Freshman Spring"], catalog
+        )
+
+        assert "CSCI-UA.0060" not in {
+            c["course_code"] for c in entries[0]["candidates"]
+        }
+        assert "CSCI-UA.0004" not in {
+            c["course_code"] for c in entries[1]["candidates"]
+        }
+
+
+class TestSequencePlan:
+    """Tests for sequence_plan function."""
+
+    def test_drops_courses_with_unmet_prerequisites(self, catalog, student):
+        """Test that a course cannot rely on a prerequisite from the same semester."""
+        from api.plan_recommender import project_semester_candidates, sequence_plan
+
+        entries = project_semester_candidates(student, [], ["Freshman Fall"], catalog)
+        plan = {"Freshman Fall": [_item("CSCI-UA.0101"), _item("CSCI-UA.0102")]}
+
+        result = sequence_plan(plan, entries, [], catalog)
+        codes = [c["course_code"] for c in result["Freshman Fall"]]
+
+        assert "CSCI-UA.0101" in codes
+        assert "CSCI-UA.0102" not in codes
+
+    def test_earlier_semesters_satisfy_prerequisites(self, catalog, student):
+        """Test that courses from earlier semesters count as completed."""
+        from api.plan_recommender import project_semester_candidates, sequence_plan
+
+        semesters = ["Freshman Fall", "Freshman Spring"]
+        entries = project_semester_candidates(student, [], semesters, catalog)
+        plan = {
+            "Freshman Fall": [_item("CSCI-UA.0101")],
+            "Freshman Spring": [_item("CSCI-UA.0102"), _item("CSCI-UA.0101")],
+        }
+
+        result = sequence_plan(plan, entries, [], catalog)
+        spring_codes = [c["course_code"] for c in result["Freshman Spring"]]
+
+        assert "CSCI-UA.0102" in spring_codes
+        assert "CSCI-UA.0101" not in spring_codes  # no repeats
+
+    def test_drops_unknown_and_completed_courses(self, catalog, student):
+        """Test that hallucinated and already completed courses are removed."""
+        from api.plan_recommender import project_semester_candidates, sequence_plan
+
+        entries = project_semester_candidates(
+            student, ["CSCI-UA.0101"], ["Freshman Fall"], catalog
+        )
+        plan = {"Freshman Fall": [_item("CSCI-UA.9999"), _item("CSCI-UA.0101")]}
+
+        result = sequence_plan(plan, entries, ["CSCI-UA.0101"], catalog)
+        codes = [c["course_code"] for c in result["Freshman Fall"]]
+
+        assert "CSCI-UA.9999" not in codes
+        assert "CSCI-UA.0101" not in codes
+
+    def test_tops_up_empty_semesters(self, catalog, student):
+        """Test that semesters missing from the response are filled locally."""
+        from api.plan_recommender import project_semester_candidates, sequence_plan
+
+        entries = project_semester_candidates(student, [], ["Freshman Fall"], catalog)
+
+        result = sequence_plan({}, entries, [], catalog)
+
+        assert result["Freshman Fall"]
+        assert all(c["reasoning"] for c in result["Freshman Fall"])
+
+
+class TestGeneratePlan:
+    """Tests for generate_plan function."""
+
+    def test_generate_plan_single_call(self, catalog, student):
+        """Test that all semesters are generated with one LLM call."""
+        from api import plan_recommender
+
+        semesters = ["Freshman Fall", "Freshman Spring"]
+        response = {
+            "Freshman Fall": [_item("CSCI-UA.0101")],
+            "Freshman Spring": [_item("CSCI-UA.0102")],
+        }
+
+        with patch(
+            "api.llm_service.generate_plan_recommendations", return_value=response
+        ) as mock_llm:
+            plan = plan_recommender.generate_plan(
+                student, [], semesters, catalog, strategy="single"
+            )
+
+        assert mock_llm.call_count == 1
+        assert len(mock_llm.call_args.kwargs["semester_candidates"]) == 2
+        assert plan["Freshman Spring"][0]["course_code"] == "CSCI-UA.0102"
+
+    def test_generate_plan_llm_failure(self, catalog, student):
+        """Test that None is returned when the LLM fails."""
+        from api import plan_recommender
+
+        with patch("api.llm_service.generate_plan_recommendations", return_value=None):
+            plan = plan_recommender.generate_plan(
+                student, [], ["Freshman Fall"], catalog, strategy="single"
+            )
+
+        assert plan is None
+
+    def test_generate_local_plan(self, catalog, student):
+        """Test that a local plan is generated without calling the LLM."""
+        from api import plan_recommender
+
+        with patch("api.llm_service.generate_plan_recommendations") as mock_llm:
+            plan = plan_recommender.generate_local_plan(
+                student, [], ["Freshman Fall", "Freshman Spring"], catalog
+            )
+
+        mock_llm.assert_not_called()
+        assert "CSCI-UA.0101" in [c["course_code"] for c in plan["Freshman Fall"]]
+        assert "CSCI-UA.0102" in [c["course_code"] for c in plan["Freshman Spring"]]
@@ -0,0 +1,133 @@
+"""
+test_plan_templates.py
+
+Unit tests for plan_templates.py and database/precompute_plans.py
+(precomputed canonical plans served as starting templates).
+"""
+
+import pytest
+
+
+@pytest.fixture
+def catalog(make_course):
+    """Catalog with a prerequisite chain and a few electives."""
+    return [
+        make_course("CSCI-UA.0101", "Introduction to Computer Science"),
+        make_course("CSCI-UA.0102", "Data Structures", ["CSCI-UA.0101"]),
+        make_course("CSCI-UA.0201", "Computer Systems Organization", ["CSCI-UA.0102"]),
+        make_course("CSCI-UA.0202", "Operating Systems", ["CSCI-UA.0201"]),
+        make_course("CSCI-UA.0004", "Web Design", offered=("Fall",)),
+        make_course("CSCI-UA.0060", "Database Design", offered=("Spring",)),
+        make_course(
+            "CSCI-UA.0473", "Fundamentals of Machine Learning", ["CSCI-UA.0102"]
+        ),
+        make_course("CSCI-UA.0474", "Software Engineering", ["CSCI-UA.0102"]),
+    ]
+
+
+class TestNormalizeCareerPath:
+    """Tests for normalize_career_path function."""
+
+    def test_normalize_career_path(self):
+        """Test that case, punctuation and spacing are ignored."""
+        from api.plan_templates import normalize_career_path
+
+        assert (
+            normalize_career_path("  Software   Engineering ") == "software engineering"
+        )
+        assert normalize_career_path("AI/ML") == "ai ml"
+        assert normalize_career_path(None) == ""
+
+
+class TestBuildTemplates:
+    """Tests for build_templates function."""
+
+    def test_one_template_per_start_semester(self, catalog):
+        """Test that later templates assume the earlier semesters were completed."""
+        from api.plan_templates import build_templates
+        from api.plan_utils import SEMESTERS
+
+        templates = build_templates("Computer Science", "Software Engineering", catalog)
+
+        assert [t["start_semester"] for t in templates] == SEMESTERS
+        assert templates[0]["assumed_completed"] == []
+        assert len(templates[0]["semesters"]) == len(SEMESTERS)
+        first_semester = [
+            c["course_code"] for c in templates[0]["semesters"][0]["courses"]
+        ]
+        assert templates[1]["assumed_completed"] == first_semester
+        assert templates[1]["semesters"] == templates[0]["semesters"][1:]
+        assert templates[0]["career_path"] == "software engineering"
+        assert templates[0]["source"] == "local"
+
+
+class TestFindTemplate:
+    """Tests for save_templates and find_template functions."""
+
+    def test_find_template(self, mock_db, catalog):
+        """Test lookup by normalized career path and removal of completed courses."""
+        from api.plan_templates import build_templates, find_template, save_templates
+
+        templates = build_templates("Computer Science", "Software Engineering", catalog)
+        save_templates(templates, mock_db)
+        assumed = templates[1]["assumed_completed"]
+
+        template = find_template(
+            "Computer Science",
+            "software engineering!",
+            "Freshman Spring",
+            assumed,
+            mock_db,
+        )
+
+        assert template["career_path"] == "Software Engineering"
+        assert template["start_semester"] == "Freshman Spring"
+        assert template["divergence"] == 0
+        assert template["divergent"] is False
+        assert "assumed_completed" not in template
+
+    def test_divergent_history(self, mock_db, catalog):
+        """Test that a history far from the template's assumptions is divergent."""
+        from api.plan_templates import build_templates, find_template, save_templates
+
+        save_templates(build_templates("Computer Science", "", catalog), mock_db)
+        completed = ["CSCI-UA.0101", "CSCI-UA.0102", "CSCI-UA.0201", "CSCI-UA.0473"]
+
+        template = find_template(
+            "Computer Science", "", "Freshman Fall", completed, mock_db
+        )
+
+        assert template["divergence"] == 4
+        assert template["divergent"] is True
+        codes = {c["course_code"] for s in template["semesters"] for c in s["courses"]}
+        assert not codes & set(completed)
+
+    def test_missing_template(self, mock_db):
+        """Test that None is returned for combinations that were not precomputed."""
+        from api.plan_templates import find_template
+
+        assert (
+            find_template("Computer Science", "Astronaut", "Freshman Fall", [], mock_db)
+            is None
+        )
+
+
+class TestPrecomputePlans:
+    """Tests for the precompute_plans batch job."""
+
+    def test_precompute_replaces_old_catalog(self, mock_db, catalog):
+        """Test that rerunning replaces templates and drops other catalog versions."""
+        from database.precompute_plans import precompute_plans
+
+        mock_db.courses.insert_many(catalog)
+        mock_db.canonical_plans.insert_one(
+            {"major": "Mathematics", "career_path": "", "catalog_version": "old"}
+        )
+
+        first = precompute_plans(mock_db, career_paths=["", "Data Science"])
+        second = precompute_plans(mock_db, career_paths=["", "Data Science"])
+
+        assert first["stored"] == 16
+        assert first["removed"] == 1
+        assert second["removed"] == 0
+        assert mock_db.canonical_plans.count_documents({}) == 16
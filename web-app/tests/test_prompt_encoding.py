@@ -0,0 +1,139 @@
+"""
+test_prompt_encoding.py
+
+Unit tests for prompt_encoding.py (compact course rows, row cache, token counting).
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+@pytest.fixture
+def sample_course():
+    """Course dictionary in the database format."""
+    return {
+        "course_code": "CSCI-UA.0102",
+        "title": "Data Structures",
+        "credits": 4,
+        "difficulty": 3,
+        "prerequisites": ["CSCI-UA.0101"],
+        "semester_offered": ["Fall", "Spring"],
+        "description": "Use and design of data structures, which organize information "
+        "in computer memory. Stacks, queues, linked lists, binary trees: how to "
+        "implement them in a high level language.",
+    }
+
+
+class TestEncodeCourseRow:
+    """Tests for encode_course_row function."""
+
+    def test_encode_course_row_fields(self, sample_course):
+        """Test that a row contains every column in header order."""
+        from api.prompt_encoding import COURSE_TABLE_HEADER, encode_course_row
+
+        row = encode_course_row(sample_course)
+        fields = row.split("|")
+
+        assert len(fields) == len(COURSE_TABLE_HEADER.split("|"))
+        assert fields[:6] == [
+            "CSCI-UA.0102",
+            "Data Structures",
+            "4",
+            "3",
+            "CSCI-UA.0101",
+            "Fa,Sp",
+        ]
+
+    def test_encode_course_row_truncates_description(self, sample_course):
+        """Test that long descriptions are shortened at a word boundary."""
+        from api.prompt_encoding import DESCRIPTION_CHARS, encode_course_row
+
+        about = encode_course_row(sample_course).rsplit("|", maxsplit=1)[-1]
+
+        assert len(about) <= DESCRIPTION_CHARS + 1
+        assert about.endswith("…")
+
+    def test_encode_course_row_prerequisite_logic(self, sample_course):
+        """Test AND/OR prerequisite rendering."""
+        from api.prompt_encoding import encode_course_row
+
+        sample_course["prerequisites"] = {
+            "logic": "or",
+            "courses": ["CSCI-UA.0002", "CSCI-UA.0003"],
+        }
+        assert "|CSCI-UA.0002/CSCI-UA.0003|" in encode_course_row(sample_course)
+
+        sample_course["prerequisites"] = ["CSCI-UA.0101", "MATH-UA.0120"]
+        assert "|CSCI-UA.0101+MATH-UA.0120|" in encode_course_row(sample_course)
+
+        sample_course["prerequisites"] = []
+        assert "|-|" in encode_course_row(sample_course)
+
+
+class TestGetCourseRows:
+    """Tests for get_course_rows function."""
+
+    def test_get_course_rows_cached_per_version(self, sample_course):
+        """Test that rows are reused within a catalog version and rebuilt after."""
+        from api.prompt_encoding import get_course_rows
+
+        first = get_course_rows([sample_course], "v1")
+        sample_course["title"] = "Renamed Course"
+
+        assert get_course_rows([sample_course], "v1") == first
+        assert "Renamed Course" in get_course_rows([sample_course], "v2")[0]
+
+    def test_get_course_rows_no_version(self, sample_course):
+        """Test that rows are always encoded fresh without a catalog version."""
+        from api.prompt_encoding import get_course_rows
+
+        get_course_rows([sample_course], None)
+        sample_course["title"] = "Renamed Course"
+
+        assert "Renamed Course" in get_course_rows([sample_course], None)[0]
+
+
+class TestCountTokens:
+    """Tests for count_tokens function."""
+
+    def test_count_tokens(self):
+        """Test that token counts grow with text length."""
+        from api.prompt_encoding import count_tokens
+
+        assert count_tokens("") == 0
+        assert (
+            0 < count_tokens("Data Structures") < count_tokens("Data Structures " * 20)
+        )
+
+    def test_encoder_loaded_off_request_path(self):
+        """Test that counting before warmup estimates and loads the encoding in the background."""
+        from api import prompt_encoding
+
+        fake_tiktoken = MagicMock()
+        fake_tiktoken.get_encoding.return_value.encode.side_effect = str.split
+        with patch.object(prompt_encoding, "tiktoken", fake_tiktoken), patch.object(
+            prompt_encoding, "_encoder", None
+        ), patch.object(prompt_encoding, "_encoder_loader", None):
+            estimated = prompt_encoding.count_tokens("one two three")
+            prompt_encoding._encoder_loader.join(timeout=5)
+            exact = prompt_encoding.count_tokens("one two three")
+
+        assert estimated == 4
+        assert exact == 3
+        fake_tiktoken.get_encoding.assert_called_once_with("cl100k_base")
+
+    def test_load_encoder_failure(self):
+        """Test that an unavailable encoding falls back to estimates without retrying."""
+        from api import prompt_encoding
+
+        fake_tiktoken = MagicMock()
+        fake_tiktoken.get_encoding.side_effect = OSError("offline")
+        with patch.object(prompt_encoding, "tiktoken", fake_tiktoken), patch.object(
+            prompt_encoding, "_encoder", None
+        ):
+            assert prompt_encoding.load_encoder() is False
+            assert prompt_encoding.count_tokens("abcdefgh") == 2
+            assert prompt_encoding.load_encoder() is False
+
+        fake_tiktoken.get_encoding.assert_called_once()
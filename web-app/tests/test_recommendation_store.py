@@ -0,0 +1,210 @@
+"""
+test_recommendation_store.py
+
+Unit tests for recommendation_store.py (last recommendations per student and semester).
+"""
+
+from unittest.mock import patch
+
+COURSES = [
+    {
+        "course_code": "CSCI-UA.0102",
+        "title": "Data Structures",
+        "credits": 4,
+        "reasoning": "...",
+    }
+]
+
+
+def _save(mock_db, fingerprint, courses=None, semester="Sophomore Fall"):
+    from api.recommendation_store import save_recommendations
+
+    save_recommendations(
+        user_email="test@example.com",
+        semester=semester,
+        courses=courses or COURSES,
+        source="llm",
+        fingerprint=fingerprint,
+        career_path="Software Engineering",
+        side_interests=["Music"],
+        db=mock_db,
+    )
+
+
+class TestComputeInputFingerprint:
+    """Tests for compute_input_fingerprint function."""
+
+    def test_fingerprint_order_independent(self):
+        """Test that course order and duplicates don't change the fingerprint."""
+        from api.recommendation_store import compute_input_fingerprint
+
+        first = compute_input_fingerprint(
+            ["CSCI-UA.0101", "MATH-UA.0121"], "Computer Science"
+        )
+        second = compute_input_fingerprint(
+            ["MATH-UA.0121", "CSCI-UA.0101", "CSCI-UA.0101"], "Computer Science"
+        )
+
+        assert first == second
+
+    def test_fingerprint_changes_with_inputs(self):
+        """Test that courses and major change the fingerprint."""
+        from api.recommendation_store import compute_input_fingerprint
+
+        base = compute_input_fingerprint(["CSCI-UA.0101"], "Computer Science")
+
+        assert compute_input_fingerprint(["CSCI-UA.0102"], "Computer Science") != base
+        assert compute_input_fingerprint(["CSCI-UA.0101"], "Mathematics") != base
+
+
+class TestLastRecommendations:
+    """Tests for save_recommendations and get_last_recommendations."""
+
+    def test_get_saved_recommendations(self, mock_db):
+        """Test that a saved set is returned fresh for the same inputs."""
+        from api.recommendation_store import get_last_recommendations
+
+        _save(mock_db, "abc")
+        record = get_last_recommendations(
+            "test@example.com", "Sophomore Fall", "abc", mock_db
+        )
+
+        assert record["courses"] == COURSES
+        assert record["source"] == "llm"
+        assert record["career_path"] == "Software Engineering"
+        assert record["side_interests"] == ["Music"]
+        assert record["generated_at"]
+        assert record["stale"] is False
+        assert "_id" not in record and "fingerprint" not in record
+
+    def test_stale_when_inputs_change(self, mock_db):
+        """Test that the set is marked stale when the fingerprint differs."""
+        from api.recommendation_store import get_last_recommendations
+
+        _save(mock_db, "abc")
+        record = get_last_recommendations(
+            "test@example.com", "Sophomore Fall", "def", mock_db
+        )
+
+        assert record["stale"] is True
+
+    def test_save_replaces_previous(self, mock_db):
+        """Test that only the last set is kept per semester."""
+        from api.recommendation_store import get_last_recommendations
+
+        newer = [dict(COURSES[0], course_code="CSCI-UA.0201")]
+        _save(mock_db, "abc")
+        _save(mock_db, "def", courses=newer)
+        _save(mock_db, "abc", semester="Junior Fall")
+
+        record = get_last_recommendations(
+            "test@example.com", "Sophomore Fall", "def", mock_db
+        )
+
+        assert record["courses"] == newer
+        assert record["stale"] is False
+        assert mock_db.recommendations.count_documents({}) == 2
+
+    def test_get_missing(self, mock_db):
+        """Test that None is returned when nothing was saved."""
+        from api.recommendation_store import get_last_recommendations
+
+        assert (
+            get_last_recommendations("test@example.com", "Senior Fall", "abc", mock_db)
+            is None
+        )
+
+
+class TestGenerateRoute:
+    """Tests for saving recommendations from POST /api/recommendations/generate."""
+
+    def test_save_failure_still_returns_recommendations(
+        self, mock_db, make_course, auth_header
+    ):
+        """Test that a failed save is logged and the recommendations are returned."""
+        from api import recommendation_store
+        from api.app import app
+
+        mock_db.courses.insert_many(
+            [
+                make_course("CSCI-UA.0101", "Introduction to Computer Science"),
+                make_course("CSCI-UA.0102", "Data Structures", ["CSCI-UA.0101"]),
+            ]
+        )
+        mock_db.students.insert_one(
+            {
+                "email": "ada@example.edu",
+                "major": "",
+                "year": "Freshman",
+                "completed_courses": ["CSCI-UA.0101"],
+                "planned_semesters": [],
+            }
+        )
+        with patch("api.user_model.db", mock_db), patch(
+            "api.course_filtering.db", mock_db
+        ), patch("api.recommendation_routes.db", mock_db), patch.object(
+            recommendation_store,
+            "save_recommendations",
+            side_effect=RuntimeError("write failed"),
+        ):
+            response = app.test_client().post(
+                "/api/recommendations/generate",
+                json={"semester": "Freshman Spring", "mode": "local"},
+                headers=auth_header(),
+            )
+
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body["source"] == "local"
+        assert [c["course_code"] for c in body["courses"]] == ["CSCI-UA.0102"]
+
+    def test_fresh_after_saving_into_semester(self, mock_db, make_course, auth_header):
+        """Test that planning the recommended courses keeps the saved set fresh."""
+        from api.app import app
+
+        mock_db.courses.insert_many(
+            [
+                make_course("CSCI-UA.0101", "Introduction to Computer Science"),
+                make_course("CSCI-UA.0102", "Data Structures", ["CSCI-UA.0101"]),
+                make_course("MATH-UA.0121", "Calculus I"),
+            ]
+        )
+        mock_db.students.insert_one(
+            {
+                "email": "ada@example.edu",
+                "major": "",
+                "year": "Freshman",
+                "completed_courses": ["CSCI-UA.0101"],
+                "planned_semesters": [],
+            }
+        )
+
+        def plan(semesters):
+            mock_db.students.update_one(
+                {"email": "ada@example.edu"},
+                {"$set": {"planned_semesters": semesters}},
+            )
+
+        def last():
+            return client.get(
+                "/api/recommendations/last?semester=Freshman Spring",
+                headers=auth_header(),
+            ).get_json()
+
+        with patch("api.user_model.db", mock_db), patch(
+            "api.course_filtering.db", mock_db
+        ), patch("api.recommendation_routes.db", mock_db):
+            client = app.test_client()
+            client.post(
+                "/api/recommendations/generate",
+                json={"semester": "Freshman Spring", "mode": "local"},
+                headers=auth_header(),
+            )
+            spring = {"semester": "Freshman Spring", "courses": ["CSCI-UA.0102"]}
+            plan([spring])
+            saved_into_semester = last()
+            plan([spring, {"semester": "Sophomore Fall", "courses": ["MATH-UA.0121"]}])
+            other_semester_changed = last()
+
+        assert saved_into_semester["stale"] is False
+        assert other_semester_changed["stale"] is True
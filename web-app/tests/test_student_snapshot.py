@@ -0,0 +1,203 @@
+"""
+test_student_snapshot.py
+
+Unit tests for student_snapshot.py (materialized degree progress and
+eligibility) and the routes that write and read the snapshots.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.fixture
+def seed_courses():
+    """The bundled catalog as a tuple of Course records."""
+    from api.course import Course
+    from database.app_db import load_courses
+
+    return tuple(Course.from_dict(course) for course in load_courses())
+
+
+@pytest.fixture
+def student():
+    """A CS student with completed and planned courses."""
+    return {
+        "name": "Ada",
+        "email": "ada@example.edu",
+        "netid": "ada",
+        "password": "hashed",
+        "major": "Computer Science",
+        "year": "Sophomore",
+        "interests": [],
+        "completed_courses": ["CSCI-UA.0101", "MATH-UA.0121"],
+        "planned_semesters": [
+            {
+                "semester": "Sophomore Fall",
+                "courses": [
+                    {
+                        "course_code": "CSCI-UA.0102",
+                        "title": "Data Structures",
+                        "credits": 4,
+                    }
+                ],
+            }
+        ],
+    }
+
+
+@pytest.fixture
+def seeded_db(mock_db, student):
+    """Bundled catalog and one student, wired into the routes."""
+    from database.app_db import load_courses
+
+    mock_db.courses.insert_many(load_courses())
+    mock_db.students.insert_one(dict(student))
+    with patch("api.course_filtering.db", mock_db), patch(
+        "api.user_routes.db", mock_db
+    ), patch("api.plan_routes.db", mock_db):
+        yield mock_db
+
+
+class TestBuildSnapshot:
+    """Tests for build_snapshot and get_available_courses."""
+
+    @pytest.mark.parametrize("semester", ["Freshman Fall", "Junior Spring", "Summer"])
+    def test_matches_live_computation(self, seed_courses, student, semester):
+        """Test that the snapshot gives the same courses and audit as computing them."""
+        from api import course_filtering, major_requirements, student_snapshot
+        from api.plan_utils import excluded_course_codes
+
+        snapshot = student_snapshot.build_snapshot(student, seed_courses)
+        excluded = excluded_course_codes(student)
+        audit = major_requirements.audit_degree(
+            "Computer Science", excluded, seed_courses
+        )
+
+        assert student_snapshot.get_available_courses(
+            snapshot, semester, seed_courses
+        ) == course_filtering.get_available_courses_for_semester(
+            excluded, semester, seed_courses, "Computer Science"
+        )
+        assert snapshot["major_progress"] == audit.progress()
+        assert snapshot["remaining_requirements"] == audit.remaining()
+        assert "CSCI-UA.0102" not in snapshot["eligible"]["Fall"]["catalog"]
+
+    def test_no_major(self, seed_courses, student):
+        """Test that a student without a major gets eligibility but no audit."""
+        from api import student_snapshot
+
+        snapshot = student_snapshot.build_snapshot(
+            dict(student, major=""), seed_courses
+        )
+
+        assert snapshot["major_progress"] is None
+        assert snapshot["remaining_requirements"] is None
+        assert snapshot["eligible"]["Spring"]["catalog"]
+        assert snapshot["eligible"]["Spring"]["math"] == []
+
+
+class TestGetStudentSnapshot:
+    """Tests for get_student_snapshot (materialization and staleness)."""
+
+    def test_stored_and_reused(self, mock_db, seed_courses, student):
+        """Test that a current snapshot is read back without recomputing."""
+        from api import student_snapshot
+
+        snapshot = student_snapshot.get_student_snapshot(student, mock_db, seed_courses)
+
+        with patch.object(student_snapshot, "build_snapshot") as build:
+            stored = student_snapshot.get_student_snapshot(
+                student, mock_db, seed_courses
+            )
+
+        build.assert_not_called()
+        assert stored == snapshot
+        assert mock_db.student_snapshots.count_documents({}) == 1
+
+    def test_recomputed_when_stale(self, mock_db, seed_courses, student):
+        """Test that changed courses, major or catalog recompute the snapshot."""
+        from api import student_snapshot
+
+        first = student_snapshot.get_student_snapshot(student, mock_db, seed_courses)
+        changes = [
+            (dict(student, completed_courses=["CSCI-UA.0101"]), seed_courses),
+            (dict(student, major="Mathematics"), seed_courses),
+            (student, seed_courses[1:]),
+        ]
+        for user, courses in changes:
+            snapshot = student_snapshot.get_student_snapshot(user, mock_db, courses)
+
+            assert (snapshot["fingerprint"], snapshot["catalog_version"]) != (
+                first["fingerprint"],
+                first["catalog_version"],
+            )
+            assert (
+                mock_db.student_snapshots.find_one(
+                    {"email": "ada@example.edu"}, {"_id": 0}
+                )
+                == snapshot
+            )
+
+    def test_disabled(self, mock_db, seed_courses, student):
+        """Test that nothing is materialized with STUDENT_SNAPSHOTS off."""
+        from api import student_snapshot
+
+        with patch.object(student_snapshot, "STUDENT_SNAPSHOTS", False):
+            snapshot = student_snapshot.get_student_snapshot(
+                student, mock_db, seed_courses
+            )
+
+        assert snapshot is None
+        assert mock_db.student_snapshots.count_documents({}) == 0
+
+
+class TestSnapshotRoutes:
+    """Tests for the routes that write and read the snapshots."""
+
+    def test_completed_courses_then_progress(self, seeded_db, auth_header):
+        """Test that a write materializes the snapshot that /progress serves."""
+        from api import student_snapshot
+        from api.app import app
+
+        client = app.test_client()
+        response = client.put(
+            "/api/user/completed-courses",
+            json={"completed_courses": ["CSCI-UA.0101", "CSCI-UA.0201"]},
+            headers=auth_header(),
+        )
+        assert response.status_code == 200
+        assert seeded_db.student_snapshots.count_documents({}) == 1
+
+        with patch.object(student_snapshot, "build_snapshot") as build:
+            response = client.get("/api/user/progress", headers=auth_header())
+
+        build.assert_not_called()
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body["major"] == "Computer Science"
+        # Planned courses count, as in recommendation requests
+        assert body["major_progress"]["core_requirements"]["completed"] == [
+            "CSCI-UA.0101",
+            "CSCI-UA.0102",
+            "CSCI-UA.0201",
+        ]
+        assert "CSCI-UA.0201" not in body["eligible"]["Fall"]
+
+    def test_plan_save_updates_eligibility(self, seeded_db, auth_header):
+        """Test that saving a plan recomputes the eligible courses."""
+        from api.app import app
+
+        response = app.test_client().post(
+            "/api/plans/save",
+            json={
+                "semester": "Freshman Spring",
+                "courses": ["CSCI-UA.0201 Computer Systems Organization (4 credits)"],
+            },
+            headers=auth_header(),
+        )
+
+        assert response.status_code == 200
+        snapshot = seeded_db.student_snapshots.find_one({"email": "ada@example.edu"})
+        assert "CSCI-UA.0201" not in snapshot["eligible"]["Spring"]["catalog"]
+        assert "CSCI-UA.0202" in snapshot["eligible"]["Spring"]["catalog"]
@@ -0,0 +1,169 @@
+"""
+test_warmup.py
+
+Unit tests for warmup.py, the /readyz readiness probe and the gunicorn
+configuration hooks (preloading and gc.freeze).
+"""
+
+import importlib.util
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+@pytest.fixture
+def warmup_module():
+    """Warmup module with a fresh (not ready) status."""
+    from api import warmup
+
+    status = {key: None for key in warmup._status}
+    status["ready"] = False
+    status["courses"] = 0
+    with patch.dict(warmup._status, status), patch.object(warmup, "_last_attempt", 0.0):
+        yield warmup
+
+
+class TestWarmUp:
+    """Tests for warm_up and the readiness probe."""
+
+    def test_warm_up_marks_ready(self, mock_db, warmup_module, make_course):
+        """Test that a successful warmup fills the caches and marks the process ready."""
+        from api import course_filtering
+
+        mock_db.courses.insert_many(
+            [
+                make_course("CSCI-UA.0101", "Intro"),
+                make_course("CSCI-UA.0102", "Data Structures"),
+            ]
+        )
+        with patch("api.course_filtering.db", mock_db):
+            status = warmup_module.warm_up()
+
+        assert status["ready"] is True
+        assert status["courses"] == 2
+        assert status["error"] is None
+        assert warmup_module.is_ready()
+        index = course_filtering.get_catalog_index([], status["catalog_version"])
+        assert set(index) == {"CSCI-UA.0101", "CSCI-UA.0102"}
+
+    def test_empty_catalog_not_ready(self, mock_db, warmup_module):
+        """Test that warmup fails (not ready) on an empty catalog."""
+        with patch("api.course_filtering.db", mock_db):
+            status = warmup_module.warm_up()
+
+        assert status["ready"] is False
+        assert "catalog is empty" in status["error"]
+
+    def test_readyz(self, mock_db, warmup_module, make_course):
+        """Test that /readyz returns 503 before warmup and 200 after."""
+        from api.app import app
+
+        client = app.test_client()
+        with patch.object(warmup_module, "retry_in_background") as retry:
+            response = client.get("/readyz")
+        assert response.status_code == 503
+        retry.assert_called_once()
+
+        mock_db.courses.insert_one(make_course("CSCI-UA.0101", "Intro"))
+        with patch("api.course_filtering.db", mock_db):
+            warmup_module.warm_up()
+        response = client.get("/readyz")
+        assert response.status_code == 200
+        assert response.get_json()["ready"] is True
+
+    def test_retry_is_rate_limited(self, warmup_module):
+        """Test that a failed warmup is retried at most every WARMUP_RETRY_SECONDS."""
+        with patch.object(warmup_module.threading, "Thread") as thread, patch.object(
+            warmup_module.time, "monotonic", return_value=100.0
+        ):
+            warmup_module._last_attempt = 95.0
+            warmup_module.retry_in_background()
+            assert not thread.called
+
+            warmup_module._last_attempt = 80.0
+            warmup_module.retry_in_background()
+
+        thread.assert_called_once()
+        assert thread.call_args.kwargs["target"] is warmup_module.warm_up
+
+
+def _load_gunicorn_config(**env):
+    path = os.path.join(os.path.dirname(__file__), "..", "gunicorn.conf.py")
+    spec = importlib.util.spec_from_file_location("gunicorn_conf", path)
+    module = importlib.util.module_from_spec(spec)
+    # Don't disable the test process's garbage collector at import
+    with patch.dict(os.environ, {"GUNICORN_PRELOAD": "false", **env}):
+        spec.loader.exec_module(module)
+    return module
+
+
+class TestGunicornConfig:
+    """Tests for the gunicorn.conf.py hooks."""
+
+    def test_when_ready_warms_up_and_freezes(self):
+        """Test that the master warms up, closes MongoDB and freezes the heap."""
+        config = _load_gunicorn_config()
+        server = MagicMock()
+        status = {"ready": True, "duration_seconds": 0.1, "courses": 3}
+
+        with patch.object(config, "PRELOAD", True), patch(
+            "api.warmup.warm_up", return_value=status
+        ) as warm_up, patch("api.user_model.client") as client, patch.object(
+            config, "gc"
+        ) as gc:
+            config.when_ready(server)
+            config.post_fork(server, MagicMock())
+
+        warm_up.assert_called_once()
+        client.close.assert_called_once()
+        gc.freeze.assert_called_once()
+        gc.enable.assert_called_once()
+
+    def test_admission_backend_defaults_to_mongo(self):
+        """Test that the admission limits are shared across workers by default."""
+        with patch.dict(os.environ):
+            os.environ.pop("ADMISSION_BACKEND", None)
+            config = _load_gunicorn_config(GUNICORN_WORKERS="4")
+
+        assert config.ADMISSION_BACKEND == "mongo"
+
+    def test_admission_backend_read_from_env_file(self):
+        """Test that ADMISSION_BACKEND set in .env is not overridden with mongo."""
+
+        def load_env_file(path):
+            assert path.endswith(".env")
+            os.environ.setdefault("ADMISSION_BACKEND", "memory")
+
+        with patch.dict(os.environ), patch(
+            "dotenv.load_dotenv", side_effect=load_env_file
+        ):
+            os.environ.pop("ADMISSION_BACKEND", None)
+            config = _load_gunicorn_config(GUNICORN_WORKERS="1")
+
+        assert config.ADMISSION_BACKEND == "memory"
+
+    def test_modules_share_one_mongo_client(self):
+        """Test that closing the client before fork covers the catalog reads too."""
+        from api import course_filtering, user_model
+
+        assert course_filtering.client is user_model.client
+
+    def test_memory_backend_refused_with_several_workers(self):
+        """Test that per-worker admission limits stop gunicorn from starting."""
+        with pytest.raises(SystemExit, match="ADMISSION_BACKEND=memory"):
+            _load_gunicorn_config(ADMISSION_BACKEND="memory", GUNICORN_WORKERS="4")
+
+        config = _load_gunicorn_config(ADMISSION_BACKEND="memory", GUNICORN_WORKERS="1")
+        assert config.workers == 1
+
+    def test_worker_warms_up_when_not_ready(self):
+        """Test that a worker warms itself up if the master did not."""
+        config = _load_gunicorn_config()
+
+        with patch("api.warmup.is_ready", return_value=False), patch(
+            "api.warmup.warm_up"
+        ) as warm_up:
+            config.post_worker_init(MagicMock())
+
+        warm_up.assert_called_once()